@@ -14,6 +14,7 @@ class WhisperServerManager {
 
   static const String _baseUrl = 'http://127.0.0.1:8089';
   static const String _healthEndpoint = '/health';
+  static const String _readyEndpoint = '/health/ready';
 
   /// Check if server is currently running
   bool get isRunning => _isRunning;
@@ -202,9 +203,27 @@ class WhisperServerManager {
     }
   }
 
-  /// Wait for server to be ready (polls health endpoint)
+  /// Check whether the server has finished warming up its preloaded models
+  Future<bool> _checkReady() async {
+    try {
+      final response = await _httpClient
+          .get(Uri.parse('$_baseUrl$_readyEndpoint'))
+          .timeout(const Duration(seconds: 2));
+
+      return response.statusCode == 200;
+    } catch (e) {
+      _logger.d('Readiness check failed: $e');
+      return false;
+    }
+  }
+
+  /// Wait for server to be ready (polls readiness endpoint)
+  ///
+  /// The server answers `/health` as soon as it is listening, but loads and
+  /// warms up its models in the background; `/health/ready` only succeeds
+  /// once the first transcription will run at full speed.
   Future<bool> waitForReady({
-    Duration timeout = const Duration(seconds: 30),
+    Duration timeout = const Duration(minutes: 2),
   }) async {
     final endTime = DateTime.now().add(timeout);
     int attempt = 0;
@@ -213,9 +232,9 @@ class WhisperServerManager {
 
     while (DateTime.now().isBefore(endTime)) {
       attempt++;
-      _logger.d('Health check attempt $attempt');
+      _logger.d('Readiness check attempt $attempt');
 
-      if (await checkHealth()) {
+      if (await _checkReady()) {
         _logger.i('Whisper server is ready!');
         return true;
       }
@@ -228,7 +247,7 @@ class WhisperServerManager {
     }
 
     _logger.e(
-      'Whisper server failed to start within ${timeout.inSeconds} seconds',
+      'Whisper server failed to become ready within ${timeout.inSeconds} seconds',
     );
     return false;
   }
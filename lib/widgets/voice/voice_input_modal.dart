@@ -142,7 +142,7 @@ class _VoiceInputModalState extends ConsumerState<VoiceInputModal> {
 
           final ready = await _serverManager.waitForReady();
           if (!ready) {
-            throw Exception('Whisper server failed to start within 30 seconds');
+            throw Exception('Whisper server failed to start within 2 minutes');
           }
 
           _logger.d('✅ Whisper server ready');
@@ -412,7 +412,7 @@ class _VoiceInputModalState extends ConsumerState<VoiceInputModal> {
             const Text('Starting Whisper server...'),
             const SizedBox(height: 8),
             const Text(
-              'First time may take 30 seconds',
+              'Loading models, first time may take up to 2 minutes',
               style: TextStyle(fontSize: 12, color: Colors.grey),
               textAlign: TextAlign.center,
             ),
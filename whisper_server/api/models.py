@@ -1,4 +1,5 @@
 """Pydantic models for API requests and responses."""
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from config import WhisperConfig
@@ -12,6 +13,7 @@ class TranscribeRequest(BaseModel):
     language: Optional[str] = "auto"
     messages: Optional[List[Dict[str, Any]]] = None
     audio_options: Optional[Dict[str, Any]] = None
+    stream: bool = False
 
     def get_audio(self) -> str:
         """
@@ -60,6 +62,33 @@ class TranscribeRequest(BaseModel):
         return None
 
 
+@dataclass
+class AudioInput:
+    """Audio and options extracted from any supported transcription request body."""
+
+    model: str
+    language: Optional[str]
+    data: bytes
+    format: Optional[str] = None
+    pcm_sample_rate: Optional[int] = None
+    pcm_channels: int = 1
+    pcm_big_endian: bool = True
+    stream: bool = False
+
+    @property
+    def is_raw_pcm(self) -> bool:
+        """Whether data is raw 16-bit PCM rather than an encoded container."""
+        return self.pcm_sample_rate is not None
+
+
+class TranscriptSegment(BaseModel):
+    """Timed piece of a transcript, in seconds from the start of the original audio."""
+
+    start: float
+    end: float
+    text: str
+
+
 class TranscribeResponse(BaseModel):
     """Response model for transcription endpoint."""
 
@@ -67,6 +96,10 @@ class TranscribeResponse(BaseModel):
     processing_time: float
     model: str
     format: str
+    segments: List[TranscriptSegment] = []
+    request_id: Optional[str] = None
+    # Stage durations in milliseconds, only with ?timings=true
+    timings: Optional[Dict[str, float]] = None
 
 
 class HealthResponse(BaseModel):
@@ -76,6 +109,14 @@ class HealthResponse(BaseModel):
     service: str
 
 
+class ReadinessResponse(BaseModel):
+    """Response model for readiness endpoint."""
+
+    ready: bool
+    warm_models: List[str]
+    models: Dict[str, Dict[str, Any]]
+
+
 class AudioInfoResponse(BaseModel):
     """Response model for debug audio info endpoint."""
 
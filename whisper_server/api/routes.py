@@ -1,21 +1,81 @@
 """API routes for Whisper transcription server."""
-import base64
-import tempfile
+import asyncio
+import functools
+import json
 import time
 import logging
-from pathlib import Path
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Request, Depends
+from contextlib import ExitStack
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    Response,
+    Depends,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+import numpy as np
+import soxr
 
 from api.models import (
+    AudioInput,
     TranscribeRequest,
     TranscribeResponse,
     HealthResponse,
+    ReadinessResponse,
     AudioInfoResponse,
 )
 from services.audio_processor import AudioProcessor, AudioProcessingError
+from services.batch_scheduler import BatchScheduler
+from services.inference_backend import GENERATE_OPTIONS
+from services.inference_executor import (
+    InferenceExecutor,
+    QueueFullError,
+    parse_client_weights,
+    set_current_client,
+)
+from services.language_id import LanguageIdentifier
 from services.model_manager import ModelManager
-from validators import validate_base64_audio, validate_model_name, validate_audio_format
+from services.metrics import (
+    CONTENT_TYPE_LATEST,
+    observe_transcription,
+    render_metrics,
+    time_stage,
+)
+from services.model_warmup import ModelWarmup
+from services.rate_limiter import RateLimiter, RateLimitExceededError, parse_window
+from services.replica_pool import (
+    ReplicaModelManager,
+    available_cores,
+    estimate_replica_bytes,
+    physical_memory_bytes,
+    plan_replicas,
+)
+from services.request_timing import current_timing
+from services.streaming_transcriber import StreamingTranscriber
+from services.stub_pipeline import StubModelManager
+from services.transcriber import (
+    run_pipeline_batch,
+    run_pipeline_chunked,
+    run_pipeline_streaming,
+)
+from services.transcription_cache import TranscriptionCache
+from services.voice_activity import SpeechAudio
+from config import WhisperConfig
+from validators import (
+    AudioValidationError,
+    BASE64_PATTERN,
+    base64_decoded_size,
+    decode_base64_audio,
+    validate_audio_size,
+    validate_model_name,
+    validate_audio_format,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +85,73 @@ router = APIRouter()
 # Global service instances (singleton pattern)
 _model_manager: ModelManager = None
 _audio_processor: AudioProcessor = None
+_inference_executor: InferenceExecutor = None
+_batch_scheduler: BatchScheduler = None
+_transcription_cache: TranscriptionCache = None
+_model_warmup: ModelWarmup = None
+_language_identifier: Optional[LanguageIdentifier] = None
+_rate_limiter: Optional[RateLimiter] = None
+_replica_plan: Optional[List[List[int]]] = None
 
 
 def get_model_manager() -> ModelManager:
     """Dependency to get ModelManager instance."""
     global _model_manager
     if _model_manager is None:
-        _model_manager = ModelManager(max_cache_size=4)
+        cache_options = dict(
+            max_cache_size=4,
+            max_cache_bytes=WhisperConfig.MODEL_CACHE_MAX_MB * 1024 * 1024,
+            idle_ttl_seconds=WhisperConfig.MODEL_IDLE_TTL_SECONDS or None,
+            resident_model=WhisperConfig.MODEL_RESIDENT or None,
+            cpu_precision=WhisperConfig.CPU_PRECISION,
+            artifact_dir=WhisperConfig.PRECISION_ARTIFACT_DIR or None,
+            inference_backend=WhisperConfig.INFERENCE_BACKEND,
+            speculative_decoding=WhisperConfig.SPECULATIVE_DECODING,
+        )
+        stub = None
+        if WhisperConfig.STUB_PIPELINE:
+            logger.warning("STUB_PIPELINE is enabled: transcripts come from a stub, not a model")
+            stub = dict(
+                fixed_latency=WhisperConfig.STUB_FIXED_LATENCY_MS / 1000.0,
+                seconds_per_audio_second=WhisperConfig.STUB_MS_PER_AUDIO_SECOND / 1000.0,
+            )
+        if get_replica_plan():
+            _model_manager = ReplicaModelManager(get_replica_plan(), stub=stub, **cache_options)
+        elif stub is not None:
+            _model_manager = StubModelManager(**stub, **cache_options)
+        else:
+            _model_manager = ModelManager(**cache_options)
     return _model_manager
 
 
+def get_replica_plan() -> List[List[int]]:
+    """Cores of each inference replica process, empty when inference runs in-process."""
+    global _replica_plan
+    if _replica_plan is None:
+        if WhisperConfig.INFERENCE_REPLICAS == 1:
+            _replica_plan = []
+        else:
+            memory_budget = WhisperConfig.REPLICA_MEMORY_MB * 1024 * 1024 or int(
+                (physical_memory_bytes() or 0) * 0.75
+            )
+            _replica_plan = plan_replicas(
+                WhisperConfig.INFERENCE_REPLICAS,
+                available_cores(),
+                threads_per_replica=WhisperConfig.REPLICA_THREADS,
+                memory_budget_bytes=memory_budget,
+                replica_bytes=estimate_replica_bytes(
+                    [
+                        *WhisperConfig.MODEL_PRELOAD,
+                        WhisperConfig.MODEL_RESIDENT,
+                        WhisperConfig.LANGUAGE_ID_MODEL,
+                    ],
+                    WhisperConfig.CPU_PRECISION,
+                    WhisperConfig.SPECULATIVE_DECODING,
+                ),
+            )
+    return _replica_plan
+
+
 def get_audio_processor() -> AudioProcessor:
     """Dependency to get AudioProcessor instance."""
     global _audio_processor
@@ -43,10 +160,96 @@ def get_audio_processor() -> AudioProcessor:
             target_sample_rate=16000,
             silence_threshold_db=40,
             normalize=True,
+            voice_activity_detection=WhisperConfig.VAD_ENABLED,
+            max_pack_seconds=WhisperConfig.LONG_FORM_CHUNK_LENGTH_S,
+            resample_backend=WhisperConfig.RESAMPLE_BACKEND,
         )
     return _audio_processor
 
 
+def get_inference_executor() -> InferenceExecutor:
+    """Dependency to get InferenceExecutor instance."""
+    global _inference_executor
+    if _inference_executor is None:
+        # One inference thread per replica so every replica can be kept busy
+        _inference_executor = InferenceExecutor(
+            max_workers=max(WhisperConfig.INFERENCE_WORKERS, len(get_replica_plan())),
+            max_queue_size=WhisperConfig.INFERENCE_MAX_QUEUE_SIZE,
+            retry_after_seconds=WhisperConfig.INFERENCE_RETRY_AFTER_SECONDS,
+            client_weights=parse_client_weights(WhisperConfig.FAIR_QUEUE_WEIGHTS),
+        )
+    return _inference_executor
+
+
+def get_batch_scheduler() -> BatchScheduler:
+    """Dependency to get BatchScheduler instance."""
+    global _batch_scheduler
+    if _batch_scheduler is None:
+        _batch_scheduler = BatchScheduler(
+            get_inference_executor(),
+            window_ms=WhisperConfig.BATCH_WINDOW_MS,
+        )
+    return _batch_scheduler
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Dependency to get TranscriptionCache instance."""
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = TranscriptionCache(
+            max_bytes=int(WhisperConfig.TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024),
+            db_path=WhisperConfig.TRANSCRIPTION_CACHE_DB_PATH or None,
+            ttl_seconds=WhisperConfig.TRANSCRIPTION_CACHE_TTL_SECONDS,
+        )
+    return _transcription_cache
+
+
+def get_model_warmup() -> ModelWarmup:
+    """Dependency to get ModelWarmup instance."""
+    global _model_warmup
+    if _model_warmup is None:
+        _model_warmup = ModelWarmup(
+            get_model_manager(),
+            get_audio_processor(),
+            get_inference_executor(),
+        )
+    return _model_warmup
+
+
+def get_language_identifier() -> Optional[LanguageIdentifier]:
+    """Dependency to get the LanguageIdentifier instance, None when it is disabled."""
+    global _language_identifier
+    if _language_identifier is None and WhisperConfig.LANGUAGE_ID_MODEL:
+        _language_identifier = LanguageIdentifier(
+            model_name=WhisperConfig.LANGUAGE_ID_MODEL,
+            min_confidence=WhisperConfig.LANGUAGE_ID_MIN_CONFIDENCE,
+            sample_seconds=WhisperConfig.LANGUAGE_ID_SECONDS,
+            cache_ttl_seconds=WhisperConfig.LANGUAGE_ID_CACHE_TTL_SECONDS,
+        )
+    return _language_identifier
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Dependency to get the RateLimiter instance, None when rate limiting is disabled."""
+    global _rate_limiter
+    if _rate_limiter is None and WhisperConfig.RATE_LIMIT_REQUESTS > 0:
+        _rate_limiter = RateLimiter(
+            requests=WhisperConfig.RATE_LIMIT_REQUESTS,
+            window_seconds=parse_window(WhisperConfig.RATE_LIMIT_WINDOW),
+        )
+    return _rate_limiter
+
+
+def shutdown_services() -> None:
+    """Release resources held by the global service instances."""
+    if isinstance(_model_manager, ReplicaModelManager):
+        _model_manager.shutdown()
+    if _inference_executor is not None:
+        _inference_executor.shutdown()
+    if _transcription_cache is not None:
+        _transcription_cache.close()
+
+
 def detect_audio_extension(audio_bytes: bytes) -> str:
     """
     Detect audio file extension from bytes.
@@ -87,184 +290,1027 @@ def detect_audio_extension(audio_bytes: bytes) -> str:
     return "mp3"
 
 
-@router.post("/v1/audio/transcriptions", response_model=TranscribeResponse)
+@router.post(
+    "/v1/audio/transcriptions",
+    response_model=TranscribeResponse,
+    response_model_exclude_none=True,
+)
 async def transcribe(
-    request: TranscribeRequest,
     client_request: Request,
+    response: Response,
     model_manager: ModelManager = Depends(get_model_manager),
     audio_processor: AudioProcessor = Depends(get_audio_processor),
+    inference_executor: InferenceExecutor = Depends(get_inference_executor),
+    batch_scheduler: BatchScheduler = Depends(get_batch_scheduler),
+    transcription_cache: TranscriptionCache = Depends(get_transcription_cache),
+    language_identifier: Optional[LanguageIdentifier] = Depends(get_language_identifier),
+    rate_limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
 ) -> Dict[str, Any]:
     """
     Transcribe audio using local Whisper models.
 
+    Accepts any of these request bodies:
+        - application/json: TranscribeRequest with base64 audio
+        - multipart/form-data: OpenAI-style ``file`` upload with ``model``/``language`` fields
+        - application/octet-stream: encoded audio file, options as query parameters
+        - audio/L16; rate=16000: raw 16-bit PCM, skips container decoding and resampling
+
+    Identical audio with identical options is served from the transcription
+    cache, or joins an in-flight inference for the same audio; the outcome is
+    reported in the ``X-Cache`` header (hit, miss or coalesced).
+
+    With ``stream=true`` the response is a Server-Sent Events stream of
+    ``transcript.text.delta`` events as the decoder produces text, followed
+    by one ``transcript.text.done`` event with the TranscribeResponse fields.
+    Streamed requests bypass the cache and batching.
+
+    Every response carries ``X-Request-ID`` and a ``Server-Timing`` stage
+    breakdown; ``?timings=true`` also returns the breakdown in the body.
+
+    With language ``auto``, the language remembered for the client is used;
+    otherwise a small model identifies it from the first seconds of speech
+    (see LanguageIdentifier).
+
+    Each client (by address) may make RATE_LIMIT_REQUESTS requests per
+    RATE_LIMIT_WINDOW; the limit and the requests left are reported in the
+    ``X-RateLimit-Limit`` and ``X-RateLimit-Remaining`` headers. Admitted
+    requests share the inference workers fairly across clients (see
+    InferenceExecutor).
+
     Args:
-        request: Transcription request with audio data
         client_request: FastAPI request object
+        response: Response used to set the X-Cache and rate limit headers
         model_manager: Model manager dependency
         audio_processor: Audio processor dependency
+        inference_executor: Inference executor dependency
+        batch_scheduler: Batch scheduler dependency
+        transcription_cache: Transcription cache dependency
+        language_identifier: Language identifier dependency, None when disabled
+        rate_limiter: Rate limiter dependency, None when disabled
 
     Returns:
         Transcription response with text and metadata
 
     Raises:
-        HTTPException: If validation or transcription fails
+        HTTPException: If validation or transcription fails, 429 if the client
+            is over its rate limit, or 503 if the inference queue is full
     """
-    temp_file_path = None
-    preprocessed_path = None
-
+    start_time = time.time()
     try:
         # Log request for monitoring
         client_ip = client_request.client.host if client_request.client else "unknown"
-        logger.info(f"Transcription request from {client_ip} with model {request.model}")
+        logger.info(f"Transcription request from {client_ip}")
+        set_current_client(client_ip)
 
-        # Validate model
-        allowed_models = list(ModelManager.SUPPORTED_MODELS.keys())
-        is_valid_model, model_error = validate_model_name(request.model, allowed_models)
-        if not is_valid_model:
-            raise HTTPException(status_code=400, detail=model_error)
+        # Spend one of the client's requests before any other work
+        rate_headers: Dict[str, str] = {}
+        if rate_limiter is not None:
+            remaining = rate_limiter.acquire(client_ip)
+            rate_headers = {
+                "X-RateLimit-Limit": str(rate_limiter.limit),
+                "X-RateLimit-Remaining": str(remaining),
+            }
+            response.headers.update(rate_headers)
 
-        # Get and validate audio data
-        try:
-            audio_data = request.get_audio()
-        except ValueError as e:
-            logger.error("Invalid audio data format: %s", str(e))
-            raise HTTPException(status_code=400, detail="Invalid audio data format")
+        # Reserve an inference slot before reading the body or doing any heavy work
+        with ExitStack() as admission:
+            admission.enter_context(inference_executor.admit())
+            with time_stage("read"):
+                audio_input = await _read_audio_input(client_request)
+            timing = current_timing()
+            if timing is not None:
+                timing.details["model"] = audio_input.model
 
-        # Validate base64 audio
-        is_valid_audio, audio_error = validate_base64_audio(audio_data)
-        if not is_valid_audio:
-            raise HTTPException(status_code=400, detail=audio_error)
+            # Validate model
+            with time_stage("validation"):
+                allowed_models = list(ModelManager.SUPPORTED_MODELS.keys())
+                is_valid_model, model_error = validate_model_name(
+                    audio_input.model, allowed_models
+                )
+            if not is_valid_model:
+                raise HTTPException(status_code=400, detail=model_error)
 
-        # Decode audio
-        try:
-            audio_bytes = base64.b64decode(audio_data)
-        except Exception as e:
-            logger.error(f"Failed to decode base64 audio: {str(e)}")
-            raise HTTPException(status_code=400, detail="Invalid audio data format")
+            if language_identifier is not None and audio_input.language in (None, "auto"):
+                # A remembered language makes this an explicit-language request for the
+                # transcription cache and batching alike
+                audio_input.language = language_identifier.cached_language(client_ip) or "auto"
 
-        # Validate audio format
-        is_valid_format, format_error = validate_audio_format(audio_bytes)
-        if not is_valid_format:
-            raise HTTPException(status_code=400, detail=format_error)
+            if audio_input.stream:
+                # The event stream outlives this handler, so it takes over the slot
+                speech = await _prepare_audio(audio_input, audio_processor)
+                return StreamingResponse(
+                    _stream_transcription_events(
+                        audio_input,
+                        speech.audio,
+                        model_manager,
+                        inference_executor,
+                        audio_processor.target_sample_rate,
+                        admission.pop_all(),
+                        language_identifier,
+                        client_ip,
+                    ),
+                    media_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache", **rate_headers},
+                )
 
-        # Detect format for file extension
-        file_extension = detect_audio_extension(audio_bytes)
+            # Key on the decoded audio plus everything that changes the output
+            cache_key = await run_in_threadpool(
+                TranscriptionCache.make_key,
+                audio_input.data,
+                audio_input.model,
+                audio_input.language,
+                {
+                    **GENERATE_OPTIONS,
+                    "pcm": [
+                        audio_input.pcm_sample_rate,
+                        audio_input.pcm_channels,
+                        audio_input.pcm_big_endian,
+                    ],
+                    "chunking": [
+                        WhisperConfig.LONG_FORM_CHUNK_LENGTH_S,
+                        WhisperConfig.LONG_FORM_STRIDE_LENGTH_S,
+                    ],
+                    "resample": WhisperConfig.RESAMPLE_BACKEND,
+                    "vad": audio_processor.vad_settings,
+                    "cpu_precision": WhisperConfig.CPU_PRECISION,
+                    "backend": WhisperConfig.INFERENCE_BACKEND,
+                    "language_id": [
+                        WhisperConfig.LANGUAGE_ID_MODEL,
+                        WhisperConfig.LANGUAGE_ID_SECONDS,
+                        WhisperConfig.LANGUAGE_ID_MIN_CONFIDENCE,
+                    ],
+                    # Stub transcripts must never be served to a real-model server
+                    "stub": WhisperConfig.STUB_PIPELINE,
+                },
+            )
+            result, cache_status = await transcription_cache.get_or_compute(
+                cache_key,
+                lambda: _transcribe_admitted(
+                    audio_input,
+                    model_manager,
+                    audio_processor,
+                    inference_executor,
+                    batch_scheduler,
+                    language_identifier,
+                    client_ip,
+                ),
+            )
 
-        # Save to a temporary file with proper extension
-        try:
-            with tempfile.NamedTemporaryFile(
-                delete=False, suffix=f".{file_extension}"
-            ) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_file_path = temp_file.name
-        except Exception as e:
-            logger.error(f"Failed to save temporary file: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to process audio file")
+        response.headers["X-Cache"] = cache_status
+        if cache_status != "miss":
+            result["processing_time"] = time.time() - start_time
+        if timing is not None and _is_true(client_request.query_params.get("timings")):
+            result = {**result, "request_id": timing.request_id, "timings": timing.to_dict()}
+        return result
 
-        # Preprocess audio for optimal performance
-        try:
-            preprocessed_path, success = audio_processor.preprocess(temp_file_path)
-            if not success:
-                logger.warning(f"Audio preprocessing failed, using original file")
-        except AudioProcessingError as e:
-            logger.error(f"Audio preprocessing error: {str(e)}")
-            preprocessed_path = temp_file_path
-
-        # Transcribe using local Whisper model
+    except RateLimitExceededError as e:
+        logger.warning(f"Rejecting transcription request: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded, please retry later",
+            headers={
+                "Retry-After": str(e.retry_after),
+                "X-RateLimit-Limit": str(rate_limiter.limit),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+    except QueueFullError as e:
+        logger.warning(f"Rejecting transcription request: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def _parse_content_type(content_type: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a Content-Type header into its media type and parameters.
+
+    Args:
+        content_type: Raw header value, e.g. "audio/L16; rate=16000"
+
+    Returns:
+        Tuple of (lowercased media type, lowercased parameter dict)
+    """
+    media_type, *params = content_type.split(";")
+    parsed = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        parsed[key.strip().lower()] = value.strip().strip('"').lower()
+    return media_type.strip().lower(), parsed
+
+
+def _is_true(value: Optional[str]) -> bool:
+    """Interpret a query string or form flag such as ``stream=true``."""
+    return value is not None and value.lower() in ("true", "1", "yes")
+
+
+async def _read_audio_input(client_request: Request) -> AudioInput:
+    """
+    Extract audio and options from the request according to its Content-Type.
+
+    Args:
+        client_request: FastAPI request object
+
+    Returns:
+        AudioInput with encoded audio bytes or raw PCM
+
+    Raises:
+        HTTPException: If the body is missing, malformed, or outside the size limits
+    """
+    media_type, params = _parse_content_type(client_request.headers.get("content-type", ""))
+    query = client_request.query_params
+    model = query.get("model", WhisperConfig.DEFAULT_MODEL)
+    language = query.get("language", "auto")
+    stream = _is_true(query.get("stream"))
+
+    if media_type == "multipart/form-data":
+        return await _read_multipart_input(client_request)
+
+    if media_type == "application/octet-stream":
+        audio_bytes = await _read_body_limited(client_request)
+        return AudioInput(model=model, language=language, data=audio_bytes, stream=stream)
+
+    if media_type == "audio/l16":
         try:
-            start_time = time.time()
+            sample_rate = int(params.get("rate", "16000"))
+            channels = int(params.get("channels", "1"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid audio/L16 parameters")
+        if sample_rate <= 0 or channels <= 0:
+            raise HTTPException(status_code=400, detail="Invalid audio/L16 parameters")
+
+        audio_bytes = await _read_body_limited(client_request)
+        return AudioInput(
+            model=model,
+            language=language,
+            data=audio_bytes,
+            format="pcm",
+            pcm_sample_rate=sample_rate,
+            pcm_channels=channels,
+            pcm_big_endian=params.get("endianness", "big-endian") != "little-endian",
+            stream=stream,
+        )
+
+    # Default: JSON body with base64 audio
+    try:
+        request = TranscribeRequest(**json.loads(await client_request.body()))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid request body: {str(e)}")
 
-            # Get the model
-            pipe, batch_size = model_manager.get_model(request.model)
+    # Get and validate audio data
+    try:
+        audio_data = request.get_audio()
+    except ValueError as e:
+        logger.error("Invalid audio data format: %s", str(e))
+        raise HTTPException(status_code=400, detail="Invalid audio data format")
+
+    # Validate and decode base64 audio once; every later stage shares these bytes
+    try:
+        audio_bytes = decode_base64_audio(audio_data)
+    except AudioValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return AudioInput(
+        model=request.model,
+        language=request.language,
+        data=audio_bytes,
+        stream=request.stream,
+    )
 
-            # Set language if specified (not "auto")
-            language = request.language if request.language != "auto" else None
 
-            logger.info(
-                f"Transcribing with model {request.model}, format: {file_extension}"
+async def _read_multipart_input(client_request: Request) -> AudioInput:
+    """Read an OpenAI-style multipart upload with a ``file`` part."""
+    form = await client_request.form(max_files=1)
+    try:
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="No audio file in request")
+
+        if upload.size is not None:
+            is_valid_size, size_error = validate_audio_size(upload.size)
+            if not is_valid_size:
+                raise HTTPException(status_code=400, detail=size_error)
+
+        audio_bytes = await upload.read()
+        is_valid_size, size_error = validate_audio_size(len(audio_bytes))
+        if not is_valid_size:
+            raise HTTPException(status_code=400, detail=size_error)
+
+        return AudioInput(
+            model=form.get("model") or WhisperConfig.DEFAULT_MODEL,
+            language=form.get("language") or "auto",
+            data=audio_bytes,
+            stream=_is_true(form.get("stream")),
+        )
+    finally:
+        await form.close()
+
+
+async def _read_body_limited(client_request: Request) -> bytes:
+    """
+    Read a raw request body, stopping as soon as it exceeds the size limit.
+
+    Args:
+        client_request: FastAPI request object
+
+    Returns:
+        Body bytes
+
+    Raises:
+        HTTPException: If the body is outside the size limits
+    """
+    declared_length = client_request.headers.get("content-length")
+    if declared_length and declared_length.isdigit():
+        is_valid_size, size_error = validate_audio_size(int(declared_length))
+        if not is_valid_size:
+            raise HTTPException(status_code=400, detail=size_error)
+
+    chunks = []
+    received = 0
+    async for chunk in client_request.stream():
+        received += len(chunk)
+        if received > WhisperConfig.MAX_AUDIO_FILE_SIZE_BYTES:
+            is_valid_size, size_error = validate_audio_size(received)
+            raise HTTPException(status_code=400, detail=size_error)
+        chunks.append(chunk)
+
+    is_valid_size, size_error = validate_audio_size(received)
+    if not is_valid_size:
+        raise HTTPException(status_code=400, detail=size_error)
+    return b"".join(chunks)
+
+
+def _load_audio(audio_input: AudioInput, audio_processor: AudioProcessor) -> SpeechAudio:
+    """
+    Decode and preprocess an AudioInput (CPU-bound, runs in the threadpool).
+
+    Raw PCM skips container decoding entirely; at the target sample rate it
+    also skips resampling.
+    """
+    with time_stage("decode"):
+        if audio_input.is_raw_pcm:
+            audio = audio_processor.load_pcm16(
+                audio_input.data,
+                channels=audio_input.pcm_channels,
+                big_endian=audio_input.pcm_big_endian,
             )
+            sample_rate = audio_input.pcm_sample_rate
+        else:
+            audio, sample_rate = audio_processor.load(audio_input.data, audio_input.format)
+    with time_stage("preprocess"):
+        return audio_processor.process_speech(audio, sample_rate)
 
-            # Perform transcription with optimized parameters
-            result = pipe(
-                preprocessed_path,
-                batch_size=batch_size,
-                return_timestamps=True,
-                generate_kwargs={
-                    "language": language,
-                    "do_sample": False,  # Deterministic for speed
-                    "num_beams": 1,  # Greedy decoding for speed
-                },
+
+async def _prepare_audio(audio_input: AudioInput, audio_processor: AudioProcessor) -> SpeechAudio:
+    """
+    Validate, decode and preprocess request audio.
+
+    Args:
+        audio_input: Audio and options read from the request
+        audio_processor: Audio processor dependency
+
+    Returns:
+        Speech at the target sample rate, packed into model inputs
+
+    Raises:
+        HTTPException: If the audio format is invalid or cannot be decoded
+    """
+    if not audio_input.is_raw_pcm:
+        with time_stage("validation"):
+            # Validate audio format
+            is_valid_format, format_error = validate_audio_format(audio_input.data)
+            if not is_valid_format:
+                raise HTTPException(status_code=400, detail=format_error)
+
+            # Detect format for file extension
+            audio_input.format = detect_audio_extension(audio_input.data)
+
+    # Decode and preprocess in memory (CPU-bound, keep it off the event loop)
+    try:
+        return await run_in_threadpool(_load_audio, audio_input, audio_processor)
+    except AudioProcessingError as e:
+        logger.error(f"Audio preprocessing error: {str(e)}")
+        raise HTTPException(status_code=400, detail="Could not decode audio data")
+
+
+def _sse_event(payload: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _stream_transcription_events(
+    audio_input: AudioInput,
+    audio_array: np.ndarray,
+    model_manager: ModelManager,
+    inference_executor: InferenceExecutor,
+    sample_rate: int,
+    admission: ExitStack,
+    language_identifier: Optional[LanguageIdentifier] = None,
+    client: str = "unknown",
+) -> AsyncIterator[str]:
+    """
+    Run one streamed transcription and yield its Server-Sent Events.
+
+    Args:
+        audio_input: Audio and options read from the request
+        audio_array: Preprocessed audio
+        model_manager: Model manager dependency
+        inference_executor: Inference executor dependency
+        sample_rate: Sample rate of audio_array
+        admission: Inference slot held until the stream ends
+        language_identifier: Identifies the language of auto-language requests, if enabled
+        client: Client the identified language is remembered for
+
+    Yields:
+        ``transcript.text.delta`` events, then ``transcript.text.done`` or ``error``
+    """
+    with admission:
+        start_time = time.time()
+        if audio_array.size == 0:
+            # No speech in the clip, nothing to decode
+            yield _sse_event(
+                {
+                    "type": "transcript.text.done",
+                    "text": "",
+                    "processing_time": time.time() - start_time,
+                    "model": audio_input.model,
+                    "format": audio_input.format,
+                }
+            )
+            return
+
+        language = await _request_language(
+            audio_input,
+            audio_array,
+            sample_rate,
+            model_manager,
+            inference_executor,
+            language_identifier,
+            client,
+        )
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+
+        # Text arrives on the inference thread; hand it to the event loop
+        inference = asyncio.ensure_future(
+            inference_executor.run(
+                run_pipeline_streaming,
+                model_manager,
+                audio_input.model,
+                language,
+                sample_rate,
+                audio_array,
+                lambda text: loop.call_soon_threadsafe(deltas.put_nowait, text),
             )
+        )
+        inference.add_done_callback(lambda _: deltas.put_nowait(None))
+
+        try:
+            while True:
+                delta = await deltas.get()
+                if delta is None:
+                    break
+                yield _sse_event({"type": "transcript.text.delta", "delta": delta})
+
+            try:
+                result = inference.result()
+            except Exception as e:
+                logger.error(f"Streamed transcription failed: {str(e)}")
+                yield _sse_event({"type": "error", "detail": f"Transcription failed: {str(e)}"})
+                return
 
             processing_time = time.time() - start_time
+            logger.info(f"Streamed transcription completed in {processing_time:.2f}s")
+            yield _sse_event(
+                {
+                    "type": "transcript.text.done",
+                    "text": result.get("text", "") if isinstance(result, dict) else str(result),
+                    "processing_time": processing_time,
+                    "model": audio_input.model,
+                    "format": audio_input.format,
+                }
+            )
+        finally:
+            if not inference.done():
+                # Client went away; the result is no longer needed
+                inference.cancel()
 
-            # Extract text from result
-            if isinstance(result, dict):
-                text = result.get("text", "")
-            elif isinstance(result, list) and len(result) > 0:
-                text = result[0].get("text", "")
-            else:
-                text = str(result)
 
-            logger.info(f"Transcription completed in {processing_time:.2f}s")
+async def _transcribe_admitted(
+    audio_input: AudioInput,
+    model_manager: ModelManager,
+    audio_processor: AudioProcessor,
+    inference_executor: InferenceExecutor,
+    batch_scheduler: BatchScheduler,
+    language_identifier: Optional[LanguageIdentifier] = None,
+    client: str = "unknown",
+) -> Dict[str, Any]:
+    """
+    Preprocess and transcribe a request that holds an inference slot.
+
+    Only the speech found by voice activity detection is transcribed, packed
+    into inputs of up to LONG_FORM_CHUNK_LENGTH_S; audio with no speech
+    returns empty text without running the model. Packs that fit in one
+    window are micro-batched with concurrent requests. A single region longer
+    than that is split into overlapping chunks that run as one batch of
+    their own.
+
+    Args:
+        audio_input: Audio and options read from the request
+        model_manager: Model manager dependency
+        audio_processor: Audio processor dependency
+        inference_executor: Inference executor dependency
+        batch_scheduler: Batch scheduler dependency
+        language_identifier: Identifies the language of auto-language requests, if enabled
+        client: Client the identified language is remembered for
 
+    Returns:
+        Transcription response with text, segments and metadata
+
+    Raises:
+        HTTPException: If validation or transcription fails
+    """
+    speech = await _prepare_audio(audio_input, audio_processor)
+    timing = current_timing()
+    if timing is not None:
+        timing.details["audio_duration"] = round(speech.duration, 2)
+        timing.details["speech_duration"] = round(speech.speech_duration, 2)
+
+    # Transcribe using local Whisper model
+    try:
+        start_time = time.time()
+
+        if speech.is_empty:
+            logger.info(f"No speech in {speech.duration:.2f}s of audio, skipping inference")
             return {
-                "text": text,
-                "processing_time": processing_time,
-                "model": request.model,
-                "format": file_extension,
+                "text": "",
+                "processing_time": time.time() - start_time,
+                "model": audio_input.model,
+                "format": audio_input.format,
+                "segments": [],
             }
 
-        except Exception as e:
-            logger.error(f"Transcription failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+        language = await _request_language(
+            audio_input,
+            speech.packs[0],
+            speech.sample_rate,
+            model_manager,
+            inference_executor,
+            language_identifier,
+            client,
+        )
+
+        logger.info(
+            f"Transcribing {len(speech.packs)} speech packs with model {audio_input.model}, "
+            f"format: {audio_input.format}"
+        )
+
+        results = await asyncio.gather(
+            *(
+                _transcribe_pack(
+                    pack,
+                    audio_input.model,
+                    language,
+                    speech.sample_rate,
+                    model_manager,
+                    inference_executor,
+                    batch_scheduler,
+                )
+                for pack in speech.packs
+            )
+        )
+
+        processing_time = time.time() - start_time
+        observe_transcription(speech.duration, processing_time)
+
+        # Extract text and segments from the results, mapped back to the original timeline
+        with time_stage("postprocess"):
+            text, segments = _collect_transcript(speech, results)
+
+        logger.info(f"Transcription completed in {processing_time:.2f}s")
+
+        return {
+            "text": text,
+            "processing_time": processing_time,
+            "model": audio_input.model,
+            "format": audio_input.format,
+            "segments": segments,
+        }
 
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        # Clean up temporary files
-        for file_path in [temp_file_path, preprocessed_path]:
-            if file_path and Path(file_path).exists() and file_path != temp_file_path:
-                try:
-                    Path(file_path).unlink()
-                except Exception as e:
-                    logger.warning(f"Failed to clean up temporary file {file_path}: {str(e)}")
+        logger.error(f"Transcription failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+
+
+async def _request_language(
+    audio_input: AudioInput,
+    speech: np.ndarray,
+    sample_rate: int,
+    model_manager: ModelManager,
+    inference_executor: InferenceExecutor,
+    language_identifier: Optional[LanguageIdentifier],
+    client: str,
+) -> Optional[str]:
+    """
+    Language to transcribe a request with.
+
+    Args:
+        audio_input: Audio and options read from the request
+        speech: Speech from the start of the request audio
+        sample_rate: Sample rate of speech
+        model_manager: Model manager dependency
+        inference_executor: Inference executor dependency
+        language_identifier: Identifies the language of auto-language requests, if enabled
+        client: Client the identified language is remembered for
+
+    Returns:
+        The requested language, the identified one for "auto", or None to let the model
+        identify it
+    """
+    if audio_input.language not in (None, "auto"):
+        return audio_input.language
+    if language_identifier is None:
+        return None
+    return await inference_executor.run(
+        language_identifier.identify,
+        model_manager,
+        client,
+        audio_input.model,
+        speech,
+        sample_rate,
+    )
+
+
+def _collect_transcript(
+    speech: SpeechAudio, results: List[Any]
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """Join per-pack pipeline results into text and segments on the original timeline."""
+    texts = []
+    segments = []
+    for pack_index, result in enumerate(results):
+        if isinstance(result, list):
+            result = result[0] if result else {}
+        if not isinstance(result, dict):
+            texts.append(str(result))
+            continue
+        texts.append(result.get("text", ""))
+        for chunk in result.get("chunks") or []:
+            start, end = chunk.get("timestamp") or (None, None)
+            if start is None:
+                continue
+            if end is None:
+                end = len(speech.packs[pack_index]) / speech.sample_rate
+            segments.append(
+                {
+                    "start": round(speech.to_original_time(pack_index, start), 2),
+                    "end": round(speech.to_original_time(pack_index, end), 2),
+                    "text": chunk.get("text", "").strip(),
+                }
+            )
+    text = texts[0] if len(texts) == 1 else " ".join(t.strip() for t in texts if t.strip())
+    return text, segments
+
+
+async def _transcribe_pack(
+    audio: np.ndarray,
+    model: str,
+    language: Optional[str],
+    sample_rate: int,
+    model_manager: ModelManager,
+    inference_executor: InferenceExecutor,
+    batch_scheduler: BatchScheduler,
+) -> Any:
+    """Transcribe one speech pack, chunking it if it is longer than one window."""
+    duration = len(audio) / sample_rate
+    if duration > WhisperConfig.LONG_FORM_CHUNK_LENGTH_S:
+        logger.info(f"Long-form audio ({duration:.1f}s), transcribing in chunks")
+        return await inference_executor.run(
+            run_pipeline_chunked,
+            model_manager,
+            model,
+            language,
+            sample_rate,
+            audio,
+            chunk_length_s=WhisperConfig.LONG_FORM_CHUNK_LENGTH_S,
+            stride_length_s=WhisperConfig.LONG_FORM_STRIDE_LENGTH_S,
+            batch_size=WhisperConfig.LONG_FORM_BATCH_SIZE or model_manager.batch_size,
+        )
+    return await batch_scheduler.submit(
+        key=(model, language),
+        item=audio,
+        run_batch=functools.partial(
+            run_pipeline_batch,
+            model_manager,
+            model,
+            language,
+            sample_rate,
+        ),
+        max_batch_size=WhisperConfig.BATCH_MAX_SIZE or model_manager.batch_size,
+    )
 
 
 @router.post("/v1/chat/completions", response_model=TranscribeResponse)
 async def chat_completions(
-    request: TranscribeRequest,
     client_request: Request,
+    response: Response,
     model_manager: ModelManager = Depends(get_model_manager),
     audio_processor: AudioProcessor = Depends(get_audio_processor),
+    inference_executor: InferenceExecutor = Depends(get_inference_executor),
+    batch_scheduler: BatchScheduler = Depends(get_batch_scheduler),
+    transcription_cache: TranscriptionCache = Depends(get_transcription_cache),
+    language_identifier: Optional[LanguageIdentifier] = Depends(get_language_identifier),
+    rate_limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
 ) -> Dict[str, Any]:
     """OpenAI-style compatibility endpoint that proxies to /v1/audio/transcriptions."""
-    return await transcribe(request, client_request, model_manager, audio_processor)
+    return await transcribe(
+        client_request,
+        response,
+        model_manager,
+        audio_processor,
+        inference_executor,
+        batch_scheduler,
+        transcription_cache,
+        language_identifier,
+        rate_limiter,
+    )
+
+
+@router.websocket("/v1/audio/stream")
+async def stream_transcription(
+    websocket: WebSocket,
+    model_manager: ModelManager = Depends(get_model_manager),
+    audio_processor: AudioProcessor = Depends(get_audio_processor),
+    inference_executor: InferenceExecutor = Depends(get_inference_executor),
+    batch_scheduler: BatchScheduler = Depends(get_batch_scheduler),
+    language_identifier: Optional[LanguageIdentifier] = Depends(get_language_identifier),
+    rate_limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+) -> None:
+    """
+    Transcribe live audio incrementally while the user is still speaking.
+
+    Query parameters: ``model``, ``language`` and ``sample_rate`` (default 16000).
+
+    Client messages:
+        - binary: 16-bit little-endian mono PCM at ``sample_rate``
+        - text: ``{"type": "end"}`` to finalize the stream
+
+    Server messages:
+        - ``{"type": "partial", "text", "stable", "unstable"}`` as audio arrives;
+          ``stable`` is committed by local agreement and never changes
+        - ``{"type": "final", "text", "processing_time", "model", "format"}`` once,
+          after which the server closes the socket; ``processing_time`` is the
+          time from end of stream to final text
+        - ``{"type": "error", "detail"}`` before closing on invalid input
+
+    The stream also finalizes on its own once speech is followed by
+    STREAM_ENDPOINT_SILENCE_MS of silence. With language ``auto``, the
+    language remembered for the client by earlier requests is used. A
+    connection counts as one request against the client's rate limit; over
+    the limit the server sends an error and closes with code 1013.
+
+    Args:
+        websocket: WebSocket connection
+        model_manager: Model manager dependency
+        audio_processor: Audio processor dependency
+        inference_executor: Inference executor dependency
+        batch_scheduler: Batch scheduler dependency
+        language_identifier: Language identifier dependency, None when disabled
+        rate_limiter: Rate limiter dependency, None when disabled
+    """
+    client = websocket.client.host if websocket.client else "unknown"
+    set_current_client(client)
+    query = websocket.query_params
+    model = query.get("model", WhisperConfig.DEFAULT_MODEL)
+    language = query.get("language", "auto")
+    language = language if language != "auto" else None
+    if language is None and language_identifier is not None:
+        # Windows are too short to identify a language from; use the client's, if known
+        language = language_identifier.cached_language(client)
+    allowed_models = list(ModelManager.SUPPORTED_MODELS.keys())
+    is_valid_model, error = validate_model_name(model, allowed_models)
+    sample_rate = query.get("sample_rate", "16000")
+    if is_valid_model and (not sample_rate.isdigit() or int(sample_rate) <= 0):
+        error = "Invalid sample_rate"
+
+    await websocket.accept()
+    if rate_limiter is not None:
+        try:
+            rate_limiter.acquire(client)
+        except RateLimitExceededError as e:
+            logger.warning(f"Rejecting stream: {str(e)}")
+            await websocket.send_json(
+                {"type": "error", "detail": f"Rate limit exceeded, retry in {e.retry_after}s"}
+            )
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+    if error:
+        await websocket.send_json({"type": "error", "detail": error})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    target_rate = audio_processor.target_sample_rate
+    sample_rate = int(sample_rate)
+    resampler = (
+        soxr.ResampleStream(sample_rate, target_rate, 1, dtype="float32")
+        if sample_rate != target_rate
+        else None
+    )
+    session = StreamingTranscriber(
+        sample_rate=target_rate,
+        max_window_seconds=WhisperConfig.STREAM_MAX_WINDOW_SECONDS,
+        endpoint_silence_ms=WhisperConfig.STREAM_ENDPOINT_SILENCE_MS,
+    )
+    transcribe_window = functools.partial(
+        _transcribe_window,
+        model_manager,
+        inference_executor,
+        batch_scheduler,
+        model,
+        language,
+        target_rate,
+    )
+
+    async def partial_step() -> None:
+        """Transcribe the current window and send the updated hypothesis."""
+        try:
+            with inference_executor.admit():
+                result = await transcribe_window(session.window())
+        except QueueFullError:
+            # Skip this update under load; the audio stays in the window
+            logger.debug("Inference queue full, skipping partial stream update")
+            return
+        except Exception as e:
+            logger.warning(f"Partial stream transcription failed: {str(e)}")
+            return
+        await websocket.send_json({"type": "partial", **session.update(result)})
+
+    step_seconds = WhisperConfig.STREAM_STEP_MS / 1000.0
+    pending_step: Optional[asyncio.Task] = None
+    try:
+        while not session.speech_ended:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is not None:
+                samples = audio_processor.load_pcm16(message["bytes"], big_endian=False)
+                if resampler is not None:
+                    samples = resampler.resample_chunk(samples)
+                session.append(samples)
+                if session.unread_seconds >= step_seconds and (
+                    pending_step is None or pending_step.done()
+                ):
+                    pending_step = asyncio.create_task(partial_step())
+            elif message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = None
+                if not isinstance(control, dict) or control.get("type") != "end":
+                    await websocket.send_json(
+                        {"type": "error", "detail": "Unknown control message"}
+                    )
+                    await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+                    return
+                break
+
+        # Finalize: one last pass over the remaining (uncommitted) window
+        end_time = time.time()
+        if pending_step is not None:
+            await pending_step
+        if resampler is not None:
+            session.append(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+        audio = session.window()
+        result = await transcribe_window(audio) if audio.size else None
+        text = session.finalize(result)
+
+        await websocket.send_json(
+            {
+                "type": "final",
+                "text": text,
+                "processing_time": time.time() - end_time,
+                "model": model,
+                "format": "pcm",
+            }
+        )
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("Audio stream closed by client")
+    except AudioProcessingError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+    except Exception as e:
+        logger.error(f"Stream transcription failed: {str(e)}")
+        await websocket.send_json({"type": "error", "detail": "Transcription failed"})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        if pending_step is not None and not pending_step.done():
+            pending_step.cancel()
+
+
+async def _transcribe_window(
+    model_manager: ModelManager,
+    inference_executor: InferenceExecutor,
+    batch_scheduler: BatchScheduler,
+    model: str,
+    language: Optional[str],
+    sample_rate: int,
+    audio: np.ndarray,
+) -> Dict[str, Any]:
+    """
+    Transcribe one stream window, batching with other requests for the same model.
+
+    The window is trimmed only when a partial result comes back, so it can
+    outgrow one Whisper input while partial steps are skipped under load; it
+    then goes through the chunked long-form path instead of being cut off.
+    """
+    result = await _transcribe_pack(
+        audio, model, language, sample_rate, model_manager, inference_executor, batch_scheduler
+    )
+    return result if isinstance(result, dict) else {"text": str(result)}
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> Dict[str, str]:
-    """Health check endpoint."""
+    """Liveness endpoint: the server is up and accepting connections."""
     return {"status": "healthy", "service": "whisper-api-server"}
 
 
+@router.get("/health/ready", response_model=ReadinessResponse)
+async def readiness_check(
+    response: Response,
+    model_warmup: ModelWarmup = Depends(get_model_warmup),
+) -> Dict[str, Any]:
+    """Readiness endpoint: 200 once startup warm-up has finished, 503 while models are warming."""
+    status = model_warmup.get_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+
+@router.get("/metrics")
+async def metrics(
+    model_manager: ModelManager = Depends(get_model_manager),
+    inference_executor: InferenceExecutor = Depends(get_inference_executor),
+    batch_scheduler: BatchScheduler = Depends(get_batch_scheduler),
+    rate_limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+) -> Response:
+    """Prometheus scrape endpoint: pipeline histograms plus queue and model cache gauges."""
+    body = render_metrics(
+        model_cache=model_manager.get_cache_info(),
+        inference=inference_executor.get_stats(),
+        batching=batch_scheduler.get_stats(),
+        rate_limit=rate_limiter.get_stats() if rate_limiter else None,
+    )
+    return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+
 @router.post("/debug/audio-info", response_model=AudioInfoResponse)
 async def debug_audio_info(request: TranscribeRequest) -> Dict[str, Any]:
     """Debug endpoint to get information about audio data without transcribing."""
     try:
         audio_data = request.get_audio()
-        audio_bytes = base64.b64decode(audio_data)
+        if not BASE64_PATTERN.fullmatch(audio_data):
+            raise ValueError("Invalid base64 encoding")
+
+        # Sizes come from the encoded length; the payload is never decoded here
+        audio_size = base64_decoded_size(audio_data)
 
         return {
-            "audio_size_bytes": len(audio_bytes),
-            "audio_size_mb": len(audio_bytes) / (1024 * 1024),
+            "audio_size_bytes": audio_size,
+            "audio_size_mb": audio_size / (1024 * 1024),
             "base64_length": len(audio_data),
             "model": request.model,
             "language": request.language,
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/debug/stats")
+async def debug_stats(
+    model_manager: ModelManager = Depends(get_model_manager),
+    inference_executor: InferenceExecutor = Depends(get_inference_executor),
+    batch_scheduler: BatchScheduler = Depends(get_batch_scheduler),
+    transcription_cache: TranscriptionCache = Depends(get_transcription_cache),
+    language_identifier: Optional[LanguageIdentifier] = Depends(get_language_identifier),
+    rate_limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+) -> Dict[str, Any]:
+    """Debug endpoint reporting rate limit, queue, batching, cache, language and model stats."""
+    return {
+        "rate_limit": rate_limiter.get_stats() if rate_limiter else None,
+        "inference": inference_executor.get_stats(),
+        "batching": batch_scheduler.get_stats(),
+        "transcription_cache": transcription_cache.get_stats(),
+        "language_id": language_identifier.get_stats() if language_identifier else None,
+        "models": model_manager.get_cache_info(),
+    }
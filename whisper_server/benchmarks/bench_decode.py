@@ -0,0 +1,113 @@
+"""
+Benchmark per-format decode latency.
+
+Encodes the same stereo 48kHz clip in every format libsndfile can write and
+times the decoder registry against the previous path (librosa.load) on it.
+Formats the registry hands to the fallback decoder (m4a, webm) are included
+when ffmpeg is available to create them.
+
+Usage:
+    python benchmarks/bench_decode.py [--seconds 10] [--repeat 10]
+"""
+import argparse
+import io
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Callable, Dict
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.audio_decoder import DecoderRegistry  # noqa: E402
+from validators import detect_audio_format  # noqa: E402
+
+SAMPLE_RATE = 48000
+
+
+def encode_clips(seconds: float) -> Dict[str, bytes]:
+    """Encode a test clip in every benchmarked format."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t)) / 2
+    stereo = np.stack([tone, tone], axis=1)
+
+    clips = {}
+    for name, audio_format, subtype in [
+        ("wav", "WAV", "PCM_16"),
+        ("flac", "FLAC", "PCM_16"),
+        ("ogg", "OGG", "VORBIS"),
+        ("mp3", "MP3", "MPEG_LAYER_III"),
+    ]:
+        buffer = io.BytesIO()
+        sf.write(buffer, stereo, SAMPLE_RATE, format=audio_format, subtype=subtype)
+        clips[name] = buffer.getvalue()
+
+    if shutil.which("ffmpeg"):
+        wav = clips["wav"]
+        for name, codec in [("m4a", "aac"), ("webm", "libopus")]:
+            with tempfile.NamedTemporaryFile(suffix=f".{name}") as output:
+                result = subprocess.run(
+                    ["ffmpeg", "-y", "-loglevel", "error", "-f", "wav", "-i", "-",
+                     "-c:a", codec, output.name],
+                    input=wav,
+                    capture_output=True,
+                )
+                if result.returncode == 0:
+                    clips[name] = Path(output.name).read_bytes()
+    return clips
+
+
+def time_decode(decode: Callable[[], object], repeat: int) -> float:
+    """Return the best decode time in milliseconds."""
+    decode()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def librosa_load(audio_bytes: bytes, extension: str):
+    """Previous decode path: librosa.load, via a temporary file for non-libsndfile formats."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return librosa.load(io.BytesIO(audio_bytes), sr=None, mono=True)
+        except Exception:
+            with tempfile.NamedTemporaryFile(suffix=f".{extension}") as temp_file:
+                temp_file.write(audio_bytes)
+                temp_file.flush()
+                return librosa.load(temp_file.name, sr=None, mono=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the test clip")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per format")
+    args = parser.parse_args()
+
+    registry = DecoderRegistry()
+    clips = encode_clips(args.seconds)
+
+    print(f"{'format':<8}{'decoder':<18}{'registry':>12}{'librosa':>12}{'per sec':>12}")
+    for name, audio_bytes in clips.items():
+        decoder = registry.decoder_for(detect_audio_format(audio_bytes))
+        registry_ms = time_decode(lambda: registry.decode(audio_bytes, name), args.repeat)
+        librosa_ms = time_decode(lambda: librosa_load(audio_bytes, name), args.repeat)
+        print(
+            f"{name:<8}{decoder:<18}{registry_ms:>10.2f}ms{librosa_ms:>10.2f}ms"
+            f"{registry_ms * 1000 / args.seconds:>10.0f}us"
+        )
+    print(f"(best of {args.repeat}, {args.seconds:g}s stereo {SAMPLE_RATE}Hz clip)")
+
+
+if __name__ == "__main__":
+    main()
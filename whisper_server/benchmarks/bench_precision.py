@@ -0,0 +1,228 @@
+"""
+Benchmark CPU inference precisions against fp32.
+
+Transcribes a fixed local corpus with one model at each CPU precision
+(fp32, bf16, int8) and reports load time, resident model size, peak RSS,
+inference latency and how far each precision's transcripts drift from fp32
+(word error rate against the fp32 transcript, and how many are identical).
+Each precision runs in a fresh process so memory figures do not overlap.
+
+The corpus is every audio file in --corpus, in name order. Without one, a
+few seeded synthetic clips are used; they are not speech, so their
+transcript check is only a smoke test and real recordings should be used
+before changing CPU_PRECISION in production.
+
+Usage:
+    python benchmarks/bench_precision.py --model whisper-small --corpus ./corpus
+        [--precisions fp32,bf16,int8] [--repeat 3] [--max-wer 0.05] [--json results.json]
+"""
+import argparse
+import io
+import json
+import logging
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.audio_processor import AudioProcessor  # noqa: E402
+from services.cpu_precision import resolve_precision  # noqa: E402
+from services.model_manager import ModelManager  # noqa: E402
+from services.transcriber import run_pipeline_batch  # noqa: E402
+from signals import speech_like  # noqa: E402
+
+TARGET_SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".m4a", ".webm", ".mp4"}
+SYNTHETIC_CLIPS = [(5.0, 0), (15.0, 1), (30.0, 2)]
+
+
+def load_corpus(corpus: str) -> List[Tuple[str, np.ndarray]]:
+    """Decode and preprocess the corpus into (name, 16kHz mono audio) pairs, in name order."""
+    processor = AudioProcessor(target_sample_rate=TARGET_SAMPLE_RATE)
+    if not corpus:
+        clips = []
+        for seconds, seed in SYNTHETIC_CLIPS:
+            buffer = io.BytesIO()
+            sf.write(buffer, speech_like(seconds, 48000, seed), 48000, format="WAV")
+            clips.append(
+                (f"synthetic-{seconds:g}s", processor.preprocess(buffer.getvalue(), "wav"))
+            )
+        return clips
+
+    paths = sorted(p for p in Path(corpus).iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+    if not paths:
+        sys.exit(f"No audio files in {corpus}")
+    return [(p.name, processor.preprocess(p.read_bytes(), p.suffix[1:].lower())) for p in paths]
+
+
+def words(text: str) -> List[str]:
+    """Lowercased words without punctuation, so only wording differences count."""
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length."""
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def run_precision(args: argparse.Namespace) -> Dict[str, Any]:
+    """Load the model at one precision and transcribe the corpus (runs in a worker process)."""
+    manager = ModelManager(
+        max_cache_size=1, cpu_precision=args.worker, artifact_dir=args.artifact_dir or None
+    )
+    if manager.get_cache_info()["device"] != "cpu":
+        sys.exit("bench_precision measures CPU inference; no GPU may be visible")
+
+    clips = load_corpus(args.corpus)
+    start = time.perf_counter()
+    manager.get_model(args.model)
+    load_s = time.perf_counter() - start
+
+    def transcribe(audio: np.ndarray) -> str:
+        result = run_pipeline_batch(
+            manager, args.model, args.language or None, TARGET_SAMPLE_RATE, [audio]
+        )
+        return result[0]["text"].strip()
+
+    transcribe(clips[0][1])  # Warm-up
+    results = {}
+    for name, audio in clips:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            text = transcribe(audio)
+            times.append(time.perf_counter() - start)
+        results[name] = {
+            "audio_s": len(audio) / TARGET_SAMPLE_RATE,
+            "median_s": statistics.median(times),
+            "text": text,
+        }
+
+    model_info = next(iter(manager.get_cache_info()["models"].values()))
+    return {
+        "precision": args.worker,
+        "resolved": resolve_precision(args.worker),
+        "load_s": load_s,
+        "model_bytes": model_info["size_bytes"],
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "clips": results,
+    }
+
+
+def run_in_subprocess(args: argparse.Namespace, precision: str) -> Dict[str, Any]:
+    """Benchmark one precision in a fresh interpreter and return its results."""
+    command = [
+        sys.executable, __file__, "--worker", precision,
+        "--model", args.model, "--corpus", args.corpus, "--repeat", str(args.repeat),
+        "--language", args.language, "--artifact-dir", args.artifact_dir,
+    ]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        sys.exit(f"{precision} run failed with status {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="whisper-small", help="Model to benchmark")
+    parser.add_argument(
+        "--corpus", default="", help="Directory of audio files (default: synthetic clips)"
+    )
+    parser.add_argument("--precisions", default="fp32,bf16,int8", help="Precisions to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per clip")
+    parser.add_argument("--language", default="en", help="Language code, empty to auto-detect")
+    parser.add_argument(
+        "--artifact-dir",
+        default=str(Path.home() / ".cache" / "whisper_server" / "artifacts"),
+        help="Quantized model cache; empty re-quantizes on every run",
+    )
+    parser.add_argument(
+        "--max-wer",
+        type=float,
+        default=None,
+        help="Exit with status 1 if any precision's mean WER against fp32 exceeds this",
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the full results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.worker:
+        print(json.dumps(run_precision(args)))
+        return
+
+    precisions = [p.strip() for p in args.precisions.split(",") if p.strip()]
+    if "fp32" not in precisions:
+        precisions.insert(0, "fp32")
+    if not args.corpus:
+        print("No --corpus given: synthetic clips, the transcript check is a smoke test only")
+
+    runs = {precision: run_in_subprocess(args, precision) for precision in precisions}
+    reference = runs["fp32"]
+
+    print(
+        f"{'precision':<14}{'load':>9}{'model':>10}{'peak RSS':>10}{'latency':>11}"
+        f"{'speedup':>9}{'audio x':>9}{'WER':>8}{'same':>7}"
+    )
+    failed = []
+    for precision, run in runs.items():
+        clips = run["clips"]
+        latency = sum(clip["median_s"] for clip in clips.values())
+        audio_s = sum(clip["audio_s"] for clip in clips.values())
+        reference_latency = sum(clip["median_s"] for clip in reference["clips"].values())
+        wers = [
+            word_error_rate(reference["clips"][name]["text"], clip["text"])
+            for name, clip in clips.items()
+        ]
+        same = sum(
+            words(reference["clips"][name]["text"]) == words(clip["text"])
+            for name, clip in clips.items()
+        )
+        run["mean_wer_vs_fp32"] = statistics.mean(wers)
+        if args.max_wer is not None and run["mean_wer_vs_fp32"] > args.max_wer:
+            failed.append(precision)
+
+        label = precision if run["resolved"] == precision else f"{precision}>{run['resolved']}"
+        print(
+            f"{label:<14}{run['load_s']:>8.1f}s{run['model_bytes'] / 2**20:>8.0f}MB"
+            f"{run['peak_rss_bytes'] / 2**20:>8.0f}MB{latency:>10.2f}s"
+            f"{reference_latency / latency:>8.2f}x{audio_s / latency:>9.1f}"
+            f"{run['mean_wer_vs_fp32']:>8.1%}{same:>4}/{len(clips)}"
+        )
+    print(
+        f"({args.model}, {len(reference['clips'])} clips, median of {args.repeat}; load includes "
+        "quantization unless an artifact was cached; WER and same are against fp32 transcripts)"
+    )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"model": args.model, "runs": runs}, indent=2))
+        print(f"Results written to {args.json}")
+
+    if failed:
+        print(f"Mean WER against fp32 above {args.max_wer:.1%}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
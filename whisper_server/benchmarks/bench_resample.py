@@ -0,0 +1,58 @@
+"""
+Benchmark the resample backends.
+
+Reports the time each backend needs per second of input audio for the rates
+clients actually send (48kHz from the app's recorder, 44.1kHz uploads).
+
+Usage:
+    python benchmarks/bench_resample.py [--seconds 60] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.audio_processor import RESAMPLE_BACKENDS, Resampler  # noqa: E402
+
+TARGET_SAMPLE_RATE = 16000
+
+
+def time_backend(backend: str, audio: np.ndarray, sample_rate: int, repeat: int) -> float:
+    """Return the best time per second of audio in microseconds."""
+    resampler = Resampler(backend)
+    resampler.resample(audio, sample_rate, TARGET_SAMPLE_RATE)  # warm caches
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resampler.resample(audio, sample_rate, TARGET_SAMPLE_RATE)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(audio) / sample_rate) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of test audio")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per backend")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[48000, 44100], help="Input sample rates"
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'backend':<12}" + "".join(f"{rate:>12}" for rate in args.rates))
+    results = {}
+    for rate in args.rates:
+        audio = rng.normal(0, 0.1, int(args.seconds * rate)).astype(np.float32)
+        for backend in RESAMPLE_BACKENDS:
+            results[backend, rate] = time_backend(backend, audio, rate, args.repeat)
+    for backend in RESAMPLE_BACKENDS:
+        print(f"{backend:<12}" + "".join(f"{results[backend, rate]:>10.0f}us" for rate in args.rates))
+    print(f"(microseconds per second of audio, resampled to {TARGET_SAMPLE_RATE}Hz, best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
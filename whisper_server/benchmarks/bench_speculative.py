@@ -0,0 +1,171 @@
+"""
+Benchmark speculative decoding against plain greedy decoding.
+
+Loads the target model once with its draft attached, then transcribes every
+clip both ways: plain greedy decoding with the target alone, and assisted
+decoding where the draft proposes tokens the target verifies. Reports the
+median latency of each, the speedup and whether the transcripts are
+identical (they must be), grouped by clip length, since the gain depends on
+how many tokens each generate call decodes. Clips longer than 30s are
+chunked with the server's long-form settings.
+
+The corpus is every audio file in --corpus; without one, seeded synthetic
+clips of each --lengths are used. They are not speech, so the draft's
+acceptance rate (and the speedup) on them says little; use real recordings
+before enabling SPECULATIVE_DECODING in production.
+
+Usage:
+    python benchmarks/bench_speculative.py --model whisper-large --draft whisper-tiny
+        [--corpus ./corpus] [--lengths 5,15,30,60] [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from signals import speech_like  # noqa: E402
+
+from config import WhisperConfig  # noqa: E402
+from services.audio_processor import AudioProcessor  # noqa: E402
+from services.inference_backend import LoadedModel  # noqa: E402
+from services.model_manager import ModelManager  # noqa: E402
+
+TARGET_SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".m4a", ".webm", ".mp4"}
+
+
+def load_clips(corpus: str, lengths: List[float], per_length: int) -> List[Tuple[str, np.ndarray]]:
+    """(name, 16kHz mono audio) pairs from the corpus, or synthetic clips of each length."""
+    if not corpus:
+        return [
+            (f"synthetic-{seconds:g}s-{seed}", speech_like(seconds, TARGET_SAMPLE_RATE, seed))
+            for seconds in lengths
+            for seed in range(per_length)
+        ]
+    processor = AudioProcessor(target_sample_rate=TARGET_SAMPLE_RATE)
+    paths = sorted(p for p in Path(corpus).iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+    if not paths:
+        sys.exit(f"No audio files in {corpus}")
+    return [(p.name, processor.preprocess(p.read_bytes(), p.suffix[1:].lower())) for p in paths]
+
+
+def length_bucket(seconds: float, lengths: List[float]) -> str:
+    """The smallest --lengths value a clip fits in, as its report row."""
+    for bound in sorted(lengths):
+        if seconds <= bound + 0.5:
+            return f"<={bound:g}s"
+    return f">{max(lengths):g}s"
+
+
+def transcribe(model: LoadedModel, audio: np.ndarray, language: str) -> str:
+    """Transcribe one clip the way the server does, chunking long audio."""
+    options: Dict[str, Any] = {}
+    if len(audio) / TARGET_SAMPLE_RATE > 30.0:
+        options = {
+            "chunk_length_s": WhisperConfig.LONG_FORM_CHUNK_LENGTH_S,
+            "stride_length_s": WhisperConfig.LONG_FORM_STRIDE_LENGTH_S,
+        }
+    result = model.transcribe([audio], TARGET_SAMPLE_RATE, language or None, **options)
+    return result[0]["text"].strip()
+
+
+def median_time(model: LoadedModel, audio: np.ndarray, args: argparse.Namespace) -> Tuple:
+    """Median seconds over --repeat runs, and the transcript."""
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        text = transcribe(model, audio, args.language)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="whisper-large", help="Target model")
+    parser.add_argument("--draft", default="whisper-tiny", help="Draft model")
+    parser.add_argument(
+        "--corpus", default="", help="Directory of audio files (default: synthetic clips)"
+    )
+    parser.add_argument(
+        "--lengths", default="5,15,30,60", help="Clip lengths in seconds, also the report rows"
+    )
+    parser.add_argument(
+        "--clips-per-length", type=int, default=2, help="Synthetic clips of each length"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per clip and mode")
+    parser.add_argument("--language", default="en", help="Language code, empty to auto-detect")
+    parser.add_argument("--precision", default="fp32", help="CPU precision spec for both models")
+    parser.add_argument("--json", metavar="PATH", help="Write the full results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    lengths = [float(x) for x in args.lengths.split(",") if x.strip()]
+    if not args.corpus:
+        print("No --corpus given: synthetic clips, the speedup is not representative of speech")
+
+    manager = ModelManager(
+        max_cache_size=2,
+        cpu_precision=args.precision,
+        speculative_decoding=f"{args.model}:{args.draft}",
+    )
+    clips = load_clips(args.corpus, lengths, args.clips_per_length)
+    with manager.use_model(args.model) as (speculative, _):
+        plain = LoadedModel(speculative.backend, speculative.model)
+        transcribe(plain, clips[0][1], args.language)  # Warm-up
+        transcribe(speculative, clips[0][1], args.language)
+
+        results = {}
+        for name, audio in clips:
+            plain_s, plain_text = median_time(plain, audio, args)
+            speculative_s, speculative_text = median_time(speculative, audio, args)
+            results[name] = {
+                "audio_s": len(audio) / TARGET_SAMPLE_RATE,
+                "plain_s": plain_s,
+                "speculative_s": speculative_s,
+                "same": plain_text == speculative_text,
+                "plain_text": plain_text,
+                "speculative_text": speculative_text,
+            }
+
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results.values():
+        rows.setdefault(length_bucket(result["audio_s"], lengths), []).append(result)
+
+    print(
+        f"{'clip length':<13}{'clips':>6}{'plain':>10}{'speculative':>13}{'speedup':>9}{'same':>7}"
+    )
+    for bucket, group in sorted(rows.items(), key=lambda item: item[1][0]["audio_s"]):
+        plain_s = sum(r["plain_s"] for r in group)
+        speculative_s = sum(r["speculative_s"] for r in group)
+        same = sum(r["same"] for r in group)
+        print(
+            f"{bucket:<13}{len(group):>6}{plain_s:>9.2f}s{speculative_s:>12.2f}s"
+            f"{plain_s / speculative_s:>8.2f}x{same:>4}/{len(group)}"
+        )
+    print(
+        f"({args.model} drafted by {args.draft}, {args.precision}, median of {args.repeat}; "
+        "latency is summed over the clips in each row)"
+    )
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps({"model": args.model, "draft": args.draft, "clips": results}, indent=2)
+        )
+        print(f"Results written to {args.json}")
+
+    different = [name for name, result in results.items() if not result["same"]]
+    if different:
+        print(f"Transcripts differ from plain greedy decoding: {', '.join(different)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
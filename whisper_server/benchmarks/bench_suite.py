@@ -0,0 +1,311 @@
+"""
+Microbenchmark suite for the request hot path.
+
+Times every stage a transcription request passes through before inference
+(format sniffing, base64 validation and decoding, request parsing, container
+decoding, resampling/VAD/normalization) and the full /v1/audio/transcriptions
+route, on seeded synthetic speech-like audio at several sample rates,
+durations and formats. The route runs against a deterministic stub pipeline
+with the transcription cache disabled, so it measures the server and not the
+model. Each case reports the median time, throughput, audio seconds processed
+per second, and peak Python-allocated memory (tracemalloc, which includes
+numpy buffers).
+
+Results can be saved as a baseline and later runs compared against it; the
+comparison exits with status 1 when any case is slower than its baseline by
+more than the threshold.
+
+Usage:
+    python benchmarks/bench_suite.py [--quick] [--filter route]
+    python benchmarks/bench_suite.py --save-baseline baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json [--threshold 0.25]
+"""
+import argparse
+import base64
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from signals import FORMATS, encode, speech_like  # noqa: E402
+
+from api.models import TranscribeRequest  # noqa: E402
+from services.audio_processor import AudioProcessor  # noqa: E402
+from validators import (  # noqa: E402
+    decode_base64_audio,
+    detect_audio_format,
+    validate_base64_audio,
+)
+
+TARGET_SAMPLE_RATE = 16000
+
+
+@dataclass
+class Case:
+    """One benchmarked operation."""
+
+    name: str
+    run: Callable[[], Any]
+    audio_seconds: float = 0.0
+
+
+@dataclass
+class Config:
+    """Sizes and timing budget of a suite run."""
+
+    sample_rates: List[int]
+    durations: List[float]
+    route_durations: List[float]
+    rounds: int
+    min_round_seconds: float
+
+
+FULL = Config([8000, 16000, 44100, 48000], [5.0, 30.0, 120.0], [5.0, 30.0], 7, 0.2)
+QUICK = Config([16000, 48000], [5.0, 30.0], [5.0], 3, 0.05)
+
+
+def stage_cases(config: Config) -> List[Case]:
+    """Cases for the individual preprocessing and validation stages."""
+    processor = AudioProcessor(target_sample_rate=TARGET_SAMPLE_RATE)
+    cases = []
+
+    for seconds in config.durations:
+        wav = encode(speech_like(seconds, 48000), 48000, "wav")
+        encoded = base64.b64encode(wav).decode("ascii")
+        body = json.dumps({"audio": encoded, "model": "whisper-small"})
+        label = f"{seconds:g}s"
+        cases += [
+            Case(f"detect_audio_format/wav/{label}", lambda b=wav: detect_audio_format(b), seconds),
+            Case(
+                f"validate_base64_audio/{label}",
+                lambda e=encoded: validate_base64_audio(e),
+                seconds,
+            ),
+            Case(
+                f"decode_base64_audio/{label}",
+                lambda e=encoded: decode_base64_audio(e),
+                seconds,
+            ),
+            Case(
+                f"TranscribeRequest.get_audio/{label}",
+                lambda b=body: TranscribeRequest(**json.loads(b)).get_audio(),
+                seconds,
+            ),
+        ]
+
+    for sample_rate in config.sample_rates:
+        for seconds in config.durations:
+            audio = speech_like(seconds, sample_rate)
+            label = f"{sample_rate}Hz/{seconds:g}s"
+            encoded = {name: encode(audio, sample_rate, name) for name in FORMATS}
+            for audio_format, data in encoded.items():
+                cases.append(
+                    Case(
+                        f"AudioProcessor.load/{audio_format}/{label}",
+                        lambda d=data: processor.load(d),
+                        seconds,
+                    )
+                )
+            cases += [
+                Case(
+                    f"AudioProcessor.preprocess/wav/{label}",
+                    lambda d=encoded["wav"]: processor.preprocess(d, "wav"),
+                    seconds,
+                ),
+                Case(
+                    f"AudioProcessor.process_speech/{label}",
+                    lambda a=audio, sr=sample_rate: processor.process_speech(a, sr),
+                    seconds,
+                ),
+            ]
+    return cases
+
+
+def route_cases(config: Config) -> List[Case]:
+    """Cases for the full transcription route, served by a stub pipeline."""
+    from fastapi.testclient import TestClient
+
+    from api.routes import get_model_manager, get_rate_limiter, get_transcription_cache
+    from services.stub_pipeline import StubModelManager
+    from services.transcription_cache import TranscriptionCache
+    from whisper_api_server import app
+
+    model_manager = StubModelManager()
+    # A disabled cache makes every repeat run the whole pipeline, and no rate limit
+    # lets a case repeat as often as its rounds need
+    transcription_cache = TranscriptionCache(max_bytes=0)
+    overrides = {
+        get_model_manager: lambda: model_manager,
+        get_transcription_cache: lambda: transcription_cache,
+        get_rate_limiter: lambda: None,
+    }
+    client = TestClient(app)
+
+    def post(**kwargs: Any) -> None:
+        # Install the overrides only for the call, so nothing leaks into other users of the app
+        previous = dict(app.dependency_overrides)
+        app.dependency_overrides.update(overrides)
+        try:
+            response = client.post("/v1/audio/transcriptions", **kwargs)
+        finally:
+            app.dependency_overrides.clear()
+            app.dependency_overrides.update(previous)
+        if response.status_code != 200:
+            raise RuntimeError(f"Route returned {response.status_code}: {response.text}")
+
+    cases = []
+    for seconds in config.route_durations:
+        audio = speech_like(seconds, 48000)
+        wav = encode(audio, 48000, "wav")
+        mp3 = encode(audio, 48000, "mp3")
+        pcm = (speech_like(seconds, TARGET_SAMPLE_RATE) * 32767).astype(">i2").tobytes()
+        body = {"audio": base64.b64encode(wav).decode("ascii"), "model": "whisper-small"}
+        label = f"{seconds:g}s"
+        octet = {"Content-Type": "application/octet-stream"}
+        cases += [
+            Case(f"route/json-wav-48000Hz/{label}", lambda b=body: post(json=b), seconds),
+            Case(
+                f"route/octet-mp3-48000Hz/{label}",
+                lambda d=mp3: post(content=d, headers=octet),
+                seconds,
+            ),
+            Case(
+                f"route/l16-16000Hz/{label}",
+                lambda d=pcm: post(content=d, headers={"Content-Type": "audio/L16; rate=16000"}),
+                seconds,
+            ),
+        ]
+    return cases
+
+
+def measure(case: Case, config: Config) -> Dict[str, float]:
+    """
+    Time a case and measure its peak memory.
+
+    The number of calls per round is calibrated so one round takes at least
+    ``min_round_seconds``; the reported time is the median over rounds.
+    Memory is measured in a separate call, since tracing slows execution.
+    """
+    case.run()  # warm caches and lazy imports
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= config.min_round_seconds:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(config.min_round_seconds / elapsed) + 1))
+
+    per_call = [elapsed / loops]
+    for _ in range(config.rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            case.run()
+        per_call.append((time.perf_counter() - start) / loops)
+    median = statistics.median(per_call)
+
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": median,
+        "ops_per_s": 1.0 / median,
+        "audio_s_per_s": case.audio_seconds / median,
+        "peak_bytes": peak,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Names of cases slower than their baseline by more than threshold."""
+    return [
+        name
+        for name, result in results.items()
+        if name in baseline and result["median_s"] > baseline[name]["median_s"] * (1 + threshold)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes and shorter rounds")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--no-route", action="store_true", help="Skip the full route cases")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline as a fraction (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    config = QUICK if args.quick else FULL
+    baseline = json.loads(Path(args.compare).read_text())["results"] if args.compare else {}
+
+    cases = stage_cases(config)
+    if not args.no_route:
+        cases += route_cases(config)
+    cases = [case for case in cases if args.filter in case.name]
+
+    print(
+        f"{'case':<48}{'median':>12}{'ops/s':>10}{'audio x':>10}{'peak':>10}"
+        + (f"{'vs base':>10}" if baseline else "")
+    )
+    results = {}
+    for case in cases:
+        result = results[case.name] = measure(case, config)
+        line = (
+            f"{case.name:<48}{result['median_s'] * 1000:>10.3f}ms{result['ops_per_s']:>10.1f}"
+            f"{result['audio_s_per_s']:>10.0f}{result['peak_bytes'] / 2**20:>8.1f}MB"
+        )
+        if case.name in baseline:
+            line += f"{result['median_s'] / baseline[case.name]['median_s'] - 1:>+10.1%}"
+        print(line)
+    print("(audio x: seconds of audio processed per second; peak: tracemalloc peak)")
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "quick": args.quick,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+        print(f"Baseline written to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}:")
+            for name in regressions:
+                print(f"  {name}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Load generator for the transcription endpoint with latency SLO reporting.
+
+Drives a running server either closed-loop (a fixed number of clients, each
+sending its next request when the previous one finishes) or open-loop (a
+fixed arrival rate, Poisson or evenly spaced, regardless of how fast the
+server answers). Requests draw from a weighted mix of clip lengths, models
+and formats built from seeded synthetic speech, so runs are repeatable.
+
+Reports p50/p95/p99 latency, throughput, error and reject (503/429) rates,
+the share of rejects that were 429 rate limiting rather than 503 backpressure,
+cache outcomes and server-side queue wait (from the Server-Timing header),
+overall and per model and clip length. Open-loop latency is measured from
+the scheduled send time, so a server that falls behind is not hidden by the
+client waiting for it.
+
+Against a real model, run the server as usual. To measure scheduler and I/O
+changes on a CPU-only machine in seconds, start it in stub pipeline mode with
+the result cache and the per-client rate limit off (every loadgen client shares
+one address, so the limit would reject almost every request):
+
+    STUB_PIPELINE=true TRANSCRIPTION_CACHE_MAX_MB=0 RATE_LIMIT_REQUESTS=0 \
+        python whisper_api_server.py
+
+Usage:
+    python benchmarks/loadgen.py --concurrency 8 --duration 30
+    python benchmarks/loadgen.py --rate 5 --clips 5:3,30:1 --models whisper-tiny,whisper-small
+    python benchmarks/loadgen.py --concurrency 4 --slo-p95-ms 2000 --json results.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from signals import FORMATS, encode, speech_like
+
+ENDPOINT = "/v1/audio/transcriptions"
+PCM_SAMPLE_RATE = 16000
+SOURCE_SAMPLE_RATE = 48000
+_QUEUE_WAIT = re.compile(r"queue_wait;dur=([0-9.]+)")
+
+
+@dataclass
+class Variant:
+    """One prepared request body."""
+
+    clip_seconds: float
+    model: str
+    audio_format: str
+    content: bytes
+    headers: Dict[str, str]
+
+
+@dataclass
+class Result:
+    """Outcome of one request."""
+
+    scheduled: float
+    latency: float
+    status: int
+    clip_seconds: float
+    model: str
+    audio_format: str
+    queue_wait_ms: Optional[float] = None
+    cache: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    @property
+    def rejected(self) -> bool:
+        return self.status in (429, 503)
+
+
+def parse_mix(spec: str, cast: Any = str) -> List[Tuple[Any, float]]:
+    """Parse ``a:3,b:1,c`` into values with relative weights (default weight 1)."""
+    mix = []
+    for part in spec.split(","):
+        value, _, weight = part.strip().partition(":")
+        mix.append((cast(value), float(weight) if weight else 1.0))
+    return mix
+
+
+def build_body(
+    audio_bytes: bytes, audio_format: str, transport: str, model: str, language: str
+) -> Tuple[bytes, Dict[str, str]]:
+    """Encode one request body the way a client of the given transport would."""
+    if audio_format == "l16":
+        return audio_bytes, {"Content-Type": f"audio/L16; rate={PCM_SAMPLE_RATE}"}
+    if transport == "json":
+        body = {
+            "audio": base64.b64encode(audio_bytes).decode("ascii"),
+            "model": model,
+            "language": language,
+        }
+        return json.dumps(body).encode(), {"Content-Type": "application/json"}
+    if transport == "multipart":
+        request = httpx.Request(
+            "POST",
+            "http://loadgen" + ENDPOINT,
+            files={"file": (f"clip.{audio_format}", audio_bytes)},
+            data={"model": model, "language": language},
+        )
+        return request.read(), {"Content-Type": request.headers["Content-Type"]}
+    return audio_bytes, {"Content-Type": "application/octet-stream"}
+
+
+def prepare_variants(
+    clips: List[float],
+    models: List[str],
+    formats: List[str],
+    transport: str,
+    language: str,
+    variants: int,
+) -> Dict[Tuple[float, str, str], List[Variant]]:
+    """Encode ``variants`` distinct clips for every (clip length, model, format)."""
+    prepared = {}
+    for seconds in clips:
+        for audio_format in formats:
+            encoded = []
+            for seed in range(variants):
+                if audio_format == "l16":
+                    audio = speech_like(seconds, PCM_SAMPLE_RATE, seed=seed)
+                    encoded.append((audio * 32767).astype(">i2").tobytes())
+                else:
+                    audio = speech_like(seconds, SOURCE_SAMPLE_RATE, seed=seed)
+                    encoded.append(encode(audio, SOURCE_SAMPLE_RATE, audio_format))
+            for model in models:
+                prepared[seconds, model, audio_format] = [
+                    Variant(
+                        seconds,
+                        model,
+                        audio_format,
+                        *build_body(audio_bytes, audio_format, transport, model, language),
+                    )
+                    for audio_bytes in encoded
+                ]
+    return prepared
+
+
+class LoadGenerator:
+    """Sends requests drawn from a weighted workload mix and records the outcomes."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.url = args.url.rstrip("/") + ENDPOINT
+        self.language = args.language
+        self.timeout = args.timeout
+        self.rng = random.Random(args.seed)
+        self.clips = parse_mix(args.clips, float)
+        self.models = parse_mix(args.models)
+        self.formats = parse_mix(args.formats)
+        for audio_format, _ in self.formats:
+            if audio_format != "l16" and audio_format not in FORMATS:
+                choices = ", ".join([*FORMATS, "l16"])
+                raise SystemExit(f"Unknown format {audio_format}, use one of {choices}")
+        self.variants = prepare_variants(
+            [c for c, _ in self.clips],
+            [m for m, _ in self.models],
+            [f for f, _ in self.formats],
+            args.transport,
+            args.language,
+            args.variants,
+        )
+        self.results: List[Result] = []
+
+    def _pick(self, mix: List[Tuple[Any, float]]) -> Any:
+        values, weights = zip(*mix)
+        return self.rng.choices(values, weights)[0]
+
+    def next_variant(self) -> Variant:
+        """Draw the next request from the mix."""
+        key = (self._pick(self.clips), self._pick(self.models), self._pick(self.formats))
+        return self.rng.choice(self.variants[key])
+
+    async def send(self, client: httpx.AsyncClient, variant: Variant, scheduled: float) -> None:
+        """Send one request and record its result; latency counts from ``scheduled``."""
+        result = Result(
+            scheduled, 0.0, 0, variant.clip_seconds, variant.model, variant.audio_format
+        )
+        try:
+            response = await client.post(
+                self.url,
+                content=variant.content,
+                headers=variant.headers,
+                params={"model": variant.model, "language": self.language},
+            )
+            result.status = response.status_code
+            result.cache = response.headers.get("x-cache")
+            match = _QUEUE_WAIT.search(response.headers.get("server-timing", ""))
+            if match:
+                result.queue_wait_ms = float(match.group(1))
+            if response.status_code != 200:
+                result.error = response.text[:200]
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {str(e)}"
+        result.latency = time.perf_counter() - scheduled
+        self.results.append(result)
+
+    async def run_closed_loop(self, concurrency: int, duration: float) -> None:
+        """``concurrency`` clients each send back-to-back requests until the deadline."""
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+
+            async def worker() -> None:
+                while time.perf_counter() < deadline:
+                    await self.send(client, self.next_variant(), time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def run_open_loop(
+        self, rate: float, duration: float, poisson: bool, max_outstanding: int
+    ) -> int:
+        """
+        Send requests at ``rate`` per second until the deadline.
+
+        Returns:
+            Arrivals skipped because ``max_outstanding`` requests were already in flight
+        """
+        start = time.perf_counter()
+        limits = httpx.Limits(max_connections=max_outstanding)
+        tasks = set()
+        skipped = 0
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            scheduled = start
+            while scheduled < start + duration:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(tasks) >= max_outstanding:
+                    skipped += 1
+                else:
+                    task = asyncio.create_task(self.send(client, self.next_variant(), scheduled))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                scheduled += self.rng.expovariate(rate) if poisson else 1.0 / rate
+            if tasks:
+                await asyncio.gather(*tasks)
+        return skipped
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1), "p99": round(float(p99), 1)}
+
+
+def summarize(results: List[Result], window: float) -> Dict[str, Any]:
+    """Latency percentiles (ms), rates and throughput for a set of results."""
+    ok = [r for r in results if r.ok]
+    count = len(results)
+    cache = defaultdict(int)
+    for r in ok:
+        cache[r.cache or "none"] += 1
+    return {
+        "requests": count,
+        "ok": len(ok),
+        "error_rate": round(sum(not r.ok and not r.rejected for r in results) / count, 4)
+        if count else 0.0,
+        "reject_rate": round(sum(r.rejected for r in results) / count, 4) if count else 0.0,
+        "rate_limited_rate": round(sum(r.status == 429 for r in results) / count, 4)
+        if count else 0.0,
+        "throughput_rps": round(len(ok) / window, 2) if window > 0 else 0.0,
+        "audio_seconds_per_second": round(sum(r.clip_seconds for r in ok) / window, 1)
+        if window > 0 else 0.0,
+        "latency_ms": _percentiles([r.latency * 1000.0 for r in ok]),
+        "queue_wait_ms": _percentiles(
+            [r.queue_wait_ms for r in ok if r.queue_wait_ms is not None]
+        ),
+        "cache": dict(cache),
+    }
+
+
+def _print_row(label: str, summary: Dict[str, Any]) -> None:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:>8.0f}" if value is not None else f"{'-':>8}"
+
+    latency, queue_wait = summary["latency_ms"], summary["queue_wait_ms"]
+    print(
+        f"{label:<28}{summary['requests']:>7}{summary['throughput_rps']:>8.2f}"
+        f"{summary['error_rate']:>7.1%}{summary['reject_rate']:>7.1%}"
+        f"{ms(latency['p50'])}{ms(latency['p95'])}{ms(latency['p99'])}"
+        f"{ms(queue_wait['p50'])}{ms(queue_wait['p95'])}{ms(queue_wait['p99'])}"
+    )
+
+
+def report(results: List[Result], window: float) -> Dict[str, Any]:
+    """Print overall, per-model and per-clip summaries and return them."""
+    groups = {"all": results}
+    for model in sorted({r.model for r in results}):
+        groups[f"model={model}"] = [r for r in results if r.model == model]
+    for seconds in sorted({r.clip_seconds for r in results}):
+        groups[f"clip={seconds:g}s"] = [r for r in results if r.clip_seconds == seconds]
+    summaries = {label: summarize(group, window) for label, group in groups.items()}
+
+    print(
+        f"{'':<28}{'reqs':>7}{'req/s':>8}{'err':>7}{'rej':>7}"
+        f"{'p50':>8}{'p95':>8}{'p99':>8}{'qw p50':>8}{'qw p95':>8}{'qw p99':>8}"
+    )
+    for label, summary in summaries.items():
+        _print_row(label, summary)
+    overall = summaries["all"]
+    print(
+        f"(latency and queue wait in ms over {window:.1f}s; "
+        f"{overall['audio_seconds_per_second']} audio s/s; cache {overall['cache']})"
+    )
+
+    errors = [r.error for r in results if r.error and not r.rejected]
+    if errors:
+        print(f"First error: {errors[0]}")
+    if overall["rate_limited_rate"] > overall["reject_rate"] / 2:
+        # Every client here shares one address, so 429s measure the limiter, not the scheduler
+        print(
+            f"Warning: {overall['rate_limited_rate']:.1%} of requests were rate limited (429), "
+            "most of the rejects; start the server with RATE_LIMIT_REQUESTS=0"
+        )
+    return summaries
+
+
+def check_slo(overall: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    """Descriptions of every violated SLO."""
+    violations = []
+    latency = overall["latency_ms"]
+    for name, limit in (("p95", args.slo_p95_ms), ("p99", args.slo_p99_ms)):
+        if limit is not None and (latency[name] is None or latency[name] > limit):
+            violations.append(f"{name} latency {latency[name]}ms exceeds {limit:g}ms")
+    failed = overall["error_rate"] + overall["reject_rate"]
+    if args.max_error_rate is not None and failed > args.max_error_rate:
+        violations.append(f"error+reject rate {failed:.1%} exceeds {args.max_error_rate:.1%}")
+    return violations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8089", help="Server base URL")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, help="Closed loop: concurrent clients (default 4)")
+    load.add_argument("--rate", type=float, help="Open loop: arrivals per second")
+    parser.add_argument(
+        "--arrivals", choices=("poisson", "uniform"), default="poisson", help="Open-loop spacing"
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--clips", default="5:3,15:2,30:1", help="Clip seconds[:weight],...")
+    parser.add_argument("--models", default="whisper-small", help="Models[:weight],...")
+    parser.add_argument(
+        "--formats", default="wav:2,mp3:1", help="wav/flac/ogg/mp3/l16[:weight],..."
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("octet", "json", "multipart"),
+        default="octet",
+        help="How encoded audio is sent (l16 is always a raw body)",
+    )
+    parser.add_argument("--language", default="en", help="Language sent with each request")
+    parser.add_argument("--variants", type=int, default=4, help="Distinct clips per mix entry")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Request timeout in seconds")
+    parser.add_argument(
+        "--max-outstanding", type=int, default=256, help="Open loop: in-flight request cap"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix")
+    parser.add_argument("--slo-p95-ms", type=float, help="Fail if p95 latency exceeds this")
+    parser.add_argument("--slo-p99-ms", type=float, help="Fail if p99 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="Fail above this error+reject rate")
+    parser.add_argument("--json", metavar="PATH", help="Write summaries and raw results")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args)
+    mode = f"rate {args.rate:g}/s ({args.arrivals})" if args.rate else (
+        f"concurrency {args.concurrency or 4}"
+    )
+    print(f"Driving {generator.url} at {mode} for {args.warmup:g}s warm-up + {args.duration:g}s")
+
+    async def run() -> int:
+        total = args.warmup + args.duration
+        if args.rate:
+            return await generator.run_open_loop(
+                args.rate, total, args.arrivals == "poisson", args.max_outstanding
+            )
+        await generator.run_closed_loop(args.concurrency or 4, total)
+        return 0
+
+    started = time.perf_counter()
+    skipped = asyncio.run(run())
+    measure_from = started + args.warmup
+    measured = [r for r in generator.results if r.scheduled >= measure_from]
+    window = max(r.scheduled + r.latency for r in measured) - measure_from if measured else 0.0
+    summaries = report(measured, window)
+    if skipped:
+        print(f"{skipped} arrivals skipped at the --max-outstanding cap; the server is saturated")
+
+    violations = check_slo(summaries["all"], args)
+    for violation in violations:
+        print(f"SLO violated: {violation}")
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {
+                    "args": vars(args),
+                    "skipped_arrivals": skipped,
+                    "summaries": summaries,
+                    "results": [asdict(r) for r in measured],
+                },
+                indent=2,
+            )
+        )
+        print(f"Results written to {args.json}")
+
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Synthetic speech-like test signals for the benchmarks.
+
+Signals are generated offline and seeded, so every run and every machine
+benchmarks exactly the same audio. They are not speech, but they have the
+properties the preprocessing path reacts to: voiced phrases with a moving
+pitch and harmonics, a syllable-rate envelope, pauses between phrases (which
+voice activity detection cuts out) and a low noise floor.
+"""
+import io
+from typing import Dict, Tuple
+
+import numpy as np
+import soundfile as sf
+
+# name -> (soundfile format, subtype)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
+
+def speech_like(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate a mono speech-like signal.
+
+    Args:
+        seconds: Length of the signal
+        sample_rate: Sample rate of the signal
+        seed: Random seed; the same arguments always give the same samples
+
+    Returns:
+        float32 audio peaking around 0.2
+    """
+    rng = np.random.default_rng(seed)
+    length = int(seconds * sample_rate)
+    audio = rng.normal(0.0, 0.002, length).astype(np.float32)
+
+    position = int(rng.uniform(0.1, 0.4) * sample_rate)
+    while position < length:
+        phrase = min(int(rng.uniform(1.0, 4.0) * sample_rate), length - position)
+        t = np.arange(phrase, dtype=np.float32) / sample_rate
+
+        # Pitch drifting around a speaker's base frequency, integrated to a phase
+        base = rng.uniform(100.0, 220.0)
+        pitch = base * (1.0 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 2.0) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+
+        voiced = np.zeros(phrase, dtype=np.float32)
+        for harmonic in range(1, 9):
+            if base * harmonic < sample_rate / 2:
+                voiced += np.sin(harmonic * phase).astype(np.float32) / harmonic
+
+        # Syllables: a 3-6Hz envelope that reaches zero between syllables
+        syllables = np.sin(np.pi * rng.uniform(3.0, 6.0) * t) ** 2
+        audio[position:position + phrase] += 0.12 * voiced * syllables.astype(np.float32)
+
+        position += phrase + int(rng.uniform(0.3, 1.2) * sample_rate)
+
+    return audio
+
+
+def encode(audio: np.ndarray, sample_rate: int, audio_format: str) -> bytes:
+    """
+    Encode audio in one of FORMATS.
+
+    Args:
+        audio: Mono float audio
+        sample_rate: Sample rate of audio
+        audio_format: Key of FORMATS
+
+    Returns:
+        Encoded file contents
+    """
+    container, subtype = FORMATS[audio_format]
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=container, subtype=subtype)
+    return buffer.getvalue()
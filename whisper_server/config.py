@@ -1,6 +1,9 @@
 import os
 from typing import List
 
+from services.inference_executor import parse_client_weights
+from services.rate_limiter import parse_window
+
 
 class WhisperConfig:
     """Configuration for Whisper API Server"""
@@ -13,10 +16,55 @@ class WhisperConfig:
     MAX_AUDIO_FILE_SIZE_MB = int(os.getenv("MAX_AUDIO_FILE_SIZE_MB", "10"))
     MAX_AUDIO_FILE_SIZE_BYTES = MAX_AUDIO_FILE_SIZE_MB * 1024 * 1024
 
-    # Rate Limiting
+    # Rate Limiting: per-client token buckets of RATE_LIMIT_REQUESTS per RATE_LIMIT_WINDOW
+    # ("1 minute", "30 seconds", "1 hour" or seconds; RATE_LIMIT_REQUESTS=0 disables)
     RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
     RATE_LIMIT_WINDOW = os.getenv("RATE_LIMIT_WINDOW", "1 minute")
 
+    # Weighted fair queueing of inference across clients: client:weight pairs, others get 1
+    FAIR_QUEUE_WEIGHTS = os.getenv("FAIR_QUEUE_WEIGHTS", "")
+
+    # Inference Execution
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+    INFERENCE_MAX_QUEUE_SIZE = int(os.getenv("INFERENCE_MAX_QUEUE_SIZE", "8"))
+    INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "5"))
+
+    # Model replicas: 1 runs inference in the server process, N > 1 starts N worker processes
+    # that each own a model instance and a disjoint slice of cores, 0 derives N from the cores
+    # (REPLICA_THREADS per replica, default 4) and REPLICA_MEMORY_MB (0 = 75% of physical memory)
+    INFERENCE_REPLICAS = int(os.getenv("INFERENCE_REPLICAS", "1"))
+    REPLICA_THREADS = int(os.getenv("REPLICA_THREADS", "0"))
+    REPLICA_MEMORY_MB = int(os.getenv("REPLICA_MEMORY_MB", "0"))
+
+    # Micro-batching (BATCH_MAX_SIZE=0 uses the device's optimal batch size)
+    BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+    BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "0"))
+
+    # Transcription Result Cache (empty DB path disables the disk tier)
+    TRANSCRIPTION_CACHE_MAX_MB = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "32"))
+    TRANSCRIPTION_CACHE_DB_PATH = os.getenv("TRANSCRIPTION_CACHE_DB_PATH", "")
+    TRANSCRIPTION_CACHE_TTL_SECONDS = int(os.getenv("TRANSCRIPTION_CACHE_TTL_SECONDS", "86400"))
+
+    # Long-form Audio: clips longer than one chunk are split into overlapping chunks
+    # decoded in batches (LONG_FORM_BATCH_SIZE=0 uses the device's optimal batch size)
+    LONG_FORM_CHUNK_LENGTH_S = float(os.getenv("LONG_FORM_CHUNK_LENGTH_S", "30"))
+    LONG_FORM_STRIDE_LENGTH_S = float(os.getenv("LONG_FORM_STRIDE_LENGTH_S", "5"))
+    LONG_FORM_BATCH_SIZE = int(os.getenv("LONG_FORM_BATCH_SIZE", "0"))
+
+    # Resampling of client audio to 16kHz (soxr_vhq/hq/mq/lq/qq, polyphase or librosa)
+    RESAMPLE_BACKEND = os.getenv("RESAMPLE_BACKEND", "soxr_hq")
+    SUPPORTED_RESAMPLE_BACKENDS = (
+        "soxr_vhq", "soxr_hq", "soxr_mq", "soxr_lq", "soxr_qq", "polyphase", "librosa"
+    )
+
+    # Voice Activity Detection: drop non-speech before inference (edge trimming only when off)
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # WebSocket Streaming (STREAM_ENDPOINT_SILENCE_MS=0 disables end-of-speech detection)
+    STREAM_STEP_MS = float(os.getenv("STREAM_STEP_MS", "500"))
+    STREAM_MAX_WINDOW_SECONDS = float(os.getenv("STREAM_MAX_WINDOW_SECONDS", "15"))
+    STREAM_ENDPOINT_SILENCE_MS = float(os.getenv("STREAM_ENDPOINT_SILENCE_MS", "800"))
+
     # Supported Audio Formats
     SUPPORTED_AUDIO_FORMATS = {
         "mp3": "audio/mpeg",
@@ -31,6 +79,50 @@ class WhisperConfig:
     # Default Model
     DEFAULT_MODEL = "whisper-1"
 
+    # Model Cache (MODEL_IDLE_TTL_SECONDS=0 keeps idle models loaded; MODEL_RESIDENT names a
+    # model that is never evicted, empty for none)
+    MODEL_CACHE_MAX_MB = int(os.getenv("MODEL_CACHE_MAX_MB", "8192"))
+    MODEL_IDLE_TTL_SECONDS = float(os.getenv("MODEL_IDLE_TTL_SECONDS", "1800"))
+    MODEL_RESIDENT = os.getenv("MODEL_RESIDENT", "")
+
+    # Inference backend (transformers, or ctranslate2 via faster-whisper) as a default plus
+    # per-model overrides, e.g. "transformers,whisper-small:ctranslate2"
+    SUPPORTED_INFERENCE_BACKENDS = ("transformers", "ctranslate2")
+    INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "transformers")
+
+    # Speculative decoding as target:draft model pairs, e.g. "whisper-large:whisper-tiny":
+    # the draft proposes tokens and the target verifies them, with unchanged output
+    SPECULATIVE_DECODING = os.getenv("SPECULATIVE_DECODING", "")
+
+    # Language identification for language="auto": the first LANGUAGE_ID_SECONDS of speech go
+    # through LANGUAGE_ID_MODEL (empty, the default, disables; e.g. "whisper-tiny", which is
+    # downloaded and loaded alongside the main model) and a language it hears with at least
+    # LANGUAGE_ID_MIN_CONFIDENCE is passed to the main model and remembered per client for
+    # LANGUAGE_ID_CACHE_TTL_SECONDS (0 never remembers); below it the main model identifies it
+    LANGUAGE_ID_MODEL = os.getenv("LANGUAGE_ID_MODEL", "")
+    LANGUAGE_ID_SECONDS = float(os.getenv("LANGUAGE_ID_SECONDS", "10"))
+    LANGUAGE_ID_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_ID_MIN_CONFIDENCE", "0.8"))
+    LANGUAGE_ID_CACHE_TTL_SECONDS = float(os.getenv("LANGUAGE_ID_CACHE_TTL_SECONDS", "600"))
+
+    # CPU inference precision: fp32, bf16 (fp32 when the CPU lacks native bf16) or int8
+    # dynamic quantization of the linear layers, as a default plus per-model overrides,
+    # e.g. "fp32,whisper-large:int8". Quantized models are cached in PRECISION_ARTIFACT_DIR
+    # (empty disables) so later startups skip re-quantizing
+    SUPPORTED_CPU_PRECISIONS = ("fp32", "bf16", "int8")
+    CPU_PRECISION = os.getenv("CPU_PRECISION", "fp32")
+    PRECISION_ARTIFACT_DIR = os.getenv(
+        "PRECISION_ARTIFACT_DIR", os.path.expanduser("~/.cache/whisper_server/artifacts")
+    )
+
+    # Models loaded and warmed up in the background at startup (empty for none): each is
+    # downloaded on first start and loaded before readiness reports 200. The default is the
+    # app's default model, which its voice input waits for on /health/ready
+    MODEL_PRELOAD = [
+        name.strip()
+        for name in os.getenv("MODEL_PRELOAD", "whisper-small").split(",")
+        if name.strip()
+    ]
+
     # CORS Configuration
     ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:*").split(",")
 
@@ -40,6 +132,15 @@ class WhisperConfig:
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+    # Requests slower than this are written to the whisper.slow_requests log (0 disables)
+    SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "10000"))
+
+    # Stub pipeline mode for load testing: models are replaced by a deterministic stub
+    # that sleeps a fixed time per call plus a time per second of audio
+    STUB_PIPELINE = os.getenv("STUB_PIPELINE", "false").lower() in ("1", "true", "yes")
+    STUB_FIXED_LATENCY_MS = float(os.getenv("STUB_FIXED_LATENCY_MS", "50"))
+    STUB_MS_PER_AUDIO_SECOND = float(os.getenv("STUB_MS_PER_AUDIO_SECOND", "20"))
+
     @classmethod
     def validate_config(cls) -> List[str]:
         """Validate configuration and return list of errors"""
@@ -51,4 +152,105 @@ class WhisperConfig:
         if cls.PORT <= 0 or cls.PORT > 65535:
             errors.append("PORT must be between 1 and 65535")
 
+        if cls.MODEL_CACHE_MAX_MB <= 0:
+            errors.append("MODEL_CACHE_MAX_MB must be positive")
+
+        if cls.MODEL_IDLE_TTL_SECONDS < 0:
+            errors.append("MODEL_IDLE_TTL_SECONDS must not be negative")
+
+        precisions = [entry.rpartition(":")[2].strip() for entry in cls.CPU_PRECISION.split(",")]
+        if not all(p.lower() in cls.SUPPORTED_CPU_PRECISIONS for p in precisions if p):
+            errors.append(
+                f"CPU_PRECISION must use {', '.join(cls.SUPPORTED_CPU_PRECISIONS)}, "
+                "optionally as model:precision"
+            )
+
+        backends = [entry.rpartition(":")[2].strip() for entry in cls.INFERENCE_BACKEND.split(",")]
+        if not all(b.lower() in cls.SUPPORTED_INFERENCE_BACKENDS for b in backends if b):
+            errors.append(
+                f"INFERENCE_BACKEND must use {', '.join(cls.SUPPORTED_INFERENCE_BACKENDS)}, "
+                "optionally as model:backend"
+            )
+
+        pairs = [entry.split(":") for entry in cls.SPECULATIVE_DECODING.split(",") if entry.strip()]
+        if not all(len(pair) == 2 and all(name.strip() for name in pair) for pair in pairs):
+            errors.append("SPECULATIVE_DECODING must be target:draft model pairs")
+
+        if cls.LANGUAGE_ID_SECONDS <= 0 or cls.LANGUAGE_ID_SECONDS > 30:
+            errors.append("LANGUAGE_ID_SECONDS must be between 0 and 30")
+
+        if not 0 <= cls.LANGUAGE_ID_MIN_CONFIDENCE <= 1:
+            errors.append("LANGUAGE_ID_MIN_CONFIDENCE must be between 0 and 1")
+
+        if cls.LANGUAGE_ID_CACHE_TTL_SECONDS < 0:
+            errors.append("LANGUAGE_ID_CACHE_TTL_SECONDS must not be negative")
+
+        if cls.RATE_LIMIT_REQUESTS < 0:
+            errors.append("RATE_LIMIT_REQUESTS must not be negative")
+
+        try:
+            parse_window(cls.RATE_LIMIT_WINDOW)
+        except ValueError as e:
+            errors.append(f"RATE_LIMIT_WINDOW: {str(e)}")
+
+        try:
+            parse_client_weights(cls.FAIR_QUEUE_WEIGHTS)
+        except ValueError as e:
+            errors.append(f"FAIR_QUEUE_WEIGHTS: {str(e)}")
+
+        if cls.INFERENCE_WORKERS <= 0:
+            errors.append("INFERENCE_WORKERS must be positive")
+
+        if cls.INFERENCE_REPLICAS < 0:
+            errors.append("INFERENCE_REPLICAS must not be negative")
+
+        if cls.REPLICA_THREADS < 0 or cls.REPLICA_MEMORY_MB < 0:
+            errors.append("REPLICA_THREADS and REPLICA_MEMORY_MB must not be negative")
+
+        if cls.INFERENCE_MAX_QUEUE_SIZE < 0:
+            errors.append("INFERENCE_MAX_QUEUE_SIZE must not be negative")
+
+        if cls.BATCH_WINDOW_MS < 0:
+            errors.append("BATCH_WINDOW_MS must not be negative")
+
+        if cls.BATCH_MAX_SIZE < 0:
+            errors.append("BATCH_MAX_SIZE must not be negative")
+
+        if cls.TRANSCRIPTION_CACHE_MAX_MB < 0:
+            errors.append("TRANSCRIPTION_CACHE_MAX_MB must not be negative")
+
+        if cls.TRANSCRIPTION_CACHE_TTL_SECONDS <= 0:
+            errors.append("TRANSCRIPTION_CACHE_TTL_SECONDS must be positive")
+
+        if cls.LONG_FORM_CHUNK_LENGTH_S <= 0 or cls.LONG_FORM_CHUNK_LENGTH_S > 30:
+            errors.append("LONG_FORM_CHUNK_LENGTH_S must be between 0 and 30")
+
+        if cls.LONG_FORM_STRIDE_LENGTH_S < 0 or (
+            2 * cls.LONG_FORM_STRIDE_LENGTH_S >= cls.LONG_FORM_CHUNK_LENGTH_S
+        ):
+            errors.append("LONG_FORM_STRIDE_LENGTH_S must be less than half the chunk length")
+
+        if cls.LONG_FORM_BATCH_SIZE < 0:
+            errors.append("LONG_FORM_BATCH_SIZE must not be negative")
+
+        if cls.SLOW_REQUEST_MS < 0:
+            errors.append("SLOW_REQUEST_MS must not be negative")
+
+        if cls.STUB_FIXED_LATENCY_MS < 0 or cls.STUB_MS_PER_AUDIO_SECOND < 0:
+            errors.append("STUB_FIXED_LATENCY_MS and STUB_MS_PER_AUDIO_SECOND must not be negative")
+
+        if cls.RESAMPLE_BACKEND not in cls.SUPPORTED_RESAMPLE_BACKENDS:
+            errors.append(
+                f"RESAMPLE_BACKEND must be one of {', '.join(cls.SUPPORTED_RESAMPLE_BACKENDS)}"
+            )
+
+        if cls.STREAM_STEP_MS <= 0:
+            errors.append("STREAM_STEP_MS must be positive")
+
+        if cls.STREAM_MAX_WINDOW_SECONDS <= 0 or cls.STREAM_MAX_WINDOW_SECONDS > 28:
+            errors.append("STREAM_MAX_WINDOW_SECONDS must be between 0 and 28")
+
+        if cls.STREAM_ENDPOINT_SILENCE_MS < 0:
+            errors.append("STREAM_ENDPOINT_SILENCE_MS must not be negative")
+
         return errors
@@ -0,0 +1,196 @@
+"""Format-specific audio decoders selected by the sniffed container format."""
+import io
+import logging
+import tempfile
+import threading
+import warnings
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from validators import detect_audio_format
+
+try:
+    import av  # PyAV: FFmpeg's decoders in-process, reading from memory
+except ImportError:
+    av = None
+
+logger = logging.getLogger(__name__)
+
+# A decoder turns encoded bytes into (mono float32 audio, sample_rate)
+Decoder = Callable[[bytes], Tuple[np.ndarray, int]]
+
+
+class AudioDecodeError(Exception):
+    """Raised when no decoder can read the audio."""
+    pass
+
+
+def decode_soundfile(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode a libsndfile format (WAV, FLAC, OGG, MP3) straight from memory.
+
+    Samples are read as float32 and multichannel audio is downmixed with a
+    single matrix-vector product, so there is no intermediate float64 copy.
+
+    Args:
+        audio_bytes: Encoded audio file contents
+
+    Returns:
+        Tuple of (audio, sample_rate)
+
+    Raises:
+        sf.SoundFileError: If libsndfile cannot read the data
+    """
+    with sf.SoundFile(io.BytesIO(audio_bytes)) as audio_file:
+        frames = audio_file.read(dtype="float32", always_2d=True)
+        sample_rate = audio_file.samplerate
+
+    channels = frames.shape[1]
+    if channels == 1:
+        return frames[:, 0], sample_rate
+    return frames @ np.full(channels, 1.0 / channels, dtype=np.float32), sample_rate
+
+
+class FallbackDecoder:
+    """
+    Shared decoder for containers libsndfile cannot read (m4a/AAC, webm/Opus).
+
+    Uses PyAV when installed, which decodes from memory inside this process
+    and lets FFmpeg downmix to mono float32 while decoding. Without PyAV it
+    falls back to audioread through a self-deleting temporary file, which
+    starts an external decoder per call. Either way one instance is shared by
+    all requests and bounds how many decodes run at once, so a burst of
+    compressed uploads cannot fork an unbounded number of decoder processes.
+    """
+
+    def __init__(self, max_concurrent: int = 2):
+        """
+        Initialize FallbackDecoder.
+
+        Args:
+            max_concurrent: Decodes allowed to run at the same time (default: 2)
+        """
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.backend = "pyav" if av is not None else "audioread"
+        logger.info(f"Fallback audio decoder: {self.backend} (max {max_concurrent} concurrent)")
+
+    def decode(self, audio_bytes: bytes, file_extension: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Decode audio bytes of any FFmpeg-supported container.
+
+        Args:
+            audio_bytes: Encoded audio file contents
+            file_extension: Container format, used as the temporary file suffix by audioread
+
+        Returns:
+            Tuple of (audio, sample_rate)
+
+        Raises:
+            AudioDecodeError: If the audio cannot be decoded
+        """
+        with self._slots:
+            try:
+                if av is not None:
+                    return self._decode_pyav(audio_bytes)
+                return self._decode_audioread(audio_bytes, file_extension)
+            except Exception as e:
+                raise AudioDecodeError(f"Failed to decode audio: {str(e)}") from e
+
+    @staticmethod
+    def _decode_pyav(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+        """Decode in-process, converting to packed mono float32 in FFmpeg."""
+        with av.open(io.BytesIO(audio_bytes)) as container:
+            stream = container.streams.audio[0]
+            sample_rate = stream.codec_context.sample_rate
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+            chunks = []
+            for frame in container.decode(stream):
+                for converted in resampler.resample(frame):
+                    chunks.append(converted.to_ndarray().reshape(-1))
+            for converted in resampler.resample(None):
+                chunks.append(converted.to_ndarray().reshape(-1))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32), sample_rate
+        return np.concatenate(chunks), sample_rate
+
+    @staticmethod
+    def _decode_audioread(audio_bytes: bytes, file_extension: Optional[str]) -> Tuple[np.ndarray, int]:
+        """Decode via audioread, which only accepts paths."""
+        import librosa
+
+        suffix = f".{file_extension}" if file_extension else ""
+        with tempfile.NamedTemporaryFile(suffix=suffix) as temp_file:
+            temp_file.write(audio_bytes)
+            temp_file.flush()
+            # Suppress librosa's audioread deprecation warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return librosa.load(temp_file.name, sr=None, mono=True)
+
+
+class DecoderRegistry:
+    """
+    Maps sniffed container formats to decoders.
+
+    The format comes from the file header (``validators.detect_audio_format``),
+    never from the client. Formats with a registered decoder are decoded
+    directly; if that decoder rejects the data, or the format is unknown or
+    has no decoder, the shared FallbackDecoder is used.
+    """
+
+    def __init__(self, fallback: Optional[FallbackDecoder] = None):
+        """
+        Initialize DecoderRegistry with soundfile for its native formats.
+
+        Args:
+            fallback: Decoder for everything else (default: a new FallbackDecoder)
+        """
+        self.fallback = fallback or FallbackDecoder()
+        self._decoders: Dict[str, Decoder] = {
+            "wav": decode_soundfile,
+            "flac": decode_soundfile,
+            "ogg": decode_soundfile,
+            "mp3": decode_soundfile,
+        }
+
+    def register(self, audio_format: str, decoder: Decoder) -> None:
+        """
+        Register or replace the decoder for a format.
+
+        Args:
+            audio_format: Format name as returned by detect_audio_format
+            decoder: Callable returning (mono float32 audio, sample_rate)
+        """
+        self._decoders[audio_format] = decoder
+
+    def decoder_for(self, audio_format: Optional[str]) -> str:
+        """Name of the decoder that handles audio_format first."""
+        decoder = self._decoders.get(audio_format) if audio_format else None
+        return decoder.__name__ if decoder is not None else self.fallback.backend
+
+    def decode(self, audio_bytes: bytes, file_extension: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Decode audio bytes with the decoder for their sniffed format.
+
+        Args:
+            audio_bytes: Encoded audio file contents
+            file_extension: Hint passed to the fallback decoder
+
+        Returns:
+            Tuple of (audio, sample_rate)
+
+        Raises:
+            AudioDecodeError: If the audio cannot be decoded
+        """
+        audio_format = detect_audio_format(audio_bytes)
+        decoder = self._decoders.get(audio_format) if audio_format else None
+        if decoder is not None:
+            try:
+                return decoder(audio_bytes)
+            except Exception as e:
+                logger.debug(f"{audio_format} decoder failed ({str(e)}), using fallback decoder")
+
+        return self.fallback.decode(audio_bytes, file_extension or audio_format)
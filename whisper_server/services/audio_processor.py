@@ -1,10 +1,15 @@
 """Audio preprocessing service for optimal Whisper performance."""
 import logging
-from pathlib import Path
-from typing import Tuple
+from functools import lru_cache
+from math import gcd
+from typing import Any, Dict, Optional, Tuple
 import librosa
-import soundfile as sf
+import soxr
 import numpy as np
+from scipy import signal
+
+from services.audio_decoder import AudioDecodeError, DecoderRegistry
+from services.voice_activity import SpeechAudio, VoiceActivityDetector
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +19,103 @@ class AudioProcessingError(Exception):
     pass
 
 
+# soxr quality presets by backend name, best quality first
+_SOXR_QUALITIES = {
+    "soxr_vhq": "VHQ",
+    "soxr_hq": "HQ",
+    "soxr_mq": "MQ",
+    "soxr_lq": "LQ",
+    "soxr_qq": "QQ",
+}
+
+RESAMPLE_BACKENDS = (*_SOXR_QUALITIES, "polyphase", "librosa")
+
+# Anti-aliasing FIR for the polyphase backend: taps per unit of ratio and Kaiser beta
+_POLYPHASE_TAPS_PER_RATIO = 10
+_POLYPHASE_KAISER_BETA = 5.0
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Design (once per ratio) the low-pass FIR used by resample_poly."""
+    ratio = max(up, down)
+    taps = 2 * _POLYPHASE_TAPS_PER_RATIO * ratio + 1
+    fir = signal.firwin(taps, 1.0 / ratio, window=("kaiser", _POLYPHASE_KAISER_BETA))
+    fir.setflags(write=False)
+    return fir
+
+
+class Resampler:
+    """
+    Sample rate converter with selectable backends.
+
+    Backends:
+        - ``soxr_vhq`` ... ``soxr_qq``: libsoxr at the given quality preset;
+          ``soxr_hq`` is the default and the fastest at speech quality.
+        - ``polyphase``: scipy's polyphase FIR. Integer ratios (48kHz to
+          16kHz is exactly 3:1) take the fast path: a FIR designed once per
+          ratio and applied in a single vectorized pass that only computes
+          the kept output samples.
+        - ``librosa``: ``librosa.resample``, the previous behaviour.
+    """
+
+    def __init__(self, backend: str = "soxr_hq"):
+        """
+        Initialize Resampler.
+
+        Args:
+            backend: One of RESAMPLE_BACKENDS (default: soxr_hq)
+
+        Raises:
+            ValueError: If the backend is unknown
+        """
+        if backend not in RESAMPLE_BACKENDS:
+            raise ValueError(
+                f"Unknown resample backend {backend!r}, expected one of {', '.join(RESAMPLE_BACKENDS)}"
+            )
+        self.backend = backend
+
+    def resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        """
+        Convert mono float32 audio to target_sr.
+
+        Args:
+            audio: Mono float32 audio
+            orig_sr: Sample rate of audio
+            target_sr: Desired sample rate
+
+        Returns:
+            Mono float32 audio at target_sr
+        """
+        if orig_sr == target_sr or audio.size == 0:
+            return audio
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+
+        if self.backend in _SOXR_QUALITIES:
+            return soxr.resample(audio, orig_sr, target_sr, quality=_SOXR_QUALITIES[self.backend])
+
+        if self.backend == "polyphase":
+            divisor = gcd(orig_sr, target_sr)
+            up, down = target_sr // divisor, orig_sr // divisor
+            # Integer ratios reuse a cached filter; others get scipy's own design
+            if up == 1 or down == 1:
+                window = _polyphase_filter(up, down)
+            else:
+                window = ("kaiser", _POLYPHASE_KAISER_BETA)
+            return signal.resample_poly(audio, up, down, window=window).astype(np.float32, copy=False)
+
+        return librosa.resample(audio, orig_sr=orig_sr, target_sr=target_sr).astype(
+            np.float32, copy=False
+        )
+
+
 class AudioProcessor:
     """
-    Service for preprocessing audio files for optimal Whisper transcription.
+    Service for preprocessing audio for optimal Whisper transcription.
 
-    Handles resampling, normalization, and silence trimming.
+    Works entirely on in-memory buffers: decodes bytes, resamples, keeps only
+    the speech found by voice activity detection and normalizes it, returning
+    float32 audio ready for the pipeline.
     """
 
     def __init__(
@@ -26,85 +123,209 @@ class AudioProcessor:
         target_sample_rate: int = 16000,
         silence_threshold_db: int = 40,
         normalize: bool = True,
+        voice_activity_detection: bool = True,
+        max_pack_seconds: float = 30.0,
+        resample_backend: str = "soxr_hq",
+        decoders: Optional[DecoderRegistry] = None,
     ):
         """
         Initialize AudioProcessor.
 
         Args:
             target_sample_rate: Target sample rate for Whisper (default: 16000Hz)
-            silence_threshold_db: Threshold in dB for silence trimming (default: 40)
+            silence_threshold_db: Threshold in dB below peak for silence (default: 40)
             normalize: Whether to normalize audio (default: True)
+            voice_activity_detection: Drop internal non-speech, not just edge silence (default: True)
+            max_pack_seconds: Target length of each packed speech input (default: 30s)
+            resample_backend: One of RESAMPLE_BACKENDS (default: soxr_hq)
+            decoders: Decoder registry (default: soundfile with a shared fallback decoder)
         """
         self.target_sample_rate = target_sample_rate
         self.silence_threshold_db = silence_threshold_db
         self.normalize = normalize
+        self.max_pack_seconds = max_pack_seconds
+        self.resampler = Resampler(resample_backend)
+        self.decoders = decoders or DecoderRegistry()
+        self._vad = (
+            VoiceActivityDetector(top_db=silence_threshold_db)
+            if voice_activity_detection
+            else None
+        )
+
+    @property
+    def vad_settings(self) -> Dict[str, Any]:
+        """Silence and voice activity thresholds applied to every input."""
+        return {
+            "enabled": self._vad is not None,
+            "silence_threshold_db": self.silence_threshold_db,
+            **(self._vad.settings if self._vad is not None else {}),
+        }
+
+    def preprocess(self, audio_bytes: bytes, file_extension: Optional[str] = None) -> np.ndarray:
+        """
+        Decode and preprocess audio bytes for optimal Whisper performance.
+
+        Args:
+            audio_bytes: Encoded audio file contents
+            file_extension: Detected container format, used only by the fallback decoder
+
+        Returns:
+            Mono float32 speech at the target sample rate, empty if there is none
+
+        Raises:
+            AudioProcessingError: If the audio cannot be decoded or processed
+        """
+        return self.preprocess_speech(audio_bytes, file_extension).audio
+
+    def preprocess_speech(
+        self, audio_bytes: bytes, file_extension: Optional[str] = None
+    ) -> SpeechAudio:
+        """
+        Decode and preprocess audio bytes, keeping speech segments and their timing.
+
+        Args:
+            audio_bytes: Encoded audio file contents
+            file_extension: Detected container format, used only by the fallback decoder
+
+        Returns:
+            SpeechAudio with packed speech at the target sample rate
+
+        Raises:
+            AudioProcessingError: If the audio cannot be decoded or processed
+        """
+        audio, sr = self.load(audio_bytes, file_extension)
+        return self.process_speech(audio, sr)
 
-    def preprocess(self, audio_path: str) -> Tuple[str, bool]:
+    def load(self, audio_bytes: bytes, file_extension: Optional[str] = None) -> Tuple[np.ndarray, int]:
         """
-        Preprocess audio file for optimal Whisper performance.
+        Decode audio bytes into a mono float32 array.
+
+        The decoder is chosen from the sniffed file header: libsndfile formats
+        (WAV, FLAC, OGG, MP3) are decoded straight from memory, everything
+        else goes through the shared fallback decoder.
 
         Args:
-            audio_path: Path to the audio file
+            audio_bytes: Encoded audio file contents
+            file_extension: Detected container format, used only by the fallback decoder
 
         Returns:
-            Tuple of (preprocessed_path, preprocessing_succeeded)
+            Tuple of (audio, sample_rate)
 
         Raises:
-            AudioProcessingError: If preprocessing fails unexpectedly
+            AudioProcessingError: If the audio cannot be decoded
         """
         try:
-            # Load audio with explicit format handling and suppress warnings
-            import warnings
+            audio, sr = self.decoders.decode(audio_bytes, file_extension)
+        except AudioDecodeError as e:
+            raise AudioProcessingError(str(e)) from e
 
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                audio, sr = librosa.load(audio_path, sr=None, mono=True)
+        if audio.size == 0:
+            raise AudioProcessingError("Decoded audio is empty")
 
-            logger.info(
-                f"Loaded audio: {len(audio)} samples at {sr}Hz, duration: {len(audio)/sr:.2f}s"
+        logger.info(
+            f"Loaded audio: {len(audio)} samples at {sr}Hz, duration: {len(audio)/sr:.2f}s"
+        )
+        return np.ascontiguousarray(audio, dtype=np.float32), sr
+
+    def load_pcm16(
+        self, pcm_bytes: bytes, channels: int = 1, big_endian: bool = True
+    ) -> np.ndarray:
+        """
+        Convert raw signed 16-bit PCM into mono float32 without any container decoding.
+
+        Args:
+            pcm_bytes: Interleaved 16-bit samples
+            channels: Number of interleaved channels (default: 1)
+            big_endian: Byte order, network order per RFC 2586 (default: True)
+
+        Returns:
+            Mono float32 audio in [-1, 1)
+
+        Raises:
+            AudioProcessingError: If the data is not a whole number of frames
+        """
+        frame_size = 2 * channels
+        if channels < 1 or len(pcm_bytes) % frame_size != 0:
+            raise AudioProcessingError(
+                f"PCM data length {len(pcm_bytes)} is not a multiple of {frame_size} bytes"
             )
 
+        samples = np.frombuffer(pcm_bytes, dtype=">i2" if big_endian else "<i2")
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        return (samples * (1.0 / 32768.0)).astype(np.float32)
+
+    def process(self, audio: np.ndarray, sr: int) -> np.ndarray:
+        """
+        Resample decoded audio and reduce it to normalized speech.
+
+        Args:
+            audio: Mono float32 audio
+            sr: Sample rate of audio
+
+        Returns:
+            Mono float32 speech at the target sample rate, empty if there is none
+
+        Raises:
+            AudioProcessingError: If processing fails unexpectedly
+        """
+        return self.process_speech(audio, sr).audio
+
+    def process_speech(self, audio: np.ndarray, sr: int) -> SpeechAudio:
+        """
+        Resample decoded audio, cut out the speech and normalize it.
+
+        Args:
+            audio: Mono float32 audio
+            sr: Sample rate of audio
+
+        Returns:
+            SpeechAudio with packed speech at the target sample rate
+
+        Raises:
+            AudioProcessingError: If processing fails unexpectedly
+        """
+        try:
             # Resample to 16kHz (Whisper's optimal sample rate)
             if sr != self.target_sample_rate:
-                audio = librosa.resample(
-                    audio, orig_sr=sr, target_sr=self.target_sample_rate
+                audio = self.resampler.resample(audio, sr, self.target_sample_rate)
+                logger.info(
+                    f"Resampled {sr}Hz to {self.target_sample_rate}Hz "
+                    f"({self.resampler.backend}): {len(audio)} samples"
                 )
-                logger.info(f"Resampled to {self.target_sample_rate}Hz: {len(audio)} samples")
 
-            # Normalize audio
-            if self.normalize:
-                audio = librosa.util.normalize(audio)
-
-            # Trim silence (use configured threshold for voice)
-            audio_before_trim = len(audio)
-            audio, _ = librosa.effects.trim(audio, top_db=self.silence_threshold_db)
-            logger.info(
-                f"Trimmed audio: {audio_before_trim} -> {len(audio)} samples "
-                f"(kept {len(audio)/audio_before_trim*100:.1f}%)"
-            )
+            if self._vad is not None:
+                # Drop leading, trailing and internal non-speech
+                speech = self._vad.split(
+                    audio, self.target_sample_rate, self.max_pack_seconds
+                )
+            else:
+                # Trim edge silence only (use configured threshold for voice)
+                trimmed, (start, _) = librosa.effects.trim(
+                    audio, top_db=self.silence_threshold_db
+                )
+                sr = self.target_sample_rate
+                speech = SpeechAudio.from_audio(trimmed, sr)
+                speech.duration = len(audio) / sr
+                if speech.pieces:
+                    speech.pieces[0] = [(0.0, start / sr, len(trimmed) / sr)]
 
-            # Save preprocessed audio as WAV (most compatible format)
-            preprocessed_path = audio_path.replace(".", "_preprocessed.wav")
-            sf.write(preprocessed_path, audio, self.target_sample_rate, format="WAV")
+            # Normalize all packs with one gain so relative levels are kept
+            if self.normalize and not speech.is_empty:
+                peak = max(float(np.abs(pack).max()) for pack in speech.packs)
+                if peak > 0:
+                    speech.packs = [pack * (1.0 / peak) for pack in speech.packs]
+            speech.packs = [pack.astype(np.float32, copy=False) for pack in speech.packs]
 
             logger.info(
-                f"Preprocessed audio saved: {preprocessed_path}, "
-                f"duration: {len(audio)/self.target_sample_rate:.2f}s"
-            )
-            return preprocessed_path, True
-
-        except (librosa.LibrosaError, sf.SoundFileError) as e:
-            logger.warning(
-                f"Audio preprocessing failed: {str(e)}, using original file",
-                extra={"audio_path": audio_path, "error_type": type(e).__name__},
+                f"Preprocessed audio: {speech.speech_duration:.2f}s of speech "
+                f"from {speech.duration:.2f}s"
             )
-            return audio_path, False
+            return speech
 
         except Exception as e:
             logger.error(
                 f"Unexpected error in audio preprocessing: {str(e)}",
                 exc_info=True,
-                extra={"audio_path": audio_path},
             )
-            # Re-raise unexpected errors
             raise AudioProcessingError(f"Failed to preprocess audio: {str(e)}") from e
@@ -0,0 +1,193 @@
+"""Dynamic micro-batching of concurrent transcription requests."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from services.inference_executor import InferenceExecutor, current_client, set_current_client
+from services.request_timing import RequestTiming, current_timing, set_current_timing
+
+logger = logging.getLogger(__name__)
+
+BatchRunner = Callable[[List[Any]], List[Any]]
+
+
+@dataclass
+class _PendingBatch:
+    """Requests collected for one batch key that have not been dispatched yet."""
+
+    run_batch: BatchRunner
+    max_batch_size: int
+    # (input, future, submitting request's timing, submit time)
+    items: List[Tuple[Any, asyncio.Future, Optional[RequestTiming], float]] = field(
+        default_factory=list
+    )
+    # Clients of the submitting requests, in submission order
+    clients: List[Optional[str]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+    ready: bool = False
+
+    @property
+    def client(self) -> Optional[str]:
+        """Client the batch is queued for: its members' client, or all of them joined."""
+        clients = sorted({client for client in self.clients if client})
+        return "+".join(clients) or None
+
+
+class BatchScheduler:
+    """
+    Groups concurrent requests that share a batch key into one inference call.
+
+    The first request for a key opens a batch and starts a short collection
+    window. The batch is dispatched to the inference executor when the window
+    expires or when it reaches its maximum size, whichever comes first. If
+    every worker is busy when the window expires, the batch keeps collecting
+    until a worker frees up, so bursts fill batches instead of queueing many
+    single-item calls. Results are fanned back out to the waiting requests in
+    submission order.
+
+    A batch is queued on the executor for the client of its requests; a batch
+    shared by several clients is queued as a client of its own. When a worker
+    frees up, the ready batch of the client the executor would serve first
+    goes next, so fair queueing also applies to batches held back here.
+    """
+
+    def __init__(self, inference_executor: InferenceExecutor, window_ms: float = 10.0):
+        """
+        Initialize BatchScheduler.
+
+        Args:
+            inference_executor: Executor that runs the batched calls
+            window_ms: How long a new batch waits for co-members (default: 10ms)
+        """
+        self._executor = inference_executor
+        self._window = max(window_ms, 0.0) / 1000.0
+        self._pending: Dict[Hashable, _PendingBatch] = {}
+        self._in_flight = 0
+        self._batches_run = 0
+        self._items_run = 0
+
+    async def submit(
+        self,
+        key: Hashable,
+        item: Any,
+        run_batch: BatchRunner,
+        max_batch_size: int,
+    ) -> Any:
+        """
+        Add one request to the batch for its key and wait for its result.
+
+        Args:
+            key: Requests with equal keys may share a batch (e.g. model and language)
+            item: Input for this request
+            run_batch: Blocking callable mapping a list of inputs to a list of results
+            max_batch_size: Maximum number of items per batch
+
+        Returns:
+            The result for this request's item
+
+        Raises:
+            Exception: Whatever run_batch raised for the batch containing this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(run_batch=run_batch, max_batch_size=max(max_batch_size, 1))
+            batch.timer = loop.call_later(self._window, self._on_window_expired, key)
+            self._pending[key] = batch
+        batch.items.append((item, future, current_timing(), time.perf_counter()))
+        batch.clients.append(current_client())
+
+        if len(batch.items) >= batch.max_batch_size:
+            self._dispatch(key)
+
+        return await future
+
+    def _on_window_expired(self, key: Hashable) -> None:
+        """Dispatch the batch if a worker is free, otherwise keep collecting."""
+        batch = self._pending.get(key)
+        if batch is None:
+            return
+        batch.timer = None
+        if self._in_flight < self._executor.max_workers:
+            self._dispatch(key)
+        else:
+            batch.ready = True
+
+    def _dispatch(self, key: Hashable) -> None:
+        """Remove the pending batch for key and start running it."""
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        self._in_flight += 1
+        asyncio.ensure_future(self._run(key, batch))
+
+    async def _run(self, key: Hashable, batch: _PendingBatch) -> None:
+        """Run one batch on the executor and resolve its futures."""
+        inputs = [item for item, _, _, _ in batch.items]
+        futures = [future for _, future, _, _ in batch.items]
+        logger.debug(f"Dispatching batch of {len(inputs)} for {key}")
+
+        # The batch is shared, so its stages are timed separately and then
+        # attributed to every member (this task has its own context copy)
+        dispatched = time.perf_counter()
+        batch_timing = RequestTiming(request_id=f"batch-{self._batches_run}")
+        set_current_timing(batch_timing)
+        set_current_client(batch.client)
+
+        try:
+            results = await self._executor.run(batch.run_batch, inputs)
+            if len(results) != len(inputs):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(inputs)} inputs"
+                )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            members = [t.request_id for _, _, t, _ in batch.items if t is not None]
+            for _, _, timing, submitted in batch.items:
+                if timing is not None:
+                    timing.add_batch(batch_timing, dispatched - submitted, members)
+            self._in_flight -= 1
+            self._batches_run += 1
+            self._items_run += len(inputs)
+            self._dispatch_next_ready()
+
+    def _dispatch_next_ready(self) -> None:
+        """Dispatch the ready batch served first by fair queueing, oldest on a tie."""
+        ready = [
+            (self._executor.next_finish(batch.client), i, key)
+            for i, (key, batch) in enumerate(self._pending.items())
+            if batch.ready
+        ]
+        if ready:
+            self._dispatch(min(ready)[2])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dictionary with pending/in-flight batch counts and average batch size
+        """
+        return {
+            "window_ms": self._window * 1000.0,
+            "pending_batches": len(self._pending),
+            "pending_items": sum(len(b.items) for b in self._pending.values()),
+            "in_flight_batches": self._in_flight,
+            "batches_run": self._batches_run,
+            "avg_batch_size": (
+                self._items_run / self._batches_run if self._batches_run else 0.0
+            ),
+        }
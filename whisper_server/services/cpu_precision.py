@@ -0,0 +1,180 @@
+"""CPU inference precision: bfloat16 weights and int8 dynamic quantization with cached artifacts."""
+import functools
+import logging
+import os
+import platform
+import tempfile
+from typing import Any, Dict, Optional
+
+import torch
+import transformers
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PRECISIONS = ("fp32", "bf16", "int8")
+
+# Resident bytes per parameter before a model is loaded; int8 quantizes only the linear
+# layers, while the embeddings, convolutions and layer norms stay fp32
+BYTES_PER_PARAMETER = {"fp32": 4.0, "bf16": 2.0, "int8": 1.5}
+
+# Marker that the model is not a named override in a precision spec
+DEFAULT_KEY = "*"
+
+
+def parse_precisions(spec: str) -> Dict[str, str]:
+    """
+    Parse a precision spec of a default plus per-model overrides.
+
+    ``"int8"`` quantizes every model; ``"fp32,whisper-large:int8,whisper-small:bf16"``
+    keeps fp32 as the default and overrides two models.
+
+    Args:
+        spec: Comma-separated precisions, optionally prefixed by ``model:``
+
+    Returns:
+        Mapping of model name (or ``"*"`` for the default) to precision
+
+    Raises:
+        ValueError: If a precision is not supported
+    """
+    precisions = {DEFAULT_KEY: "fp32"}
+    for entry in spec.split(","):
+        model, _, precision = entry.strip().rpartition(":")
+        precision = precision.strip().lower()
+        if not precision:
+            continue
+        if precision not in SUPPORTED_PRECISIONS:
+            raise ValueError(
+                f"Unsupported CPU precision: {precision}. "
+                f"Supported precisions: {list(SUPPORTED_PRECISIONS)}"
+            )
+        precisions[model.strip() or DEFAULT_KEY] = precision
+    return precisions
+
+
+@functools.lru_cache(maxsize=1)
+def cpu_supports_bf16() -> bool:
+    """Whether the CPU has native bfloat16 instructions (AVX512-BF16, AMX or Arm BF16)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = set(f.read().split())
+    except OSError:
+        # macOS on Apple silicon (M2 and later) has BF16; without cpuinfo assume only arm64 does
+        return platform.machine() == "arm64"
+    return bool(flags & {"avx512_bf16", "amx_bf16", "bf16"})
+
+
+def resolve_precision(precision: str) -> str:
+    """
+    Return the precision a model will actually run at on this CPU.
+
+    bf16 without hardware support is emulated and slower than fp32, so it
+    falls back to fp32 with a warning.
+    """
+    if precision == "bf16" and not cpu_supports_bf16():
+        logger.warning("CPU has no native bf16 support, using fp32 instead")
+        return "fp32"
+    return precision
+
+
+def quantize_int8(model: Any) -> Any:
+    """
+    Quantize the linear layers of a model to int8 with dynamic activation quantization.
+
+    Weights are quantized once; activations are quantized per batch at
+    runtime, so no calibration data is needed.
+
+    Args:
+        model: fp32 model in eval mode
+
+    Returns:
+        The quantized model
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_weight_bytes(model: Any) -> int:
+    """
+    Bytes held by the packed weights of dynamically quantized layers.
+
+    These weights are not parameters or buffers, so they are missed when
+    sizing a model from ``parameters()`` alone.
+    """
+    total = 0
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight = module.weight()
+            total += weight.numel() * weight.element_size()
+            bias = module.bias()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
+
+
+class PrecisionArtifactCache:
+    """
+    Local cache of converted models so later startups skip re-quantizing.
+
+    A quantized model is saved whole, because its packed layers cannot be
+    rebuilt from a plain state dict without first loading and quantizing
+    the fp32 model. Artifacts are keyed by model, precision and the torch
+    and transformers versions that wrote them; delete the directory to
+    force a refresh after a model revision changes upstream.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize PrecisionArtifactCache.
+
+        Args:
+            directory: Directory holding the artifacts, created on first save
+        """
+        self._directory = directory
+
+    def path(self, repo_id: str, precision: str) -> str:
+        """Artifact path for a model at a precision."""
+        name = (
+            f"{repo_id.replace('/', '--')}.{precision}"
+            f".torch-{torch.__version__}.transformers-{transformers.__version__}.pt"
+        )
+        return os.path.join(self._directory, name)
+
+    def load(self, repo_id: str, precision: str) -> Optional[Any]:
+        """
+        Load a cached model, or None if there is no usable artifact.
+
+        An unreadable artifact is removed so the next save replaces it.
+        """
+        path = self.path(repo_id, precision)
+        if not os.path.exists(path):
+            return None
+        try:
+            # Artifacts are written only by this server, so the full pickle is trusted
+            model = torch.load(path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable model artifact {path}: {str(e)}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        logger.info(f"Loaded {precision} model artifact {path}")
+        return model
+
+    def save(self, repo_id: str, precision: str, model: Any) -> None:
+        """Save a converted model atomically; failures are logged, never raised."""
+        path = self.path(repo_id, precision)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    torch.save(model, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Could not save model artifact {path}: {str(e)}")
+            return
+        logger.info(f"Saved {precision} model artifact {path}")
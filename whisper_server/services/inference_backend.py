@@ -0,0 +1,606 @@
+"""Inference backends that load Whisper checkpoints and transcribe batches of audio."""
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import numpy as np
+import torch
+from transformers import AutoModelForSpeechSeq2Seq, BitsAndBytesConfig, TextStreamer, pipeline
+
+from services.cpu_precision import (
+    BYTES_PER_PARAMETER,
+    DEFAULT_KEY,
+    PrecisionArtifactCache,
+    quantize_int8,
+    quantized_weight_bytes,
+    resolve_precision,
+)
+from services.speculative import build_draft_model
+
+try:
+    import faster_whisper  # CTranslate2 Whisper runtime
+except ImportError:
+    faster_whisper = None
+
+logger = logging.getLogger(__name__)
+
+# Decode options shared by every backend (and part of the cache key)
+GENERATE_OPTIONS = {
+    "do_sample": False,  # Deterministic for speed
+    "num_beams": 1,  # Greedy decoding for speed
+}
+
+# Called with each new piece of decoded text while a transcription is running
+TextCallback = Callable[[str], None]
+
+
+class InferenceBackend(ABC):
+    """
+    A runtime that loads Whisper checkpoints and transcribes audio with them.
+
+    ModelManager hosts backends: it asks one to load a model, caches what it
+    returns, estimates and measures its memory, and releases it on eviction.
+    Every backend returns results in the same shape, one dict per input with
+    ``text`` and ``chunks`` of ``{"text", "timestamp": (start, end)}`` in
+    seconds, so callers never depend on a particular runtime.
+    """
+
+    name = ""
+
+    # Whether transcribe() accepts a draft from prepare_draft() for speculative decoding
+    supports_draft = False
+
+    @abstractmethod
+    def load(self, repo_id: str, device: str, precision: str) -> Any:
+        """
+        Load a model.
+
+        Args:
+            repo_id: Checkpoint id, e.g. "openai/whisper-small"
+            device: Device chosen by ModelManager ('cuda:0', 'mps' or 'cpu')
+            precision: Precision for the device (fp32, bf16 or int8 on CPU)
+
+        Returns:
+            The backend's model object
+        """
+
+    @abstractmethod
+    def transcribe(
+        self,
+        model: Any,
+        audio_arrays: List[np.ndarray],
+        sampling_rate: int,
+        language: Optional[str],
+        batch_size: Optional[int] = None,
+        chunk_length_s: Optional[float] = None,
+        stride_length_s: Optional[float] = None,
+        on_text: Optional[TextCallback] = None,
+        draft: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe a batch of audio (blocking).
+
+        Args:
+            model: Model returned by load()
+            audio_arrays: Mono float32 audio, one per input
+            sampling_rate: Sample rate of the audio
+            language: Language code, or None for auto-detection
+            batch_size: Inputs (or long-form chunks) per forward pass (default: all inputs)
+            chunk_length_s: Split long audio into chunks of this length (default: no chunking)
+            stride_length_s: Overlap on each side of a chunk in seconds
+            on_text: Called with text as it is decoded; single-input calls only
+            draft: Draft from prepare_draft() proposing tokens for the model to verify,
+                on backends that support speculative decoding
+
+        Returns:
+            One result per input, in order
+        """
+
+    def prepare_draft(self, model: Any, draft_model: Any) -> Any:
+        """
+        Prepare a smaller model to draft tokens for a larger one.
+
+        Args:
+            model: Target model returned by load()
+            draft_model: Draft model returned by load() of this backend
+
+        Returns:
+            The draft to pass to transcribe()
+
+        Raises:
+            ValueError: If the backend does not support speculative decoding
+        """
+        raise ValueError(f"The {self.name} backend does not support speculative decoding")
+
+    def detect_language(
+        self, model: Any, audio: np.ndarray, sampling_rate: int
+    ) -> Dict[str, float]:
+        """
+        Identify the spoken language from the first 30s window of audio (blocking).
+
+        Args:
+            model: Model returned by load()
+            audio: Mono float32 audio
+            sampling_rate: Sample rate of the audio
+
+        Returns:
+            Probability of each language the model knows, by language code
+
+        Raises:
+            ValueError: If the backend or model cannot identify languages
+        """
+        raise ValueError(f"The {self.name} backend does not support language identification")
+
+    def release(self, model: Any) -> None:
+        """Free resources held by a model that is being unloaded (default: nothing)."""
+
+    def estimate_bytes(self, parameters: int, device: str, precision: str) -> int:
+        """
+        Estimate resident bytes of a model before loading it.
+
+        Args:
+            parameters: Parameter count of the checkpoint
+            device: Device the model will be loaded on
+            precision: Precision it will be loaded at
+
+        Returns:
+            Estimated bytes of weights plus overhead
+        """
+        if device.startswith("cuda"):
+            bytes_per_parameter = 1.0  # 8-bit quantization
+        elif device == "mps":
+            bytes_per_parameter = 2.0  # float16
+        else:
+            bytes_per_parameter = BYTES_PER_PARAMETER[precision]
+        return int(parameters * bytes_per_parameter * 1.1)
+
+    def measure_bytes(self, model: Any) -> int:
+        """Measured resident bytes of a loaded model, or 0 if the backend cannot tell."""
+        return 0
+
+
+class LoadedModel:
+    """A model together with the backend that runs it; what ModelManager caches and lends out."""
+
+    def __init__(self, backend: InferenceBackend, model: Any, draft: Any = None):
+        self.backend = backend
+        self.model = model
+        self.draft = draft
+
+    def transcribe(
+        self,
+        audio_arrays: List[np.ndarray],
+        sampling_rate: int,
+        language: Optional[str],
+        **options: Any,
+    ) -> List[Dict[str, Any]]:
+        """Transcribe with this model (and its draft, if any); see InferenceBackend.transcribe."""
+        if self.draft is not None:
+            options["draft"] = self.draft
+        return self.backend.transcribe(
+            self.model, audio_arrays, sampling_rate, language, **options
+        )
+
+    def detect_language(self, audio: np.ndarray, sampling_rate: int) -> Dict[str, float]:
+        """Language probabilities of the audio; see InferenceBackend.detect_language."""
+        return self.backend.detect_language(self.model, audio, sampling_rate)
+
+
+class _CallbackStreamer(TextStreamer):
+    """Text streamer that hands each finalized piece of decoded text to a callback."""
+
+    def __init__(self, tokenizer: Any, on_text: TextCallback):
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self._on_text = on_text
+
+    def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+        if text:
+            self._on_text(text)
+
+
+class TransformersBackend(InferenceBackend):
+    """
+    The transformers ASR pipeline.
+
+    Uses 8-bit bitsandbytes weights and flash attention on CUDA, float16 on
+    MPS and the configured CPU precision on CPU, where int8 models are cached
+    as artifacts. Long audio is chunked and batched by the pipeline itself.
+    With a draft, greedy decoding is assisted generation: the draft proposes
+    tokens and the model verifies them all in one forward pass, keeping only
+    those it would have chosen itself.
+    """
+
+    name = "transformers"
+
+    supports_draft = True
+
+    def __init__(self, artifact_dir: Optional[str] = None):
+        """
+        Initialize TransformersBackend.
+
+        Args:
+            artifact_dir: Directory caching quantized models across restarts (default: none)
+        """
+        self._artifacts = PrecisionArtifactCache(artifact_dir) if artifact_dir else None
+
+    def load(self, repo_id: str, device: str, precision: str) -> Any:
+        """Build the pipeline for a checkpoint with the device's optimizations."""
+        # Configure quantization (only for CUDA, not MPS)
+        quantization_config = None
+        use_quantization = False
+
+        try:
+            if device.startswith("cuda"):
+                # Use 8-bit quantization for CUDA GPU only
+                quantization_config = BitsAndBytesConfig(
+                    load_in_8bit=True,
+                    llm_int8_threshold=6.0,
+                    llm_int8_has_fp16_weight=False,
+                )
+                use_quantization = True
+                logger.info("8-bit quantization enabled for CUDA GPU")
+        except Exception as e:
+            logger.warning(
+                f"Quantization setup failed: {str(e)}, continuing without quantization"
+            )
+
+        # Optimized model loading
+        if device == "cpu":
+            precision = resolve_precision(precision)
+            pipe = self._load_cpu_pipeline(repo_id, precision)
+        else:
+            model_kwargs = {
+                "use_cache": True,
+                "torch_dtype": torch.float16,
+            }
+
+            # Add flash attention if available and compatible (CUDA only)
+            if device.startswith("cuda"):
+                try:
+                    import flash_attn
+
+                    model_kwargs["attn_implementation"] = "flash_attention_2"
+                    logger.info("Flash attention 2 enabled for CUDA")
+                except ImportError:
+                    logger.info("Flash attention not available, using standard attention")
+                except Exception as e:
+                    logger.warning(
+                        f"Flash attention setup failed: {str(e)}, using standard attention"
+                    )
+            else:
+                logger.info("Flash attention not available for MPS, using standard attention")
+
+            # Create pipeline with or without quantization config
+            if use_quantization and quantization_config is not None:
+                pipe = pipeline(
+                    "automatic-speech-recognition",
+                    repo_id,
+                    device=device,
+                    quantization_config=quantization_config,
+                    model_kwargs=model_kwargs,
+                )
+            else:
+                pipe = pipeline(
+                    "automatic-speech-recognition",
+                    repo_id,
+                    device=device,
+                    model_kwargs=model_kwargs,
+                )
+
+        # Enable torch compile for additional speedup; inductor has no kernels for
+        # dynamically quantized linear layers, so int8 models run eagerly
+        if device == "cpu" and precision == "int8":
+            logger.info("Torch compile skipped for int8 dynamically quantized model")
+        else:
+            try:
+                pipe.model = torch.compile(pipe.model, mode="reduce-overhead")
+                logger.info("Torch compile enabled for model optimization")
+            except Exception as e:
+                logger.warning(f"Torch compile failed: {str(e)}, continuing without it")
+        return pipe
+
+    def _load_cpu_pipeline(self, repo_id: str, precision: str) -> Any:
+        """
+        Build a CPU pipeline at the given precision.
+
+        int8 models are loaded from the artifact cache when possible; otherwise
+        the fp32 checkpoint is quantized and the result saved for next time.
+
+        Args:
+            repo_id: Checkpoint id
+            precision: Resolved precision: fp32, bf16 or int8
+
+        Returns:
+            The pipeline
+        """
+        logger.info(f"Using {precision} CPU precision for {repo_id}")
+        if precision == "fp32":
+            return pipeline(
+                "automatic-speech-recognition",
+                repo_id,
+                device="cpu",
+                model_kwargs={"use_cache": True},
+            )
+        if precision == "bf16":
+            # The pipeline casts input features to its dtype, so the whole forward runs in bf16
+            return pipeline(
+                "automatic-speech-recognition",
+                repo_id,
+                device="cpu",
+                dtype=torch.bfloat16,
+                model_kwargs={"use_cache": True},
+            )
+
+        model = self._artifacts.load(repo_id, precision) if self._artifacts else None
+        if model is None:
+            start_time = time.time()
+            model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                repo_id, dtype=torch.float32, use_cache=True
+            ).eval()
+            model = quantize_int8(model)
+            logger.info(f"Quantized {repo_id} to int8 in {time.time() - start_time:.1f}s")
+            if self._artifacts:
+                self._artifacts.save(repo_id, precision, model)
+        return pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=repo_id,
+            feature_extractor=repo_id,
+            device="cpu",
+        )
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_arrays: List[np.ndarray],
+        sampling_rate: int,
+        language: Optional[str],
+        batch_size: Optional[int] = None,
+        chunk_length_s: Optional[float] = None,
+        stride_length_s: Optional[float] = None,
+        on_text: Optional[TextCallback] = None,
+        draft: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """Run the pipeline, one generate call per batch of inputs or long-form chunks."""
+        # The pipeline consumes these dicts, so build fresh ones for every call
+        audio_inputs = [
+            {"raw": audio, "sampling_rate": sampling_rate} for audio in audio_arrays
+        ]
+        generate_kwargs = {"language": language, **GENERATE_OPTIONS}
+        options: Dict[str, Any] = {"return_timestamps": True}
+        if chunk_length_s:
+            options.update(
+                chunk_length_s=chunk_length_s,
+                stride_length_s=stride_length_s,
+                ignore_warning=True,
+            )
+        if on_text is not None:
+            generate_kwargs["streamer"] = _CallbackStreamer(model.tokenizer, on_text)
+        if draft is not None:
+            # Assisted generation verifies one sequence at a time
+            generate_kwargs["assistant_model"] = draft
+            batch_size = 1
+
+        if len(audio_inputs) == 1 and (chunk_length_s or on_text is not None):
+            # Chunked and streamed calls take a single input; chunks are batched within it
+            results = model(
+                audio_inputs[0],
+                batch_size=batch_size or 1,
+                generate_kwargs=generate_kwargs,
+                **options,
+            )
+        else:
+            results = model(
+                audio_inputs,
+                batch_size=batch_size or len(audio_inputs),
+                generate_kwargs=generate_kwargs,
+                **options,
+            )
+        return results if isinstance(results, list) else [results]
+
+    def prepare_draft(self, model: Any, draft_model: Any) -> Any:
+        """Present the draft pipeline's model as an assistant for the target pipeline."""
+        return build_draft_model(model, draft_model)
+
+    def detect_language(
+        self, model: Any, audio: np.ndarray, sampling_rate: int
+    ) -> Dict[str, float]:
+        """Softmax over the language tokens of the first decoding step, as Whisper detects."""
+        whisper = getattr(model.model, "_orig_mod", model.model)
+        generation_config = whisper.generation_config
+        lang_to_id = getattr(generation_config, "lang_to_id", None)
+        if not lang_to_id:
+            raise ValueError(f"{whisper.config.name_or_path} is not a multilingual model")
+        features = model.feature_extractor(
+            audio, sampling_rate=sampling_rate, return_tensors="pt"
+        ).input_features.to(whisper.device, whisper.dtype)
+        decoder_input_ids = torch.tensor(
+            [[generation_config.decoder_start_token_id]], device=whisper.device
+        )
+        with torch.no_grad():
+            logits = whisper(
+                input_features=features, decoder_input_ids=decoder_input_ids, use_cache=False
+            ).logits[0, -1]
+        probabilities = logits[list(lang_to_id.values())].float().softmax(-1)
+        # Language tokens look like <|en|>
+        return {
+            token[2:-2]: probability
+            for token, probability in zip(lang_to_id, probabilities.tolist())
+        }
+
+    def measure_bytes(self, model: Any) -> int:
+        """Parameter and buffer bytes, plus packed weights of int8 layers."""
+        try:
+            module = model.model
+            tensors = list(module.parameters()) + list(module.buffers())
+            measured = sum(t.numel() * t.element_size() for t in tensors)
+            return measured + quantized_weight_bytes(module)
+        except Exception as e:
+            logger.debug(f"Could not measure model size: {str(e)}")
+            return 0
+
+
+class CTranslate2Backend(InferenceBackend):
+    """
+    CTranslate2 through faster-whisper, typically several times faster than
+    the transformers pipeline on CPU at lower memory.
+
+    Uses the converted checkpoints faster-whisper publishes for each Whisper
+    size (downloaded on first use) with the configured CPU precision as the
+    compute type, and as many threads as torch is allowed to use, so replica
+    core pinning applies. Long audio is decoded in faster-whisper's own
+    sequential 30s windows, and a batch is transcribed one input at a time;
+    CTranslate2 already keeps every core busy on a single input. Streaming
+    reports text a segment at a time.
+    """
+
+    name = "ctranslate2"
+
+    COMPUTE_TYPES = {"fp32": "float32", "bf16": "bfloat16", "int8": "int8"}
+
+    def __init__(self, artifact_dir: Optional[str] = None):
+        """
+        Initialize CTranslate2Backend.
+
+        Args:
+            artifact_dir: Unused; faster-whisper caches converted models in the Hugging Face cache
+
+        Raises:
+            ValueError: If faster-whisper is not installed
+        """
+        if faster_whisper is None:
+            raise ValueError(
+                "The ctranslate2 backend requires faster-whisper (pip install faster-whisper)"
+            )
+
+    def load(self, repo_id: str, device: str, precision: str) -> Any:
+        """Load the faster-whisper conversion of a checkpoint."""
+        size = repo_id.rsplit("/whisper-", 1)[-1]
+        if device.startswith("cuda"):
+            ct2_device, compute_type = "cuda", "int8_float16"
+        else:
+            # CTranslate2 has no MPS support; Apple machines run it on the CPU
+            ct2_device = "cpu"
+            compute_type = self.COMPUTE_TYPES.get(resolve_precision(precision), "float32")
+        logger.info(f"Loading faster-whisper {size} on {ct2_device} as {compute_type}")
+        return faster_whisper.WhisperModel(
+            size,
+            device=ct2_device,
+            compute_type=compute_type,
+            cpu_threads=torch.get_num_threads(),
+            num_workers=1,
+        )
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_arrays: List[np.ndarray],
+        sampling_rate: int,
+        language: Optional[str],
+        batch_size: Optional[int] = None,
+        chunk_length_s: Optional[float] = None,
+        stride_length_s: Optional[float] = None,
+        on_text: Optional[TextCallback] = None,
+        draft: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """Transcribe each input with greedy decoding and segment timestamps."""
+        if sampling_rate != 16000:
+            raise ValueError(f"faster-whisper needs 16kHz audio, got {sampling_rate}Hz")
+
+        results = []
+        for audio in audio_arrays:
+            segments, _ = model.transcribe(
+                audio,
+                language=language,
+                task="transcribe",
+                beam_size=1,
+                best_of=1,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=False,
+                without_timestamps=False,
+            )
+            chunks = []
+            for segment in segments:
+                timestamp = (round(segment.start, 2), round(segment.end, 2))
+                chunks.append({"text": segment.text, "timestamp": timestamp})
+                if on_text is not None and segment.text:
+                    on_text(segment.text)
+            results.append({"text": "".join(chunk["text"] for chunk in chunks), "chunks": chunks})
+        return results
+
+    def detect_language(
+        self, model: Any, audio: np.ndarray, sampling_rate: int
+    ) -> Dict[str, float]:
+        """faster-whisper's language detection on the first 30s window."""
+        if sampling_rate != 16000:
+            raise ValueError(f"faster-whisper needs 16kHz audio, got {sampling_rate}Hz")
+        if not model.model.is_multilingual:
+            raise ValueError("The faster-whisper model is not multilingual")
+        features = model.feature_extractor(audio)[:, : model.feature_extractor.nb_max_frames]
+        results = model.model.detect_language(model.encode(features))[0]
+        # Language tokens look like <|en|>
+        return {token[2:-2]: probability for token, probability in results}
+
+    def release(self, model: Any) -> None:
+        """Free the CTranslate2 model's weights now rather than at garbage collection."""
+        unload = getattr(getattr(model, "model", None), "unload_model", None)
+        if unload is not None:
+            unload()
+
+    def estimate_bytes(self, parameters: int, device: str, precision: str) -> int:
+        """CTranslate2 int8 also quantizes the embeddings, so int8 is about one byte each."""
+        if not device.startswith("cuda") and precision == "int8":
+            return int(parameters * 1.1)
+        return super().estimate_bytes(parameters, device, precision)
+
+
+# Backends selectable by name in INFERENCE_BACKEND
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    TransformersBackend.name: TransformersBackend,
+    CTranslate2Backend.name: CTranslate2Backend,
+}
+
+
+def parse_backends(spec: str) -> Dict[str, str]:
+    """
+    Parse a backend spec of a default plus per-model overrides.
+
+    ``"transformers,whisper-small:ctranslate2"`` runs whisper-small on
+    CTranslate2 and every other model on transformers.
+
+    Args:
+        spec: Comma-separated backend names, optionally prefixed by ``model:``
+
+    Returns:
+        Mapping of model name (or ``"*"`` for the default) to backend name
+
+    Raises:
+        ValueError: If a backend is not known
+    """
+    backends = {DEFAULT_KEY: TransformersBackend.name}
+    for entry in spec.split(","):
+        model, _, backend = entry.strip().rpartition(":")
+        backend = backend.strip().lower()
+        if not backend:
+            continue
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unsupported inference backend: {backend}. "
+                f"Supported backends: {list(BACKENDS)}"
+            )
+        backends[model.strip() or DEFAULT_KEY] = backend
+    return backends
+
+
+def create_backend(name: str, artifact_dir: Optional[str] = None) -> InferenceBackend:
+    """
+    Create a backend by name.
+
+    Raises:
+        ValueError: If the backend is unknown or its runtime is not installed
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unsupported inference backend: {name}. Supported: {list(BACKENDS)}")
+    return BACKENDS[name](artifact_dir=artifact_dir)
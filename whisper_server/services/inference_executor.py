@@ -0,0 +1,364 @@
+"""Bounded executor that runs blocking inference off the event loop."""
+import asyncio
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from services.metrics import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Client that inference calls made from this context are queued for
+_current_client: ContextVar[Optional[str]] = ContextVar("inference_client", default=None)
+
+# Flow of inference calls made outside any request, such as warm-up
+_INTERNAL_CLIENT = "internal"
+
+
+def current_client() -> Optional[str]:
+    """The client inference calls from this context are queued for, if any."""
+    return _current_client.get()
+
+
+def set_current_client(client: Optional[str]) -> None:
+    """Queue inference calls made from this context (and tasks it starts) for a client."""
+    _current_client.set(client)
+
+
+def parse_client_weights(spec: str) -> Dict[str, float]:
+    """
+    Parse a fair queueing weight spec of client:weight pairs.
+
+    ``"10.0.0.5:4,10.0.0.6:0.5"`` gives 10.0.0.5 four times the inference
+    time of a client with the default weight 1 when both have work queued,
+    and 10.0.0.6 half of it. The weight is after the last colon, so IPv6
+    addresses can be used as is.
+
+    Args:
+        spec: Comma-separated ``client:weight`` pairs
+
+    Returns:
+        Mapping of client to weight
+
+    Raises:
+        ValueError: If an entry is not a client:weight pair with a positive weight
+    """
+    weights = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        client, _, weight = entry.strip().rpartition(":")
+        try:
+            value = float(weight)
+        except ValueError:
+            value = 0.0
+        if not client or value <= 0:
+            raise ValueError(
+                f"Invalid fair queue weight entry: {entry.strip()}. "
+                "Expected client:weight with a positive weight, e.g. 10.0.0.5:2"
+            )
+        weights[client] = value
+    return weights
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue cannot admit another request."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Call:
+    """One inference call waiting for a worker."""
+
+    fn: Callable[..., Any]
+    args: Any
+    kwargs: Dict[str, Any]
+    context: contextvars.Context
+    future: Future
+    submitted: float
+    # Worker seconds charged to the flow when dispatched, corrected on completion
+    charge: float = 0.0
+
+
+@dataclass
+class _Flow:
+    """One client's queued calls and the inference time charged to it."""
+
+    weight: float
+    calls: Deque[_Call] = field(default_factory=deque)
+    running: int = 0
+    # Virtual time at which the flow's charged work finishes; lowest is served next
+    finish: float = 0.0
+    served_seconds: float = 0.0
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for model inference with bounded admission.
+
+    At most ``max_workers`` inference calls run at once and at most
+    ``max_queue_size`` further requests wait for a worker. Anything beyond
+    that is rejected immediately with QueueFullError, so clients back off
+    instead of waiting on work that cannot finish before their timeout.
+
+    Calls waiting for a worker are served by weighted fair queueing across
+    clients rather than in arrival order. Each client is charged the worker
+    time its calls take, divided by its weight, and a free worker takes the
+    next call of the client charged least so far. A client sending long
+    recordings therefore uses its share of the workers, and another client's
+    short calls go ahead of the rest of its backlog instead of behind it.
+    A client that goes idle is not credited for the time it was away.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_queue_size: int = 8,
+        retry_after_seconds: int = 5,
+        client_weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize InferenceExecutor.
+
+        Args:
+            max_workers: Number of concurrent inference threads (default: 1)
+            max_queue_size: Requests allowed to wait for a worker (default: 8)
+            retry_after_seconds: Retry-After hint before any timings are known (default: 5)
+            client_weights: Fair queueing weight per client, others get 1 (default: none)
+        """
+        self._max_workers = max_workers
+        self._max_queue_size = max_queue_size
+        self._retry_after_seconds = retry_after_seconds
+        self._client_weights = dict(client_weights or {})
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._rejected = 0
+        self._avg_duration: Optional[float] = None
+        self._flows: Dict[str, _Flow] = {}
+        # Finish time of the flow served last; a flow becoming active starts from here
+        self._virtual_time = 0.0
+        self._closed = False
+
+        logger.info(
+            f"InferenceExecutor initialized with {max_workers} workers, "
+            f"queue size {max_queue_size}"
+        )
+
+    @property
+    def max_workers(self) -> int:
+        """Number of concurrent inference threads."""
+        return self._max_workers
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of admitted requests (running plus queued)."""
+        return self._max_workers + self._max_queue_size
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Reserve a slot for one request for the duration of the block.
+
+        Raises:
+            QueueFullError: If the executor is already at capacity
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                retry_after = self._estimate_retry_after()
+                raise QueueFullError(
+                    f"Inference queue is full ({self._pending} requests pending)",
+                    retry_after=retry_after,
+                )
+            self._pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable on the inference pool and await its result.
+
+        The callable runs in a copy of the caller's context, so stage timings
+        it records are attributed to the caller's request; time spent waiting
+        for a worker is recorded as the queue_wait stage. It is queued for the
+        context's client (see set_current_client).
+
+        Args:
+            fn: Callable to execute
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The callable's return value
+        """
+        call = _Call(
+            fn=fn,
+            args=args,
+            kwargs=kwargs,
+            context=contextvars.copy_context(),
+            future=Future(),
+            submitted=time.perf_counter(),
+        )
+        client = current_client() or _INTERNAL_CLIENT
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("InferenceExecutor is shut down")
+            flow = self._flows.get(client)
+            if flow is None:
+                flow = self._flows[client] = _Flow(weight=self._client_weights.get(client, 1.0))
+            if not flow.calls and not flow.running:
+                # Idle time earns no credit: start no earlier than the flows being served
+                flow.finish = max(flow.finish, self._virtual_time)
+            flow.calls.append(call)
+            self._dispatch()
+        return await asyncio.wrap_future(call.future)
+
+    def next_finish(self, client: Optional[str]) -> float:
+        """
+        Virtual time a new call from a client would be served at; lower goes first.
+
+        Args:
+            client: Client identifier, None for calls made outside any request
+
+        Returns:
+            The client's fair queueing position
+        """
+        with self._lock:
+            flow = self._flows.get(client or _INTERNAL_CLIENT)
+            if flow is None:
+                return self._virtual_time
+            return max(flow.finish, self._virtual_time)
+
+    def _dispatch(self) -> None:
+        """Start waiting calls on free workers, least charged client first (lock held)."""
+        while self._running < self._max_workers:
+            waiting = [(f.finish, i, c) for i, (c, f) in enumerate(self._flows.items()) if f.calls]
+            if not waiting:
+                return
+            _, _, client = min(waiting)
+            flow = self._flows[client]
+            call = flow.calls.popleft()
+            if not call.future.set_running_or_notify_cancel():
+                # The caller stopped waiting before a worker was free
+                self._forget_idle()
+                continue
+            self._virtual_time = max(self._virtual_time, flow.finish)
+            # Charge the expected duration now, so one client cannot take every free worker
+            call.charge = self._avg_duration or 0.0
+            flow.finish += call.charge / flow.weight
+            flow.running += 1
+            self._running += 1
+            self._executor.submit(self._work, client, call)
+
+    def _work(self, client: str, call: _Call) -> None:
+        """Run one call on a worker thread, charge its client, then start the next call."""
+        start_time = time.perf_counter()
+        result, error = None, None
+        try:
+            result = call.context.run(
+                self._timed_call, start_time - call.submitted, call.fn, *call.args, **call.kwargs
+            )
+        except BaseException as e:
+            error = e
+        duration = time.perf_counter() - start_time
+        with self._lock:
+            self._running -= 1
+            if self._avg_duration is None:
+                self._avg_duration = duration
+            else:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            flow = self._flows[client]
+            flow.running -= 1
+            flow.finish += (duration - call.charge) / flow.weight
+            flow.served_seconds += duration
+            self._forget_idle()
+            self._dispatch()
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    @staticmethod
+    def _timed_call(
+        queue_wait: float, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Execute fn in the caller's context, recording how long it waited for a worker."""
+        record_stage("queue_wait", queue_wait)
+        return fn(*args, **kwargs)
+
+    def _forget_idle(self) -> None:
+        """Drop flows with nothing queued, running or owed (caller holds the lock)."""
+        idle = [
+            client
+            for client, flow in self._flows.items()
+            if not flow.calls and not flow.running and flow.finish <= self._virtual_time
+        ]
+        for client in idle:
+            del self._flows[client]
+
+    def _estimate_retry_after(self) -> int:
+        """Estimate seconds until a slot frees up (caller must hold the lock)."""
+        if self._avg_duration is None:
+            return self._retry_after_seconds
+        queued = max(self._pending - self._max_workers, 0) + 1
+        return max(1, math.ceil(self._avg_duration * queued / self._max_workers))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dictionary with worker, queue and rejection counts, and the fair
+            queueing state of every client with work queued, running or owed
+        """
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "max_queue_size": self._max_queue_size,
+                "pending": self._pending,
+                "running": self._running,
+                "queued": max(self._pending - self._running, 0),
+                "rejected": self._rejected,
+                "avg_duration": self._avg_duration,
+                "waiting_calls": sum(len(flow.calls) for flow in self._flows.values()),
+                "clients": {
+                    client: {
+                        "weight": flow.weight,
+                        "queued": len(flow.calls),
+                        "running": flow.running,
+                        "served_seconds": round(flow.served_seconds, 3),
+                        # Weighted worker seconds charged beyond the client served last
+                        "lead_seconds": round(flow.finish - self._virtual_time, 3),
+                    }
+                    for client, flow in self._flows.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work, cancel queued calls and release the worker threads."""
+        with self._lock:
+            self._closed = True
+            for flow in self._flows.values():
+                for call in flow.calls:
+                    call.future.cancel()
+                flow.calls.clear()
+        self._executor.shutdown(wait=wait)
+        logger.info("InferenceExecutor shut down")
@@ -0,0 +1,172 @@
+"""Language identification for auto-language requests, on a small model and cached per client."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from services.metrics import time_stage
+from services.model_manager import ModelManager
+
+logger = logging.getLogger(__name__)
+
+
+class LanguageIdentifier:
+    """
+    Pick the language of requests sent without one before the main model runs.
+
+    Whisper identifies the language of every input it is not given one for,
+    on the model doing the transcription. Here the first seconds of speech
+    go through a small model once and the language it hears is passed to the
+    main model. A client's users rarely switch language, so a confident
+    result is also remembered per client and later requests from that client
+    skip identification entirely until it expires. Below the confidence
+    threshold nothing is passed or remembered, and the main model identifies
+    the language itself as before.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "whisper-tiny",
+        min_confidence: float = 0.8,
+        sample_seconds: float = 10.0,
+        cache_ttl_seconds: float = 600.0,
+        max_clients: int = 10000,
+    ):
+        """
+        Initialize LanguageIdentifier.
+
+        Args:
+            model_name: Model that identifies the language (default: whisper-tiny)
+            min_confidence: Probability the top language needs to be used (default: 0.8)
+            sample_seconds: Seconds of speech from the start of the audio used (default: 10)
+            cache_ttl_seconds: How long a client's language is remembered, 0 to never
+                remember it (default: 10 minutes)
+            max_clients: Clients remembered at once, least recently seen dropped first
+
+        Raises:
+            ValueError: If model_name is not supported
+        """
+        if model_name not in ModelManager.SUPPORTED_MODELS:
+            raise ValueError(
+                f"Unsupported language identification model: {model_name}. "
+                f"Supported models: {list(ModelManager.SUPPORTED_MODELS.keys())}"
+            )
+        self.model_name = model_name
+        self.min_confidence = min_confidence
+        self.sample_seconds = sample_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_clients = max_clients
+        # Client to (language, expiry time), least recently seen first
+        self._clients: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "cache_hits": 0,
+            "identified": 0,
+            "uncertain": 0,
+            "skipped": 0,
+            "errors": 0,
+        }
+
+    def cached_language(self, client: str) -> Optional[str]:
+        """
+        Language remembered for a client.
+
+        Args:
+            client: Client identifier, such as its address
+
+        Returns:
+            The client's language, or None if it is unknown or expired
+        """
+        with self._lock:
+            entry = self._clients.get(client)
+            if entry is None:
+                return None
+            language, expires = entry
+            if expires <= time.time():
+                del self._clients[client]
+                return None
+            self._clients.move_to_end(client)
+            self._stats["cache_hits"] += 1
+            return language
+
+    def identify(
+        self,
+        model_manager: ModelManager,
+        client: str,
+        model_name: str,
+        audio: np.ndarray,
+        sampling_rate: int,
+    ) -> Optional[str]:
+        """
+        Identify the language of a request's speech (blocking, runs on the inference pool).
+
+        Args:
+            model_manager: Model manager used to fetch the identification model
+            client: Client identifier the language is remembered for
+            model_name: Model that will transcribe the audio
+            audio: Speech to identify, mono float32
+            sampling_rate: Sample rate of the audio
+
+        Returns:
+            Language code to transcribe with, or None to let the main model identify it
+        """
+        checkpoint = ModelManager.SUPPORTED_MODELS.get(model_name)
+        if checkpoint == ModelManager.SUPPORTED_MODELS[self.model_name]:
+            # The model identifies the language in the same pass it would take here
+            self._count("skipped")
+            return None
+
+        sample = audio[: int(self.sample_seconds * sampling_rate)]
+        try:
+            with ExitStack() as stack:
+                with time_stage("model_load"):
+                    model, _ = stack.enter_context(model_manager.use_model(self.model_name))
+                with time_stage("language_id"):
+                    probabilities = model.detect_language(sample, sampling_rate)
+            language, confidence = max(probabilities.items(), key=lambda item: item[1])
+        except Exception as e:
+            logger.warning(
+                f"Language identification with {self.model_name} failed, "
+                f"{model_name} will identify the language: {str(e)}"
+            )
+            self._count("errors")
+            return None
+
+        if confidence < self.min_confidence:
+            logger.debug(
+                f"Language {language} identified with confidence {confidence:.2f}, "
+                f"below {self.min_confidence}; {model_name} will identify the language"
+            )
+            self._count("uncertain")
+            return None
+
+        self._count("identified")
+        if self.cache_ttl_seconds > 0:
+            with self._lock:
+                self._clients[client] = (language, time.time() + self.cache_ttl_seconds)
+                self._clients.move_to_end(client)
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+        return language
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get language identification statistics.
+
+        Returns:
+            Dictionary with outcome counts and the number of clients remembered
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "model": self.model_name,
+                "clients": len(self._clients),
+            }
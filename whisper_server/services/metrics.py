@@ -0,0 +1,303 @@
+"""Prometheus metrics for the transcription pipeline."""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from services.request_timing import current_timing
+
+logger = logging.getLogger(__name__)
+
+# Metrics live in their own registry so tests and multiple apps never collide
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+
+STAGES = (
+    "read",
+    "validation",
+    "decode",
+    "preprocess",
+    "queue_wait",
+    "model_load",
+    "language_id",
+    "inference",
+    "postprocess",
+)
+
+REQUEST_LATENCY = Histogram(
+    "whisper_http_request_duration_seconds",
+    "HTTP request latency by route and status",
+    ["method", "route", "status"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "whisper_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    registry=REGISTRY,
+)
+STAGE_LATENCY = Histogram(
+    "whisper_stage_duration_seconds",
+    "Time spent in each transcription pipeline stage",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    registry=REGISTRY,
+)
+AUDIO_DURATION = Histogram(
+    "whisper_audio_duration_seconds",
+    "Duration of transcribed audio",
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600),
+    registry=REGISTRY,
+)
+REAL_TIME_FACTOR = Histogram(
+    "whisper_real_time_factor",
+    "Transcription time divided by audio duration",
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5),
+    registry=REGISTRY,
+)
+EVENT_LOOP_LAG = Histogram(
+    "whisper_event_loop_lag_seconds",
+    "Delay of a periodic event loop callback past its scheduled time",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    registry=REGISTRY,
+)
+
+# Numeric service statistics exported at scrape time
+_INFERENCE_GAUGES = (
+    "pending", "running", "queued", "max_workers", "max_queue_size", "waiting_calls"
+)
+_BATCH_GAUGES = ("pending_batches", "pending_items", "in_flight_batches")
+_MODEL_GAUGES = ("cache_size", "max_cache_size", "cache_bytes", "max_cache_bytes", "batch_size")
+_MODEL_COUNTERS = (
+    "hits", "misses", "coalesced_loads", "load_failures", "evictions", "idle_unloads"
+)
+_REPLICA_METRICS = (
+    ("alive", GaugeMetricFamily, "whisper_replica_up", "Whether a replica process is running"),
+    ("outstanding", GaugeMetricFamily, "whisper_replica_outstanding", "Requests in flight"),
+    ("completed", CounterMetricFamily, "whisper_replica_completed", "Requests served"),
+    ("restarts", CounterMetricFamily, "whisper_replica_restarts", "Replica process restarts"),
+)
+
+# Label children resolved once so the hot path is a single observe()
+_STAGE_HISTOGRAMS = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Record time spent in a pipeline stage.
+
+    Observes the stage histogram and adds the time to the current request's
+    timing breakdown, if there is one.
+
+    Args:
+        stage: One of STAGES
+        seconds: Duration of the stage
+    """
+    _STAGE_HISTOGRAMS[stage].observe(seconds)
+    timing = current_timing()
+    if timing is not None:
+        timing.add(stage, seconds)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """
+    Time the block as one pipeline stage.
+
+    Args:
+        stage: One of STAGES
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def observe_transcription(audio_duration: float, processing_time: float) -> None:
+    """
+    Record the audio duration and real-time factor of a finished transcription.
+
+    Args:
+        audio_duration: Seconds of audio in the request
+        processing_time: Seconds spent transcribing it
+    """
+    AUDIO_DURATION.observe(audio_duration)
+    if audio_duration > 0:
+        REAL_TIME_FACTOR.observe(processing_time / audio_duration)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """
+    Measure event loop lag until cancelled.
+
+    Sleeps for ``interval`` and records how much later than requested the
+    loop woke up; blocking work on the loop shows up directly as lag.
+
+    Args:
+        interval: Seconds between samples (default: 0.5)
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP latency and in-flight requests.
+
+    Requests are labelled with the route template (``/v1/audio/transcriptions``),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - start)
+
+
+class _ServiceSnapshot:
+    """Converts service statistics into metric families at scrape time."""
+
+    def __init__(
+        self,
+        model_cache: Optional[Dict[str, Any]],
+        inference: Optional[Dict[str, Any]],
+        batching: Optional[Dict[str, Any]],
+        rate_limit: Optional[Dict[str, Any]] = None,
+    ):
+        self._model_cache = model_cache
+        self._inference = inference
+        self._batching = batching
+        self._rate_limit = rate_limit
+
+    def collect(self) -> Iterator[Any]:
+        if self._rate_limit is not None:
+            stats = self._rate_limit
+            yield _gauge("whisper_rate_limit_requests", "Requests per window", stats["limit"])
+            yield _gauge(
+                "whisper_rate_limit_window_seconds", "Rate limit window", stats["window_seconds"]
+            )
+            yield _gauge(
+                "whisper_rate_limit_clients", "Clients with a partly used bucket", stats["clients"]
+            )
+            yield _counter("whisper_rate_limit_allowed", "Requests allowed", stats["allowed"])
+            yield _counter("whisper_rate_limit_limited", "Requests rate limited", stats["limited"])
+
+        if self._inference is not None:
+            stats = self._inference
+            for name in _INFERENCE_GAUGES:
+                yield _gauge(f"whisper_inference_{name}", f"Inference executor {name}", stats[name])
+            yield _gauge(
+                "whisper_inference_clients", "Clients in fair queueing", len(stats["clients"])
+            )
+            yield _counter("whisper_inference_rejected", "Requests rejected", stats["rejected"])
+
+        if self._batching is not None:
+            stats = self._batching
+            for name in _BATCH_GAUGES:
+                yield _gauge(f"whisper_batch_{name}", f"Batch scheduler {name}", stats[name])
+            yield _counter("whisper_batch_batches_run", "Batches dispatched", stats["batches_run"])
+
+        if self._model_cache is not None:
+            info = self._model_cache
+            for name in _MODEL_GAUGES:
+                yield _gauge(f"whisper_model_{name}", f"Model cache {name}", info[name])
+            yield _gauge("whisper_model_loading", "Models loading", len(info["loading_models"]))
+            for name in _MODEL_COUNTERS:
+                yield _counter(f"whisper_model_cache_{name}", f"Model cache {name}", info[name])
+
+            per_model = {
+                "size_bytes": GaugeMetricFamily(
+                    "whisper_model_size_bytes", "Estimated size of a loaded model", labels=["model"]
+                ),
+                "refcount": GaugeMetricFamily(
+                    "whisper_model_refcount", "Requests using a loaded model", labels=["model"]
+                ),
+                "hits": CounterMetricFamily(
+                    "whisper_model_hits", "Cache hits per loaded model", labels=["model"]
+                ),
+            }
+            for model, entry in info["models"].items():
+                for field, family in per_model.items():
+                    family.add_metric([model], entry[field])
+            yield from per_model.values()
+
+            if "replicas" in info:
+                per_replica = {
+                    field: family(name, documentation, labels=["replica"])
+                    for field, family, name, documentation in _REPLICA_METRICS
+                }
+                for replica in info["replicas"]:
+                    for field, family in per_replica.items():
+                        family.add_metric([str(replica["index"])], float(replica[field]))
+                yield from per_replica.values()
+
+
+def _gauge(name: str, documentation: str, value: Any) -> GaugeMetricFamily:
+    return GaugeMetricFamily(name, documentation, value=float(value or 0))
+
+
+def _counter(name: str, documentation: str, value: Any) -> CounterMetricFamily:
+    return CounterMetricFamily(name, documentation, value=float(value or 0))
+
+
+def render_metrics(
+    model_cache: Optional[Dict[str, Any]] = None,
+    inference: Optional[Dict[str, Any]] = None,
+    batching: Optional[Dict[str, Any]] = None,
+    rate_limit: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Args:
+        model_cache: ``ModelManager.get_cache_info()``
+        inference: ``InferenceExecutor.get_stats()``
+        batching: ``BatchScheduler.get_stats()``
+        rate_limit: ``RateLimiter.get_stats()``, None when rate limiting is disabled
+
+    Returns:
+        Exposition body, served with CONTENT_TYPE_LATEST
+    """
+    return generate_latest(REGISTRY) + generate_latest(
+        _ServiceSnapshot(model_cache, inference, batching, rate_limit)
+    )
+
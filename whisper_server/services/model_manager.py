@@ -1,19 +1,67 @@
 """Model management service for loading and caching Whisper models."""
+import gc
 import logging
 import threading
-from typing import Dict, Tuple, Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 import torch
-from transformers import pipeline, BitsAndBytesConfig
+
+from services.cpu_precision import DEFAULT_KEY, parse_precisions
+from services.inference_backend import (
+    InferenceBackend,
+    LoadedModel,
+    create_backend,
+    parse_backends,
+)
+from services.speculative import parse_drafts
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CachedModel:
+    """A loaded model plus the bookkeeping used for eviction."""
+
+    pipe: LoadedModel
+    batch_size: int
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+    precision: str = ""
+    backend: str = ""
+    hits: int = 0
+    refcount: int = 0
+    # (draft model, draft prepared by the backend) for speculative decoding
+    draft: Optional[Tuple[Any, Any]] = None
+
+
+@dataclass
+class _PendingLoad:
+    """A model load in progress that concurrent requests for the same model wait on."""
+
+    future: Future
+    size_bytes: int
+
+
 class ModelManager:
     """
     Thread-safe model manager with caching and hardware optimization.
 
     Handles loading Whisper models with appropriate optimizations based on
-    available hardware (CUDA, MPS, CPU).
+    available hardware (CUDA, MPS, CPU), each through the inference backend
+    configured for it (see services.inference_backend). Loaded models are kept in a true LRU
+    cache bounded by an estimated resident byte budget; models in use by a
+    running inference are pinned via refcounts, idle models can be unloaded
+    after a TTL, and one small model can be kept resident permanently.
+    Each model is loaded at most once at a time without holding the cache
+    lock, so slow loads never block requests for models already cached.
+    A model can be given a smaller draft model for speculative decoding; the
+    draft is the same cache entry that serves the draft model's own traffic,
+    and it is pinned alongside the model it drafts for.
     """
 
     # Supported models mapping
@@ -25,152 +73,435 @@ class ModelManager:
         "whisper-large": "openai/whisper-large-v3",
     }
 
-    def __init__(self, max_cache_size: int = 4):
+    # Parameter counts used to estimate resident size before a model is loaded
+    MODEL_PARAMETERS = {
+        "openai/whisper-tiny": 39_000_000,
+        "openai/whisper-small": 244_000_000,
+        "openai/whisper-medium": 769_000_000,
+        "openai/whisper-large-v3": 1_550_000_000,
+    }
+
+    def __init__(
+        self,
+        max_cache_size: int = 4,
+        max_cache_bytes: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        resident_model: Optional[str] = None,
+        cpu_precision: str = "fp32",
+        artifact_dir: Optional[str] = None,
+        inference_backend: str = "transformers",
+        speculative_decoding: str = "",
+    ):
         """
         Initialize ModelManager.
 
         Args:
             max_cache_size: Maximum number of models to cache (default: 4)
+            max_cache_bytes: Estimated resident byte budget for cached models (default: unlimited)
+            idle_ttl_seconds: Unload models unused for this long (default: never)
+            resident_model: Model that is never evicted or unloaded once loaded (default: None)
+            cpu_precision: CPU precision spec, a default plus per-model overrides such as
+                "fp32,whisper-large:int8" (default: fp32)
+            artifact_dir: Directory caching quantized models across restarts (default: none)
+            inference_backend: Backend spec, a default plus per-model overrides such as
+                "transformers,whisper-small:ctranslate2" (default: transformers)
+            speculative_decoding: Draft models as target:draft pairs such as
+                "whisper-large:whisper-tiny" (default: none)
+
+        Raises:
+            ValueError: If a spec names an unsupported precision, backend or model, a
+                backend's runtime is not installed, or a draft cannot be used
         """
-        self._models: Dict[str, Tuple] = {}
+        self._models: "OrderedDict[str, CachedModel]" = OrderedDict()
         self._lock = threading.RLock()
         self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._idle_ttl_seconds = idle_ttl_seconds
+        self._resident_key = self.SUPPORTED_MODELS.get(resident_model) if resident_model else None
+        self._loading: Dict[str, _PendingLoad] = {}
+        self._cpu_precisions = self._by_model_key(parse_precisions(cpu_precision), "CPU precision")
+        backend_names = self._by_model_key(parse_backends(inference_backend), "inference backend")
+        backends = {
+            name: create_backend(name, artifact_dir=artifact_dir)
+            for name in set(backend_names.values())
+        }
+        self._backends = {key: backends[name] for key, name in backend_names.items()}
+        self._drafts = self._draft_names(parse_drafts(speculative_decoding))
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced_loads": 0,
+            "load_failures": 0,
+            "evictions": 0,
+            "idle_unloads": 0,
+        }
         self._device = self._get_optimal_device()
         self._batch_size = self._get_optimal_batch_size(self._device)
 
         logger.info(f"ModelManager initialized with device: {self._device}")
 
+    @property
+    def batch_size(self) -> int:
+        """Optimal batch size for the selected device."""
+        return self._batch_size
+
+    @property
+    def replica_count(self) -> int:
+        """Number of independent model instances serving requests (1 in-process)."""
+        return 1
+
+    def _by_model_key(self, by_name: Dict[str, str], setting: str) -> Dict[str, str]:
+        """Re-key a per-model setting from model names to repos, keeping the default under "*"."""
+        by_key = {DEFAULT_KEY: by_name.pop(DEFAULT_KEY)}
+        for model_name, value in by_name.items():
+            if model_name not in self.SUPPORTED_MODELS:
+                raise ValueError(
+                    f"Unsupported model in {setting}: {model_name}. "
+                    f"Supported models: {list(self.SUPPORTED_MODELS.keys())}"
+                )
+            # Aliases of one checkpoint share a single cached model and its settings
+            by_key[self.SUPPORTED_MODELS[model_name]] = value
+        return by_key
+
+    def _draft_names(self, drafts: Dict[str, str]) -> Dict[str, str]:
+        """Re-key draft models by target repo, checking each pair can decode speculatively."""
+        by_key = {}
+        for target_name, draft_name in drafts.items():
+            for model_name in (target_name, draft_name):
+                if model_name not in self.SUPPORTED_MODELS:
+                    raise ValueError(
+                        f"Unsupported model in speculative decoding: {model_name}. "
+                        f"Supported models: {list(self.SUPPORTED_MODELS.keys())}"
+                    )
+            key = self.SUPPORTED_MODELS[target_name]
+            draft_key = self.SUPPORTED_MODELS[draft_name]
+            if draft_key == key:
+                raise ValueError(f"{target_name} cannot be its own draft model")
+            backend = self.backend_for(key)
+            if not backend.supports_draft or self.backend_for(draft_key) is not backend:
+                raise ValueError(
+                    f"Speculative decoding needs {target_name} and {draft_name} on one backend "
+                    f"that supports it, got {backend.name} and {self.backend_for(draft_key).name}"
+                )
+            by_key[key] = draft_name
+        return by_key
+
+    def backend_for(self, key: str) -> InferenceBackend:
+        """
+        Backend a model is loaded and run with.
+
+        Args:
+            key: Model repo id, e.g. "openai/whisper-small"
+        """
+        return self._backends.get(key, self._backends[DEFAULT_KEY])
+
+    def precision_for(self, key: str) -> str:
+        """
+        Precision a model is loaded at on this device.
+
+        Args:
+            key: Model repo id, e.g. "openai/whisper-small"
+
+        Returns:
+            "int8" or "fp16" on GPUs; the configured fp32, bf16 or int8 on CPU
+        """
+        if self._device.startswith("cuda"):
+            return "int8"
+        if self._device == "mps":
+            return "fp16"
+        return self._cpu_precisions.get(key, self._cpu_precisions[DEFAULT_KEY])
+
     def get_model(self, model_name: str) -> Tuple:
         """
         Get or load a model (thread-safe).
 
+        The model is not pinned; prefer use_model() around inference calls.
+
         Args:
             model_name: Name of the model to load
 
         Returns:
-            Tuple of (pipeline, batch_size)
+            Tuple of (LoadedModel, batch_size)
 
         Raises:
             ValueError: If model_name is not supported
         """
-        if model_name not in self.SUPPORTED_MODELS:
-            raise ValueError(
-                f"Unsupported model: {model_name}. "
-                f"Supported models: {list(self.SUPPORTED_MODELS.keys())}"
-            )
+        entry = self._get_entry(model_name, pin=False)
+        draft_entry = self._get_draft_entry(model_name, pin=False)
+        return self._with_draft(entry, draft_entry), entry.batch_size
 
-        with self._lock:
-            if model_name in self._models:
-                logger.debug(f"Model {model_name} found in cache")
-                return self._models[model_name]
+    @contextmanager
+    def use_model(self, model_name: str) -> Iterator[Tuple]:
+        """
+        Get or load a model and pin it in the cache for the duration of the block.
 
-            # Load model
-            logger.info(f"Loading model {model_name}...")
-            pipe, batch_size = self._load_model(model_name)
+        A model with a draft model comes with the draft attached, and the
+        draft is pinned too.
 
-            # Cache eviction if needed (LRU-style)
-            if len(self._models) >= self._max_cache_size:
-                oldest_key = next(iter(self._models))
-                del self._models[oldest_key]
-                logger.info(f"Evicted model {oldest_key} from cache")
+        Args:
+            model_name: Name of the model to load
 
-            self._models[model_name] = (pipe, batch_size)
-            logger.info(f"Model {model_name} loaded and cached")
-            return pipe, batch_size
+        Yields:
+            Tuple of (LoadedModel, batch_size)
 
-    def _load_model(self, model_name: str) -> Tuple:
+        Raises:
+            ValueError: If model_name is not supported
+        """
+        entry = self._get_entry(model_name, pin=True)
+        draft_entry = None
+        try:
+            draft_entry = self._get_draft_entry(model_name, pin=True)
+            yield self._with_draft(entry, draft_entry), entry.batch_size
+        finally:
+            with self._lock:
+                for pinned in (entry, draft_entry):
+                    if pinned is not None:
+                        pinned.refcount -= 1
+                        pinned.last_used = time.time()
+
+    def _get_draft_entry(self, model_name: str, pin: bool) -> Optional[CachedModel]:
         """
-        Internal method to load a Whisper model with optimizations.
+        Return the cache entry of a model's draft model, loading it on a miss.
 
-        Args:
-            model_name: Name of the model to load
+        Drafts only speed decoding up, so a draft that fails to load is
+        skipped with a warning rather than failing the request.
+        """
+        draft_name = self._drafts.get(self.SUPPORTED_MODELS[model_name])
+        if draft_name is None:
+            return None
+        try:
+            return self._get_entry(draft_name, pin)
+        except Exception as e:
+            logger.warning(
+                f"Draft model {draft_name} unavailable, decoding {model_name} without it: "
+                f"{str(e)}"
+            )
+            return None
+
+    def _with_draft(self, entry: CachedModel, draft_entry: Optional[CachedModel]) -> LoadedModel:
+        """The entry's model with its draft attached, prepared once per pair of loaded models."""
+        if draft_entry is None:
+            return entry.pipe
+        draft_model = draft_entry.pipe.model
+        prepared = entry.draft
+        if prepared is None or prepared[0] is not draft_model:
+            prepared = (
+                draft_model,
+                entry.pipe.backend.prepare_draft(entry.pipe.model, draft_model),
+            )
+            with self._lock:
+                entry.draft = prepared
+        return LoadedModel(entry.pipe.backend, entry.pipe.model, draft=prepared[1])
 
-        Returns:
-            Tuple of (pipeline, batch_size)
+    def _get_entry(self, model_name: str, pin: bool) -> CachedModel:
         """
-        local_model_name = self.SUPPORTED_MODELS[model_name]
-        device = self._device
-        batch_size = self._batch_size
+        Return the cache entry for model_name, loading it on a miss.
 
+        The cache lock is only held for bookkeeping, never during a load, so
+        requests for cached models are not blocked behind a slow load. The
+        first request for a missing model loads it; concurrent requests for
+        the same model wait on that load's future instead of loading again.
+        """
+        if model_name not in self.SUPPORTED_MODELS:
+            raise ValueError(
+                f"Unsupported model: {model_name}. "
+                f"Supported models: {list(self.SUPPORTED_MODELS.keys())}"
+            )
+        key = self.SUPPORTED_MODELS[model_name]
+
+        while True:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    logger.debug(f"Model {model_name} found in cache")
+                    self._models.move_to_end(key)
+                    self._stats["hits"] += 1
+                    entry.hits += 1
+                    return self._touch(entry, pin)
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    # Reserve room before loading so peak memory stays within budget
+                    self._stats["misses"] += 1
+                    estimated_bytes = self._estimate_model_bytes(key)
+                    self._evict_for(estimated_bytes)
+                    loading = _PendingLoad(future=Future(), size_bytes=estimated_bytes)
+                    self._loading[key] = loading
+                    is_loader = True
+                else:
+                    self._stats["coalesced_loads"] += 1
+                    is_loader = False
+
+            if is_loader:
+                return self._load_entry(model_name, key, loading, pin)
+
+            # Raises the loader's exception if the load failed
+            entry = loading.future.result()
+            with self._lock:
+                if self._models.get(key) is entry:
+                    self._models.move_to_end(key)
+                    entry.hits += 1
+                    return self._touch(entry, pin)
+            # Evicted between the load finishing and this waiter waking up; retry
+
+    def _load_entry(
+        self, model_name: str, key: str, loading: "_PendingLoad", pin: bool
+    ) -> CachedModel:
+        """Load a model outside the lock, publish it, and resolve its waiters."""
+        try:
+            logger.info(f"Loading model {model_name}...")
+            pipe, batch_size = self._load_model(model_name)
+            size_bytes = self._measure_model_bytes(pipe, key)
+        except BaseException as e:
+            # Failures are never cached: the next request starts a fresh load
+            with self._lock:
+                del self._loading[key]
+                self._stats["load_failures"] += 1
+            loading.future.set_exception(e)
+            logger.error(f"Failed to load model {model_name}: {str(e)}")
+            raise
+
+        now = time.time()
+        entry = CachedModel(
+            pipe=pipe,
+            batch_size=batch_size,
+            size_bytes=size_bytes,
+            loaded_at=now,
+            last_used=now,
+            precision=self.precision_for(key),
+            backend=pipe.backend.name,
+        )
+        with self._lock:
+            del self._loading[key]
+            self._models[key] = entry
+            self._touch(entry, pin)
+            self._evict_for(0)
+        loading.future.set_result(entry)
         logger.info(
-            f"Loading model {local_model_name} on {device} with batch size {batch_size}"
+            f"Model {model_name} loaded and cached "
+            f"({entry.size_bytes / (1024 * 1024):.0f}MB)"
         )
+        return entry
 
-        # Configure quantization (only for CUDA, not MPS)
-        quantization_config = None
-        use_quantization = False
+    def _touch(self, entry: CachedModel, pin: bool) -> CachedModel:
+        """Mark an entry used and optionally pin it (caller holds the lock)."""
+        entry.last_used = time.time()
+        if pin:
+            entry.refcount += 1
+        return entry
 
-        try:
-            if device.startswith("cuda"):
-                # Use 8-bit quantization for CUDA GPU only
-                quantization_config = BitsAndBytesConfig(
-                    load_in_8bit=True,
-                    llm_int8_threshold=6.0,
-                    llm_int8_has_fp16_weight=False,
-                )
-                use_quantization = True
-                logger.info("8-bit quantization enabled for CUDA GPU")
-        except Exception as e:
-            logger.warning(
-                f"Quantization setup failed: {str(e)}, continuing without quantization"
+    def _evictable(self, key: str, entry: CachedModel) -> bool:
+        """Whether an entry may be evicted or unloaded right now."""
+        return entry.refcount == 0 and key != self._resident_key
+
+    def _evict_for(self, required_bytes: int) -> None:
+        """
+        Evict least recently used models until required_bytes more fit (caller holds the lock).
+
+        Loads in progress count against the budget with their estimated size.
+        Pinned and resident models are skipped; if they alone exceed the budget
+        the load proceeds over budget with a warning.
+        """
+        def over_limit(extra_models: int) -> bool:
+            if len(self._models) + len(self._loading) + extra_models > self._max_cache_size:
+                return True
+            if self._max_cache_bytes is None:
+                return False
+            reserved_bytes = sum(load.size_bytes for load in self._loading.values())
+            return (
+                self._cached_bytes() + reserved_bytes + required_bytes
+                > self._max_cache_bytes
             )
 
-        # Optimized model loading
-        if device == "cpu":
-            pipe = pipeline(
-                "automatic-speech-recognition",
-                local_model_name,
-                device=device,
-                model_kwargs={"use_cache": True},
+        extra_models = 1 if required_bytes else 0
+        for key in list(self._models.keys()):
+            if not over_limit(extra_models):
+                return
+            entry = self._models[key]
+            if self._evictable(key, entry):
+                self._unload(key)
+                self._stats["evictions"] += 1
+                logger.info(f"Evicted model {key} from cache")
+
+        if over_limit(extra_models):
+            logger.warning(
+                "Model cache is over budget; remaining models are pinned or resident"
             )
-        else:
-            model_kwargs = {
-                "use_cache": True,
-                "torch_dtype": torch.float16,
-            }
 
-            # Add flash attention if available and compatible (CUDA only)
-            if device.startswith("cuda"):
-                try:
-                    import flash_attn
-
-                    model_kwargs["attn_implementation"] = "flash_attention_2"
-                    logger.info("Flash attention 2 enabled for CUDA")
-                except ImportError:
-                    logger.info("Flash attention not available, using standard attention")
-                except Exception as e:
-                    logger.warning(
-                        f"Flash attention setup failed: {str(e)}, using standard attention"
-                    )
-            else:
-                logger.info("Flash attention not available for MPS, using standard attention")
-
-            # Create pipeline with or without quantization config
-            if use_quantization and quantization_config is not None:
-                pipe = pipeline(
-                    "automatic-speech-recognition",
-                    local_model_name,
-                    device=device,
-                    quantization_config=quantization_config,
-                    model_kwargs=model_kwargs,
-                )
-            else:
-                pipe = pipeline(
-                    "automatic-speech-recognition",
-                    local_model_name,
-                    device=device,
-                    model_kwargs=model_kwargs,
-                )
+    def unload_idle(self) -> List[str]:
+        """
+        Unload models that have not been used for longer than the idle TTL.
+
+        Returns:
+            Names of the unloaded models
+        """
+        if not self._idle_ttl_seconds:
+            return []
 
-        # Enable torch compile for additional speedup
+        cutoff = time.time() - self._idle_ttl_seconds
+        unloaded = []
+        with self._lock:
+            for key, entry in list(self._models.items()):
+                if entry.last_used < cutoff and self._evictable(key, entry):
+                    self._unload(key)
+                    self._stats["idle_unloads"] += 1
+                    unloaded.append(key)
+                    logger.info(f"Unloaded idle model {key}")
+        return unloaded
+
+    def _unload(self, key: str) -> None:
+        """Drop a model from the cache and return its memory (caller holds the lock)."""
+        entry = self._models.pop(key)
+        for other in self._models.values():
+            # A prepared draft shares the draft's weights; drop it so they are freed
+            if other.draft is not None and other.draft[0] is entry.pipe.model:
+                other.draft = None
         try:
-            pipe.model = torch.compile(pipe.model, mode="reduce-overhead")
-            logger.info("Torch compile enabled for model optimization")
+            entry.pipe.backend.release(entry.pipe.model)
         except Exception as e:
-            logger.warning(f"Torch compile failed: {str(e)}, continuing without it")
+            logger.warning(f"Releasing model {key} failed: {str(e)}")
+        gc.collect()
+        if self._device.startswith("cuda"):
+            torch.cuda.empty_cache()
+        elif self._device == "mps":
+            torch.mps.empty_cache()
+
+    def _cached_bytes(self) -> int:
+        """Total estimated resident bytes of cached models."""
+        return sum(entry.size_bytes for entry in self._models.values())
+
+    def _estimate_model_bytes(self, key: str) -> int:
+        """Estimate resident bytes of a model before loading it."""
+        return self.backend_for(key).estimate_bytes(
+            self.MODEL_PARAMETERS.get(key, 0), self._device, self.precision_for(key)
+        )
 
+    def _measure_model_bytes(self, pipe: LoadedModel, key: str) -> int:
+        """Measure resident bytes of a loaded model, falling back to the estimate."""
+        measured = pipe.backend.measure_bytes(pipe.model)
+        if measured > 0:
+            return measured
+        return self._estimate_model_bytes(key)
+
+    def _load_model(self, model_name: str) -> Tuple:
+        """
+        Internal method to load a Whisper model with its backend.
+
+        Args:
+            model_name: Name of the model to load
+
+        Returns:
+            Tuple of (LoadedModel, batch_size)
+        """
+        local_model_name = self.SUPPORTED_MODELS[model_name]
+        backend = self.backend_for(local_model_name)
+        logger.info(
+            f"Loading model {local_model_name} with {backend.name} on {self._device} "
+            f"with batch size {self._batch_size}"
+        )
+        model = backend.load(local_model_name, self._device, self.precision_for(local_model_name))
         logger.info(f"Model {local_model_name} loaded successfully with optimizations")
-        return pipe, batch_size
+        return LoadedModel(backend, model), self._batch_size
 
     def _get_optimal_device(self) -> str:
         """
@@ -207,23 +538,44 @@ class ModelManager:
             return 2
 
     def clear_cache(self) -> None:
-        """Clear all cached models."""
+        """Clear all cached models that are not in use."""
         with self._lock:
-            self._models.clear()
+            for key, entry in list(self._models.items()):
+                if entry.refcount == 0:
+                    self._unload(key)
             logger.info("Model cache cleared")
 
-    def get_cache_info(self) -> Dict[str, any]:
+    def get_cache_info(self) -> Dict[str, Any]:
         """
         Get information about cached models.
 
         Returns:
-            Dictionary with cache statistics
+            Dictionary with cache statistics and per-model size, last use and hit counts
         """
         with self._lock:
             return {
                 "cached_models": list(self._models.keys()),
+                "loading_models": list(self._loading.keys()),
                 "cache_size": len(self._models),
                 "max_cache_size": self._max_cache_size,
+                "cache_bytes": self._cached_bytes(),
+                "max_cache_bytes": self._max_cache_bytes,
+                "idle_ttl_seconds": self._idle_ttl_seconds,
+                "resident_model": self._resident_key,
                 "device": self._device,
                 "batch_size": self._batch_size,
+                **self._stats,
+                "models": {
+                    key: {
+                        "size_bytes": entry.size_bytes,
+                        "loaded_at": entry.loaded_at,
+                        "last_used": entry.last_used,
+                        "hits": entry.hits,
+                        "refcount": entry.refcount,
+                        "precision": entry.precision,
+                        "backend": entry.backend,
+                        "draft": self._drafts.get(key),
+                    }
+                    for key, entry in self._models.items()
+                },
             }
@@ -0,0 +1,165 @@
+"""Startup model preloading and warm-up inference."""
+import asyncio
+import io
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import soundfile as sf
+from fastapi.concurrency import run_in_threadpool
+
+from services.audio_processor import AudioProcessor
+from services.inference_executor import InferenceExecutor
+from services.model_manager import ModelManager
+from services.transcriber import run_pipeline_batch
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_speech_wav(duration: float = 2.0, sample_rate: int = 48000) -> bytes:
+    """
+    Build a speech-like WAV file for warm-up.
+
+    A voiced harmonic signal with a syllable-rate envelope, padded with
+    silence and recorded at 48kHz stereo like the app's recordings, so the
+    warm-up exercises decoding, downmixing, resampling and silence trimming.
+
+    Args:
+        duration: Voiced duration in seconds (default: 2.0)
+        sample_rate: Sample rate of the file (default: 48000Hz)
+
+    Returns:
+        WAV file bytes
+    """
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pitch = 140.0 + 20.0 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))
+    signal = 0.3 * voiced * envelope
+
+    silence = np.zeros(sample_rate // 4)
+    signal = np.concatenate([silence, signal, silence]).astype(np.float32)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, np.stack([signal, signal], axis=1), sample_rate, format="WAV")
+    return buffer.getvalue()
+
+
+class ModelWarmup:
+    """
+    Loads configured models in the background and runs one warm-up transcription each.
+
+    The first inference on a freshly loaded model pays for torch.compile and
+    librosa's numba kernels; doing it at startup on synthetic audio keeps that
+    cost off the first user request. Models are warmed one at a time through
+    the inference executor, so warm-up never competes with itself for memory.
+    """
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        audio_processor: AudioProcessor,
+        inference_executor: InferenceExecutor,
+    ):
+        """
+        Initialize ModelWarmup.
+
+        Args:
+            model_manager: Model manager that loads and caches the models
+            audio_processor: Audio processor used for the full preprocessing path
+            inference_executor: Executor that runs the warm-up inference
+        """
+        self._model_manager = model_manager
+        self._audio_processor = audio_processor
+        self._inference_executor = inference_executor
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._started = False
+        self._finished = False
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether warm-up has finished, or was never started."""
+        return self._finished or not self._started
+
+    def start(self, model_names: List[str]) -> "asyncio.Task":
+        """
+        Start preloading and warming up each model in order in the background.
+
+        Readiness drops immediately, before the task first runs. Failures are
+        logged and recorded per model; such a model is then loaded lazily on
+        its first request as before.
+
+        Args:
+            model_names: Names of the models to warm up
+
+        Returns:
+            The background warm-up task
+        """
+        self._started = True
+        self._finished = False
+        self._models = {
+            name: {"status": "pending", "duration": None, "error": None}
+            for name in model_names
+        }
+        return asyncio.create_task(self._run(list(model_names)))
+
+    async def _run(self, model_names: List[str]) -> None:
+        """Warm up each model in order, then mark warm-up finished."""
+        try:
+            audio_bytes = synthetic_speech_wav()
+            for name in model_names:
+                await self._warm_model(name, audio_bytes)
+        finally:
+            self._finished = True
+
+    async def _warm_model(self, model_name: str, audio_bytes: bytes) -> None:
+        """Load one model and run a transcription of synthetic audio on it."""
+        state = self._models[model_name]
+        state["status"] = "warming"
+        logger.info(f"Warming up model {model_name}...")
+        start_time = time.time()
+        try:
+            audio = await run_in_threadpool(
+                self._audio_processor.preprocess, audio_bytes, "wav"
+            )
+            # One run per replica; concurrent runs land on different replicas
+            await asyncio.gather(
+                *(
+                    self._inference_executor.run(
+                        run_pipeline_batch,
+                        self._model_manager,
+                        model_name,
+                        None,
+                        self._audio_processor.target_sample_rate,
+                        [audio],
+                    )
+                    for _ in range(self._model_manager.replica_count)
+                )
+            )
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            logger.error(f"Warm-up failed for model {model_name}: {str(e)}")
+            return
+
+        state["status"] = "warm"
+        state["duration"] = time.time() - start_time
+        logger.info(f"Model {model_name} warm in {state['duration']:.2f}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get warm-up progress.
+
+        Returns:
+            Dictionary with readiness, warm models and per-model status
+        """
+        models = {name: dict(state) for name, state in self._models.items()}
+        return {
+            "ready": self.is_ready,
+            "warm_models": [
+                name for name, state in models.items() if state["status"] == "warm"
+            ],
+            "models": models,
+        }
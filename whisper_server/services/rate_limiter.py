@@ -0,0 +1,194 @@
+"""Per-client token bucket rate limiting of transcription requests."""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Seconds per window unit; plural forms ("minutes") are accepted too
+_WINDOW_UNITS = {
+    "": 1.0,
+    "s": 1.0,
+    "sec": 1.0,
+    "second": 1.0,
+    "m": 60.0,
+    "min": 60.0,
+    "minute": 60.0,
+    "h": 3600.0,
+    "hour": 3600.0,
+    "d": 86400.0,
+    "day": 86400.0,
+}
+_WINDOW_PATTERN = re.compile(r"(\d+(?:\.\d+)?)?\s*([a-z]*)")
+
+
+def parse_window(spec: str) -> float:
+    """
+    Parse a rate limit window such as ``"1 minute"``, ``"30 seconds"`` or ``"3600"``.
+
+    Args:
+        spec: A count and a unit (second, minute, hour or day), a unit alone, or seconds
+
+    Returns:
+        Window length in seconds
+
+    Raises:
+        ValueError: If the window is not understood or not positive
+    """
+    match = _WINDOW_PATTERN.fullmatch(spec.strip().lower())
+    unit = match.group(2) if match else ""
+    if len(unit) > 1 and unit.endswith("s") and unit[:-1] in _WINDOW_UNITS:
+        unit = unit[:-1]
+    if not match or unit not in _WINDOW_UNITS or not (match.group(1) or unit):
+        raise ValueError(
+            f"Invalid rate limit window: {spec!r}. "
+            "Expected e.g. '1 minute', '30 seconds' or a number of seconds"
+        )
+    seconds = float(match.group(1) or 1) * _WINDOW_UNITS[unit]
+    if seconds <= 0:
+        raise ValueError(f"Rate limit window must be positive: {spec!r}")
+    return seconds
+
+
+class RateLimitExceededError(Exception):
+    """Raised when a client has used up its requests for the current window."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Bucket:
+    """Tokens left for one client as of ``updated``."""
+
+    tokens: float
+    updated: float
+    limited: int = 0
+
+
+class RateLimiter:
+    """
+    Per-client token buckets enforcing ``requests`` per ``window_seconds``.
+
+    Every request takes one token from its client's bucket, which holds at
+    most ``requests`` tokens and refills continuously at ``requests`` per
+    window. A client that has been quiet can send a burst of up to the full
+    limit; a client sending steadily is held to the configured rate. A
+    request finding its bucket empty is rejected with the time until the
+    next token. Buckets that have refilled are forgotten, and at most
+    ``max_clients`` are tracked, least recently used dropped first.
+    """
+
+    def __init__(
+        self,
+        requests: int = 10,
+        window_seconds: float = 60.0,
+        max_clients: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize RateLimiter.
+
+        Args:
+            requests: Requests each client may make per window (default: 10)
+            window_seconds: Length of the window in seconds (default: 60)
+            max_clients: Client buckets tracked at once (default: 10000)
+            clock: Monotonic time source in seconds (default: time.monotonic)
+
+        Raises:
+            ValueError: If requests or window_seconds is not positive
+        """
+        if requests <= 0 or window_seconds <= 0:
+            raise ValueError("Rate limit requests and window must be positive")
+        self.limit = requests
+        self.window_seconds = window_seconds
+        self.max_clients = max_clients
+        self._clock = clock
+        self._rate = requests / window_seconds
+        # Client to bucket, least recently used first
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._limited = 0
+
+        logger.info(
+            f"RateLimiter initialized with {requests} requests per {window_seconds:g}s per client"
+        )
+
+    def acquire(self, client: str) -> int:
+        """
+        Take one token from a client's bucket.
+
+        Args:
+            client: Client identifier, such as its address
+
+        Returns:
+            Whole tokens the client has left after this request
+
+        Raises:
+            RateLimitExceededError: If the client's bucket is empty
+        """
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = _Bucket(float(self.limit), now)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._refill(bucket, now)
+                self._buckets.move_to_end(client)
+
+            if bucket.tokens < 1.0:
+                bucket.limited += 1
+                self._limited += 1
+                retry_after = max(1, math.ceil((1.0 - bucket.tokens) / self._rate))
+                raise RateLimitExceededError(
+                    f"Rate limit of {self.limit} requests per {self.window_seconds:g}s "
+                    f"exceeded by {client}",
+                    retry_after=retry_after,
+                )
+            bucket.tokens -= 1.0
+            self._allowed += 1
+            return int(bucket.tokens)
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        """Add the tokens earned since the bucket was last updated (caller holds the lock)."""
+        bucket.tokens = min(float(self.limit), bucket.tokens + (now - bucket.updated) * self._rate)
+        bucket.updated = now
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Get rate limit statistics and the state of the most drained buckets.
+
+        Args:
+            top: Number of client buckets to report, emptiest first (default: 10)
+
+        Returns:
+            Dictionary with the limit, request counts and per-client bucket state
+        """
+        now = self._clock()
+        with self._lock:
+            for client, bucket in list(self._buckets.items()):
+                self._refill(bucket, now)
+                if bucket.tokens >= self.limit:
+                    # A full bucket is the same as no bucket
+                    del self._buckets[client]
+            drained = sorted(self._buckets.items(), key=lambda item: item[1].tokens)[:top]
+            return {
+                "limit": self.limit,
+                "window_seconds": self.window_seconds,
+                "allowed": self._allowed,
+                "limited": self._limited,
+                "clients": len(self._buckets),
+                "buckets": {
+                    client: {"tokens": round(bucket.tokens, 2), "limited": bucket.limited}
+                    for client, bucket in drained
+                },
+            }
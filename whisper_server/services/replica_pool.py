@@ -0,0 +1,533 @@
+"""Multi-process model replicas, each pinned to its own slice of CPU cores."""
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.cpu_precision import BYTES_PER_PARAMETER, DEFAULT_KEY, parse_precisions
+from services.model_manager import ModelManager
+from services.speculative import parse_drafts
+
+logger = logging.getLogger(__name__)
+
+# Intra-op threads per replica when the replica count is derived automatically
+DEFAULT_THREADS_PER_REPLICA = 4
+
+# A replica that keeps dying (e.g. out of memory on load) is not restarted forever
+MAX_RESTARTS = 5
+
+# Summed across replicas in get_cache_info()
+_SUMMED_STATS = (
+    "cache_size", "cache_bytes", "hits", "misses", "coalesced_loads",
+    "load_failures", "evictions", "idle_unloads",
+)
+
+
+class ReplicaError(Exception):
+    """Raised when a replica fails a request or no replica is running."""
+    pass
+
+
+def available_cores() -> List[int]:
+    """CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def physical_memory_bytes() -> Optional[int]:
+    """Total physical memory, if the platform reports it."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_replica_bytes(
+    model_names: List[str], cpu_precision: str = "fp32", speculative_decoding: str = ""
+) -> int:
+    """
+    Estimate the resident bytes one CPU replica needs for the given models.
+
+    Args:
+        model_names: Models each replica is expected to hold (e.g. preload and resident)
+        cpu_precision: CPU precision spec the replicas load models with (default: fp32)
+        speculative_decoding: Draft model spec; drafts of the models are held too (default: none)
+
+    Returns:
+        Estimated weights at their precision plus overhead, summed over distinct models
+    """
+    supported = ModelManager.SUPPORTED_MODELS
+    precisions = parse_precisions(cpu_precision)
+    drafts = parse_drafts(speculative_decoding)
+    model_names = [*model_names, *(drafts[name] for name in model_names if name in drafts)]
+    by_key = {}
+    for name in model_names:
+        if name in supported:
+            precision = precisions.get(name, precisions[DEFAULT_KEY])
+            by_key[supported[name]] = BYTES_PER_PARAMETER[precision]
+    return int(
+        sum(
+            ModelManager.MODEL_PARAMETERS.get(key, 0) * bytes_per_parameter * 1.1
+            for key, bytes_per_parameter in by_key.items()
+        )
+    )
+
+
+def plan_replicas(
+    replicas: int,
+    cores: List[int],
+    threads_per_replica: int = 0,
+    memory_budget_bytes: Optional[int] = None,
+    replica_bytes: int = 0,
+) -> List[List[int]]:
+    """
+    Decide how many replicas to run and which cores each one owns.
+
+    Args:
+        replicas: Number of replicas, or 0 to derive it from cores and memory
+        cores: Cores available to the server
+        threads_per_replica: Intra-op threads (and cores) per replica, 0 to split
+            the cores evenly (default: 0, or DEFAULT_THREADS_PER_REPLICA when derived)
+        memory_budget_bytes: Memory all replicas may use together, for the derived count
+        replica_bytes: Estimated memory of one replica, for the derived count
+
+    Returns:
+        One list of core ids per replica; slices are disjoint unless there are
+        more replicas times threads than cores
+    """
+    cores = cores or [0]
+    if replicas <= 0:
+        threads = threads_per_replica or min(DEFAULT_THREADS_PER_REPLICA, len(cores))
+        replicas = max(len(cores) // threads, 1)
+        if memory_budget_bytes and replica_bytes:
+            replicas = max(min(replicas, memory_budget_bytes // replica_bytes), 1)
+    else:
+        threads = threads_per_replica or max(len(cores) // replicas, 1)
+
+    if replicas * threads > len(cores):
+        logger.warning(
+            f"{replicas} replicas x {threads} threads exceeds {len(cores)} cores, "
+            f"replicas will share cores"
+        )
+    return [
+        [cores[(index * threads + offset) % len(cores)] for offset in range(threads)]
+        for index in range(replicas)
+    ]
+
+
+def _create_replica_manager(spec: Dict[str, Any]) -> ModelManager:
+    """Build the ModelManager a replica process serves from."""
+    if spec.get("stub") is not None:
+        from services.stub_pipeline import StubModelManager
+
+        return StubModelManager(**spec["stub"], **spec["options"])
+    return ModelManager(**spec["options"])
+
+
+def _replica_main(index: int, cores: List[int], conn: Any, spec: Dict[str, Any]) -> None:
+    """
+    Entry point of a replica process: serve requests from conn one at a time.
+
+    Requests are ``(task_id, op, args)``; every reply is
+    ``(kind, task_id, value, cache_info)`` with kind ``done``, ``error`` or,
+    for streamed calls, ``text``.
+    """
+    threads = len(cores)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            logger.warning(f"Replica {index} could not pin cores {cores}: {str(e)}")
+
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed once any parallel work has run
+
+    manager = _create_replica_manager(spec)
+    idle_ttl = spec["options"].get("idle_ttl_seconds")
+    idle_check = max(idle_ttl / 4, 5) if idle_ttl else None
+    logger.info(f"Replica {index} (pid {os.getpid()}) serving on cores {cores}")
+
+    while True:
+        if idle_check is not None and not conn.poll(idle_check):
+            manager.unload_idle()
+            continue
+        try:
+            task_id, op, args = conn.recv()
+        except (EOFError, OSError):
+            break
+        if op == "stop":
+            break
+        try:
+            value = _handle(manager, conn, task_id, op, *args)
+            conn.send(("done", task_id, value, manager.get_cache_info()))
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            conn.send(("error", task_id, error, manager.get_cache_info()))
+
+
+def _handle(manager: ModelManager, conn: Any, task_id: int, op: str, *args: Any) -> Any:
+    """Run one replica request."""
+    if op == "load":
+        (model_name,) = args
+        _, batch_size = manager.get_model(model_name)
+        return batch_size
+
+    if op == "transcribe":
+        model_name, audio_arrays, sampling_rate, language, options, stream = args
+        with manager.use_model(model_name) as (model, _):
+            if stream:
+                options["on_text"] = lambda text: conn.send(("text", task_id, text, None))
+            return model.transcribe(audio_arrays, sampling_rate, language, **options)
+
+    if op == "detect_language":
+        model_name, audio, sampling_rate = args
+        with manager.use_model(model_name) as (model, _):
+            return model.detect_language(audio, sampling_rate)
+
+    if op == "clear":
+        manager.clear_cache()
+        return None
+
+    raise ValueError(f"Unknown replica request: {op}")
+
+
+@dataclass
+class _Task:
+    """A request sent to a replica that has not been answered yet."""
+
+    future: Future
+    on_text: Optional[Callable[[str], None]] = None
+
+
+class _Replica:
+    """Parent-side handle of one replica process: its pipe, pending requests and stats."""
+
+    def __init__(self, index: int, cores: List[int], spec: Dict[str, Any], context: Any):
+        self.index = index
+        self.cores = cores
+        self.outstanding = 0
+        self.completed = 0
+        self.restarts = 0
+        self.alive = True
+        self.cache_info: Dict[str, Any] = {}
+        self._spec = spec
+        self._context = context
+        self._lock = threading.Lock()
+        self._tasks: Dict[int, _Task] = {}
+        self._task_ids = itertools.count()
+        self._closing = False
+        self._start()
+
+    def _start(self) -> None:
+        """Start the process and the thread that reads its replies."""
+        parent_conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_replica_main,
+            args=(self.index, self.cores, child_conn, self._spec),
+            name=f"whisper-replica-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        threading.Thread(
+            target=self._read_replies,
+            args=(parent_conn, self.process),
+            name=f"whisper-replica-{self.index}-reader",
+            daemon=True,
+        ).start()
+
+    def request(
+        self, op: str, *args: Any, on_text: Optional[Callable[[str], None]] = None
+    ) -> Future:
+        """Send a request; the future resolves with the replica's reply."""
+        future: Future = Future()
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._tasks[task_id] = _Task(future, on_text)
+            try:
+                self._conn.send((task_id, op, args))
+            except (OSError, ValueError) as e:
+                del self._tasks[task_id]
+                future.set_exception(ReplicaError(f"Replica {self.index} unavailable: {str(e)}"))
+        return future
+
+    def _read_replies(self, conn: Any, process: Any) -> None:
+        """Resolve pending requests from replies until the process exits."""
+        while True:
+            try:
+                kind, task_id, value, cache_info = conn.recv()
+            except (EOFError, OSError):
+                break
+            if cache_info is not None:
+                self.cache_info = cache_info
+            if kind == "text":
+                # The restart path swaps the task table under the lock
+                with self._lock:
+                    task = self._tasks.get(task_id)
+                if task is not None and task.on_text is not None:
+                    task.on_text(value)
+                continue
+            with self._lock:
+                task = self._tasks.pop(task_id, None)
+            if task is None:
+                continue
+            if kind == "done":
+                task.future.set_result(value)
+            else:
+                task.future.set_exception(ReplicaError(value))
+        self._on_exit(conn, process)
+
+    def _on_exit(self, conn: Any, process: Any) -> None:
+        """Fail the requests the dead process held and restart it unless closing."""
+        process.join(timeout=5)
+        conn.close()
+        with self._lock:
+            tasks, self._tasks = self._tasks, {}
+            if not self._closing:
+                if self.restarts < MAX_RESTARTS:
+                    self.restarts += 1
+                    logger.error(
+                        f"Replica {self.index} exited with code {process.exitcode}, restarting"
+                    )
+                    self._start()
+                else:
+                    self.alive = False
+                    logger.error(f"Replica {self.index} keeps exiting, giving up on it")
+        for task in tasks.values():
+            task.future.set_exception(ReplicaError(f"Replica {self.index} exited"))
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the process, waiting up to timeout for it to finish its current request."""
+        with self._lock:
+            self._closing = True
+            self.alive = False
+            try:
+                self._conn.send((None, "stop", ()))
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Process, core and load statistics of this replica."""
+        return {
+            "index": self.index,
+            "pid": self.process.pid,
+            "cores": self.cores,
+            "alive": self.alive,
+            "outstanding": self.outstanding,
+            "completed": self.completed,
+            "restarts": self.restarts,
+        }
+
+
+class _RemoteModel:
+    """
+    Stand-in for a LoadedModel that runs on a replica.
+
+    The audio and options of transcribe() and detect_language() are sent to
+    the replica, which runs them on its own model. An ``on_text`` callback
+    cannot cross the process boundary, so the replica streams text back and
+    it is called here.
+    """
+
+    def __init__(
+        self, manager: "ReplicaModelManager", model_name: str, replica: Optional[_Replica]
+    ):
+        self._manager = manager
+        self._model_name = model_name
+        self._replica = replica
+
+    def transcribe(
+        self,
+        audio_arrays: List[Any],
+        sampling_rate: int,
+        language: Optional[str],
+        **options: Any,
+    ) -> List[Dict[str, Any]]:
+        if self._replica is None:
+            # Unpinned (from get_model): pick a replica for this call
+            with self._manager.use_model(self._model_name) as (model, _):
+                return model.transcribe(audio_arrays, sampling_rate, language, **options)
+
+        on_text = options.pop("on_text", None)
+        future = self._replica.request(
+            "transcribe",
+            self._model_name,
+            audio_arrays,
+            sampling_rate,
+            language,
+            options,
+            on_text is not None,
+            on_text=on_text,
+        )
+        return future.result()
+
+    def detect_language(self, audio: Any, sampling_rate: int) -> Dict[str, float]:
+        if self._replica is None:
+            with self._manager.use_model(self._model_name) as (model, _):
+                return model.detect_language(audio, sampling_rate)
+        return self._replica.request(
+            "detect_language", self._model_name, audio, sampling_rate
+        ).result()
+
+
+class ReplicaModelManager(ModelManager):
+    """
+    ModelManager whose models live in separate replica processes.
+
+    A single process runs one model at a time on one torch thread pool,
+    and uvicorn workers would each load every model with no coordination.
+    Here each replica process owns its own ModelManager (with the same cache
+    limits) and a disjoint slice of cores, with torch's intra-op threads
+    sized to that slice. ``use_model`` routes each inference to the replica
+    with the fewest requests in flight, so concurrent batches run in parallel
+    on different cores. Replicas that exit are restarted.
+    """
+
+    def __init__(
+        self,
+        plan: List[List[int]],
+        stub: Optional[Dict[str, float]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize ReplicaModelManager and start the replica processes.
+
+        Args:
+            plan: Cores of each replica, from plan_replicas
+            stub: StubModelManager options to serve stub pipelines instead of models
+            **kwargs: ModelManager options used by every replica
+        """
+        super().__init__(**kwargs)
+        spec = {"options": kwargs, "stub": stub}
+        # Fork is unsafe once torch has started its thread pools
+        context = multiprocessing.get_context("spawn")
+        self._replicas = [
+            _Replica(index, cores, spec, context) for index, cores in enumerate(plan)
+        ]
+        self._dispatch_lock = threading.Lock()
+        logger.info(
+            f"Started {len(self._replicas)} inference replicas on cores "
+            f"{', '.join(f'{c[0]}-{c[-1]}' for c in plan)}"
+        )
+
+    @property
+    def replica_count(self) -> int:
+        """Number of replica processes."""
+        return len(self._replicas)
+
+    def _acquire(self) -> _Replica:
+        """Reserve the replica with the fewest requests in flight."""
+        with self._dispatch_lock:
+            running = [replica for replica in self._replicas if replica.alive]
+            if not running:
+                raise ReplicaError("No inference replicas are running")
+            replica = min(running, key=lambda r: (r.outstanding, r.completed))
+            replica.outstanding += 1
+            return replica
+
+    def _release(self, replica: _Replica) -> None:
+        with self._dispatch_lock:
+            replica.outstanding -= 1
+            replica.completed += 1
+
+    def get_model(self, model_name: str) -> Tuple:
+        """
+        Load a model on the least-loaded replica.
+
+        Returns:
+            Tuple of (model proxy that runs on any replica, batch_size)
+        """
+        with self.use_model(model_name) as (_, batch_size):
+            pass
+        return _RemoteModel(self, model_name, None), batch_size
+
+    @contextmanager
+    def use_model(self, model_name: str) -> Iterator[Tuple]:
+        """
+        Reserve the least-loaded replica and load the model there for the block.
+
+        The returned model runs on that replica, whose own cache pins the
+        model for each call.
+
+        Raises:
+            ValueError: If model_name is not supported
+            ReplicaError: If the replica fails or no replica is running
+        """
+        if model_name not in self.SUPPORTED_MODELS:
+            raise ValueError(
+                f"Unsupported model: {model_name}. "
+                f"Supported models: {list(self.SUPPORTED_MODELS.keys())}"
+            )
+        replica = self._acquire()
+        try:
+            batch_size = replica.request("load", model_name).result()
+            yield _RemoteModel(self, model_name, replica), batch_size
+        finally:
+            self._release(replica)
+
+    def unload_idle(self) -> List[str]:
+        """Replicas unload their own idle models."""
+        return []
+
+    def clear_cache(self) -> None:
+        """Clear every replica's cache of models that are not in use."""
+        for future in [r.request("clear") for r in self._replicas if r.alive]:
+            future.result()
+
+    def get_cache_info(self) -> Dict[str, Any]:
+        """
+        Get cache information summed over replicas, plus per-replica statistics.
+
+        Each replica reports its cache with every reply, so this never waits
+        on a busy replica.
+        """
+        info = super().get_cache_info()
+        reports = [r.cache_info for r in self._replicas if r.cache_info]
+        for name in _SUMMED_STATS:
+            info[name] = sum(report.get(name, 0) for report in reports)
+        info["max_cache_size"] *= len(self._replicas)
+        if info["max_cache_bytes"] is not None:
+            info["max_cache_bytes"] *= len(self._replicas)
+        info["cached_models"] = sorted({m for r in reports for m in r.get("cached_models", [])})
+        info["loading_models"] = sorted({m for r in reports for m in r.get("loading_models", [])})
+
+        models: Dict[str, Dict[str, Any]] = {}
+        for report in reports:
+            for key, entry in report.get("models", {}).items():
+                merged = models.setdefault(
+                    key, {**entry, "size_bytes": 0, "hits": 0, "refcount": 0}
+                )
+                merged["size_bytes"] += entry["size_bytes"]
+                merged["hits"] += entry["hits"]
+                merged["refcount"] += entry["refcount"]
+                merged["loaded_at"] = min(merged["loaded_at"], entry["loaded_at"])
+                merged["last_used"] = max(merged["last_used"], entry["last_used"])
+        info["models"] = models
+        with self._dispatch_lock:
+            info["replicas"] = [replica.get_stats() for replica in self._replicas]
+        return info
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop all replica processes."""
+        deadline = time.monotonic() + timeout
+        for replica in self._replicas:
+            replica.close(max(deadline - time.monotonic(), 0.1))
+        logger.info("Inference replicas stopped")
@@ -0,0 +1,157 @@
+"""Per-request stage timings, Server-Timing headers and the slow-request log."""
+import json
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Structured slow-request records go to their own logger so they can be routed separately
+slow_request_logger = logging.getLogger("whisper.slow_requests")
+
+_current_timing: ContextVar[Optional["RequestTiming"]] = ContextVar(
+    "request_timing", default=None
+)
+
+# Client-supplied request ids are echoed back, so only accept short token-like values
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+@dataclass
+class RequestTiming:
+    """
+    Stage timings and context for one request.
+
+    Stages accumulate, so a stage entered more than once (e.g. inference for
+    several speech packs) reports its total. ``details`` carries the context
+    the slow-request log needs: audio duration, model, batch co-members.
+    """
+
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, float] = field(default_factory=dict)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_batch(
+        self, batch: "RequestTiming", collect_wait: float, members: List[str]
+    ) -> None:
+        """
+        Attribute a shared batch's stage timings to this request.
+
+        Args:
+            batch: Timings recorded while the batch ran
+            collect_wait: Seconds this request waited for the batch to be dispatched
+            members: Request ids of every request in the batch
+        """
+        self.add("queue_wait", collect_wait)
+        for stage, seconds in batch.stages.items():
+            self.add(stage, seconds)
+        self.details["batch_size"] = len(members)
+        self.details["batch_members"] = [m for m in members if m != self.request_id]
+
+    def to_dict(self) -> Dict[str, float]:
+        """Stage durations and the total so far, in milliseconds."""
+        timings = {stage: round(seconds * 1000.0, 2) for stage, seconds in self.stages.items()}
+        timings["total"] = round(self.elapsed * 1000.0, 2)
+        return timings
+
+    def server_timing(self) -> str:
+        """Render the stages as a Server-Timing header value."""
+        return ", ".join(f"{stage};dur={ms}" for stage, ms in self.to_dict().items())
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """The RequestTiming of the request being handled, if any."""
+    return _current_timing.get()
+
+
+def set_current_timing(timing: Optional[RequestTiming]) -> None:
+    """Make timing the current one for this context (and contexts copied from it)."""
+    _current_timing.set(timing)
+
+
+def _request_id_from(headers: List[Any]) -> str:
+    """Reuse a well-formed X-Request-ID from the client or generate one."""
+    for name, value in headers:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID_PATTERN.match(candidate):
+                return candidate
+    return uuid.uuid4().hex
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware that gives every HTTP request an id and a stage timing breakdown.
+
+    Adds ``X-Request-ID`` and ``Server-Timing`` headers to the response and
+    writes a structured record for requests slower than the threshold.
+    Stages still running when the response starts (e.g. a streamed body)
+    appear only in the slow-request log.
+    """
+
+    def __init__(self, app: Any, slow_request_ms: float = 0.0):
+        """
+        Initialize RequestTimingMiddleware.
+
+        Args:
+            app: ASGI application to wrap
+            slow_request_ms: Log requests slower than this, 0 disables (default: 0)
+        """
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(request_id=_request_id_from(scope.get("headers", [])))
+        token = _current_timing.set(timing)
+        status = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", timing.request_id.encode("latin-1")))
+                headers.append((b"server-timing", timing.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            elapsed_ms = timing.elapsed * 1000.0
+            if self.slow_request_ms > 0 and elapsed_ms >= self.slow_request_ms:
+                self._log_slow_request(scope, status, timing)
+
+    @staticmethod
+    def _log_slow_request(scope: Dict[str, Any], status: int, timing: RequestTiming) -> None:
+        """Write one JSON record describing a slow request."""
+        record = {
+            "request_id": timing.request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(timing.elapsed * 1000.0, 2),
+            "stages_ms": timing.to_dict(),
+            "queue_wait_ms": round(timing.stages.get("queue_wait", 0.0) * 1000.0, 2),
+            **timing.details,
+        }
+        slow_request_logger.warning(json.dumps(record))
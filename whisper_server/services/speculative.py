@@ -0,0 +1,232 @@
+"""Speculative decoding: a small cached Whisper model drafts tokens that a large one verifies."""
+import copy
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+from torch import nn
+from transformers import WhisperForConditionalGeneration
+
+logger = logging.getLogger(__name__)
+
+
+def parse_drafts(spec: str) -> Dict[str, str]:
+    """
+    Parse a speculative decoding spec of target:draft model pairs.
+
+    ``"whisper-large:whisper-tiny"`` decodes whisper-large with whisper-tiny
+    proposing tokens; an empty spec disables speculative decoding.
+
+    Args:
+        spec: Comma-separated ``target:draft`` model names
+
+    Returns:
+        Mapping of target model name to draft model name
+
+    Raises:
+        ValueError: If an entry is not a target:draft pair
+    """
+    drafts = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        target, _, draft = entry.partition(":")
+        if not target.strip() or not draft.strip():
+            raise ValueError(
+                f"Invalid speculative decoding entry: {entry.strip()}. "
+                "Expected target:draft, e.g. whisper-large:whisper-tiny"
+            )
+        drafts[target.strip()] = draft.strip()
+    return drafts
+
+
+def mel_projection(target_filters: Any, draft_filters: Any) -> Optional[torch.Tensor]:
+    """
+    Linear map from the target's mel power spectrum to the draft's.
+
+    Both filter banks weight the same STFT bins (Whisper always uses a 400
+    point FFT at 16kHz), so the draft's bands are recovered from the
+    target's through the pseudo-inverse of the target bank. On speech the
+    projected log-mel features are within about 0.01 of the draft's own.
+
+    Args:
+        target_filters: Target feature extractor's mel filters, (frequency bins, target mels)
+        draft_filters: Draft feature extractor's mel filters, (frequency bins, draft mels)
+
+    Returns:
+        (draft mels, target mels) matrix, or None when both use the same filters
+    """
+    target = torch.as_tensor(target_filters, dtype=torch.float64)
+    draft = torch.as_tensor(draft_filters, dtype=torch.float64)
+    if target.shape == draft.shape and torch.allclose(target, draft):
+        return None
+    return (draft.T @ torch.linalg.pinv(target.T)).float()
+
+
+def vocabulary_maps(
+    target_vocab: Dict[str, int],
+    draft_vocab: Dict[str, int],
+    target_size: int,
+    draft_size: int,
+    draft_fallback_id: int,
+) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Map token ids between two Whisper vocabularies by token string.
+
+    Text tokens are the same in every Whisper checkpoint, but large-v3 adds a
+    language token, which shifts the id of every special token after it.
+
+    Args:
+        target_vocab: Target tokenizer's token to id mapping
+        draft_vocab: Draft tokenizer's token to id mapping
+        target_size: Target model's vocabulary size (its logits width)
+        draft_size: Draft model's vocabulary size
+        draft_fallback_id: Draft id fed for target tokens the draft does not know
+
+    Returns:
+        (draft id of each target id, draft id whose logit each target id takes or -1),
+        or None when the vocabularies are identical
+    """
+    to_draft = torch.full((target_size,), draft_fallback_id, dtype=torch.long)
+    from_draft = torch.full((target_size,), -1, dtype=torch.long)
+    for token, target_id in target_vocab.items():
+        draft_id = draft_vocab.get(token)
+        if target_id < target_size and draft_id is not None and draft_id < draft_size:
+            to_draft[target_id] = draft_id
+            from_draft[target_id] = draft_id
+    if target_size == draft_size and torch.equal(from_draft, torch.arange(target_size)):
+        return None
+    return to_draft, from_draft
+
+
+class _ProjectedEncoder(nn.Module):
+    """The draft's encoder, fed target features projected onto the draft's mel bands."""
+
+    def __init__(self, encoder: nn.Module, projection: Optional[torch.Tensor]):
+        super().__init__()
+        self.encoder = encoder
+        self.projection = projection
+
+    def forward(self, input_features: torch.Tensor, **kwargs: Any) -> Any:
+        if self.projection is not None:
+            input_features = self._project(input_features)
+        dtype = self.encoder.conv1.weight.dtype
+        return self.encoder(input_features=input_features.to(dtype), **kwargs)
+
+    def _project(self, features: torch.Tensor) -> torch.Tensor:
+        """Undo Whisper's log-mel scaling, project the power spectrum and scale it again."""
+        power = 10 ** (4.0 * features.float() - 4.0)
+        projection = self.projection.to(power.device)
+        log_spec = torch.einsum("dm,bmt->bdt", projection, power).clamp(min=1e-10).log10()
+        floor = log_spec.amax(dim=(1, 2), keepdim=True) - 8.0
+        return (torch.maximum(log_spec, floor) + 4.0) / 4.0
+
+
+class DraftModel(WhisperForConditionalGeneration):
+    """
+    A cached Whisper model presented to assisted generation as the target's assistant.
+
+    transformers' assisted generation needs an assistant that reads the
+    target's input features and speaks its vocabulary, and it rewrites the
+    assistant's generation config. This view shares every weight of the
+    draft model (the one cached for normal traffic) while projecting input
+    features onto the draft's mel bands, mapping token ids in both
+    directions, and keeping its own generation config, so the cached model
+    is neither copied nor modified.
+    """
+
+    def __init__(
+        self,
+        draft: Any,
+        target_config: Any,
+        target_generation_config: Any,
+        projection: Optional[torch.Tensor] = None,
+        vocab_maps: Optional[Tuple[torch.Tensor, torch.Tensor]] = None,
+    ):
+        """
+        Initialize DraftModel.
+
+        Args:
+            draft: The draft's WhisperForConditionalGeneration
+            target_config: The target model's config
+            target_generation_config: The target model's generation config
+            projection: Mel projection from mel_projection(), None if features match
+            vocab_maps: Token id maps from vocabulary_maps(), None if vocabularies match
+        """
+        config = copy.deepcopy(draft.config)
+        config.vocab_size = target_config.vocab_size
+        config.num_mel_bins = target_config.num_mel_bins
+        # Build the skeleton without allocating weights; the draft's modules replace it
+        with torch.device("meta"):
+            super().__init__(config)
+        self.model = draft.model
+        self.proj_out = draft.proj_out
+        self.generation_config = copy.deepcopy(target_generation_config)
+        # Not registered as a submodule: its modules are already this model's
+        self.__dict__["draft"] = draft
+        self._encoder = _ProjectedEncoder(draft.model.encoder, projection)
+        self._to_draft, self._from_draft = vocab_maps or (None, None)
+
+    def get_encoder(self, modality: Optional[str] = None) -> nn.Module:
+        return self._encoder
+
+    def generate(self, *args: Any, logits_processor: Any = None, **kwargs: Any) -> Any:
+        # Assisted generation hands the draft the target's own logits processors, and
+        # Whisper's generate re-bases the timestamp processor on the tokens decoded so far;
+        # the target would then verify with the wrong rules, so the draft works on copies
+        if logits_processor is not None:
+            logits_processor = copy.deepcopy(logits_processor)
+        return super().generate(*args, logits_processor=logits_processor, **kwargs)
+
+    def forward(
+        self,
+        input_features: Optional[torch.Tensor] = None,
+        decoder_input_ids: Optional[torch.Tensor] = None,
+        encoder_outputs: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        if encoder_outputs is None and input_features is not None:
+            encoder_outputs = self._encoder(input_features)
+        if self._to_draft is not None and decoder_input_ids is not None:
+            decoder_input_ids = self._to_draft.to(decoder_input_ids.device)[decoder_input_ids]
+        outputs = self.draft(
+            encoder_outputs=encoder_outputs, decoder_input_ids=decoder_input_ids, **kwargs
+        )
+        if self._from_draft is not None:
+            from_draft = self._from_draft.to(outputs.logits.device)
+            logits = outputs.logits[..., from_draft.clamp(min=0)]
+            outputs.logits = logits.masked_fill(from_draft < 0, torch.finfo(logits.dtype).min)
+        return outputs
+
+
+def build_draft_model(target_pipe: Any, draft_pipe: Any) -> DraftModel:
+    """
+    Build the assistant for a target pipeline from a draft pipeline.
+
+    Args:
+        target_pipe: transformers ASR pipeline of the target model
+        draft_pipe: transformers ASR pipeline of the draft model
+
+    Returns:
+        DraftModel sharing the draft pipeline's weights
+    """
+    # torch.compile wraps the model; assisted generation needs the module itself
+    target = getattr(target_pipe.model, "_orig_mod", target_pipe.model)
+    draft = getattr(draft_pipe.model, "_orig_mod", draft_pipe.model)
+    projection = mel_projection(
+        target_pipe.feature_extractor.mel_filters, draft_pipe.feature_extractor.mel_filters
+    )
+    vocab_maps = vocabulary_maps(
+        target_pipe.tokenizer.get_vocab(),
+        draft_pipe.tokenizer.get_vocab(),
+        target.config.vocab_size,
+        draft.config.vocab_size,
+        draft.config.eos_token_id,
+    )
+    if projection is not None or vocab_maps is not None:
+        logger.info(
+            f"Draft model {draft.config.name_or_path} adapted to {target.config.name_or_path}: "
+            f"{'mel bands projected' if projection is not None else 'same features'}, "
+            f"{'token ids mapped' if vocab_maps is not None else 'same vocabulary'}"
+        )
+    return DraftModel(draft, target.config, target.generation_config, projection, vocab_maps)
@@ -0,0 +1,241 @@
+"""Incremental transcription state for live audio streams."""
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper's encoder window; a stream buffer must never grow past it
+_MAX_WHISPER_WINDOW_SECONDS = 30.0
+
+# Frame length used for end-of-speech detection
+_FRAME_SECONDS = 0.03
+
+
+def _normalize_word(word: str) -> str:
+    """Compare words case- and punctuation-insensitively."""
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    """
+    Sliding-window transcription state for one live audio stream.
+
+    Audio arrives in small chunks and the caller periodically transcribes the
+    current window (all audio since the last trim point). Words are committed
+    with the local agreement policy: a word becomes stable once two
+    consecutive hypotheses agree on it, so partial results never flicker in
+    their stable prefix. Once the window grows past ``max_window_seconds``,
+    audio covered by committed segments is trimmed from the front so every
+    inference stays short. End of speech is detected from trailing silence.
+
+    This class holds no model; the caller runs inference on ``window()`` and
+    feeds the pipeline result back through ``update()`` or ``finalize()``.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        max_window_seconds: float = 15.0,
+        endpoint_silence_ms: float = 800.0,
+        silence_threshold_db: float = 35.0,
+        min_speech_db: float = -50.0,
+    ):
+        """
+        Initialize StreamingTranscriber.
+
+        Args:
+            sample_rate: Sample rate of appended audio (default: 16000Hz)
+            max_window_seconds: Window length that triggers trimming (default: 15s)
+            endpoint_silence_ms: Trailing silence that ends speech, 0 disables (default: 800ms)
+            silence_threshold_db: Frames this far below the loudest frame are silence (default: 35)
+            min_speech_db: Frames quieter than this dBFS are always silence (default: -50)
+        """
+        self.sample_rate = sample_rate
+        self._max_window = min(max_window_seconds, _MAX_WHISPER_WINDOW_SECONDS - 2.0)
+        self._endpoint_samples = int(endpoint_silence_ms / 1000.0 * sample_rate)
+        self._silence_threshold_db = silence_threshold_db
+        self._min_speech_db = min_speech_db
+        self._frame_size = max(int(_FRAME_SECONDS * sample_rate), 1)
+
+        self._chunks: List[np.ndarray] = []
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._unread_samples = 0
+
+        # Words committed over the whole stream, and the ones whose audio is still buffered
+        self._committed: List[str] = []
+        self._buffer_committed = 0
+        self._tentative: List[str] = []
+
+        # End-of-speech tracking
+        self._frame_remainder = np.zeros(0, dtype=np.float32)
+        self._peak_db = -np.inf
+        self._speech_seen = False
+        self._trailing_silence = 0
+
+    @property
+    def buffered_seconds(self) -> float:
+        """Duration of audio in the current window."""
+        return (len(self._buffer) + sum(len(c) for c in self._chunks)) / self.sample_rate
+
+    @property
+    def unread_seconds(self) -> float:
+        """Duration of audio appended since the last call to window()."""
+        return self._unread_samples / self.sample_rate
+
+    @property
+    def speech_ended(self) -> bool:
+        """Whether speech was heard and has been followed by enough silence."""
+        return (
+            self._endpoint_samples > 0
+            and self._speech_seen
+            and self._trailing_silence >= self._endpoint_samples
+        )
+
+    @property
+    def stable_text(self) -> str:
+        """Committed text, which later hypotheses never change."""
+        return " ".join(self._committed)
+
+    @property
+    def unstable_text(self) -> str:
+        """Tentative text after the committed prefix, which may still change."""
+        return " ".join(self._tentative)
+
+    def append(self, samples: np.ndarray) -> None:
+        """
+        Add mono float32 audio at the stream's sample rate.
+
+        Args:
+            samples: Audio samples in [-1, 1)
+        """
+        if samples.size == 0:
+            return
+        samples = samples.astype(np.float32, copy=False)
+        self._chunks.append(samples)
+        self._unread_samples += len(samples)
+        self._track_speech(samples)
+
+    def _track_speech(self, samples: np.ndarray) -> None:
+        """Update speech/silence state from whole frames of new audio."""
+        audio = np.concatenate([self._frame_remainder, samples])
+        frame_count = len(audio) // self._frame_size
+        self._frame_remainder = audio[frame_count * self._frame_size:]
+        if frame_count == 0:
+            return
+
+        frames = audio[: frame_count * self._frame_size].reshape(frame_count, self._frame_size)
+        frame_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        self._peak_db = max(self._peak_db, float(frame_db.max()))
+        threshold = max(self._peak_db - self._silence_threshold_db, self._min_speech_db)
+
+        voiced = np.flatnonzero(frame_db >= threshold)
+        if voiced.size:
+            self._speech_seen = True
+            self._trailing_silence = (frame_count - 1 - voiced[-1]) * self._frame_size
+        else:
+            self._trailing_silence += frame_count * self._frame_size
+
+    def window(self) -> np.ndarray:
+        """
+        Return the audio to transcribe now and mark all appended audio as read.
+
+        Returns:
+            Mono float32 audio from the last trim point to the end of the stream
+        """
+        if self._chunks:
+            self._buffer = np.concatenate([self._buffer, *self._chunks])
+            self._chunks = []
+        self._unread_samples = 0
+        return self._buffer
+
+    def update(self, result: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Apply a hypothesis for the latest window and commit agreed words.
+
+        Args:
+            result: Pipeline result for ``window()`` with ``text`` and timestamped ``chunks``
+
+        Returns:
+            Dictionary with the full, stable and unstable text
+        """
+        words = result.get("text", "").split()
+        tail = words[self._buffer_committed:]
+
+        agreed = 0
+        for previous, current in zip(self._tentative, tail):
+            if _normalize_word(previous) != _normalize_word(current):
+                break
+            agreed += 1
+
+        self._committed.extend(tail[:agreed])
+        self._buffer_committed += agreed
+        self._tentative = tail[agreed:]
+        self._trim(result.get("chunks") or [])
+        return self.hypothesis()
+
+    def finalize(self, result: Optional[Dict[str, Any]]) -> str:
+        """
+        Commit the final hypothesis for the remaining window.
+
+        Args:
+            result: Pipeline result for ``window()``, or None if there was no audio left
+
+        Returns:
+            The complete transcript of the stream
+        """
+        if result is not None:
+            words = result.get("text", "").split()
+            self._committed.extend(words[self._buffer_committed:])
+        elif self._tentative:
+            self._committed.extend(self._tentative)
+        self._tentative = []
+        self._buffer_committed = 0
+        self._buffer = np.zeros(0, dtype=np.float32)
+        return self.stable_text
+
+    def hypothesis(self) -> Dict[str, str]:
+        """Current full, stable and unstable text."""
+        return {
+            "text": " ".join(self._committed + self._tentative),
+            "stable": self.stable_text,
+            "unstable": self.unstable_text,
+        }
+
+    def _trim(self, segments: List[Dict[str, Any]]) -> None:
+        """
+        Drop audio covered by committed segments once the window is too long.
+
+        Cuts at the end of the last segment whose words are all committed. If
+        no such segment exists and the window is about to outgrow Whisper's
+        30 second input, the current hypothesis is committed as-is instead.
+        """
+        if len(self._buffer) / self.sample_rate <= self._max_window:
+            return
+
+        cut_seconds = None
+        cut_words = 0
+        words_seen = 0
+        for segment in segments:
+            words_seen += len(segment.get("text", "").split())
+            end = (segment.get("timestamp") or (None, None))[1]
+            if words_seen > self._buffer_committed or end is None:
+                break
+            cut_seconds, cut_words = end, words_seen
+
+        if cut_seconds is None:
+            if len(self._buffer) / self.sample_rate < _MAX_WHISPER_WINDOW_SECONDS - 2.0:
+                return
+            logger.debug("No committed segment boundary in stream window, forcing commit")
+            self._committed.extend(self._tentative)
+            self._tentative = []
+            self._buffer = np.zeros(0, dtype=np.float32)
+            self._buffer_committed = 0
+            return
+
+        cut = min(int(cut_seconds * self.sample_rate), len(self._buffer))
+        self._buffer = self._buffer[cut:]
+        self._buffer_committed = max(self._buffer_committed - cut_words, 0)
+        logger.debug(f"Trimmed {cut / self.sample_rate:.2f}s of committed audio from stream")
@@ -0,0 +1,161 @@
+"""Deterministic stand-in for the Whisper pipeline, for benchmarks and load tests."""
+import logging
+import time
+import zlib
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from services.inference_backend import InferenceBackend, TransformersBackend
+from services.model_manager import ModelManager
+
+logger = logging.getLogger(__name__)
+
+_WORDS = (
+    "aisle", "three", "shelf", "four", "pallet", "move", "the", "box", "to", "bay",
+    "seven", "scan", "next", "order", "done", "check", "stock", "two", "left", "right",
+)
+
+
+class StubPipeline:
+    """
+    Callable with the Whisper ASR pipeline's interface that never runs a model.
+
+    Text is derived from a checksum of the audio, so identical audio always
+    gives identical text, and each call sleeps for a configurable fixed cost
+    plus a cost per second of audio to stand in for generation. Batches pay
+    the fixed cost once, like a real batched generate call.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "stub",
+        fixed_latency: float = 0.0,
+        seconds_per_audio_second: float = 0.0,
+    ):
+        """
+        Initialize StubPipeline.
+
+        Args:
+            model_name: Name reported in logs (default: stub)
+            fixed_latency: Seconds slept per call (default: 0)
+            seconds_per_audio_second: Seconds slept per second of input audio (default: 0)
+        """
+        self.model_name = model_name
+        self.fixed_latency = fixed_latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.tokenizer = None
+        self.calls = 0
+
+    def __call__(
+        self, inputs: Union[Dict[str, Any], List[Dict[str, Any]]], **kwargs: Any
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        items = [inputs] if isinstance(inputs, dict) else list(inputs)
+        durations = [len(item["raw"]) / item["sampling_rate"] for item in items]
+
+        delay = self.fixed_latency + self.seconds_per_audio_second * sum(durations)
+        if delay > 0:
+            time.sleep(delay)
+        self.calls += 1
+
+        results = [
+            self._transcribe(item["raw"], duration) for item, duration in zip(items, durations)
+        ]
+
+        # Feed a TextStreamer word by word, as streamed generation would
+        streamer = (kwargs.get("generate_kwargs") or {}).get("streamer")
+        if streamer is not None:
+            for word in results[0]["text"].split():
+                streamer.on_finalized_text(f" {word}")
+        return results[0] if isinstance(inputs, dict) else results
+
+    @staticmethod
+    def _transcribe(audio: np.ndarray, duration: float) -> Dict[str, Any]:
+        """Build a deterministic result with roughly two words per second of audio."""
+        seed = zlib.crc32(np.ascontiguousarray(audio).view(np.uint8)[:65536].tobytes())
+        count = max(1, int(duration * 2))
+        words = [_WORDS[(seed + i * 7) % len(_WORDS)] for i in range(count)]
+        text = " " + " ".join(words)
+        return {"text": text, "chunks": [{"text": text, "timestamp": (0.0, round(duration, 2))}]}
+
+
+class StubBackend(TransformersBackend):
+    """
+    Inference backend whose models are StubPipelines.
+
+    Transcription goes through the transformers backend's pipeline call, so
+    everything but the model itself runs the production code path.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        fixed_latency: float = 0.0,
+        seconds_per_audio_second: float = 0.0,
+        load_seconds: float = 0.0,
+    ):
+        """
+        Initialize StubBackend.
+
+        Args:
+            fixed_latency: StubPipeline seconds slept per call (default: 0)
+            seconds_per_audio_second: StubPipeline seconds slept per audio second (default: 0)
+            load_seconds: Seconds a simulated model load takes (default: 0)
+        """
+        super().__init__()
+        self.fixed_latency = fixed_latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.load_seconds = load_seconds
+
+    def load(self, repo_id: str, device: str, precision: str) -> StubPipeline:
+        """Create a StubPipeline instead of loading weights."""
+        if self.load_seconds > 0:
+            time.sleep(self.load_seconds)
+        logger.info(f"Loaded stub pipeline for {repo_id}")
+        return StubPipeline(repo_id, self.fixed_latency, self.seconds_per_audio_second)
+
+    def prepare_draft(self, model: Any, draft_model: Any) -> Any:
+        """Stub pipelines ignore their assistant, so the draft is used as is."""
+        return draft_model
+
+    def detect_language(
+        self, model: Any, audio: np.ndarray, sampling_rate: int
+    ) -> Dict[str, float]:
+        """Stub pipelines always hear English."""
+        return {"en": 1.0}
+
+
+class StubModelManager(ModelManager):
+    """
+    ModelManager whose models are loaded by a StubBackend.
+
+    Caching, eviction, pinning and single-flight loading behave exactly as in
+    ModelManager; only the backend is replaced, optionally with a simulated
+    load time, so scheduler and I/O changes can be measured without model
+    weights.
+    """
+
+    def __init__(
+        self,
+        fixed_latency: float = 0.0,
+        seconds_per_audio_second: float = 0.0,
+        load_seconds: float = 0.0,
+        **kwargs: Any,
+    ):
+        """
+        Initialize StubModelManager.
+
+        Args:
+            fixed_latency: StubPipeline seconds slept per call (default: 0)
+            seconds_per_audio_second: StubPipeline seconds slept per audio second (default: 0)
+            load_seconds: Seconds a simulated model load takes (default: 0)
+            **kwargs: Passed to ModelManager
+        """
+        # Set first: ModelManager checks draft models against the backends at init
+        self._stub_backend = StubBackend(fixed_latency, seconds_per_audio_second, load_seconds)
+        super().__init__(**kwargs)
+
+    def backend_for(self, key: str) -> InferenceBackend:
+        """Every model is served by the stub backend."""
+        return self._stub_backend
@@ -0,0 +1,126 @@
+"""Blocking Whisper inference calls shared by the API and background jobs."""
+import logging
+from contextlib import ExitStack
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from services.inference_backend import LoadedModel
+from services.metrics import time_stage
+from services.model_manager import ModelManager
+
+logger = logging.getLogger(__name__)
+
+
+def _enter_model(stack: ExitStack, model_manager: ModelManager, model_name: str) -> LoadedModel:
+    """Fetch (loading if needed) and pin a model for the life of the stack, timed as model_load."""
+    with time_stage("model_load"):
+        model, _ = stack.enter_context(model_manager.use_model(model_name))
+    return model
+
+
+def run_pipeline_batch(
+    model_manager: ModelManager,
+    model_name: str,
+    language: Optional[str],
+    sampling_rate: int,
+    audio_arrays: List[np.ndarray],
+) -> List[Any]:
+    """
+    Fetch the model and transcribe a batch with its backend (blocking, runs on the inference pool).
+
+    Args:
+        model_manager: Model manager used to fetch the model
+        model_name: Name of the model to use
+        language: Language code, or None for auto-detection
+        sampling_rate: Sample rate of the audio arrays
+        audio_arrays: Preprocessed mono float32 audio, one per request
+
+    Returns:
+        One raw result per input
+    """
+    # Pin the model so it cannot be evicted while this batch is running
+    with ExitStack() as stack:
+        model = _enter_model(stack, model_manager, model_name)
+        # One forward pass for the whole batch
+        with time_stage("inference"):
+            return model.transcribe(
+                audio_arrays, sampling_rate, language, batch_size=len(audio_arrays)
+            )
+
+
+def run_pipeline_chunked(
+    model_manager: ModelManager,
+    model_name: str,
+    language: Optional[str],
+    sampling_rate: int,
+    audio: np.ndarray,
+    chunk_length_s: float,
+    stride_length_s: float,
+    batch_size: int,
+) -> Any:
+    """
+    Transcribe long audio as overlapping chunks decoded in batches (blocking).
+
+    Whisper's sequential long-form decoding waits for each 30s window before
+    starting the next. Here the audio is cut into fixed chunks that overlap
+    by ``stride_length_s`` on each side, the chunks go through generate
+    ``batch_size`` at a time, and the text is merged at the overlaps, so
+    wall-clock time scales with the number of batches. Backends that decode
+    long audio their own way may ignore the chunk settings.
+
+    Args:
+        model_manager: Model manager used to fetch the model
+        model_name: Name of the model to use
+        language: Language code, or None for auto-detection
+        sampling_rate: Sample rate of the audio
+        audio: Preprocessed mono float32 audio
+        chunk_length_s: Length of each chunk in seconds, at most 30
+        stride_length_s: Overlap on each side of a chunk in seconds
+        batch_size: Number of chunks per generate call
+
+    Returns:
+        The raw result
+    """
+    with ExitStack() as stack:
+        model = _enter_model(stack, model_manager, model_name)
+        with time_stage("inference"):
+            return model.transcribe(
+                [audio],
+                sampling_rate,
+                language,
+                batch_size=batch_size,
+                chunk_length_s=chunk_length_s,
+                stride_length_s=stride_length_s,
+            )[0]
+
+
+def run_pipeline_streaming(
+    model_manager: ModelManager,
+    model_name: str,
+    language: Optional[str],
+    sampling_rate: int,
+    audio: np.ndarray,
+    on_text: Callable[[str], None],
+) -> Any:
+    """
+    Transcribe one input, reporting text as it is decoded (blocking).
+
+    Text is reported as the backend produces it (whole words for the
+    transformers backend); ``on_text`` is called on the inference thread.
+
+    Args:
+        model_manager: Model manager used to fetch the model
+        model_name: Name of the model to use
+        language: Language code, or None for auto-detection
+        sampling_rate: Sample rate of the audio
+        audio: Preprocessed mono float32 audio
+        on_text: Called with each new piece of text
+
+    Returns:
+        The raw result
+    """
+    with ExitStack() as stack:
+        model = _enter_model(stack, model_manager, model_name)
+        with time_stage("inference"):
+            return model.transcribe([audio], sampling_rate, language, on_text=on_text)[0]
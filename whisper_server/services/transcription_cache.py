@@ -0,0 +1,225 @@
+"""Content-addressed transcription result cache with in-flight coalescing."""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping overhead (key, OrderedDict node, dict object)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+class TranscriptionCache:
+    """
+    Two-tier cache of transcription results keyed by audio content and decode options.
+
+    The memory tier is a true LRU bounded by an estimated byte budget. The
+    optional SQLite tier survives restarts and expires entries after a TTL.
+    Requests for a key that is already being computed wait on the same
+    future instead of starting a second inference. The computation is
+    cancelled when every request waiting on it has gone, so it never runs
+    on without a request holding its inference slot.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        db_path: Optional[str] = None,
+        ttl_seconds: float = 24 * 60 * 60,
+    ):
+        """
+        Initialize TranscriptionCache.
+
+        Args:
+            max_bytes: Memory tier budget in bytes, 0 disables it (default: 32MB)
+            db_path: SQLite file for the disk tier, None disables it (default: None)
+            ttl_seconds: Disk tier entry lifetime (default: 24 hours)
+        """
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # In-flight computation to the number of requests awaiting it
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            with self._db_lock:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS transcriptions "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "DELETE FROM transcriptions WHERE created < ?",
+                    (time.time() - ttl_seconds,),
+                )
+                self._db.commit()
+
+        logger.info(
+            f"TranscriptionCache initialized with {max_bytes} byte memory budget, "
+            f"disk tier: {db_path or 'disabled'}"
+        )
+
+    @staticmethod
+    def make_key(audio_bytes: bytes, model: str, language: Optional[str], options: Dict[str, Any]) -> str:
+        """
+        Build a cache key from the decoded audio and everything that affects the output.
+
+        Args:
+            audio_bytes: Decoded (not base64) audio data
+            model: Model name
+            language: Requested language
+            options: Decode options, must be JSON-serializable
+
+        Returns:
+            Hex digest identifying the transcription
+        """
+        digest = hashlib.blake2b(audio_bytes, digest_size=16)
+        digest.update(json.dumps([model, language, options], sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Return the cached result for key, or compute it exactly once.
+
+        Args:
+            key: Cache key from make_key
+            compute: Coroutine factory producing the result on a miss
+
+        Returns:
+            Tuple of (result, status) where status is "hit", "coalesced" or "miss"
+
+        Raises:
+            Exception: Whatever compute raised; failures are never cached
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value, "hit"
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._stats["coalesced"] += 1
+            value, _ = await self._wait(in_flight)
+            return dict(value), "coalesced"
+
+        task = asyncio.ensure_future(self._compute(key, compute))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        value, from_disk = await self._wait(task)
+        return dict(value), "hit" if from_disk else "miss"
+
+    async def _wait(self, task: asyncio.Future) -> Tuple[Dict[str, Any], bool]:
+        """Await a shared computation, cancelling it if the last waiter is cancelled."""
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # Nobody holds an inference slot for it any more
+                task.cancel()
+
+    async def _compute(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Check the disk tier, then compute and store in both tiers."""
+        if self._db is not None:
+            value = await run_in_threadpool(self._get_disk, key)
+            if value is not None:
+                self._stats["disk_hits"] += 1
+                self._put_memory(key, value)
+                return value, True
+
+        self._stats["misses"] += 1
+        value = await compute()
+        self._put_memory(key, value)
+        if self._db is not None:
+            await run_in_threadpool(self._put_disk, key, value)
+        return value, False
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up key in the memory tier and mark it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return dict(entry[0])
+
+    def _put_memory(self, key: str, value: Dict[str, Any]) -> None:
+        """Insert into the memory tier, evicting least recently used entries over budget."""
+        size = len(json.dumps(value)) + len(key) + _ENTRY_OVERHEAD_BYTES
+        if size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (dict(value), size)
+        self._bytes += size
+
+        while self._bytes > self._max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up key in the disk tier, ignoring expired entries."""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value FROM transcriptions WHERE key = ? AND created >= ?",
+                (key, time.time() - self._ttl_seconds),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put_disk(self, key: str, value: Dict[str, Any]) -> None:
+        """Store value in the disk tier."""
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO transcriptions (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/coalesced counts and memory tier usage
+        """
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "in_flight": len(self._in_flight),
+            "disk_enabled": self._db is not None,
+        }
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -1,6 +1,9 @@
 """Pytest configuration and shared fixtures."""
 import base64
+import io
+import numpy as np
 import pytest
+import soundfile as sf
 import tempfile
 from pathlib import Path
 from typing import Generator
@@ -53,6 +56,16 @@ def sample_mp4_bytes() -> bytes:
     return b'ftyp' + b'\x00' * 100
 
 
+@pytest.fixture
+def tone_wav_bytes() -> bytes:
+    """Return a real 1 second 48kHz stereo WAV file with a 440Hz tone."""
+    t = np.arange(48000) / 48000
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    buffer = io.BytesIO()
+    sf.write(buffer, np.stack([tone, tone], axis=1), 48000, format="WAV")
+    return buffer.getvalue()
+
+
 @pytest.fixture
 def temp_audio_file() -> Generator[Path, None, None]:
     """Create a temporary audio file for testing."""
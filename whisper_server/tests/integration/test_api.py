@@ -1,13 +1,41 @@
 """Integration tests for API endpoints."""
 import pytest
+from fastapi import WebSocketDisconnect
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import base64
+import json
+import numpy as np
 
 # Import the app
 from whisper_api_server import app
+import api.routes as routes
+from config import WhisperConfig
+from api.routes import (
+    get_audio_processor,
+    get_inference_executor,
+    get_model_manager,
+    get_model_warmup,
+)
 from services.model_manager import ModelManager
 from services.audio_processor import AudioProcessor
+from services.inference_executor import InferenceExecutor
+from services.rate_limiter import RateLimiter
+from services.voice_activity import SpeechAudio
+
+
+@pytest.fixture(autouse=True)
+def fresh_transcription_cache(monkeypatch):
+    """Give every test an empty transcription cache, no remembered languages and full buckets."""
+    monkeypatch.setattr(routes, "_transcription_cache", None)
+    monkeypatch.setattr(routes, "_language_identifier", None)
+    monkeypatch.setattr(routes, "_rate_limiter", None)
+
+
+@pytest.fixture
+def language_id_model(monkeypatch):
+    """Identify auto-language requests with whisper-tiny."""
+    monkeypatch.setattr(WhisperConfig, "LANGUAGE_ID_MODEL", "whisper-tiny")
 
 
 @pytest.fixture
@@ -19,11 +47,14 @@ def client():
 @pytest.fixture
 def mock_model_manager():
     """Create a mock ModelManager."""
-    mock = Mock(spec=ModelManager)
-    # Mock the get_model method to return a mock pipeline and batch size
+    mock = MagicMock(spec=ModelManager)
+    # Mock get_model/use_model to return a mock model and batch size
     mock_pipe = Mock()
-    mock_pipe.return_value = {"text": "Test transcription"}
+    mock_pipe.transcribe.return_value = [{"text": "Test transcription"}]
+    mock_pipe.detect_language.return_value = {"en": 0.99, "de": 0.01}
     mock.get_model.return_value = (mock_pipe, 4)
+    mock.use_model.return_value.__enter__.return_value = (mock_pipe, 4)
+    mock.batch_size = 4
     return mock
 
 
@@ -31,8 +62,13 @@ def mock_model_manager():
 def mock_audio_processor():
     """Create a mock AudioProcessor."""
     mock = Mock(spec=AudioProcessor)
-    # Mock the preprocess method to return success
-    mock.preprocess.return_value = ("/tmp/test_preprocessed.wav", True)
+    # Mock decoding and preprocessing to return one second of 16kHz speech
+    mock.load.return_value = (np.zeros(16000, dtype=np.float32), 16000)
+    mock.process_speech.return_value = SpeechAudio.from_audio(
+        np.zeros(16000, dtype=np.float32), 16000
+    )
+    mock.target_sample_rate = 16000
+    mock.vad_settings = {"enabled": True, "silence_threshold_db": 40}
     return mock
 
 
@@ -47,6 +83,31 @@ class TestHealthEndpoint:
         assert data["status"] == "healthy"
         assert data["service"] == "whisper-api-server"
 
+    def test_ready_while_warming(self, client):
+        """Test readiness is 503 until warm-up finishes, then 200 with the warm models."""
+        warmup = Mock()
+        warmup.get_status.return_value = {
+            "ready": False,
+            "warm_models": [],
+            "models": {"whisper-small": {"status": "warming", "duration": None, "error": None}},
+        }
+        app.dependency_overrides[get_model_warmup] = lambda: warmup
+        try:
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["models"]["whisper-small"]["status"] == "warming"
+
+            warmup.get_status.return_value = {
+                "ready": True,
+                "warm_models": ["whisper-small"],
+                "models": {"whisper-small": {"status": "warm", "duration": 1.5, "error": None}},
+            }
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.json()["warm_models"] == ["whisper-small"]
+        finally:
+            app.dependency_overrides.clear()
+
 
 class TestDebugEndpoint:
     """Tests for /debug/audio-info endpoint."""
@@ -127,29 +188,17 @@ class TestTranscriptionEndpoint:
         )
         assert response.status_code == 400
 
-    @patch("api.routes.get_model_manager")
-    @patch("api.routes.get_audio_processor")
     def test_transcribe_success(
         self,
-        mock_get_processor,
-        mock_get_manager,
         client,
         sample_audio_base64,
         mock_model_manager,
         mock_audio_processor,
-        tmp_path,
     ):
         """Test successful transcription with mocked services."""
-        # Setup mocks
-        mock_get_manager.return_value = mock_model_manager
-        mock_get_processor.return_value = mock_audio_processor
-
-        # Mock the temp file creation
-        temp_file = tmp_path / "test.mp3"
-        temp_file.write_bytes(b"\xff\xfb" + b"\x00" * 100)
-
-        # Update mock to return the temp file path
-        mock_audio_processor.preprocess.return_value = (str(temp_file), True)
+        # Setup mocks (patching the getters has no effect once Depends holds them)
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
 
         response = client.post(
             "/v1/audio/transcriptions",
@@ -160,6 +209,8 @@ class TestTranscriptionEndpoint:
             },
         )
 
+        app.dependency_overrides.clear()
+
         assert response.status_code == 200
         data = response.json()
         assert "text" in data
@@ -167,6 +218,608 @@ class TestTranscriptionEndpoint:
         assert data["model"] == "whisper-1"
         assert "format" in data
 
+        # The model receives the in-memory array, never a file path
+        pipe = mock_model_manager.get_model.return_value[0]
+        audio_arrays, sampling_rate = pipe.transcribe.call_args.args[:2]
+        assert sampling_rate == 16000
+        assert isinstance(audio_arrays[0], np.ndarray)
+
+    def test_stage_timings(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test the response carries a request id and per-stage timings."""
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions?timings=true",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+                headers={"X-Request-ID": "req-1"},
+            )
+            plain = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-small"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.headers["x-request-id"] == "req-1"
+        data = response.json()
+        assert data["request_id"] == "req-1"
+        for stage in ("read", "validation", "decode", "preprocess", "queue_wait", "inference"):
+            assert stage in data["timings"]
+            assert f"{stage};dur=" in response.headers["server-timing"]
+        assert "timings" not in plain.json()
+        assert "inference;dur=" in plain.headers["server-timing"]
+
+    def test_auto_language_identified_once_per_client(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor,
+        language_id_model,
+    ):
+        """Test a confidently identified language is passed on and remembered for the client."""
+        pipe = mock_model_manager.get_model.return_value[0]
+        pipe.detect_language.return_value = {"de": 0.9, "en": 0.1}
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            for _ in range(2):
+                response = client.post(
+                    "/v1/audio/transcriptions",
+                    json={"audio": sample_audio_base64, "model": "whisper-1"},
+                )
+                assert response.status_code == 200
+        finally:
+            app.dependency_overrides.clear()
+
+        assert pipe.detect_language.call_count == 1
+        assert [c.args[2] for c in pipe.transcribe.call_args_list] == ["de", "de"]
+        assert mock_model_manager.use_model.call_args_list[0].args[0] == "whisper-tiny"
+
+    def test_uncertain_language_left_to_model(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor,
+        language_id_model,
+    ):
+        """Test a language identified below the confidence threshold is neither used nor kept."""
+        pipe = mock_model_manager.get_model.return_value[0]
+        pipe.detect_language.return_value = {"de": 0.5, "nl": 0.5}
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert pipe.transcribe.call_args.args[2] is None
+        assert routes._language_identifier.cached_language("testclient") is None
+
+    def test_auto_language_left_to_model_by_default(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test no separate language identification runs unless LANGUAGE_ID_MODEL is set."""
+        pipe = mock_model_manager.get_model.return_value[0]
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert pipe.detect_language.call_count == 0
+        assert pipe.transcribe.call_args.args[2] is None
+
+    def test_long_audio_is_chunked(
+        self,
+        client,
+        sample_audio_base64,
+        mock_model_manager,
+        mock_audio_processor,
+    ):
+        """Test clips longer than one chunk are decoded as batched overlapping chunks."""
+        mock_audio_processor.process_speech.return_value = SpeechAudio.from_audio(
+            np.zeros(16000 * 600, dtype=np.float32), 16000
+        )
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-small"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        pipe = mock_model_manager.get_model.return_value[0]
+        audio_arrays = pipe.transcribe.call_args.args[0]
+        assert len(audio_arrays[0]) == 16000 * 600
+        kwargs = pipe.transcribe.call_args.kwargs
+        assert kwargs["chunk_length_s"] == WhisperConfig.LONG_FORM_CHUNK_LENGTH_S
+        assert kwargs["stride_length_s"] == WhisperConfig.LONG_FORM_STRIDE_LENGTH_S
+        assert kwargs["batch_size"] == (WhisperConfig.LONG_FORM_BATCH_SIZE or 4)
+
+    def test_no_speech_skips_inference(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test audio without speech returns empty text without running the model."""
+        mock_audio_processor.process_speech.return_value = SpeechAudio(
+            sample_rate=16000, duration=3.0
+        )
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["text"] == ""
+        assert not mock_model_manager.use_model.called
+
+    def test_speech_packs_map_segments_to_original_time(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test each speech pack is transcribed and segment times skip removed silence."""
+        mock_audio_processor.process_speech.return_value = SpeechAudio(
+            sample_rate=16000,
+            duration=60.0,
+            packs=[np.zeros(16000 * 2, dtype=np.float32), np.zeros(16000, dtype=np.float32)],
+            pieces=[[(0.0, 5.0, 2.0)], [(0.0, 40.0, 1.0)]],
+        )
+        pipe = mock_model_manager.use_model.return_value.__enter__.return_value[0]
+        pipe.transcribe.side_effect = lambda audio_arrays, *args, **kwargs: [
+            {"text": " Aisle three.", "chunks": [{"text": " Aisle three.", "timestamp": (0.5, 1.5)}]}
+            for _ in audio_arrays
+        ]
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text"] == "Aisle three. Aisle three."
+        assert [(s["start"], s["end"]) for s in data["segments"]] == [(5.5, 6.5), (40.5, 41.0)]
+
+    def test_identical_request_served_from_cache(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test a repeated identical request is answered without a second inference."""
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        body = {"audio": sample_audio_base64, "model": "whisper-1", "language": "en"}
+
+        try:
+            first = client.post("/v1/audio/transcriptions", json=body)
+            second = client.post("/v1/audio/transcriptions", json=body)
+        finally:
+            app.dependency_overrides.clear()
+        stats = client.get("/debug/stats").json()
+
+        assert first.headers["X-Cache"] == "miss"
+        assert second.headers["X-Cache"] == "hit"
+        assert second.json()["text"] == first.json()["text"]
+        assert mock_model_manager.get_model.return_value[0].transcribe.call_count == 1
+        assert stats["transcription_cache"]["hits"] == 1
+
+    def test_preprocessing_settings_change_cache_key(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor, monkeypatch
+    ):
+        """Test a different resampler or VAD threshold does not reuse a cached transcript."""
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        body = {"audio": sample_audio_base64, "model": "whisper-1", "language": "en"}
+
+        try:
+            first = client.post("/v1/audio/transcriptions", json=body)
+            monkeypatch.setattr(WhisperConfig, "RESAMPLE_BACKEND", "polyphase")
+            second = client.post("/v1/audio/transcriptions", json=body)
+            mock_audio_processor.vad_settings = {"enabled": True, "silence_threshold_db": 30}
+            third = client.post("/v1/audio/transcriptions", json=body)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [r.headers["X-Cache"] for r in (first, second, third)] == ["miss"] * 3
+        assert mock_model_manager.get_model.return_value[0].transcribe.call_count == 3
+
+    def test_transcribe_undecodable_audio(self, client, sample_audio_base64):
+        """Test transcription fails with 400 when the audio cannot be decoded."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            json={
+                "audio": sample_audio_base64,
+                "model": "whisper-1",
+            },
+        )
+        assert response.status_code == 400
+        assert "decode" in response.json()["detail"].lower()
+
+    def test_transcribe_queue_full(self, client, sample_audio_base64):
+        """Test transcription is rejected with 503 and Retry-After when the queue is full."""
+        executor = InferenceExecutor(max_workers=1, max_queue_size=0, retry_after_seconds=7)
+        app.dependency_overrides[get_inference_executor] = lambda: executor
+
+        try:
+            with executor.admit():
+                response = client.post(
+                    "/v1/audio/transcriptions",
+                    json={
+                        "audio": sample_audio_base64,
+                        "model": "whisper-1",
+                    },
+                )
+        finally:
+            app.dependency_overrides.clear()
+            executor.shutdown()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+    def test_transcribe_rate_limited(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor, monkeypatch
+    ):
+        """Test a client over its limit gets 429 before any work, with the bucket observable."""
+        # A stopped clock, so the bucket does not refill while the test runs
+        limiter = RateLimiter(requests=2, window_seconds=60.0, clock=lambda: 1000.0)
+        monkeypatch.setattr(routes, "_rate_limiter", limiter)
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            # Distinct languages so no request is answered from the transcription cache
+            responses = [
+                client.post(
+                    "/v1/audio/transcriptions",
+                    json={"audio": sample_audio_base64, "model": "whisper-1", "language": language},
+                )
+                for language in ("en", "de", "fr")
+            ]
+            stats = client.get("/debug/stats").json()["rate_limit"]
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        assert [r.headers["X-RateLimit-Remaining"] for r in responses] == ["1", "0", "0"]
+        assert responses[0].headers["X-RateLimit-Limit"] == "2"
+        assert responses[2].headers["Retry-After"] == "30"
+        assert mock_audio_processor.load.call_count == 2
+        assert stats["limited"] == 1
+        assert stats["buckets"]["testclient"] == {"tokens": 0.0, "limited": 1}
+
+    def test_rate_limit_disabled(self, client, sample_audio_base64, monkeypatch):
+        """Test RATE_LIMIT_REQUESTS=0 turns rate limiting off."""
+        monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_REQUESTS", 0)
+        response = client.get("/debug/stats")
+        assert response.json()["rate_limit"] is None
+
+
+class TestMetricsEndpoint:
+    """Tests for the Prometheus /metrics endpoint."""
+
+    def test_metrics_after_transcription(
+        self, client, sample_audio_base64, mock_model_manager, mock_audio_processor
+    ):
+        """Test stage histograms and model cache gauges are exposed after a request."""
+        mock_model_manager.get_cache_info.return_value = {
+            "cached_models": ["whisper-tiny"],
+            "loading_models": [],
+            "cache_size": 1,
+            "max_cache_size": 3,
+            "cache_bytes": 100,
+            "max_cache_bytes": 1000,
+            "batch_size": 4,
+            "hits": 1,
+            "misses": 1,
+            "coalesced_loads": 0,
+            "load_failures": 0,
+            "evictions": 0,
+            "idle_unloads": 0,
+            "models": {},
+        }
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        try:
+            client.post(
+                "/v1/audio/transcriptions",
+                json={"audio": sample_audio_base64, "model": "whisper-1"},
+            )
+            response = client.get("/metrics")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        for stage in ("validation", "decode", "preprocess", "model_load", "inference", "postprocess"):
+            assert f'whisper_stage_duration_seconds_count{{stage="{stage}"}}' in body
+        assert 'route="/v1/audio/transcriptions"' in body
+        assert "whisper_model_cache_hits_total 1.0" in body
+        assert "whisper_inference_pending" in body
+        assert "whisper_real_time_factor_count" in body
+
+
+class TestBinaryUploads:
+    """Tests for multipart, octet-stream and raw PCM request bodies."""
+
+    @pytest.fixture(autouse=True)
+    def mocked_services(self, mock_model_manager, mock_audio_processor):
+        """Route requests to mocked services."""
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        yield
+        app.dependency_overrides.clear()
+
+    def test_multipart_upload(self, client, tone_wav_bytes, mock_audio_processor):
+        """Test an OpenAI-style multipart file upload."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("clip.wav", tone_wav_bytes, "audio/wav")},
+            data={"model": "whisper-tiny", "language": "en"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["model"] == "whisper-tiny"
+        assert data["format"] == "wav"
+        assert mock_audio_processor.load.call_args.args[0] == tone_wav_bytes
+
+    def test_multipart_missing_file(self, client):
+        """Test multipart requests without a file part are rejected."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            data={"model": "whisper-1"},
+            files={"other": ("note.txt", b"hello", "text/plain")},
+        )
+        assert response.status_code == 400
+        assert "file" in response.json()["detail"].lower()
+
+    def test_octet_stream_upload(self, client, tone_wav_bytes):
+        """Test a raw binary body with options in the query string."""
+        response = client.post(
+            "/v1/audio/transcriptions?model=whisper-small",
+            content=tone_wav_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert response.status_code == 200
+        assert response.json()["model"] == "whisper-small"
+
+    def test_octet_stream_too_large(self, client):
+        """Test oversized binary bodies are rejected."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            content=b"\x00" * (11 * 1024 * 1024),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert response.status_code == 400
+        assert "too large" in response.json()["detail"].lower()
+
+    def test_raw_pcm_skips_container_decoding(self, client, mock_model_manager):
+        """Test audio/L16 bodies are converted directly without decoding or resampling."""
+        app.dependency_overrides[get_audio_processor] = lambda: AudioProcessor()
+        t = np.arange(16000) / 16000
+        pcm = (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype(">i2").tobytes()
+
+        with patch("services.audio_decoder.sf.SoundFile") as mock_read, patch(
+            "services.audio_processor.Resampler.resample"
+        ) as mock_resample:
+            response = client.post(
+                "/v1/audio/transcriptions",
+                content=pcm,
+                headers={"Content-Type": "audio/L16; rate=16000"},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["format"] == "pcm"
+        mock_read.assert_not_called()
+        mock_resample.assert_not_called()
+        pipe = mock_model_manager.get_model.return_value[0]
+        assert len(pipe.transcribe.call_args.args[0][0]) > 0
+
+    def test_raw_pcm_partial_frame(self, client):
+        """Test PCM bodies that are not whole frames are rejected."""
+        app.dependency_overrides[get_audio_processor] = lambda: AudioProcessor()
+        response = client.post(
+            "/v1/audio/transcriptions",
+            content=b"\x00" * 2049,
+            headers={"Content-Type": "audio/L16; rate=16000"},
+        )
+        assert response.status_code == 400
+
+
+class TestStreamingEndpoint:
+    """Tests for the /v1/audio/stream WebSocket endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def mocked_services(self, mock_model_manager):
+        """Route streams to a mocked model and a real audio processor."""
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: AudioProcessor()
+        yield
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def pcm_chunks(sample_rate: int, seconds: float = 1.0, chunks: int = 4):
+        """Return a 220Hz tone as little-endian 16-bit PCM chunks."""
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        pcm = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2").tobytes()
+        size = len(pcm) // chunks
+        return [pcm[i:i + size] for i in range(0, len(pcm), size)]
+
+    @staticmethod
+    def receive_until_final(websocket):
+        """Collect server messages up to and including the final one."""
+        messages = []
+        while not messages or messages[-1]["type"] not in ("final", "error"):
+            messages.append(websocket.receive_json())
+        return messages
+
+    def test_stream_finalizes_on_end_message(self, client, mock_model_manager):
+        """Test streamed PCM is transcribed and finalized on an end message."""
+        with client.websocket_connect("/v1/audio/stream?model=whisper-tiny") as websocket:
+            for chunk in self.pcm_chunks(16000):
+                websocket.send_bytes(chunk)
+            websocket.send_json({"type": "end"})
+            messages = self.receive_until_final(websocket)
+
+        final = messages[-1]
+        assert final["type"] == "final"
+        assert final["text"] == "Test transcription"
+        assert final["model"] == "whisper-tiny"
+        assert all(m["type"] == "partial" for m in messages[:-1])
+
+        pipe = mock_model_manager.use_model.return_value.__enter__.return_value[0]
+        audio_arrays, sampling_rate = pipe.transcribe.call_args.args[:2]
+        assert sampling_rate == 16000
+        assert len(audio_arrays[0]) == 16000
+
+    def test_stream_resamples_to_16khz(self, client, mock_model_manager):
+        """Test 48kHz streams are resampled incrementally to the model rate."""
+        url = "/v1/audio/stream?model=whisper-tiny&sample_rate=48000"
+        with client.websocket_connect(url) as websocket:
+            for chunk in self.pcm_chunks(48000):
+                websocket.send_bytes(chunk)
+            websocket.send_json({"type": "end"})
+            self.receive_until_final(websocket)
+
+        pipe = mock_model_manager.use_model.return_value.__enter__.return_value[0]
+        assert len(pipe.transcribe.call_args.args[0][0]) == pytest.approx(16000, abs=32)
+
+    def test_long_final_window_is_chunked(self, client, mock_model_manager, monkeypatch):
+        """Test a window that outgrew one Whisper input is not cut off at finalize."""
+        # No partial steps run, as when every one was skipped under load
+        monkeypatch.setattr(WhisperConfig, "STREAM_STEP_MS", 60000.0)
+        with client.websocket_connect("/v1/audio/stream?model=whisper-tiny") as websocket:
+            for chunk in self.pcm_chunks(16000, seconds=40.0, chunks=8):
+                websocket.send_bytes(chunk)
+            websocket.send_json({"type": "end"})
+            assert self.receive_until_final(websocket)[-1]["type"] == "final"
+
+        pipe = mock_model_manager.get_model.return_value[0]
+        assert len(pipe.transcribe.call_args.args[0][0]) == 16000 * 40
+        kwargs = pipe.transcribe.call_args.kwargs
+        assert kwargs["chunk_length_s"] == WhisperConfig.LONG_FORM_CHUNK_LENGTH_S
+
+    def test_stream_invalid_model(self, client):
+        """Test an unsupported model is reported before any audio is sent."""
+        with client.websocket_connect("/v1/audio/stream?model=gpt-4") as websocket:
+            message = websocket.receive_json()
+        assert message["type"] == "error"
+        assert "Invalid model" in message["detail"]
+
+    def test_stream_rate_limited(self, client, monkeypatch):
+        """Test a connection over the client's limit is closed with try-again-later."""
+        monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_REQUESTS", 1)
+        with client.websocket_connect("/v1/audio/stream?model=whisper-tiny") as websocket:
+            websocket.send_json({"type": "end"})
+            assert self.receive_until_final(websocket)[-1]["type"] == "final"
+        with client.websocket_connect("/v1/audio/stream?model=whisper-tiny") as websocket:
+            message = websocket.receive_json()
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                websocket.receive_json()
+        assert "Rate limit" in message["detail"]
+        assert exc_info.value.code == 1013
+
+    def test_stream_partial_frame(self, client):
+        """Test a chunk that is not whole 16-bit samples is rejected."""
+        with client.websocket_connect("/v1/audio/stream") as websocket:
+            websocket.send_bytes(b"\x00\x01\x02")
+            message = websocket.receive_json()
+        assert message["type"] == "error"
+
+
+class TestStreamedResponses:
+    """Tests for stream=true Server-Sent Events responses."""
+
+    @pytest.fixture(autouse=True)
+    def mocked_services(self, mock_model_manager, mock_audio_processor):
+        """Route requests to mocked services with a model that streams two words."""
+
+        def streaming_transcribe(audio_arrays, sampling_rate, language, on_text=None, **kwargs):
+            on_text(" Aisle ")
+            on_text("three.")
+            return [{"text": " Aisle three."}]
+
+        pipe = mock_model_manager.use_model.return_value.__enter__.return_value[0]
+        pipe.transcribe.side_effect = streaming_transcribe
+        app.dependency_overrides[get_model_manager] = lambda: mock_model_manager
+        app.dependency_overrides[get_audio_processor] = lambda: mock_audio_processor
+        yield
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def parse_events(body: str):
+        """Decode the JSON payloads of an SSE body."""
+        return [
+            json.loads(event[len("data: "):])
+            for event in body.strip().split("\n\n")
+            if event.startswith("data: ")
+        ]
+
+    def test_stream_deltas_then_done(self, client, sample_audio_base64):
+        """Test text deltas are streamed before a final event with the response fields."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            json={"audio": sample_audio_base64, "model": "whisper-tiny", "stream": True},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = self.parse_events(response.text)
+        assert [e["type"] for e in events] == [
+            "transcript.text.delta",
+            "transcript.text.delta",
+            "transcript.text.done",
+        ]
+        assert "".join(e["delta"] for e in events[:2]) == " Aisle three."
+        done = events[-1]
+        assert done["text"] == " Aisle three."
+        assert done["model"] == "whisper-tiny"
+        assert done["format"] == "mp3"
+        assert done["processing_time"] >= 0
+
+    def test_stream_query_flag(self, client, tone_wav_bytes):
+        """Test binary uploads enable streaming with a query parameter."""
+        response = client.post(
+            "/v1/audio/transcriptions?stream=true",
+            content=tone_wav_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert self.parse_events(response.text)[-1]["type"] == "transcript.text.done"
+
+    def test_stream_validation_errors_are_http_errors(self, client):
+        """Test invalid requests fail before the event stream starts."""
+        response = client.post(
+            "/v1/audio/transcriptions",
+            json={"audio": "not base64!!", "stream": True},
+        )
+        assert response.status_code == 400
+
+    def test_stream_inference_error_event(self, client, sample_audio_base64, mock_model_manager):
+        """Test an inference failure after the stream started is reported as an event."""
+        pipe = mock_model_manager.use_model.return_value.__enter__.return_value[0]
+        pipe.transcribe.side_effect = RuntimeError("boom")
+        response = client.post(
+            "/v1/audio/transcriptions",
+            json={"audio": sample_audio_base64, "stream": True},
+        )
+        events = self.parse_events(response.text)
+        assert events[-1]["type"] == "error"
+        assert "boom" in events[-1]["detail"]
+
 
 class TestChatCompletionsEndpoint:
     """Tests for /v1/chat/completions endpoint."""
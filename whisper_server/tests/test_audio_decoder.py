@@ -0,0 +1,101 @@
+"""Unit tests for the format-specific audio decoders."""
+import io
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+from services.audio_decoder import (
+    AudioDecodeError,
+    DecoderRegistry,
+    FallbackDecoder,
+    decode_soundfile,
+)
+
+
+def encode(audio: np.ndarray, sample_rate: int, audio_format: str, **kwargs) -> bytes:
+    """Encode audio in memory with libsndfile."""
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=audio_format, **kwargs)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def stereo_tone() -> np.ndarray:
+    """Return one second of 48kHz stereo with different levels per channel."""
+    t = np.arange(48000) / 48000
+    tone = np.sin(2 * np.pi * 440 * t)
+    return np.stack([0.6 * tone, 0.2 * tone], axis=1)
+
+
+class TestSoundfileDecoder:
+    """Tests for in-memory libsndfile decoding."""
+
+    @pytest.mark.parametrize(
+        "audio_format,kwargs",
+        [("WAV", {}), ("FLAC", {}), ("OGG", {"subtype": "VORBIS"})],
+    )
+    def test_decodes_and_downmixes(self, stereo_tone, audio_format, kwargs):
+        """Test each format decodes to mono float32 at the original rate."""
+        audio, sample_rate = decode_soundfile(encode(stereo_tone, 48000, audio_format, **kwargs))
+        assert sample_rate == 48000
+        assert audio.dtype == np.float32
+        assert audio.ndim == 1
+        assert np.abs(audio).max() == pytest.approx(0.4, abs=0.02)
+
+    def test_mono_is_not_copied_through_downmix(self):
+        """Test mono input is returned as its single channel."""
+        audio, _ = decode_soundfile(encode(np.full(1600, 0.25), 16000, "WAV", subtype="FLOAT"))
+        assert np.allclose(audio, 0.25)
+
+    def test_rejects_non_audio(self):
+        """Test data libsndfile cannot parse raises SoundFileError."""
+        with pytest.raises(sf.SoundFileError):
+            decode_soundfile(b"RIFF" + b"\x00" * 100)
+
+
+class TestDecoderRegistry:
+    """Tests for choosing a decoder from the sniffed format."""
+
+    def test_uses_decoder_for_sniffed_format(self, tone_wav_bytes):
+        """Test the header, not the client's extension, selects the decoder."""
+        fallback = Mock(spec=FallbackDecoder)
+        registry = DecoderRegistry(fallback)
+        wav_decoder = Mock(return_value=(np.zeros(10, dtype=np.float32), 16000))
+        registry.register("wav", wav_decoder)
+
+        registry.decode(tone_wav_bytes, "mp3")
+
+        wav_decoder.assert_called_once_with(tone_wav_bytes)
+        fallback.decode.assert_not_called()
+
+    def test_unregistered_format_uses_fallback(self, sample_mp4_bytes):
+        """Test containers without a decoder go to the fallback decoder."""
+        fallback = Mock(spec=FallbackDecoder)
+        fallback.decode.return_value = (np.zeros(10, dtype=np.float32), 44100)
+        registry = DecoderRegistry(fallback)
+
+        assert registry.decode(sample_mp4_bytes, "m4a")[1] == 44100
+        fallback.decode.assert_called_once_with(sample_mp4_bytes, "m4a")
+
+    def test_failed_decoder_falls_back(self):
+        """Test a format decoder that rejects the data hands over to the fallback."""
+        fallback = Mock(spec=FallbackDecoder)
+        fallback.decode.return_value = (np.zeros(10, dtype=np.float32), 16000)
+        registry = DecoderRegistry(fallback)
+
+        registry.decode(b"OggS" + b"\x00" * 100)
+        fallback.decode.assert_called_once_with(b"OggS" + b"\x00" * 100, "ogg")
+
+    def test_decoder_for(self):
+        """Test decoder_for names the decoder tried first."""
+        registry = DecoderRegistry(FallbackDecoder())
+        assert registry.decoder_for("flac") == "decode_soundfile"
+        assert registry.decoder_for("mp4") == registry.fallback.backend
+        assert registry.decoder_for(None) == registry.fallback.backend
+
+
+def test_fallback_raises_decode_error():
+    """Test undecodable data raises AudioDecodeError from the fallback decoder."""
+    with pytest.raises(AudioDecodeError):
+        FallbackDecoder().decode(b"\x00" * 100, "m4a")
@@ -0,0 +1,124 @@
+"""Unit tests for the audio processor service."""
+import numpy as np
+import pytest
+from config import WhisperConfig
+from services.audio_processor import (
+    RESAMPLE_BACKENDS,
+    AudioProcessor,
+    AudioProcessingError,
+    Resampler,
+)
+
+
+@pytest.fixture
+def processor():
+    """Create an AudioProcessor with default settings."""
+    return AudioProcessor(target_sample_rate=16000, silence_threshold_db=40, normalize=True)
+
+
+class TestLoad:
+    """Tests for in-memory decoding."""
+
+    def test_load_wav_from_memory(self, processor, tone_wav_bytes):
+        """Test WAV bytes decode to mono float32 without touching disk."""
+        audio, sr = processor.load(tone_wav_bytes, "wav")
+        assert sr == 48000
+        assert audio.dtype == np.float32
+        assert audio.ndim == 1
+        assert len(audio) == 48000
+
+    def test_load_undecodable_raises(self, processor, sample_mp3_bytes):
+        """Test garbage bytes raise AudioProcessingError."""
+        with pytest.raises(AudioProcessingError):
+            processor.load(sample_mp3_bytes, "mp3")
+
+
+class TestPreprocess:
+    """Tests for the full preprocessing path."""
+
+    def test_preprocess_returns_target_rate_array(self, processor, tone_wav_bytes):
+        """Test preprocessing resamples to 16kHz and normalizes."""
+        audio = processor.preprocess(tone_wav_bytes, "wav")
+        assert audio.dtype == np.float32
+        assert abs(len(audio) - 16000) <= 16
+        assert np.isclose(np.abs(audio).max(), 1.0, atol=1e-3)
+
+    def test_preprocess_leaves_no_temp_files(self, processor, tone_wav_bytes, tmp_path, monkeypatch):
+        """Test the in-memory path writes nothing to the temp directory."""
+        monkeypatch.setenv("TMPDIR", str(tmp_path))
+        import tempfile
+
+        monkeypatch.setattr(tempfile, "tempdir", None)
+        processor.preprocess(tone_wav_bytes, "wav")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_process_trims_edge_silence(self, processor):
+        """Test leading and trailing silence are trimmed."""
+        t = np.arange(16000) / 16000
+        tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        silence = np.zeros(16000, dtype=np.float32)
+        audio = processor.process(np.concatenate([silence, tone, silence]), 16000)
+        assert len(audio) < 24000
+
+    def test_process_drops_internal_silence(self, processor):
+        """Test voice activity detection removes long pauses between speech."""
+        t = np.arange(16000) / 16000
+        tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        pause = np.zeros(48000, dtype=np.float32)
+        speech = processor.process_speech(np.concatenate([tone, pause, tone]), 16000)
+        assert speech.duration == pytest.approx(5.0)
+        assert speech.speech_duration < 3.0
+
+    def test_process_without_vad_keeps_internal_silence(self):
+        """Test disabling voice activity detection only trims the edges."""
+        processor = AudioProcessor(voice_activity_detection=False)
+        t = np.arange(16000) / 16000
+        tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        pause = np.zeros(48000, dtype=np.float32)
+        audio = processor.process(np.concatenate([tone, pause, tone]), 16000)
+        assert len(audio) == 80000
+
+    def test_vad_settings(self):
+        """Test the reported thresholds follow the processor's configuration."""
+        settings = AudioProcessor(silence_threshold_db=30).vad_settings
+        assert settings["enabled"] is True
+        assert settings["silence_threshold_db"] == settings["top_db"] == 30
+        assert "min_speech_ms" in settings
+        assert AudioProcessor(voice_activity_detection=False).vad_settings == {
+            "enabled": False,
+            "silence_threshold_db": 40,
+        }
+
+
+class TestResampler:
+    """Tests for the resample backends."""
+
+    @pytest.mark.parametrize("backend", RESAMPLE_BACKENDS)
+    def test_downsample_48k_preserves_tone(self, backend):
+        """Test every backend turns 48kHz into the same 16kHz tone."""
+        t = np.arange(48000) / 48000
+        tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+        audio = Resampler(backend).resample(tone, 48000, 16000)
+        expected = np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+        assert audio.dtype == np.float32
+        assert len(audio) == 16000
+        assert np.abs(audio[200:-200] - expected[200:-200]).max() < 1e-2
+
+    def test_polyphase_non_integer_ratio(self):
+        """Test the polyphase backend also handles 44.1kHz input."""
+        audio = Resampler("polyphase").resample(np.zeros(44100, dtype=np.float32), 44100, 16000)
+        assert len(audio) == 16000
+
+    def test_same_rate_is_passthrough(self):
+        """Test audio already at the target rate is returned unchanged."""
+        audio = np.ones(100, dtype=np.float32)
+        assert Resampler().resample(audio, 16000, 16000) is audio
+
+    def test_unknown_backend_raises(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            Resampler("sinc_best")
+
+    def test_config_lists_every_backend(self):
+        """Test RESAMPLE_BACKEND validation accepts exactly the implemented backends."""
+        assert set(WhisperConfig.SUPPORTED_RESAMPLE_BACKENDS) == set(RESAMPLE_BACKENDS)
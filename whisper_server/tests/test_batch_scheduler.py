@@ -0,0 +1,172 @@
+"""Unit tests for the micro-batching scheduler."""
+import asyncio
+import threading
+import pytest
+from services.batch_scheduler import BatchScheduler
+from services.inference_executor import InferenceExecutor, current_client, set_current_client
+from services.metrics import time_stage
+from services.request_timing import RequestTiming, set_current_timing
+
+
+@pytest.fixture
+def executor():
+    """Create a single-worker executor."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=16)
+    yield executor
+    executor.shutdown()
+
+
+class RecordingRunner:
+    """Batch runner that records the batches it receives."""
+
+    def __init__(self, block: threading.Event = None):
+        self.batches = []
+        self._block = block
+
+    def __call__(self, inputs):
+        if self._block is not None:
+            self._block.wait(5)
+        self.batches.append(list(inputs))
+        return [f"result-{item}" for item in inputs]
+
+
+class TestBatchScheduler:
+    """Tests for BatchScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self, executor):
+        """Test requests arriving within the window run as one batch."""
+        scheduler = BatchScheduler(executor, window_ms=50)
+        runner = RecordingRunner()
+
+        results = await asyncio.gather(
+            *(scheduler.submit("key", i, runner, max_batch_size=8) for i in range(3))
+        )
+
+        assert results == ["result-0", "result-1", "result-2"]
+        assert runner.batches == [[0, 1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_dispatches_immediately(self, executor):
+        """Test a batch is dispatched as soon as it reaches max size."""
+        scheduler = BatchScheduler(executor, window_ms=10_000)
+        runner = RecordingRunner()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(scheduler.submit("key", i, runner, max_batch_size=2) for i in range(2))
+            ),
+            timeout=2,
+        )
+
+        assert results == ["result-0", "result-1"]
+        assert runner.batches == [[0, 1]]
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_mixed(self, executor):
+        """Test requests for different keys never share a batch."""
+        scheduler = BatchScheduler(executor, window_ms=20)
+        runner = RecordingRunner()
+
+        await asyncio.gather(
+            scheduler.submit(("tiny", "en"), "a", runner, max_batch_size=8),
+            scheduler.submit(("tiny", "de"), "b", runner, max_batch_size=8),
+        )
+
+        assert sorted(runner.batches) == [["a"], ["b"]]
+
+    @pytest.mark.asyncio
+    async def test_batch_grows_while_workers_busy(self, executor):
+        """Test requests keep collecting while the only worker is busy."""
+        scheduler = BatchScheduler(executor, window_ms=1)
+        release = threading.Event()
+        runner = RecordingRunner(block=release)
+
+        first = asyncio.ensure_future(scheduler.submit("key", 0, runner, max_batch_size=8))
+        await asyncio.sleep(0.05)
+        rest = [
+            asyncio.ensure_future(scheduler.submit("key", i, runner, max_batch_size=8))
+            for i in range(1, 4)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(first, *rest)
+
+        assert runner.batches == [[0], [1, 2, 3]]
+        assert scheduler.get_stats()["avg_batch_size"] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_held_batches_dispatched_fairly(self, executor):
+        """Test another client's held batch goes ahead of an older one from the busy client."""
+        scheduler = BatchScheduler(executor, window_ms=1)
+        release = threading.Event()
+        runner = RecordingRunner(block=release)
+
+        async def submit(client, key, item):
+            set_current_client(client)
+            return await scheduler.submit(key, item, runner, max_batch_size=8)
+
+        first = asyncio.ensure_future(submit("uploader", "large", "upload-0"))
+        await asyncio.sleep(0.05)
+        upload = asyncio.ensure_future(submit("uploader", "large", "upload-1"))
+        await asyncio.sleep(0.05)
+        command = asyncio.ensure_future(submit("voice", "tiny", "command"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(first, upload, command)
+
+        assert runner.batches == [["upload-0"], ["command"], ["upload-1"]]
+
+    @pytest.mark.asyncio
+    async def test_shared_batch_queued_for_its_clients(self, executor):
+        """Test a batch runs for its members' client, or for all of them when shared."""
+        scheduler = BatchScheduler(executor, window_ms=20)
+
+        async def submit(client, key):
+            set_current_client(client)
+            return await scheduler.submit(
+                key, client, lambda inputs: [current_client()] * len(inputs), max_batch_size=8
+            )
+
+        results = await asyncio.gather(
+            submit("b", "shared"), submit("a", "shared"), submit("a", "own")
+        )
+        assert results == ["a+b", "a+b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_members(self, executor):
+        """Test a failing batch raises in every waiting request."""
+        scheduler = BatchScheduler(executor, window_ms=20)
+
+        def failing_runner(inputs):
+            raise RuntimeError("inference failed")
+
+        results = await asyncio.gather(
+            *(scheduler.submit("key", i, failing_runner, max_batch_size=8) for i in range(2)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_batch_timings_attributed_to_members(self, executor):
+        """Test every request in a batch gets the batch's stages and its co-members."""
+        scheduler = BatchScheduler(executor, window_ms=50)
+
+        def run(inputs):
+            with time_stage("inference"):
+                return list(inputs)
+
+        async def submit(request_id):
+            timing = RequestTiming(request_id=request_id)
+            set_current_timing(timing)
+            await scheduler.submit("key", request_id, run, max_batch_size=8)
+            return timing
+
+        first, second = await asyncio.gather(submit("a"), submit("b"))
+
+        for timing, other in ((first, "b"), (second, "a")):
+            assert timing.details["batch_size"] == 2
+            assert timing.details["batch_members"] == [other]
+            assert "inference" in timing.stages
+            assert timing.stages["queue_wait"] > 0
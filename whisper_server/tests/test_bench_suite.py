@@ -0,0 +1,37 @@
+"""Tests that the benchmark suite's route cases run against the app as configured."""
+import sys
+from pathlib import Path
+
+import pytest
+
+from api import routes
+from config import WhisperConfig
+from whisper_api_server import app
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench_suite import Config, route_cases  # noqa: E402
+
+
+@pytest.fixture
+def default_rate_limit(monkeypatch):
+    """The default per-client limit, with a fresh limiter."""
+    monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_REQUESTS", 10)
+    monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_WINDOW", "1 minute")
+    monkeypatch.setattr(routes, "_rate_limiter", None)
+
+
+class TestRouteCases:
+    """Tests for the full route cases."""
+
+    def test_cases_repeat_past_the_rate_limit(self, default_rate_limit):
+        """Test every case runs more often than the limit allows one client, leaving no overrides."""
+        cases = route_cases(Config([16000], [1.0], [1.0], 1, 0.0))
+        assert len(cases) == 3
+
+        for case in cases:
+            for _ in range(WhisperConfig.RATE_LIMIT_REQUESTS + 2):
+                case.run()
+
+        assert app.dependency_overrides == {}
+        assert routes.get_rate_limiter().get_stats()["allowed"] == 0
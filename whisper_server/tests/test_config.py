@@ -114,6 +114,19 @@ class TestConfigValidation:
             WhisperConfig.PORT = original_port
             WhisperConfig.MAX_AUDIO_FILE_SIZE_MB = original_size
 
+    def test_rate_limit_and_fair_queue_validation(self, monkeypatch):
+        """Test the rate limit window and fair queue weights are checked."""
+        monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_WINDOW", "30 seconds")
+        monkeypatch.setattr(WhisperConfig, "FAIR_QUEUE_WEIGHTS", "10.0.0.5:2,::1:0.5")
+        errors = WhisperConfig.validate_config()
+        assert not any("RATE_LIMIT" in err or "FAIR_QUEUE" in err for err in errors)
+
+        monkeypatch.setattr(WhisperConfig, "RATE_LIMIT_WINDOW", "1 fortnight")
+        monkeypatch.setattr(WhisperConfig, "FAIR_QUEUE_WEIGHTS", "10.0.0.5")
+        errors = WhisperConfig.validate_config()
+        assert any("RATE_LIMIT_WINDOW" in err for err in errors)
+        assert any("FAIR_QUEUE_WEIGHTS" in err for err in errors)
+
 
 class TestEnvironmentVariables:
     """Tests for environment variable handling."""
@@ -0,0 +1,148 @@
+"""Unit tests for CPU precision selection, int8 quantization and the artifact cache."""
+import os
+import pytest
+import torch
+from unittest.mock import Mock, patch
+from transformers import WhisperConfig as WhisperModelConfig, WhisperForConditionalGeneration
+
+from services import cpu_precision
+from services.cpu_precision import (
+    PrecisionArtifactCache,
+    parse_precisions,
+    quantize_int8,
+    quantized_weight_bytes,
+    resolve_precision,
+)
+from services.model_manager import ModelManager
+from services.replica_pool import estimate_replica_bytes
+
+
+def tiny_whisper() -> WhisperForConditionalGeneration:
+    """A randomly initialised two-layer Whisper small enough to quantize in milliseconds."""
+    torch.manual_seed(0)
+    config = WhisperModelConfig(
+        vocab_size=64,
+        d_model=32,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=64,
+        decoder_ffn_dim=64,
+        max_target_positions=32,
+        pad_token_id=0,
+        bos_token_id=1,
+        eos_token_id=2,
+        decoder_start_token_id=1,
+    )
+    return WhisperForConditionalGeneration(config).eval()
+
+
+def logits(model) -> torch.Tensor:
+    torch.manual_seed(1)
+    features = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        return model(input_features=features, decoder_input_ids=torch.tensor([[1, 5]])).logits
+
+
+def cpu_manager(**kwargs) -> ModelManager:
+    manager = ModelManager(**kwargs)
+    manager._device = "cpu"
+    return manager
+
+
+class TestPrecisionSpec:
+    """Tests for parsing and resolving precision settings."""
+
+    def test_default_and_overrides(self):
+        """Test a bare precision sets the default and model:precision overrides it."""
+        assert parse_precisions("int8") == {"*": "int8"}
+        assert parse_precisions("fp32, whisper-large:INT8,whisper-small:bf16") == {
+            "*": "fp32",
+            "whisper-large": "int8",
+            "whisper-small": "bf16",
+        }
+        assert parse_precisions("whisper-tiny:int8") == {"*": "fp32", "whisper-tiny": "int8"}
+
+    def test_unsupported_precision(self):
+        """Test unknown precisions are rejected."""
+        with pytest.raises(ValueError):
+            parse_precisions("fp16")
+
+    def test_bf16_falls_back_without_hardware_support(self):
+        """Test bf16 runs as fp32 on CPUs without native bf16."""
+        with patch.object(cpu_precision, "cpu_supports_bf16", return_value=False):
+            assert resolve_precision("bf16") == "fp32"
+        with patch.object(cpu_precision, "cpu_supports_bf16", return_value=True):
+            assert resolve_precision("bf16") == "bf16"
+        assert resolve_precision("int8") == "int8"
+
+    def test_manager_resolves_aliases_per_model(self):
+        """Test overrides apply to the checkpoint, shared by its aliases."""
+        manager = cpu_manager(cpu_precision="bf16,whisper-1:int8")
+        assert manager.precision_for("openai/whisper-large-v3") == "int8"
+        assert manager.precision_for("openai/whisper-small") == "bf16"
+
+    def test_manager_rejects_unknown_model(self):
+        """Test overrides for unsupported models fail at startup."""
+        with pytest.raises(ValueError):
+            ModelManager(cpu_precision="whisper-huge:int8")
+
+    def test_estimates_follow_precision(self):
+        """Test memory estimates shrink with lower precisions."""
+        fp32 = cpu_manager()._estimate_model_bytes("openai/whisper-small")
+        bf16 = cpu_manager(cpu_precision="bf16")._estimate_model_bytes("openai/whisper-small")
+        int8 = cpu_manager(cpu_precision="int8")._estimate_model_bytes("openai/whisper-small")
+        assert fp32 == 2 * bf16
+        assert int8 < bf16
+        assert estimate_replica_bytes(["whisper-small"], "int8") == int8
+
+
+class TestInt8Quantization:
+    """Tests for dynamic quantization and artifact caching."""
+
+    def test_quantizes_linear_layers(self):
+        """Test linear weights become int8 and outputs stay close to fp32."""
+        model = tiny_whisper()
+        expected = logits(model)
+        quantized = quantize_int8(tiny_whisper())
+        assert quantized_weight_bytes(quantized) > 0
+        assert quantized_weight_bytes(model) == 0
+        assert torch.allclose(logits(quantized), expected, atol=0.1)
+
+    def test_artifact_round_trip(self, tmp_path):
+        """Test a saved artifact loads back to an identical model."""
+        cache = PrecisionArtifactCache(str(tmp_path / "artifacts"))
+        assert cache.load("openai/whisper-tiny", "int8") is None
+
+        quantized = quantize_int8(tiny_whisper())
+        cache.save("openai/whisper-tiny", "int8", quantized)
+        loaded = cache.load("openai/whisper-tiny", "int8")
+        assert torch.equal(logits(loaded), logits(quantized))
+        assert "openai--whisper-tiny.int8.torch-" in cache.path("openai/whisper-tiny", "int8")
+
+    def test_corrupt_artifact_is_discarded(self, tmp_path):
+        """Test an unreadable artifact is removed instead of failing the load."""
+        cache = PrecisionArtifactCache(str(tmp_path))
+        path = cache.path("openai/whisper-tiny", "int8")
+        with open(path, "wb") as f:
+            f.write(b"truncated")
+        assert cache.load("openai/whisper-tiny", "int8") is None
+        assert not os.path.exists(path)
+
+    def test_second_load_skips_quantization(self, tmp_path):
+        """Test the manager quantizes once and later loads reuse the artifact."""
+        from_pretrained = Mock(side_effect=lambda *args, **kwargs: tiny_whisper())
+        with patch("services.inference_backend.AutoModelForSpeechSeq2Seq.from_pretrained",
+                   from_pretrained), patch("services.inference_backend.pipeline") as pipeline:
+            first = cpu_manager(cpu_precision="int8", artifact_dir=str(tmp_path))
+            first.get_model("whisper-tiny")
+            second = cpu_manager(cpu_precision="int8", artifact_dir=str(tmp_path))
+            second.get_model("whisper-tiny")
+
+        assert from_pretrained.call_count == 1
+        models = [c.kwargs["model"] for c in pipeline.call_args_list]
+        assert all(quantized_weight_bytes(model) > 0 for model in models)
+        assert torch.equal(logits(models[0]), logits(models[1]))
+        info = second.get_cache_info()["models"]["openai/whisper-tiny"]
+        assert info["precision"] == "int8"
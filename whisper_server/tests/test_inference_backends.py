@@ -0,0 +1,246 @@
+"""Conformance tests every inference backend must pass, plus backend selection tests."""
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from services import inference_backend
+from services.inference_backend import (
+    CTranslate2Backend,
+    TransformersBackend,
+    create_backend,
+    parse_backends,
+)
+from services.model_manager import ModelManager
+from services.stub_pipeline import StubBackend
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Seeded voiced harmonics with a syllable-rate envelope at 16kHz."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120.0 + 40.0 * rng.random() + 20.0 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))
+    noise = rng.normal(0.0, 0.002, len(t))
+    return (0.2 * voiced * envelope + noise).astype(np.float32)
+
+
+# Backends whose model could not be loaded, with the reason
+_unavailable = {}
+
+
+def load_stub():
+    return StubBackend(), "stub"
+
+
+def load_transformers():
+    return TransformersBackend(), "fp32"
+
+
+def load_ctranslate2():
+    pytest.importorskip("faster_whisper")
+    return CTranslate2Backend(), "int8"
+
+
+@pytest.fixture(
+    scope="module",
+    params=[load_stub, load_transformers, load_ctranslate2],
+    ids=["stub", "transformers", "ctranslate2"],
+)
+def loaded(request):
+    """Each backend with whisper-tiny loaded on the CPU; skipped if the model is unavailable."""
+    backend, precision = request.param()
+    if backend.name in _unavailable:
+        pytest.skip(_unavailable[backend.name])
+    try:
+        model = backend.load("openai/whisper-tiny", "cpu", precision)
+    except OSError as e:
+        # A failed fixture is retried for every test; remember it so the download is tried once
+        _unavailable[backend.name] = f"whisper-tiny is not available for {backend.name}: {e}"
+        pytest.skip(_unavailable[backend.name])
+    yield backend, model
+    backend.release(model)
+
+
+def assert_result(result, duration: float) -> None:
+    """A result is a dict with text and chunks timed within the audio."""
+    assert isinstance(result, dict)
+    assert isinstance(result["text"], str)
+    for chunk in result.get("chunks") or []:
+        assert isinstance(chunk["text"], str)
+        start, end = chunk["timestamp"]
+        assert 0.0 <= start <= duration + 1.0
+        assert end is None or start <= end <= duration + 1.0
+
+
+class TestBackendConformance:
+    """The contract ModelManager and the transcriber rely on, checked for every backend."""
+
+    def test_one_result_per_input_in_order(self, loaded):
+        """Test a batch returns one well-formed result per input, in input order."""
+        backend, model = loaded
+        audio = [speech_like(1.0, 1), speech_like(3.0, 2), speech_like(0.3, 3)]
+        results = backend.transcribe(model, audio, SAMPLE_RATE, "en", batch_size=len(audio))
+        assert len(results) == len(audio)
+        for result, clip in zip(results, audio):
+            assert_result(result, len(clip) / SAMPLE_RATE)
+
+        # Order is kept: the last input transcribed alone gives the batch's last result
+        alone = backend.transcribe(model, audio[2:], SAMPLE_RATE, "en")
+        assert alone[0]["text"] == results[2]["text"]
+
+    def test_deterministic(self, loaded):
+        """Test the same audio always gives the same result."""
+        backend, model = loaded
+        audio = [speech_like(2.0, 4)]
+        first = backend.transcribe(model, audio, SAMPLE_RATE, "en")
+        second = backend.transcribe(model, audio, SAMPLE_RATE, "en")
+        assert first == second
+
+    def test_streamed_text_matches_result(self, loaded):
+        """Test text reported while decoding adds up to the final text."""
+        backend, model = loaded
+        pieces = []
+        result = backend.transcribe(
+            model, [speech_like(2.0, 5)], SAMPLE_RATE, "en", on_text=pieces.append
+        )[0]
+        assert_result(result, 2.0)
+        assert all(isinstance(piece, str) for piece in pieces)
+        assert "".join(pieces).split() == result["text"].split()
+
+    def test_long_form_chunked(self, loaded):
+        """Test long audio with chunk settings gives one result on the audio's timeline."""
+        backend, model = loaded
+        results = backend.transcribe(
+            model,
+            [speech_like(45.0, 6)],
+            SAMPLE_RATE,
+            None,
+            batch_size=2,
+            chunk_length_s=10.0,
+            stride_length_s=2.0,
+        )
+        assert len(results) == 1
+        assert_result(results[0], 45.0)
+        starts = [chunk["timestamp"][0] for chunk in results[0].get("chunks") or []]
+        assert starts == sorted(starts)
+
+    def test_language_probabilities(self, loaded):
+        """Test language identification gives a probability per language code."""
+        backend, model = loaded
+        probabilities = backend.detect_language(model, speech_like(2.0, 7), SAMPLE_RATE)
+        assert probabilities
+        assert all(isinstance(code, str) and "|" not in code for code in probabilities)
+        assert sum(probabilities.values()) == pytest.approx(1.0, abs=0.01)
+
+    def test_memory_estimates(self, loaded):
+        """Test estimates are positive and shrink with precision, and measurement never fails."""
+        backend, model = loaded
+        parameters = ModelManager.MODEL_PARAMETERS["openai/whisper-tiny"]
+        fp32 = backend.estimate_bytes(parameters, "cpu", "fp32")
+        assert fp32 > parameters
+        assert backend.estimate_bytes(parameters, "cpu", "int8") < fp32
+        assert backend.measure_bytes(model) >= 0
+
+
+class TestCTranslate2Backend:
+    """Tests for the CTranslate2 backend's handling of faster-whisper output."""
+
+    @pytest.fixture
+    def backend(self):
+        with patch.object(inference_backend, "faster_whisper", Mock()):
+            yield CTranslate2Backend()
+
+    @staticmethod
+    def fake_model(texts):
+        segments = [
+            SimpleNamespace(start=2.0 * i, end=2.0 * i + 1.5, text=text)
+            for i, text in enumerate(texts)
+        ]
+        model = Mock()
+        model.transcribe.side_effect = lambda audio, **kwargs: (iter(segments), None)
+        return model
+
+    def test_segments_become_chunks(self, backend):
+        """Test segments map to pipeline-shaped results decoded greedily."""
+        model = self.fake_model([" Aisle three.", " Shelf four."])
+        results = backend.transcribe(model, [speech_like(4.0)] * 2, SAMPLE_RATE, "en")
+        assert len(results) == 2
+        assert results[0]["text"] == " Aisle three. Shelf four."
+        assert results[0]["chunks"][1] == {"text": " Shelf four.", "timestamp": (2.0, 3.5)}
+        kwargs = model.transcribe.call_args.kwargs
+        assert kwargs["language"] == "en"
+        assert kwargs["beam_size"] == 1
+        assert kwargs["temperature"] == 0.0
+
+    def test_streams_segments(self, backend):
+        """Test each decoded segment is reported as it arrives."""
+        pieces = []
+        model = self.fake_model([" Aisle three.", " Shelf four."])
+        backend.transcribe(model, [speech_like(4.0)], SAMPLE_RATE, None, on_text=pieces.append)
+        assert pieces == [" Aisle three.", " Shelf four."]
+
+    def test_detect_language(self, backend):
+        """Test language detection runs on the first window and strips token markup."""
+        model = Mock()
+        model.model.is_multilingual = True
+        model.feature_extractor.return_value = np.zeros((80, 4500), dtype=np.float32)
+        model.feature_extractor.nb_max_frames = 3000
+        model.model.detect_language.return_value = [[("<|de|>", 0.9), ("<|en|>", 0.1)]]
+        probabilities = backend.detect_language(model, speech_like(45.0), SAMPLE_RATE)
+        assert probabilities == {"de": 0.9, "en": 0.1}
+        assert model.encode.call_args.args[0].shape == (80, 3000)
+
+    def test_requires_16khz(self, backend):
+        """Test audio at another rate is rejected rather than mistimed."""
+        with pytest.raises(ValueError):
+            backend.transcribe(self.fake_model([]), [speech_like(1.0)], 8000, None)
+
+    def test_loads_converted_size_with_precision(self, backend):
+        """Test checkpoints map to faster-whisper sizes and CPU precision to compute type."""
+        backend.load("openai/whisper-large-v3", "cpu", "int8")
+        args, kwargs = inference_backend.faster_whisper.WhisperModel.call_args
+        assert args == ("large-v3",)
+        assert kwargs["device"] == "cpu"
+        assert kwargs["compute_type"] == "int8"
+
+
+class TestBackendSelection:
+    """Tests for choosing backends per model."""
+
+    def test_parse_backends(self):
+        """Test a default plus per-model overrides, and unknown backends."""
+        assert parse_backends("transformers,whisper-small:CTranslate2") == {
+            "*": "transformers",
+            "whisper-small": "ctranslate2",
+        }
+        with pytest.raises(ValueError):
+            parse_backends("onnx")
+
+    def test_missing_runtime_fails_at_startup(self):
+        """Test selecting ctranslate2 without faster-whisper fails when the manager is built."""
+        with patch.object(inference_backend, "faster_whisper", None):
+            with pytest.raises(ValueError, match="faster-whisper"):
+                create_backend("ctranslate2")
+            with pytest.raises(ValueError):
+                ModelManager(inference_backend="whisper-small:ctranslate2")
+
+    def test_manager_routes_models_to_backends(self):
+        """Test each model loads through its configured backend and reports it."""
+        with patch.object(inference_backend, "faster_whisper", Mock()):
+            manager = ModelManager(inference_backend="transformers,whisper-1:ctranslate2")
+        assert manager.backend_for("openai/whisper-large-v3").name == "ctranslate2"
+        assert manager.backend_for("openai/whisper-small").name == "transformers"
+
+        backend = manager.backend_for("openai/whisper-small")
+        with patch.object(backend, "load", return_value=Mock()) as load:
+            model, _ = manager.get_model("whisper-small")
+        assert load.call_args.args[0] == "openai/whisper-small"
+        assert model.backend is backend
+        info = manager.get_cache_info()["models"]["openai/whisper-small"]
+        assert info["backend"] == "transformers"
@@ -0,0 +1,180 @@
+"""Unit tests for the inference executor."""
+import asyncio
+import threading
+import time
+import pytest
+from services.inference_executor import (
+    InferenceExecutor,
+    QueueFullError,
+    current_client,
+    parse_client_weights,
+    set_current_client,
+)
+
+
+@pytest.fixture
+def executor():
+    """Create an executor with one worker and one queue slot."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, retry_after_seconds=3)
+    yield executor
+    executor.shutdown()
+
+
+class TestAdmission:
+    """Tests for bounded admission."""
+
+    def test_admit_within_capacity(self, executor):
+        """Test requests are admitted up to workers plus queue size."""
+        with executor.admit():
+            with executor.admit():
+                assert executor.get_stats()["pending"] == 2
+        assert executor.get_stats()["pending"] == 0
+
+    def test_reject_when_full(self, executor):
+        """Test requests beyond capacity are rejected with a retry hint."""
+        with executor.admit(), executor.admit():
+            with pytest.raises(QueueFullError) as exc_info:
+                with executor.admit():
+                    pass
+        assert exc_info.value.retry_after == 3
+        assert executor.get_stats()["rejected"] == 1
+
+    def test_slot_released_on_error(self, executor):
+        """Test a failing request still releases its slot."""
+        with pytest.raises(RuntimeError):
+            with executor.admit():
+                raise RuntimeError("boom")
+        assert executor.get_stats()["pending"] == 0
+
+
+class TestRun:
+    """Tests for running work on the inference pool."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop(self, executor):
+        """Test callables execute on a worker thread, not the loop thread."""
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_loop_stays_responsive(self, executor):
+        """Test the event loop keeps running while inference blocks."""
+        release = threading.Event()
+        task = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        release.set()
+        assert await task is True
+
+    @pytest.mark.asyncio
+    async def test_retry_after_uses_observed_duration(self, executor):
+        """Test Retry-After is estimated from recent inference durations."""
+        await executor.run(lambda: None)
+        assert executor.get_stats()["avg_duration"] is not None
+        with executor.admit(), executor.admit():
+            with pytest.raises(QueueFullError) as exc_info:
+                with executor.admit():
+                    pass
+        assert exc_info.value.retry_after >= 1
+
+
+async def run_as(executor, client, fn, *args):
+    """Run fn on the executor for a client (call in its own task)."""
+    set_current_client(client)
+    return await executor.run(fn, *args)
+
+
+def work(order, name, seconds=0.01):
+    """A call that takes a while and records the order calls ran in."""
+    def call():
+        time.sleep(seconds)
+        order.append(name)
+    return call
+
+
+class TestFairQueueing:
+    """Tests for weighted fair queueing of calls across clients."""
+
+    @pytest.mark.asyncio
+    async def test_short_call_overtakes_another_clients_backlog(self, executor):
+        """Test a new client's call runs before the rest of a busy client's backlog."""
+        release = threading.Event()
+        order = []
+        blocker = asyncio.ensure_future(run_as(executor, "batch", release.wait, 5))
+        backlog = [
+            asyncio.ensure_future(run_as(executor, "batch", work(order, f"batch-{i}")))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        command = asyncio.ensure_future(run_as(executor, "voice", work(order, "voice")))
+        await asyncio.sleep(0.01)
+
+        clients = executor.get_stats()["clients"]
+        assert clients["batch"]["running"] == 1
+        assert clients["batch"]["queued"] == 3
+        assert clients["voice"]["queued"] == 1
+        assert executor.get_stats()["waiting_calls"] == 4
+
+        release.set()
+        await asyncio.gather(blocker, command, *backlog)
+        assert order == ["voice", "batch-0", "batch-1", "batch-2"]
+        # Clients without work or debt are forgotten
+        assert set(executor.get_stats()["clients"]) <= {"batch"}
+
+    @pytest.mark.asyncio
+    async def test_weights_share_workers(self):
+        """Test a client with twice the weight gets about twice the worker time."""
+        executor = InferenceExecutor(max_workers=1, client_weights={"gold": 2.0})
+        release = threading.Event()
+        order = []
+        try:
+            blocker = asyncio.ensure_future(run_as(executor, "warmup", release.wait, 5))
+            calls = [
+                asyncio.ensure_future(run_as(executor, client, work(order, client)))
+                for _ in range(9)
+                for client in ("gold", "standard")
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(blocker, *calls)
+        finally:
+            executor.shutdown()
+        assert order[:9].count("gold") in (5, 6, 7)
+
+    @pytest.mark.asyncio
+    async def test_calls_run_in_the_callers_client(self, executor):
+        """Test calls outside any request are queued as internal work."""
+        assert await executor.run(current_client) is None
+        assert await run_as(executor, "10.0.0.1", current_client) == "10.0.0.1"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_never_runs(self, executor):
+        """Test a call whose caller stopped waiting is skipped when a worker frees up."""
+        release = threading.Event()
+        order = []
+        blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+        abandoned = asyncio.ensure_future(run_as(executor, "gone", work(order, "gone")))
+        await asyncio.sleep(0.01)
+        abandoned.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        await blocker
+        assert await executor.run(work(order, "next")) is None
+        assert order == ["next"]
+        assert executor.get_stats()["waiting_calls"] == 0
+
+
+class TestParseClientWeights:
+    """Tests for the FAIR_QUEUE_WEIGHTS spec."""
+
+    def test_pairs(self):
+        """Test client:weight pairs, including IPv6 clients, and empty for none."""
+        assert parse_client_weights("") == {}
+        assert parse_client_weights("10.0.0.5:4, ::1:0.5") == {"10.0.0.5": 4.0, "::1": 0.5}
+
+    @pytest.mark.parametrize("spec", ["10.0.0.5", "10.0.0.5:0", "10.0.0.5:fast", ":2"])
+    def test_invalid_entry(self, spec):
+        """Test entries without a client or a positive weight are rejected."""
+        with pytest.raises(ValueError, match="client:weight"):
+            parse_client_weights(spec)
@@ -0,0 +1,161 @@
+"""Unit tests for language identification of auto-language requests."""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from transformers import (
+    GenerationConfig,
+    WhisperConfig as WhisperModelConfig,
+    WhisperFeatureExtractor,
+    WhisperForConditionalGeneration,
+)
+
+from services import language_id
+from services.inference_backend import TransformersBackend
+from services.language_id import LanguageIdentifier
+from services.stub_pipeline import StubBackend, StubModelManager
+
+SAMPLE_RATE = 16000
+
+
+def speech(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+@pytest.fixture
+def manager():
+    return StubModelManager()
+
+
+def identify(identifier, manager, client="10.0.0.1", model="whisper-large", seconds=3.0):
+    return identifier.identify(manager, client, model, speech(seconds), SAMPLE_RATE)
+
+
+class TestLanguageIdentifier:
+    """Tests for identifying and remembering client languages."""
+
+    def test_confident_language_remembered_per_client(self, manager):
+        """Test a confident language is returned and remembered for that client only."""
+        identifier = LanguageIdentifier()
+        assert identifier.cached_language("10.0.0.1") is None
+        assert identify(identifier, manager) == "en"
+        assert identifier.cached_language("10.0.0.1") == "en"
+        assert identifier.cached_language("10.0.0.2") is None
+
+        stats = identifier.get_stats()
+        assert stats["identified"] == 1
+        assert stats["cache_hits"] == 1
+        assert stats["clients"] == 1
+        # Identified on the small model, loaded through the shared cache
+        assert "openai/whisper-tiny" in manager.get_cache_info()["models"]
+
+    def test_uncertain_language_falls_back(self, manager):
+        """Test below the threshold no language is used or remembered."""
+        identifier = LanguageIdentifier(min_confidence=0.8)
+        with patch.object(StubBackend, "detect_language", return_value={"en": 0.6, "de": 0.4}):
+            assert identify(identifier, manager) is None
+        assert identifier.cached_language("10.0.0.1") is None
+        assert identifier.get_stats()["uncertain"] == 1
+
+    def test_failure_falls_back(self, manager):
+        """Test a failed identification leaves the language to the main model."""
+        identifier = LanguageIdentifier()
+        with patch.object(StubBackend, "detect_language", side_effect=ValueError("English-only")):
+            assert identify(identifier, manager) is None
+        assert identifier.get_stats()["errors"] == 1
+
+    def test_only_first_seconds_used(self, manager):
+        """Test identification sees at most sample_seconds of speech."""
+        identifier = LanguageIdentifier(sample_seconds=5.0)
+        with patch.object(StubBackend, "detect_language", return_value={"en": 1.0}) as detect:
+            identify(identifier, manager, seconds=30.0)
+        audio, sampling_rate = detect.call_args.args[1:]
+        assert len(audio) == 5 * SAMPLE_RATE
+        assert sampling_rate == SAMPLE_RATE
+
+    def test_same_model_skipped(self, manager):
+        """Test requests for the identification model itself are not identified twice."""
+        identifier = LanguageIdentifier(model_name="whisper-tiny")
+        assert identify(identifier, manager, model="whisper-tiny") is None
+        assert identifier.get_stats()["skipped"] == 1
+        assert manager.get_cache_info()["models"] == {}
+
+    def test_expiry_and_client_limit(self, manager):
+        """Test remembered languages expire and the least recently seen client goes first."""
+        identifier = LanguageIdentifier(cache_ttl_seconds=60.0, max_clients=2)
+        for client in ("a", "b"):
+            identify(identifier, manager, client=client)
+        identifier.cached_language("a")
+        identify(identifier, manager, client="c")
+        assert identifier.cached_language("b") is None
+        assert identifier.cached_language("a") == "en"
+
+        later = language_id.time.time() + 61.0
+        with patch.object(language_id.time, "time", return_value=later):
+            assert identifier.cached_language("a") is None
+
+        never = LanguageIdentifier(cache_ttl_seconds=0)
+        assert identify(never, manager) == "en"
+        assert never.cached_language("10.0.0.1") is None
+
+    def test_unsupported_model(self):
+        """Test an unknown identification model fails at startup."""
+        with pytest.raises(ValueError):
+            LanguageIdentifier(model_name="whisper-nano")
+
+
+class TestTransformersLanguageDetection:
+    """Tests for the transformers backend's language probabilities."""
+
+    def test_probabilities_match_whisper_detection(self):
+        """Test probabilities cover the languages and peak where Whisper's detection does."""
+        torch.manual_seed(0)
+        config = WhisperModelConfig(
+            vocab_size=64,
+            d_model=32,
+            encoder_layers=1,
+            decoder_layers=1,
+            encoder_attention_heads=2,
+            decoder_attention_heads=2,
+            encoder_ffn_dim=64,
+            decoder_ffn_dim=64,
+            max_target_positions=32,
+            pad_token_id=0,
+            bos_token_id=1,
+            eos_token_id=2,
+            decoder_start_token_id=1,
+            init_std=0.3,
+        )
+        model = WhisperForConditionalGeneration(config).eval()
+        model.generation_config = GenerationConfig(
+            decoder_start_token_id=1,
+            lang_to_id={"<|en|>": 10, "<|de|>": 11, "<|fr|>": 12},
+        )
+        pipe = SimpleNamespace(
+            model=model, feature_extractor=WhisperFeatureExtractor(feature_size=80)
+        )
+        rng = np.random.default_rng(0)
+        audio = rng.normal(0.0, 0.1, 2 * SAMPLE_RATE).astype(np.float32)
+
+        probabilities = TransformersBackend().detect_language(pipe, audio, SAMPLE_RATE)
+        assert set(probabilities) == {"en", "de", "fr"}
+        assert sum(probabilities.values()) == pytest.approx(1.0)
+
+        features = pipe.feature_extractor(
+            audio, sampling_rate=SAMPLE_RATE, return_tensors="pt"
+        ).input_features
+        detected = model.detect_language(input_features=features)[0].item()
+        best = max(probabilities, key=probabilities.get)
+        assert model.generation_config.lang_to_id[f"<|{best}|>"] == detected
+
+    def test_english_only_model_rejected(self):
+        """Test models without language tokens cannot identify languages."""
+        model = SimpleNamespace(
+            generation_config=GenerationConfig(),
+            config=SimpleNamespace(name_or_path="openai/whisper-tiny.en"),
+        )
+        pipe = SimpleNamespace(model=model, feature_extractor=None)
+        with pytest.raises(ValueError, match="multilingual"):
+            TransformersBackend().detect_language(pipe, speech(1.0), SAMPLE_RATE)
@@ -0,0 +1,109 @@
+"""Unit tests for the Prometheus metrics service."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.metrics import (
+    REGISTRY,
+    MetricsMiddleware,
+    observe_transcription,
+    render_metrics,
+    time_stage,
+)
+
+
+def sample(name: str, **labels) -> float:
+    """Return the current value of a sample, 0 if it was never recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_time_stage_observes_histogram():
+    """Test each timed block adds one observation to its stage."""
+    before = sample("whisper_stage_duration_seconds_count", stage="decode")
+    with time_stage("decode"):
+        pass
+    assert sample("whisper_stage_duration_seconds_count", stage="decode") == before + 1
+
+
+def test_time_stage_observes_on_error():
+    """Test a stage that raises is still timed."""
+    before = sample("whisper_stage_duration_seconds_count", stage="inference")
+    with pytest.raises(RuntimeError):
+        with time_stage("inference"):
+            raise RuntimeError("boom")
+    assert sample("whisper_stage_duration_seconds_count", stage="inference") == before + 1
+
+
+def test_observe_transcription_records_real_time_factor():
+    """Test audio duration and real-time factor are both recorded."""
+    before = sample("whisper_real_time_factor_sum")
+    observe_transcription(10.0, 2.0)
+    assert sample("whisper_real_time_factor_sum") == pytest.approx(before + 0.2)
+
+
+def test_render_includes_service_statistics():
+    """Test rate limit, queue, batching and model cache statistics are exported at scrape time."""
+    body = render_metrics(
+        model_cache={
+            "cache_size": 1,
+            "max_cache_size": 3,
+            "cache_bytes": 100,
+            "max_cache_bytes": 1000,
+            "batch_size": 4,
+            "loading_models": ["whisper-small"],
+            "hits": 7,
+            "misses": 2,
+            "coalesced_loads": 1,
+            "load_failures": 0,
+            "evictions": 3,
+            "idle_unloads": 0,
+            "models": {"whisper-tiny": {"size_bytes": 100, "refcount": 1, "hits": 7}},
+        },
+        inference={
+            "pending": 2,
+            "running": 1,
+            "queued": 1,
+            "max_workers": 1,
+            "max_queue_size": 8,
+            "rejected": 5,
+            "waiting_calls": 1,
+            "clients": {"10.0.0.1": {}, "10.0.0.2": {}},
+        },
+        batching={"pending_batches": 0, "pending_items": 0, "in_flight_batches": 1, "batches_run": 9},
+        rate_limit={"limit": 10, "window_seconds": 60.0, "allowed": 40, "limited": 3, "clients": 2},
+    ).decode()
+
+    assert "whisper_inference_queued 1.0" in body
+    assert "whisper_inference_rejected_total 5.0" in body
+    assert "whisper_model_cache_evictions_total 3.0" in body
+    assert "whisper_model_loading 1.0" in body
+    assert 'whisper_model_size_bytes{model="whisper-tiny"} 100.0' in body
+    assert "whisper_batch_in_flight_batches 1.0" in body
+    assert "whisper_inference_clients 2.0" in body
+    assert "whisper_rate_limit_limited_total 3.0" in body
+    assert "whisper_rate_limit_requests 10.0" in body
+
+
+def test_middleware_labels_route_template():
+    """Test requests are labelled by route template and status, not raw path."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    before = sample(
+        "whisper_http_request_duration_seconds_count", method="GET", route="/items/{item_id}", status="200"
+    )
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert sample(
+        "whisper_http_request_duration_seconds_count", method="GET", route="/items/{item_id}", status="200"
+    ) == before + 2
+    assert sample(
+        "whisper_http_request_duration_seconds_count", method="GET", route="unmatched", status="404"
+    ) >= 1
+    assert sample("whisper_http_requests_in_flight") == 0
@@ -0,0 +1,227 @@
+"""Unit tests for the model manager cache."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from unittest.mock import Mock, patch
+from services.model_manager import ModelManager
+
+MB = 1024 * 1024
+
+# Fake resident sizes per underlying model
+MODEL_SIZES = {
+    "openai/whisper-tiny": 100 * MB,
+    "openai/whisper-small": 300 * MB,
+    "openai/whisper-medium": 800 * MB,
+    "openai/whisper-large-v3": 1600 * MB,
+}
+
+
+def make_manager(**kwargs) -> ModelManager:
+    """Create a ModelManager whose loads return fake pipelines of known size."""
+    manager = ModelManager(**kwargs)
+    manager._load_model = Mock(side_effect=lambda name: (Mock(name=name), 2))
+    manager._estimate_model_bytes = lambda key: MODEL_SIZES[key]
+    manager._measure_model_bytes = lambda pipe, key: MODEL_SIZES[key]
+    return manager
+
+
+class TestLruEviction:
+    """Tests for byte-budgeted LRU eviction."""
+
+    def test_aliases_share_one_model(self):
+        """Test whisper-1 and whisper-large reuse the same loaded model."""
+        manager = make_manager()
+        first, _ = manager.get_model("whisper-1")
+        second, _ = manager.get_model("whisper-large")
+        assert first is second
+        assert manager._load_model.call_count == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used model is evicted, not the oldest loaded."""
+        manager = make_manager(max_cache_bytes=1100 * MB)
+        manager.get_model("whisper-tiny")
+        manager.get_model("whisper-small")
+        manager.get_model("whisper-tiny")  # tiny is now most recently used
+        manager.get_model("whisper-medium")
+
+        cached = manager.get_cache_info()["cached_models"]
+        assert "openai/whisper-tiny" in cached
+        assert "openai/whisper-small" not in cached
+        assert "openai/whisper-medium" in cached
+
+    def test_evicts_until_budget_fits(self):
+        """Test as many models as needed are evicted to fit a large one."""
+        manager = make_manager(max_cache_bytes=1700 * MB)
+        manager.get_model("whisper-tiny")
+        manager.get_model("whisper-small")
+        manager.get_model("whisper-large")
+
+        info = manager.get_cache_info()
+        assert info["cached_models"] == ["openai/whisper-large-v3"]
+        assert info["evictions"] == 2
+        assert info["cache_bytes"] <= 1700 * MB
+
+    def test_pinned_models_are_not_evicted(self):
+        """Test a model in use by an inference survives eviction pressure."""
+        manager = make_manager(max_cache_bytes=1000 * MB)
+        with manager.use_model("whisper-medium"):
+            manager.get_model("whisper-small")
+            assert "openai/whisper-medium" in manager.get_cache_info()["cached_models"]
+        assert manager.get_cache_info()["models"]["openai/whisper-medium"]["refcount"] == 0
+
+    def test_resident_model_is_never_evicted(self):
+        """Test the resident model stays loaded under pressure."""
+        manager = make_manager(max_cache_bytes=1000 * MB, resident_model="whisper-tiny")
+        manager.get_model("whisper-tiny")
+        manager.get_model("whisper-medium")
+        manager.get_model("whisper-small")
+
+        cached = manager.get_cache_info()["cached_models"]
+        assert "openai/whisper-tiny" in cached
+        assert "openai/whisper-medium" not in cached
+
+
+class TestIdleUnloading:
+    """Tests for idle TTL unloading."""
+
+    def test_unloads_idle_models(self):
+        """Test models idle past the TTL are unloaded, except the resident one."""
+        manager = make_manager(idle_ttl_seconds=60, resident_model="whisper-tiny")
+        manager.get_model("whisper-tiny")
+        manager.get_model("whisper-small")
+
+        with patch("services.model_manager.time.time", return_value=time.time() + 120):
+            unloaded = manager.unload_idle()
+
+        assert unloaded == ["openai/whisper-small"]
+        assert manager.get_cache_info()["cached_models"] == ["openai/whisper-tiny"]
+
+    def test_no_ttl_keeps_models(self):
+        """Test nothing is unloaded when no TTL is configured."""
+        manager = make_manager()
+        manager.get_model("whisper-small")
+        assert manager.unload_idle() == []
+
+
+class TestCacheInfo:
+    """Tests for get_cache_info."""
+
+    def test_reports_per_model_stats(self):
+        """Test per-model bytes, hits and last use are reported."""
+        manager = make_manager()
+        manager.get_model("whisper-tiny")
+        manager.get_model("whisper-tiny")
+
+        info = manager.get_cache_info()
+        model_info = info["models"]["openai/whisper-tiny"]
+        assert model_info["size_bytes"] == 100 * MB
+        assert model_info["hits"] == 1
+        assert model_info["last_used"] >= model_info["loaded_at"]
+        assert info["hits"] == 1
+        assert info["misses"] == 1
+
+    def test_unsupported_model(self):
+        """Test unsupported model names raise ValueError."""
+        with pytest.raises(ValueError):
+            make_manager().get_model("whisper-huge")
+
+
+class TestSingleFlightLoading:
+    """Tests for per-model loading without the global cache lock."""
+
+    def _blocking_manager(self, release: threading.Event, started: threading.Event, **kwargs):
+        """Create a manager whose whisper-large load blocks until released."""
+        manager = make_manager(**kwargs)
+
+        def load(name):
+            if name == "whisper-large":
+                started.set()
+                release.wait(5)
+            return Mock(name=name), 2
+
+        manager._load_model = Mock(side_effect=load)
+        return manager
+
+    def test_cached_model_served_during_slow_load(self):
+        """Test a cached model is returned while another model is loading."""
+        release, started = threading.Event(), threading.Event()
+        manager = self._blocking_manager(release, started)
+        manager.get_model("whisper-tiny")
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            slow = pool.submit(manager.get_model, "whisper-large")
+            assert started.wait(5)
+            start_time = time.perf_counter()
+            manager.get_model("whisper-tiny")
+            assert time.perf_counter() - start_time < 1
+            assert manager.get_cache_info()["loading_models"] == ["openai/whisper-large-v3"]
+            release.set()
+            slow.result(5)
+
+    def test_concurrent_requests_share_one_load(self):
+        """Test concurrent requests for a loading model wait on a single load."""
+        release, started = threading.Event(), threading.Event()
+        manager = self._blocking_manager(release, started)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(manager.get_model, "whisper-large") for _ in range(4)]
+            assert started.wait(5)
+            time.sleep(0.05)
+            release.set()
+            pipes = {id(future.result(5)[0]) for future in futures}
+
+        assert len(pipes) == 1
+        assert manager._load_model.call_count == 1
+        info = manager.get_cache_info()
+        assert info["misses"] == 1
+        assert info["coalesced_loads"] == 3
+
+    def test_failed_load_propagates_and_is_not_cached(self):
+        """Test a failed load raises in every waiter and the next request retries."""
+        release, started = threading.Event(), threading.Event()
+        manager = make_manager()
+
+        def failing_load(name):
+            started.set()
+            release.wait(5)
+            raise RuntimeError("download failed")
+
+        manager._load_model = Mock(side_effect=failing_load)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(manager.get_model, "whisper-small") for _ in range(2)]
+            assert started.wait(5)
+            time.sleep(0.05)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError, match="download failed"):
+                    future.result(5)
+
+        info = manager.get_cache_info()
+        assert info["cached_models"] == []
+        assert info["loading_models"] == []
+        assert info["load_failures"] == 1
+
+        manager._load_model = Mock(return_value=(Mock(), 2))
+        manager.get_model("whisper-small")
+        assert manager.get_cache_info()["cached_models"] == ["openai/whisper-small"]
+
+    def test_in_flight_load_counts_against_budget(self):
+        """Test a load that is still running reserves its estimated size."""
+        release, started = threading.Event(), threading.Event()
+        manager = self._blocking_manager(release, started, max_cache_bytes=1950 * MB)
+        manager.get_model("whisper-tiny")
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            slow = pool.submit(manager.get_model, "whisper-large")
+            assert started.wait(5)
+            # tiny + small fit on their own, but not next to the large model being loaded
+            manager.get_model("whisper-small")
+            assert manager.get_cache_info()["cached_models"] == ["openai/whisper-small"]
+            release.set()
+            slow.result(5)
+
+        assert sorted(manager.get_cache_info()["cached_models"]) == [
+            "openai/whisper-large-v3",
+            "openai/whisper-small",
+        ]
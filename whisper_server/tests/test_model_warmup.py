@@ -0,0 +1,98 @@
+"""Unit tests for startup model warm-up."""
+import io
+import pytest
+import soundfile as sf
+from unittest.mock import MagicMock, Mock
+from services.audio_processor import AudioProcessor
+from services.inference_executor import InferenceExecutor
+from services.model_manager import ModelManager
+from services.model_warmup import ModelWarmup, synthetic_speech_wav
+
+
+@pytest.fixture
+def executor():
+    """Create a single-worker executor."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def model_manager():
+    """Create a mock ModelManager whose model fails to load for whisper-large."""
+    mock = MagicMock(spec=ModelManager)
+    pipe = Mock()
+    pipe.transcribe.return_value = [{"text": "warm"}]
+
+    def use_model(name):
+        if name == "whisper-large":
+            raise RuntimeError("out of memory")
+        context = MagicMock()
+        context.__enter__.return_value = (pipe, 2)
+        return context
+
+    mock.use_model.side_effect = use_model
+    mock.replica_count = 1
+    mock.pipe = pipe
+    return mock
+
+
+class TestSyntheticSpeech:
+    """Tests for the warm-up audio."""
+
+    def test_is_48khz_stereo_wav(self):
+        """Test the warm-up audio matches the app's recording format."""
+        audio, sr = sf.read(io.BytesIO(synthetic_speech_wav(duration=1.0)))
+        assert sr == 48000
+        assert audio.shape == (48000 + 2 * 12000, 2)
+
+    def test_survives_full_preprocessing(self):
+        """Test the voiced part is kept and resampled to 16kHz."""
+        audio = AudioProcessor().preprocess(synthetic_speech_wav(duration=1.0), "wav")
+        assert 15000 < len(audio) <= 24000
+
+
+class TestModelWarmup:
+    """Tests for ModelWarmup."""
+
+    def test_ready_before_start(self, model_manager, executor):
+        """Test a server without preloading is ready immediately."""
+        warmup = ModelWarmup(model_manager, AudioProcessor(), executor)
+        assert warmup.is_ready
+        assert warmup.get_status() == {"ready": True, "warm_models": [], "models": {}}
+
+    @pytest.mark.asyncio
+    async def test_warms_models_in_order(self, model_manager, executor):
+        """Test each model runs one transcription of preprocessed audio."""
+        warmup = ModelWarmup(model_manager, AudioProcessor(), executor)
+        task = warmup.start(["whisper-tiny", "whisper-small"])
+        assert not warmup.is_ready
+        assert warmup.get_status()["models"]["whisper-tiny"]["status"] == "pending"
+
+        await task
+
+        status = warmup.get_status()
+        assert status["ready"]
+        assert status["warm_models"] == ["whisper-tiny", "whisper-small"]
+        assert [c.args[0] for c in model_manager.use_model.call_args_list] == [
+            "whisper-tiny",
+            "whisper-small",
+        ]
+        audio_arrays, sampling_rate, language = model_manager.pipe.transcribe.call_args.args
+        assert len(audio_arrays) == 1
+        assert sampling_rate == 16000
+        assert language is None
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded_and_does_not_block_readiness(
+        self, model_manager, executor
+    ):
+        """Test a model that fails to warm up is reported without blocking the rest."""
+        warmup = ModelWarmup(model_manager, AudioProcessor(), executor)
+        await warmup.start(["whisper-large", "whisper-tiny"])
+
+        status = warmup.get_status()
+        assert status["ready"]
+        assert status["warm_models"] == ["whisper-tiny"]
+        assert status["models"]["whisper-large"]["status"] == "failed"
+        assert "out of memory" in status["models"]["whisper-large"]["error"]
@@ -0,0 +1,113 @@
+"""Unit tests for per-client token bucket rate limiting."""
+import pytest
+
+from services.rate_limiter import RateLimiter, RateLimitExceededError, parse_window
+
+
+class Clock:
+    """Monotonic clock the test advances by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+class TestParseWindow:
+    """Tests for the RATE_LIMIT_WINDOW format."""
+
+    @pytest.mark.parametrize(
+        "spec, seconds",
+        [
+            ("1 minute", 60.0),
+            ("30 seconds", 30.0),
+            ("2 hours", 7200.0),
+            ("hour", 3600.0),
+            ("1 day", 86400.0),
+            ("90", 90.0),
+            ("1.5m", 90.0),
+            (" 10 Secs ", 10.0),
+        ],
+    )
+    def test_valid(self, spec, seconds):
+        """Test counts with units, units alone and plain seconds."""
+        assert parse_window(spec) == seconds
+
+    @pytest.mark.parametrize("spec", ["", "minute 1", "1 fortnight", "-5 seconds", "0 minutes"])
+    def test_invalid(self, spec):
+        """Test unknown units, malformed and non-positive windows are rejected."""
+        with pytest.raises(ValueError):
+            parse_window(spec)
+
+
+class TestRateLimiter:
+    """Tests for token buckets."""
+
+    def test_burst_then_limited(self, clock):
+        """Test a client may use its whole limit at once, then waits for the next token."""
+        limiter = RateLimiter(requests=3, window_seconds=60.0, clock=clock)
+        assert [limiter.acquire("a") for _ in range(3)] == [2, 1, 0]
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            limiter.acquire("a")
+        assert exc_info.value.retry_after == 20
+        # Other clients have their own buckets
+        assert limiter.acquire("b") == 2
+
+    def test_refills_at_the_configured_rate(self, clock):
+        """Test tokens come back continuously and never beyond the limit."""
+        limiter = RateLimiter(requests=3, window_seconds=60.0, clock=clock)
+        for _ in range(3):
+            limiter.acquire("a")
+        clock.now += 25.0
+        assert limiter.acquire("a") == 0
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            limiter.acquire("a")
+        assert exc_info.value.retry_after == 15
+        clock.now += 3600.0
+        assert limiter.acquire("a") == 2
+
+    def test_stats_report_drained_buckets(self, clock):
+        """Test stats list the emptiest buckets first and forget refilled ones."""
+        limiter = RateLimiter(requests=4, window_seconds=60.0, clock=clock)
+        for client, requests in (("a", 1), ("b", 4), ("c", 2)):
+            for _ in range(requests):
+                limiter.acquire(client)
+        with pytest.raises(RateLimitExceededError):
+            limiter.acquire("b")
+
+        stats = limiter.get_stats(top=2)
+        assert stats["allowed"] == 7
+        assert stats["limited"] == 1
+        assert stats["clients"] == 3
+        assert stats["buckets"] == {
+            "b": {"tokens": 0.0, "limited": 1},
+            "c": {"tokens": 2.0, "limited": 0},
+        }
+
+        clock.now += 30.0
+        stats = limiter.get_stats()
+        assert list(stats["buckets"]) == ["b"]
+        assert stats["buckets"]["b"]["tokens"] == 2.0
+
+    def test_client_limit(self, clock):
+        """Test the least recently used bucket is dropped beyond max_clients."""
+        limiter = RateLimiter(requests=1, window_seconds=60.0, max_clients=2, clock=clock)
+        limiter.acquire("a")
+        limiter.acquire("b")
+        limiter.acquire("c")
+        assert limiter.acquire("a") == 0
+        with pytest.raises(RateLimitExceededError):
+            limiter.acquire("c")
+
+    def test_invalid_limit(self):
+        """Test a limiter needs a positive limit and window."""
+        with pytest.raises(ValueError):
+            RateLimiter(requests=0)
+        with pytest.raises(ValueError):
+            RateLimiter(window_seconds=0)
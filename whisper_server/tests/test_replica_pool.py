@@ -0,0 +1,156 @@
+"""Unit tests for the multi-process replica pool."""
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services.replica_pool import (
+    ReplicaError,
+    ReplicaModelManager,
+    estimate_replica_bytes,
+    plan_replicas,
+)
+from services.transcriber import run_pipeline_batch, run_pipeline_streaming
+
+GB = 1024 ** 3
+
+
+class TestPlanReplicas:
+    """Tests for replica count and core assignment."""
+
+    def test_explicit_count_splits_cores_evenly(self):
+        """Test N replicas get disjoint, equal slices of the cores."""
+        plan = plan_replicas(4, list(range(32)))
+        assert plan == [list(range(i * 8, i * 8 + 8)) for i in range(4)]
+
+    def test_explicit_threads_per_replica(self):
+        """Test REPLICA_THREADS fixes the slice size."""
+        plan = plan_replicas(2, list(range(32)), threads_per_replica=6)
+        assert plan == [list(range(0, 6)), list(range(6, 12))]
+
+    def test_derived_from_cores(self):
+        """Test the derived count uses four cores per replica by default."""
+        plan = plan_replicas(0, list(range(32)))
+        assert len(plan) == 8
+        assert all(len(cores) == 4 for cores in plan)
+        assert len({core for cores in plan for core in cores}) == 32
+
+    def test_derived_count_bounded_by_memory(self):
+        """Test the derived count never exceeds what the memory budget holds."""
+        plan = plan_replicas(0, list(range(32)), memory_budget_bytes=10 * GB, replica_bytes=3 * GB)
+        assert len(plan) == 3
+
+    def test_more_replicas_than_cores_share(self):
+        """Test oversubscription wraps around the available cores."""
+        plan = plan_replicas(3, [0, 1])
+        assert plan == [[0], [1], [0]]
+
+    def test_replica_bytes_counts_each_model_once(self):
+        """Test aliases of one model are not counted twice."""
+        assert estimate_replica_bytes(["whisper-1", "whisper-large"]) == estimate_replica_bytes(
+            ["whisper-large"]
+        )
+        assert estimate_replica_bytes(["whisper-tiny", "unknown"]) > 0
+
+
+@pytest.fixture(scope="module")
+def replicas():
+    """Two stub replica processes sharing the available cores."""
+    manager = ReplicaModelManager(
+        plan_replicas(2, [0]), stub={"fixed_latency": 0.5, "seconds_per_audio_second": 0.0}
+    )
+    yield manager
+    manager.shutdown()
+
+
+def one_second(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, 0.1, 16000).astype(np.float32)
+
+
+class TestReplicaModelManager:
+    """Tests for dispatching inference to replica processes."""
+
+    def test_concurrent_batches_run_on_different_replicas(self, replicas):
+        """Test concurrent calls are routed to idle replicas and run in parallel."""
+        # Load on both replicas first so process startup is not timed
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(lambda _: replicas.get_model("whisper-small"), range(2)))
+            before = [r["completed"] for r in replicas.get_cache_info()["replicas"]]
+
+            start = time.perf_counter()
+            results = list(
+                pool.map(
+                    lambda seed: run_pipeline_batch(
+                        replicas, "whisper-small", None, 16000, [one_second(seed)]
+                    ),
+                    range(2),
+                )
+            )
+            elapsed = time.perf_counter() - start
+
+        assert all(result[0]["text"] for result in results)
+        assert elapsed < 0.9  # Two 0.5s calls in parallel, not 1.0s in series
+        after = [r["completed"] for r in replicas.get_cache_info()["replicas"]]
+        assert [a - b for a, b in zip(after, before)] == [1, 1]
+
+    def test_results_match_in_process_stub(self, replicas):
+        """Test a replica returns exactly what the pipeline returns in-process."""
+        from services.stub_pipeline import StubPipeline
+
+        audio = one_second(3)
+        result = run_pipeline_batch(replicas, "whisper-tiny", "en", 16000, [audio])
+        assert result == [StubPipeline()({"raw": audio, "sampling_rate": 16000})]
+
+    def test_streamed_text_crosses_processes(self, replicas):
+        """Test text streamed by a replica reaches the caller's callback."""
+        pieces = []
+        result = run_pipeline_streaming(
+            replicas, "whisper-small", None, 16000, one_second(4), pieces.append
+        )
+        assert pieces
+        assert "".join(pieces) == result["text"]
+
+    def test_language_detected_on_replica(self, replicas):
+        """Test language identification runs on a replica's model."""
+        with replicas.use_model("whisper-tiny") as (model, _):
+            assert model.detect_language(one_second(5), 16000) == {"en": 1.0}
+
+    def test_cache_info_sums_replicas(self, replicas):
+        """Test cache statistics are aggregated with per-replica details."""
+        info = replicas.get_cache_info()
+        assert len(info["replicas"]) == 2
+        assert all(r["alive"] and r["outstanding"] == 0 for r in info["replicas"])
+        assert "openai/whisper-small" in info["cached_models"]
+        assert info["models"]["openai/whisper-small"]["hits"] >= 2
+        assert info["max_cache_size"] == 8
+
+    def test_unsupported_model(self, replicas):
+        """Test unknown models are rejected before reaching a replica."""
+        with pytest.raises(ValueError):
+            with replicas.use_model("whisper-huge"):
+                pass
+
+    def test_replica_restarts_after_crash(self, replicas):
+        """Test a killed replica fails its request and is replaced."""
+        replica = replicas._replicas[0]
+        os.kill(replica.process.pid, signal.SIGKILL)
+        deadline = time.monotonic() + 5
+        while replica.restarts == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert replica.restarts == 1
+
+        results = [
+            run_pipeline_batch(replicas, "whisper-small", None, 16000, [one_second(seed)])
+            for seed in range(3)
+        ]
+        assert all(result[0]["text"] for result in results)
+
+    def test_no_replicas_running(self):
+        """Test requests fail clearly when no replica is running."""
+        manager = ReplicaModelManager([], stub={})
+        with pytest.raises(ReplicaError):
+            with manager.use_model("whisper-small"):
+                pass
@@ -0,0 +1,82 @@
+"""Unit tests for per-request timing and the slow-request log."""
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.metrics import time_stage
+from services.request_timing import RequestTiming, RequestTimingMiddleware
+
+
+def make_client(slow_request_ms: float = 0.0) -> TestClient:
+    """Create an app with one endpoint that records a decode stage."""
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware, slow_request_ms=slow_request_ms)
+
+    @app.get("/work")
+    async def work():
+        with time_stage("decode"):
+            pass
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestRequestTiming:
+    """Tests for the RequestTiming record."""
+
+    def test_stages_accumulate(self):
+        """Test repeated stages add up."""
+        timing = RequestTiming(request_id="r1")
+        timing.add("inference", 0.25)
+        timing.add("inference", 0.5)
+        assert timing.to_dict()["inference"] == 750.0
+
+    def test_server_timing_format(self):
+        """Test the header lists each stage and the total in milliseconds."""
+        timing = RequestTiming(request_id="r1")
+        timing.add("decode", 0.0123)
+        header = timing.server_timing()
+        assert header.startswith("decode;dur=12.3, total;dur=")
+
+
+class TestRequestTimingMiddleware:
+    """Tests for request ids, Server-Timing headers and slow-request logging."""
+
+    def test_headers_added(self):
+        """Test responses carry a generated request id and the stage breakdown."""
+        response = make_client().get("/work")
+        assert len(response.headers["x-request-id"]) == 32
+        assert "decode;dur=" in response.headers["server-timing"]
+        assert "total;dur=" in response.headers["server-timing"]
+
+    def test_client_request_id_is_reused(self):
+        """Test a well-formed X-Request-ID from the client is echoed back."""
+        response = make_client().get("/work", headers={"X-Request-ID": "app-42"})
+        assert response.headers["x-request-id"] == "app-42"
+
+    def test_malformed_request_id_is_replaced(self):
+        """Test request ids with unsafe characters are not echoed."""
+        response = make_client().get("/work", headers={"X-Request-ID": "bad id\\r\\n"})
+        assert response.headers["x-request-id"] != "bad id\\r\\n"
+
+    def test_slow_request_logged(self, caplog):
+        """Test requests over the threshold write one structured record."""
+        with caplog.at_level(logging.WARNING, logger="whisper.slow_requests"):
+            make_client(slow_request_ms=0.0001).get("/work", headers={"X-Request-ID": "slow-1"})
+
+        records = [r for r in caplog.records if r.name == "whisper.slow_requests"]
+        assert len(records) == 1
+        record = json.loads(records[0].getMessage())
+        assert record["request_id"] == "slow-1"
+        assert record["path"] == "/work"
+        assert record["status"] == 200
+        assert "decode" in record["stages_ms"]
+
+    @pytest.mark.parametrize("slow_request_ms", [0.0, 60_000.0])
+    def test_fast_or_disabled_not_logged(self, caplog, slow_request_ms):
+        """Test nothing is logged when disabled or under the threshold."""
+        with caplog.at_level(logging.WARNING, logger="whisper.slow_requests"):
+            make_client(slow_request_ms=slow_request_ms).get("/work")
+        assert not [r for r in caplog.records if r.name == "whisper.slow_requests"]
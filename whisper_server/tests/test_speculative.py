@@ -0,0 +1,262 @@
+"""Unit tests for speculative decoding with a draft model."""
+import copy
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+import torch
+from transformers import (
+    GenerationConfig,
+    WhisperConfig as WhisperModelConfig,
+    WhisperFeatureExtractor,
+    WhisperForConditionalGeneration,
+)
+
+from services import inference_backend
+from services.inference_backend import TransformersBackend
+from services.model_manager import ModelManager
+from services.speculative import (
+    DraftModel,
+    _ProjectedEncoder,
+    mel_projection,
+    parse_drafts,
+    vocabulary_maps,
+)
+from services.stub_pipeline import StubModelManager
+
+SAMPLE_RATE = 16000
+
+
+def vocabulary(extra_language: bool) -> dict:
+    """Text tokens, then specials; large-v3 style adds a language, shifting the rest."""
+    tokens = [f"t{i}" for i in range(50)] + ["<eos>", "<sot>", "<en>", "<de>"]
+    tokens += ["<yue>"] if extra_language else []
+    tokens += ["<transcribe>", "<notimestamps>"]
+    tokens += [f"<{i * 0.02:.2f}>" for i in range(200 - len(tokens) + extra_language)]
+    return {token: i for i, token in enumerate(tokens)}
+
+
+def random_whisper(seed: int, mel_bins: int, extra_language: bool, width: int = 64):
+    """A random multilingual Whisper with timestamp tokens, and its vocabulary."""
+    vocab = vocabulary(extra_language)
+    torch.manual_seed(seed)
+    config = WhisperModelConfig(
+        vocab_size=len(vocab),
+        d_model=width,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=2 * width,
+        decoder_ffn_dim=2 * width,
+        max_target_positions=448,
+        num_mel_bins=mel_bins,
+        pad_token_id=vocab["<eos>"],
+        bos_token_id=vocab["<eos>"],
+        eos_token_id=vocab["<eos>"],
+        decoder_start_token_id=vocab["<sot>"],
+        # Wide initial weights so greedy decoding does not collapse onto one token
+        init_std=0.3,
+    )
+    model = WhisperForConditionalGeneration(config).eval()
+    model.generation_config = GenerationConfig(
+        decoder_start_token_id=vocab["<sot>"],
+        eos_token_id=vocab["<eos>"],
+        pad_token_id=vocab["<eos>"],
+        bos_token_id=vocab["<eos>"],
+        no_timestamps_token_id=vocab["<notimestamps>"],
+        max_initial_timestamp_index=50,
+        begin_suppress_tokens=[vocab["<eos>"]],
+        suppress_tokens=[],
+        is_multilingual=True,
+        lang_to_id={"<|en|>": vocab["<en>"], "<|de|>": vocab["<de>"]},
+        task_to_id={"transcribe": vocab["<transcribe>"]},
+    )
+    return model, vocab
+
+
+def generate(model, features, **kwargs) -> torch.Tensor:
+    with torch.no_grad():
+        return model.generate(features, max_new_tokens=30, **kwargs)
+
+
+class TestParseDrafts:
+    """Tests for the SPECULATIVE_DECODING spec."""
+
+    def test_pairs(self):
+        """Test target:draft pairs map targets to drafts, and empty disables."""
+        assert parse_drafts("") == {}
+        assert parse_drafts("whisper-large:whisper-tiny, whisper-small:whisper-tiny") == {
+            "whisper-large": "whisper-tiny",
+            "whisper-small": "whisper-tiny",
+        }
+
+    def test_invalid_entry(self):
+        """Test entries without a draft are rejected."""
+        with pytest.raises(ValueError, match="target:draft"):
+            parse_drafts("whisper-large")
+
+
+class TestAdapters:
+    """Tests for mapping a draft onto a target with other mel bands and token ids."""
+
+    def test_mel_projection_matches_draft_features(self):
+        """Test target log-mels projected onto 80 bands match the 80-band extractor's."""
+        target = WhisperFeatureExtractor(feature_size=128)
+        draft = WhisperFeatureExtractor(feature_size=80)
+        assert mel_projection(draft.mel_filters, draft.mel_filters) is None
+
+        rng = np.random.default_rng(0)
+        t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+        audio = sum(np.sin(2 * np.pi * 140.0 * k * t) / k for k in range(1, 8))
+        audio = (0.1 * audio + rng.normal(0.0, 0.01, len(t))).astype(np.float32)
+        features = lambda extractor: torch.from_numpy(
+            extractor(audio, sampling_rate=SAMPLE_RATE, return_tensors="np").input_features
+        )
+
+        encoder = Mock(conv1=Mock(weight=torch.zeros(1)))
+        encoder.side_effect = lambda input_features: input_features
+        projected = _ProjectedEncoder(
+            encoder, mel_projection(target.mel_filters, draft.mel_filters)
+        )(features(target))
+        assert projected.shape == (1, 80, 3000)
+        # Compare the 3s of audio; the padding after it is floored differently
+        error = (projected - features(draft))[..., :300].abs().mean()
+        assert error < 0.02
+
+    def test_vocabulary_maps(self):
+        """Test ids map by token string, and target-only tokens get no draft logit."""
+        target, draft = vocabulary(True), vocabulary(False)
+        assert vocabulary_maps(draft, draft, 200, 200, 50) is None
+
+        to_draft, from_draft = vocabulary_maps(target, draft, 201, 200, draft["<eos>"])
+        assert to_draft[target["t7"]] == draft["t7"]
+        assert to_draft[target["<notimestamps>"]] == draft["<notimestamps>"]
+        assert to_draft[target["<yue>"]] == draft["<eos>"]
+        assert from_draft[target["<yue>"]] == -1
+        assert from_draft[target["<0.50>"]] == draft["<0.50>"]
+
+
+@pytest.fixture(scope="module")
+def target():
+    """A random large-v3 shaped target: 128 mel bands and the extra language token."""
+    return random_whisper(0, 128, extra_language=True, width=128)
+
+
+@pytest.fixture(scope="module")
+def adapted(target):
+    """A draft with 80 mel bands and the vocabulary before large-v3's extra language."""
+    model, vocab = target
+    draft, draft_vocab = random_whisper(1, 80, extra_language=False)
+    maps = vocabulary_maps(vocab, draft_vocab, len(vocab), len(draft_vocab), 50)
+    projection = mel_projection(
+        WhisperFeatureExtractor(feature_size=128).mel_filters,
+        WhisperFeatureExtractor(feature_size=80).mel_filters,
+    )
+    return DraftModel(draft, model.config, model.generation_config, projection, maps)
+
+
+class TestAssistedGeneration:
+    """Tests that a draft changes how many target passes run, never the output."""
+
+    @pytest.mark.parametrize("seed, timestamps", [(0, False), (1, True)])
+    def test_output_identical_to_greedy(self, target, adapted, seed, timestamps):
+        """Test assisted decoding returns exactly the target's greedy tokens."""
+        model, _ = target
+        torch.manual_seed(seed)
+        features = torch.randn(1, 128, 3000)
+        expected = generate(model, features, return_timestamps=timestamps)
+        assert expected.shape[1] > 10
+        assisted = generate(model, features, return_timestamps=timestamps, assistant_model=adapted)
+        assert torch.equal(assisted, expected)
+
+    def test_twin_draft_saves_target_passes(self, target):
+        """Test a draft that always agrees lets the target verify many tokens per pass."""
+        model, _ = target
+        twin = DraftModel(copy.deepcopy(model), model.config, model.generation_config)
+        # A random model is never confident, which would stop every draft after one token
+        twin.generation_config.assistant_confidence_threshold = 0.0
+        draft_config = twin.draft.generation_config.to_dict()
+        torch.manual_seed(2)
+        features = torch.randn(1, 128, 3000)
+        expected = generate(model, features)
+
+        with patch.object(model, "forward", wraps=model.forward) as forward:
+            assisted = generate(model, features, assistant_model=twin)
+        assert torch.equal(assisted, expected)
+        assert forward.call_count < expected.shape[1] // 2
+        # The cached draft serves its own traffic; assisted generation must not touch it
+        assert twin.draft.generation_config.to_dict() == draft_config
+
+
+class TestTransformersBackend:
+    """Tests for passing the draft to the pipeline."""
+
+    def test_draft_becomes_assistant(self):
+        """Test a draft is passed as the assistant and batches decode one input at a time."""
+        pipe = Mock(return_value=[{"text": " a"}, {"text": " b"}])
+        draft = Mock()
+        audio = [np.zeros(SAMPLE_RATE, dtype=np.float32)] * 2
+        TransformersBackend().transcribe(pipe, audio, SAMPLE_RATE, "en", batch_size=8, draft=draft)
+        kwargs = pipe.call_args.kwargs
+        assert kwargs["generate_kwargs"]["assistant_model"] is draft
+        assert kwargs["batch_size"] == 1
+
+
+class TestManagerDrafts:
+    """Tests for loading drafts through the model cache."""
+
+    def test_rejects_invalid_pairs(self):
+        """Test unknown models, self-drafting and backends without drafts fail at startup."""
+        with pytest.raises(ValueError, match="Unsupported model"):
+            ModelManager(speculative_decoding="whisper-large:whisper-nano")
+        with pytest.raises(ValueError, match="own draft"):
+            ModelManager(speculative_decoding="whisper-1:whisper-large")
+        with patch.object(inference_backend, "faster_whisper", Mock()):
+            with pytest.raises(ValueError, match="ctranslate2"):
+                ModelManager(
+                    inference_backend="ctranslate2",
+                    speculative_decoding="whisper-large:whisper-tiny",
+                )
+
+    def test_draft_shared_with_its_own_traffic(self):
+        """Test the draft is the cached whisper-tiny, loaded once and pinned while in use."""
+        manager = StubModelManager(speculative_decoding="whisper-large:whisper-tiny")
+        with manager.use_model("whisper-large") as (large, _):
+            models = manager.get_cache_info()["models"]
+            assert models["openai/whisper-tiny"]["refcount"] == 1
+            assert models["openai/whisper-large-v3"]["draft"] == "whisper-tiny"
+            tiny, _ = manager.get_model("whisper-tiny")
+            assert large.draft is tiny.model
+            assert tiny.draft is None
+
+        assert manager.get_cache_info()["models"]["openai/whisper-tiny"]["refcount"] == 0
+        assert manager.get_cache_info()["misses"] == 2
+        again, _ = manager.get_model("whisper-1")
+        assert again.draft is large.draft
+
+    def test_transcribes_with_draft(self):
+        """Test the target's pipeline is called with the draft as assistant."""
+        manager = StubModelManager(speculative_decoding="whisper-large:whisper-tiny")
+        model, _ = manager.get_model("whisper-large")
+        model.model = Mock(wraps=model.model)
+        result = model.transcribe([np.zeros(SAMPLE_RATE, dtype=np.float32)], SAMPLE_RATE, "en")
+        assert result[0]["text"]
+        kwargs = model.model.call_args.kwargs
+        assert kwargs["generate_kwargs"]["assistant_model"] is model.draft
+
+    def test_failed_draft_load_falls_back(self):
+        """Test a draft that cannot load leaves the target decoding without one."""
+        manager = StubModelManager(speculative_decoding="whisper-large:whisper-tiny")
+        backend = manager._stub_backend
+        load = backend.load
+
+        def offline_tiny(repo_id, *args):
+            if repo_id == "openai/whisper-tiny":
+                raise OSError("offline")
+            return load(repo_id, *args)
+
+        with patch.object(backend, "load", side_effect=offline_tiny):
+            with manager.use_model("whisper-large") as (model, _):
+                assert model.draft is None
+        assert "openai/whisper-tiny" not in manager.get_cache_info()["models"]
@@ -0,0 +1,145 @@
+"""Unit tests for incremental stream transcription state."""
+import numpy as np
+import pytest
+from services.streaming_transcriber import StreamingTranscriber
+
+SR = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    """Return a 220Hz tone standing in for speech."""
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    """Return digital silence."""
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class TestLocalAgreement:
+    """Tests for committing words once consecutive hypotheses agree."""
+
+    def test_first_hypothesis_is_unstable(self):
+        """Test nothing is committed from a single hypothesis."""
+        session = StreamingTranscriber()
+        update = session.update({"text": " Put the box"})
+        assert update == {"text": "Put the box", "stable": "", "unstable": "Put the box"}
+
+    def test_agreed_prefix_is_committed(self):
+        """Test the common prefix of two hypotheses becomes stable."""
+        session = StreamingTranscriber()
+        session.update({"text": " Put the box"})
+        update = session.update({"text": " Put the boxes on"})
+        assert update["stable"] == "Put the"
+        assert update["unstable"] == "boxes on"
+
+    def test_agreement_ignores_case_and_punctuation(self):
+        """Test trailing punctuation added later does not break agreement."""
+        session = StreamingTranscriber()
+        session.update({"text": " Aisle three"})
+        update = session.update({"text": " aisle three."})
+        assert update["stable"] == "aisle three."
+
+    def test_committed_words_never_change(self):
+        """Test a later hypothesis that revises committed words does not change them."""
+        session = StreamingTranscriber()
+        session.update({"text": " Put the box"})
+        session.update({"text": " Put the box on"})
+        update = session.update({"text": " But a box on shelf"})
+        assert update["stable"].startswith("Put the box")
+
+    def test_finalize_commits_the_rest(self):
+        """Test the final hypothesis commits everything after the stable prefix."""
+        session = StreamingTranscriber()
+        session.update({"text": " Put the box"})
+        session.update({"text": " Put the box on"})
+        assert session.finalize({"text": " Put the box on shelf four."}) == (
+            "Put the box on shelf four."
+        )
+
+
+class TestWindowTrimming:
+    """Tests for keeping the inference window bounded."""
+
+    def test_window_returns_all_unread_audio(self):
+        """Test window() concatenates appended chunks and resets the unread counter."""
+        session = StreamingTranscriber()
+        session.append(tone(0.5))
+        session.append(tone(0.25))
+        assert session.unread_seconds == pytest.approx(0.75)
+        assert len(session.window()) == int(0.75 * SR)
+        assert session.unread_seconds == 0
+
+    def test_trims_committed_segments(self):
+        """Test audio for committed segments is dropped once the window is too long."""
+        session = StreamingTranscriber(max_window_seconds=4.0)
+        session.append(tone(5.0))
+        session.window()
+        first = {
+            "text": " one two three four",
+            "chunks": [
+                {"text": " one two", "timestamp": (0.0, 2.0)},
+                {"text": " three four", "timestamp": (2.0, 4.5)},
+            ],
+        }
+        session.update(first)
+        session.update(first)
+
+        # All four words are committed, so both segments are trimmed
+        assert session.buffered_seconds == pytest.approx(0.5)
+        session.append(tone(1.0))
+        session.window()
+        assert session.finalize({"text": " five"}) == "one two three four five"
+
+    def test_keeps_uncommitted_segments(self):
+        """Test a segment with tentative words is not trimmed."""
+        session = StreamingTranscriber(max_window_seconds=4.0)
+        session.append(tone(5.0))
+        session.window()
+        session.update({"text": " one two", "chunks": [{"text": " one two", "timestamp": (0.0, 2.0)}]})
+        session.update(
+            {
+                "text": " one two three",
+                "chunks": [
+                    {"text": " one two", "timestamp": (0.0, 2.0)},
+                    {"text": " three", "timestamp": (2.0, 5.0)},
+                ],
+            }
+        )
+        assert session.buffered_seconds == pytest.approx(3.0)
+
+
+class TestEndOfSpeech:
+    """Tests for trailing-silence end-of-speech detection."""
+
+    def test_silence_after_speech_ends_stream(self):
+        """Test speech followed by enough silence is detected."""
+        session = StreamingTranscriber(endpoint_silence_ms=500)
+        session.append(tone(1.0))
+        session.append(silence(0.3))
+        assert not session.speech_ended
+        session.append(silence(0.3))
+        assert session.speech_ended
+
+    def test_leading_silence_does_not_end_stream(self):
+        """Test silence before any speech never finalizes."""
+        session = StreamingTranscriber(endpoint_silence_ms=500)
+        session.append(silence(2.0))
+        assert not session.speech_ended
+
+    def test_quiet_speech_resets_silence(self):
+        """Test speech in a later chunk resets the trailing silence."""
+        session = StreamingTranscriber(endpoint_silence_ms=500)
+        session.append(tone(1.0))
+        session.append(silence(0.4))
+        session.append(tone(0.2, amplitude=0.05))
+        session.append(silence(0.4))
+        assert not session.speech_ended
+
+    def test_disabled(self):
+        """Test endpoint_silence_ms=0 disables detection."""
+        session = StreamingTranscriber(endpoint_silence_ms=0)
+        session.append(tone(1.0))
+        session.append(silence(5.0))
+        assert not session.speech_ended
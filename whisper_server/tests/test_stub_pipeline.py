@@ -0,0 +1,63 @@
+"""Unit tests for the stub pipeline used by benchmarks and load tests."""
+import time
+import numpy as np
+from unittest.mock import Mock
+from services.stub_pipeline import StubModelManager, StubPipeline
+
+
+def make_input(seconds: float, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return {"raw": rng.normal(0, 0.1, int(seconds * 16000)).astype(np.float32), "sampling_rate": 16000}
+
+
+class TestStubPipeline:
+    """Tests for StubPipeline."""
+
+    def test_same_audio_same_text(self):
+        """Test output depends only on the audio."""
+        pipe = StubPipeline()
+        first = pipe(make_input(2.0), batch_size=1, generate_kwargs={"task": "transcribe"})
+        second = pipe(make_input(2.0))
+        assert first == second
+        assert len(first["text"].split()) == 4
+        assert first["chunks"][0]["timestamp"] == (0.0, 2.0)
+
+    def test_batch_returns_one_result_per_input(self):
+        """Test a list input returns a list of results in order."""
+        pipe = StubPipeline()
+        inputs = [make_input(1.0, seed=1), make_input(3.0, seed=2)]
+        results = pipe(inputs, batch_size=2)
+        assert results == [pipe(inputs[0]), pipe(inputs[1])]
+
+    def test_feeds_streamer(self):
+        """Test a streamer in generate_kwargs receives the text word by word."""
+        pipe = StubPipeline()
+        streamer = Mock()
+        result = pipe(make_input(2.0), generate_kwargs={"streamer": streamer})
+        pieces = [c.args[0] for c in streamer.on_finalized_text.call_args_list]
+        assert len(pieces) == 4
+        assert "".join(pieces) == result["text"]
+
+    def test_simulated_latency(self):
+        """Test a call sleeps the fixed cost plus the per-audio-second cost."""
+        pipe = StubPipeline(fixed_latency=0.02, seconds_per_audio_second=0.01)
+        start = time.perf_counter()
+        pipe(make_input(2.0))
+        assert time.perf_counter() - start >= 0.04
+
+
+class TestStubModelManager:
+    """Tests for StubModelManager."""
+
+    def test_loads_stub_pipelines_through_the_cache(self):
+        """Test models are StubPipelines cached like real ones."""
+        manager = StubModelManager(fixed_latency=0.001)
+        with manager.use_model("whisper-small") as (model, batch_size):
+            assert isinstance(model.model, StubPipeline)
+            assert model.model.fixed_latency == 0.001
+            assert batch_size == manager.batch_size
+        again, _ = manager.get_model("whisper-small")
+        assert again is model
+        info = manager.get_cache_info()
+        assert info["hits"] == 1
+        assert info["models"]["openai/whisper-small"]["backend"] == "stub"
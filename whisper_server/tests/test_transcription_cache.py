@@ -0,0 +1,185 @@
+"""Unit tests for the transcription result cache."""
+import asyncio
+import pytest
+from services.transcription_cache import TranscriptionCache
+
+
+def make_compute(result, calls, delay=0.0):
+    """Build a compute coroutine factory that counts its invocations."""
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return dict(result)
+
+    return compute
+
+
+class TestMakeKey:
+    """Tests for cache key construction."""
+
+    def test_same_inputs_same_key(self):
+        """Test identical audio and options produce the same key."""
+        options = {"num_beams": 1}
+        assert TranscriptionCache.make_key(b"abc", "whisper-1", "en", options) == (
+            TranscriptionCache.make_key(b"abc", "whisper-1", "en", options)
+        )
+
+    def test_options_change_key(self):
+        """Test model, language and options are part of the key."""
+        base = TranscriptionCache.make_key(b"abc", "whisper-1", "en", {"num_beams": 1})
+        assert base != TranscriptionCache.make_key(b"abd", "whisper-1", "en", {"num_beams": 1})
+        assert base != TranscriptionCache.make_key(b"abc", "whisper-tiny", "en", {"num_beams": 1})
+        assert base != TranscriptionCache.make_key(b"abc", "whisper-1", "de", {"num_beams": 1})
+        assert base != TranscriptionCache.make_key(b"abc", "whisper-1", "en", {"num_beams": 5})
+
+
+class TestGetOrCompute:
+    """Tests for lookups, coalescing and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self):
+        """Test the second lookup is served from memory."""
+        cache = TranscriptionCache()
+        calls = []
+        compute = make_compute({"text": "hello"}, calls)
+
+        first = await cache.get_or_compute("k", compute)
+        second = await cache.get_or_compute("k", compute)
+
+        assert first == ({"text": "hello"}, "miss")
+        assert second == ({"text": "hello"}, "hit")
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesce(self):
+        """Test identical in-flight requests share one computation."""
+        cache = TranscriptionCache()
+        calls = []
+        compute = make_compute({"text": "hello"}, calls, delay=0.05)
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(3)))
+
+        assert len(calls) == 1
+        assert sorted(status for _, status in results) == ["coalesced", "coalesced", "miss"]
+        assert cache.get_stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_propagate_and_are_not_cached(self):
+        """Test a failed computation raises for all waiters and is retried next time."""
+        cache = TranscriptionCache()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("inference failed")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("k", failing),
+            cache.get_or_compute("k", failing),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        calls = []
+        value, status = await cache.get_or_compute("k", make_compute({"text": "ok"}, calls))
+        assert status == "miss"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_computation_outlives_a_cancelled_waiter(self):
+        """Test cancelling the request that started a shared computation leaves it to the rest."""
+        cache = TranscriptionCache()
+        calls = []
+        compute = make_compute({"text": "hello"}, calls, delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == ({"text": "hello"}, "coalesced")
+        assert first.cancelled()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_computation_cancelled_with_its_last_waiter(self):
+        """Test a computation nobody waits for any more is cancelled and not cached."""
+        cache = TranscriptionCache()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def compute():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        request = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await started.wait()
+        request.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+        await asyncio.sleep(0)
+
+        assert cache.get_stats()["in_flight"] == 0
+        calls = []
+        _, status = await cache.get_or_compute("k", make_compute({"text": "ok"}, calls))
+        assert status == "miss"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_bytes(self):
+        """Test least recently used entries are evicted once over budget."""
+        cache = TranscriptionCache(max_bytes=700)
+        calls = []
+        for key in ["a", "b"]:
+            await cache.get_or_compute(key, make_compute({"text": key}, calls))
+        # Touch "a" so "b" becomes least recently used
+        await cache.get_or_compute("a", make_compute({"text": "a"}, calls))
+        await cache.get_or_compute("c", make_compute({"text": "c"}, calls))
+
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 700
+        _, status = await cache.get_or_compute("a", make_compute({"text": "a"}, calls))
+        assert status == "hit"
+        _, status = await cache.get_or_compute("b", make_compute({"text": "b"}, calls))
+        assert status == "miss"
+
+
+class TestDiskTier:
+    """Tests for the SQLite tier."""
+
+    @pytest.mark.asyncio
+    async def test_survives_restart(self, tmp_path):
+        """Test results persist across cache instances."""
+        db_path = str(tmp_path / "cache.db")
+        first = TranscriptionCache(db_path=db_path)
+        await first.get_or_compute("k", make_compute({"text": "persisted"}, []))
+        first.close()
+
+        second = TranscriptionCache(db_path=db_path)
+        calls = []
+        value, status = await second.get_or_compute("k", make_compute({"text": "new"}, calls))
+        second.close()
+
+        assert value == {"text": "persisted"}
+        assert status == "hit"
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_ignored(self, tmp_path):
+        """Test entries older than the TTL are recomputed."""
+        db_path = str(tmp_path / "cache.db")
+        first = TranscriptionCache(db_path=db_path, ttl_seconds=0.01)
+        await first.get_or_compute("k", make_compute({"text": "old"}, []))
+        first.close()
+        await asyncio.sleep(0.05)
+
+        second = TranscriptionCache(db_path=db_path, ttl_seconds=0.01)
+        value, status = await second.get_or_compute("k", make_compute({"text": "new"}, []))
+        second.close()
+
+        assert value == {"text": "new"}
+        assert status == "miss"
@@ -1,7 +1,10 @@
 """Unit tests for validators module."""
 import pytest
 import base64
+from unittest.mock import patch
 from validators import (
+    base64_decoded_size,
+    decode_base64_audio,
     validate_base64_audio,
     validate_model_name,
     validate_audio_format,
@@ -66,6 +69,69 @@ class TestValidateBase64Audio:
         assert error is None
 
 
+class TestBase64DecodedSize:
+    """Tests for base64_decoded_size function."""
+
+    @pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 1023, 1024, 1025])
+    def test_matches_decoded_length(self, size):
+        """Test computed size matches the real decoded size for padded data."""
+        encoded = base64.b64encode(b"\x00" * size).decode("utf-8")
+        assert base64_decoded_size(encoded) == size
+
+    def test_unpadded_data(self):
+        """Test computed size for base64 without padding characters."""
+        encoded = base64.b64encode(b"\x00" * 5).decode("utf-8").rstrip("=")
+        assert base64_decoded_size(encoded) == 5
+
+    @pytest.mark.parametrize("size", [1024, 1025, 1026, 4096])
+    def test_line_wrapped_data(self, size):
+        """Test MIME line breaks and trailing whitespace are not counted."""
+        encoded = base64.encodebytes(b"\x00" * size).decode("utf-8").replace("\n", "\r\n")
+        assert base64_decoded_size(encoded + " \t\n") == size
+
+
+class TestDecodeBase64Audio:
+    """Tests for decode_base64_audio function."""
+
+    def test_decodes_valid_audio(self, sample_audio_base64):
+        """Test valid audio is decoded to the original bytes."""
+        audio_bytes = decode_base64_audio(sample_audio_base64)
+        assert audio_bytes == base64.b64decode(sample_audio_base64)
+
+    def test_empty_audio(self):
+        """Test decoding fails for empty audio."""
+        with pytest.raises(AudioValidationError, match="Audio data is required"):
+            decode_base64_audio("")
+
+    def test_too_large_rejected_before_decoding(self, large_audio_base64):
+        """Test oversized payloads are rejected without being decoded."""
+        with patch("validators.binascii.a2b_base64") as mock_decode:
+            with pytest.raises(AudioValidationError, match="too large"):
+                decode_base64_audio(large_audio_base64)
+        mock_decode.assert_not_called()
+
+    def test_invalid_base64(self):
+        """Test malformed base64 raises AudioValidationError."""
+        with pytest.raises(AudioValidationError, match="Invalid base64 encoding"):
+            decode_base64_audio("A" * 1401)
+
+    def test_line_wrapped_data_at_max_size(self, monkeypatch):
+        """Test line-wrapped data exactly at the size limit is accepted, one byte over is not."""
+        monkeypatch.setattr(WhisperConfig, "MAX_AUDIO_FILE_SIZE_BYTES", 4096)
+        audio = b"\xff\xfb" + b"\x00" * 4094
+        wrapped = base64.encodebytes(audio).decode("utf-8") + "  \n"
+        assert decode_base64_audio(wrapped) == audio
+        with pytest.raises(AudioValidationError, match="too large"):
+            decode_base64_audio(base64.encodebytes(audio + b"\x00").decode("utf-8"))
+
+    def test_line_wrapped_data_too_small(self):
+        """Test the real decoded size is re-checked when line breaks inflate the estimate."""
+        encoded = base64.b64encode(b"\x00" * 1000).decode("utf-8")
+        wrapped = "\n".join(encoded[i:i + 4] for i in range(0, len(encoded), 4))
+        with pytest.raises(AudioValidationError, match="too small"):
+            decode_base64_audio(wrapped)
+
+
 class TestValidateModelName:
     """Tests for validate_model_name function."""
 
@@ -0,0 +1,100 @@
+"""Unit tests for voice activity detection and speech packing."""
+import numpy as np
+import pytest
+from services.voice_activity import SpeechAudio, VoiceActivityDetector
+
+SR = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    """Return a 220Hz tone standing in for speech."""
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    """Return digital silence."""
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+@pytest.fixture
+def vad():
+    """Create a VoiceActivityDetector with default settings."""
+    return VoiceActivityDetector()
+
+
+class TestDetect:
+    """Tests for finding speech regions."""
+
+    def test_silence_has_no_speech(self, vad):
+        """Test digital silence yields no regions."""
+        assert len(vad.detect(silence(3.0), SR)) == 0
+
+    def test_white_noise_has_no_speech(self, vad):
+        """Test steady broadband noise is rejected by spectral flatness."""
+        noise = np.random.default_rng(0).normal(0, 0.1, 3 * SR).astype(np.float32)
+        assert len(vad.detect(noise, SR)) == 0
+
+    def test_internal_pause_splits_regions(self, vad):
+        """Test a long pause between two bursts of speech gives two padded regions."""
+        audio = np.concatenate([silence(1.0), tone(1.0), silence(1.5), tone(1.0), silence(1.0)])
+        regions = vad.detect(audio, SR) / SR
+        assert len(regions) == 2
+        assert regions[0][0] == pytest.approx(0.8, abs=0.05)
+        assert regions[1][1] == pytest.approx(4.7, abs=0.05)
+
+    def test_short_pause_is_bridged(self, vad):
+        """Test pauses shorter than min_silence_ms stay inside one region."""
+        audio = np.concatenate([tone(1.0), silence(0.2), tone(1.0)])
+        assert len(vad.detect(audio, SR)) == 1
+
+    def test_quiet_passage_in_continuous_speech_is_kept(self, vad):
+        """Test a quiet stretch is not mistaken for the noise floor when there is no silence."""
+        audio = np.concatenate([tone(4.0, 0.5), tone(0.7, 0.05), tone(4.0, 0.5)])
+        regions = vad.detect(audio, SR)
+        assert regions.tolist() == [[0, len(audio)]]
+
+    def test_short_click_is_dropped(self, vad):
+        """Test a burst shorter than min_speech_ms is not speech."""
+        audio = np.concatenate([silence(1.0), tone(0.05), silence(1.0)])
+        assert len(vad.detect(audio, SR)) == 0
+
+
+class TestSplit:
+    """Tests for packing speech into model inputs."""
+
+    def test_drops_internal_silence(self, vad):
+        """Test only the speech regions are kept."""
+        audio = np.concatenate([silence(1.0), tone(1.0), silence(3.0), tone(1.0), silence(1.0)])
+        speech = vad.split(audio, SR)
+        assert len(speech.packs) == 1
+        assert speech.duration == pytest.approx(7.0)
+        assert speech.speech_duration < 3.0
+
+    def test_packs_respect_max_length(self, vad):
+        """Test regions are grouped into packs no longer than max_pack_seconds."""
+        audio = np.concatenate([tone(2.0), silence(1.0)] * 4)
+        speech = vad.split(audio, SR, max_pack_seconds=5.0)
+        assert len(speech.packs) == 2
+        assert all(len(pack) <= 5 * SR for pack in speech.packs)
+
+    def test_maps_times_to_original_audio(self, vad):
+        """Test a time in the second region of a pack maps past the removed pause."""
+        audio = np.concatenate([silence(1.0), tone(1.0), silence(3.0), tone(1.0)])
+        speech = vad.split(audio, SR)
+        pack_start, original_start, _ = speech.pieces[0][1]
+        assert speech.to_original_time(0, pack_start + 0.5) == pytest.approx(original_start + 0.5)
+        assert original_start == pytest.approx(4.8, abs=0.05)
+
+    def test_no_speech_is_empty(self, vad):
+        """Test silent audio produces an empty SpeechAudio."""
+        speech = vad.split(silence(2.0), SR)
+        assert speech.is_empty
+        assert speech.audio.size == 0
+
+
+def test_from_audio_wraps_one_pack():
+    """Test unsegmented audio becomes a single pack with identity timing."""
+    speech = SpeechAudio.from_audio(tone(2.0), SR)
+    assert len(speech.packs) == 1
+    assert speech.to_original_time(0, 1.25) == pytest.approx(1.25)
@@ -1,4 +1,4 @@
-import base64
+import binascii
 import re
 from typing import Tuple, Optional
 from config import WhisperConfig
@@ -22,37 +22,125 @@ class SecurityValidationError(ValidationError):
     pass
 
 
-def validate_base64_audio(audio_base64: str) -> Tuple[bool, Optional[str]]:
+# Base64 alphabet with optional line wrapping and up to two padding characters
+BASE64_PATTERN = re.compile(r"[A-Za-z0-9+/\s]*={0,2}\s*")
+
+# ASCII whitespace that base64 decoding skips, such as MIME line breaks
+BASE64_WHITESPACE = " \t\n\r\v\f"
+
+# Minimum decoded audio size (prevent empty files)
+MIN_AUDIO_FILE_SIZE_BYTES = 1024
+
+
+def base64_decoded_size(audio_base64: str) -> int:
     """
-    Validate base64 audio data
+    Compute the decoded size of base64 data from its length, without decoding
+
+    Exact for valid base64, including line-wrapped (MIME) data and trailing
+    whitespace, which are not counted; an upper bound for anything else.
+
+    Args:
+        audio_base64: Base64 encoded data
+
+    Returns:
+        Decoded size in bytes
+    """
+    length = len(audio_base64) - sum(audio_base64.count(c) for c in BASE64_WHITESPACE)
+    # Look for padding before any trailing whitespace, without copying the string
+    end = len(audio_base64)
+    while end and audio_base64[end - 1] in BASE64_WHITESPACE:
+        end -= 1
+    padding = 0
+    if audio_base64.endswith("==", 0, end):
+        padding = 2
+    elif audio_base64.endswith("=", 0, end):
+        padding = 1
+    return (length * 3) // 4 - padding
+
+
+def decode_base64_audio(audio_base64: str) -> bytes:
+    """
+    Validate and decode base64 audio data in a single pass
+
+    The size limits are checked against the length of the encoded string
+    before any decoding, so oversized payloads are rejected without
+    allocating a buffer. The data is then decoded exactly once; the returned
+    bytes are meant to be shared by every later stage.
 
     Args:
         audio_base64: Base64 encoded audio data
 
     Returns:
-        Tuple of (is_valid, error_message)
+        Decoded audio bytes
+
+    Raises:
+        AudioValidationError: If the data is missing, malformed, or outside the size limits
     """
     if not audio_base64:
-        return False, "Audio data is required"
+        raise AudioValidationError("Audio data is required")
+
+    # Check file size before decoding
+    estimated_size = base64_decoded_size(audio_base64)
+    if estimated_size > WhisperConfig.MAX_AUDIO_FILE_SIZE_BYTES:
+        max_size_mb = WhisperConfig.MAX_AUDIO_FILE_SIZE_MB
+        raise AudioValidationError(f"Audio file too large. Maximum size is {max_size_mb}MB")
 
-    # Check if it's valid base64
+    if estimated_size < MIN_AUDIO_FILE_SIZE_BYTES:
+        raise AudioValidationError("Audio file too small. Minimum size is 1KB")
+
+    # a2b_base64 reads ASCII str data in place, unlike b64decode which copies it to bytes first
     try:
-        audio_bytes = base64.b64decode(audio_base64)
-    except Exception:
-        return False, "Invalid base64 encoding"
+        audio_bytes = binascii.a2b_base64(audio_base64)
+    except (binascii.Error, ValueError):
+        raise AudioValidationError("Invalid base64 encoding")
+
+    # Characters outside the alphabet make the estimate an upper bound, so re-check the real size
+    if len(audio_bytes) < MIN_AUDIO_FILE_SIZE_BYTES:
+        raise AudioValidationError("Audio file too small. Minimum size is 1KB")
+
+    return audio_bytes
 
-    # Check file size
-    if len(audio_bytes) > WhisperConfig.MAX_AUDIO_FILE_SIZE_BYTES:
+
+def validate_audio_size(size: int) -> Tuple[bool, Optional[str]]:
+    """
+    Validate the size of raw (non-base64) audio data
+
+    Args:
+        size: Audio size in bytes
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if size > WhisperConfig.MAX_AUDIO_FILE_SIZE_BYTES:
         max_size_mb = WhisperConfig.MAX_AUDIO_FILE_SIZE_MB
         return False, f"Audio file too large. Maximum size is {max_size_mb}MB"
 
-    # Check minimum size (prevent empty files)
-    if len(audio_bytes) < 1024:  # 1KB minimum
+    if size < MIN_AUDIO_FILE_SIZE_BYTES:
         return False, "Audio file too small. Minimum size is 1KB"
 
     return True, None
 
 
+def validate_base64_audio(audio_base64: str) -> Tuple[bool, Optional[str]]:
+    """
+    Validate base64 audio data
+
+    Prefer decode_base64_audio when the decoded bytes are needed afterwards.
+
+    Args:
+        audio_base64: Base64 encoded audio data
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    try:
+        decode_base64_audio(audio_base64)
+    except AudioValidationError as e:
+        return False, str(e)
+
+    return True, None
+
+
 def validate_model_name(model: str, allowed_models: list = None) -> Tuple[bool, Optional[str]]:
     """
     Validate Whisper model name
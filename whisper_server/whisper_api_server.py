@@ -6,14 +6,19 @@ transcription with an OpenAI-compatible API interface.
 
 This is the refactored version using modular services and dependency injection.
 """
+import asyncio
 import logging
+import multiprocessing
 import torch
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from config import WhisperConfig
-from api.routes import router
+from api.routes import get_model_manager, get_model_warmup, router, shutdown_services
+from services.metrics import MetricsMiddleware, monitor_event_loop_lag
+from services.request_timing import RequestTimingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -56,9 +61,31 @@ app.add_middleware(
     allowed_hosts=WhisperConfig.ALLOWED_HOSTS,
 )
 
+# Record request latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Request ids, Server-Timing headers and the slow-request log
+app.add_middleware(RequestTimingMiddleware, slow_request_ms=WhisperConfig.SLOW_REQUEST_MS)
+
 # Include API routes
 app.include_router(router)
 
+# Background tasks started with the server
+_background_tasks = []
+
+
+async def _unload_idle_models() -> None:
+    """Periodically unload models that have been idle longer than the TTL."""
+    interval = max(WhisperConfig.MODEL_IDLE_TTL_SECONDS / 4, 5)
+    model_manager = get_model_manager()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(model_manager.unload_idle)
+        except Exception as e:
+            logger.warning(f"Idle model unloading failed: {str(e)}")
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -66,6 +93,16 @@ async def startup_event():
     logger.info(f"Starting Whisper API Server on {WhisperConfig.HOST}:{WhisperConfig.PORT}")
     logger.info(f"CORS origins: {WhisperConfig.ALLOWED_ORIGINS}")
     logger.info(f"Max audio file size: {WhisperConfig.MAX_AUDIO_FILE_SIZE_MB}MB")
+    logger.info(
+        f"Inference workers: {WhisperConfig.INFERENCE_WORKERS}, "
+        f"queue size: {WhisperConfig.INFERENCE_MAX_QUEUE_SIZE}"
+    )
+    if WhisperConfig.MODEL_PRELOAD:
+        logger.info(f"Preloading models: {WhisperConfig.MODEL_PRELOAD}")
+        _background_tasks.append(get_model_warmup().start(WhisperConfig.MODEL_PRELOAD))
+    if WhisperConfig.MODEL_IDLE_TTL_SECONDS > 0:
+        _background_tasks.append(asyncio.create_task(_unload_idle_models()))
+    _background_tasks.append(asyncio.create_task(monitor_event_loop_lag()))
     logger.info("Server started successfully")
 
 
@@ -74,9 +111,14 @@ async def startup_event():
 async def shutdown_event():
     """Clean up resources on shutdown."""
     logger.info("Shutting down Whisper API Server")
+    for task in _background_tasks:
+        task.cancel()
+    shutdown_services()
 
 
 if __name__ == "__main__":
+    # In the PyInstaller build, replica processes re-run this executable; let them run the replica
+    multiprocessing.freeze_support()
     import uvicorn
 
     uvicorn.run(